@@ -0,0 +1,72 @@
+# Arquivo: benchmarks/bench_batch.py
+# Mede a vazão do lote (relatórios/s) conforme o tamanho do pool de renderização
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_batch [itens] [tamanhos de pool separados por vírgula]
+#
+# Para cada tamanho de pool o motor é iniciado do zero, aquecido com um item por
+# worker e então renderiza o lote inteiro com renderizar_lote (concorrência = pool).
+# A eficiência compara a vazão com a do pool de 1 worker multiplicada pelo número
+# de workers; acima de os.cpu_count() os workers disputam os mesmos núcleos.
+
+import asyncio
+import os
+import sys
+import time
+
+from pdf_service.jobs.batch import ItemLote, renderizar_lote
+from pdf_service.render.engine import RenderEngine
+
+ITENS_PADRAO = 24
+
+CONTEUDO = '\n'.join(
+    f'## {secao}) Talhão {secao}\n\n'
+    + 'Solo argiloso, boa estrutura e cobertura uniforme. ' * 12
+    + f'\n\n| Nutriente | Dose (kg/ha) |\n|---|---|\n| N | {40 + secao} |\n| P2O5 | {60 + secao} |\n| K2O | {50 + secao} |\n'
+    for secao in range(1, 7)
+)
+
+def _dados(indice):
+    return {
+        'tipo_documento': 'relatorio',
+        'titulo_documento': f'Relatório {indice}',
+        'tecnico_nome': 'Benchmark',
+        'propriedade': f'Fazenda {indice}',
+        'conteudo_principal': CONTEUDO,
+    }
+
+async def _medir(tamanho_pool, quantidade):
+    motor = RenderEngine(tamanho_pool=tamanho_pool, profundidade_fila=quantidade)
+    motor.iniciar()
+    try:
+        # Aquecimento: importa o ReportLab e os módulos de render em todos os workers
+        aquecimento = [ItemLote(i, 'dinamico', _dados(i), f'a{i}.pdf') for i in range(max(1, tamanho_pool))]
+        async for _ in renderizar_lote(motor, aquecimento, [], max(1, tamanho_pool), 120, 300):
+            pass
+
+        itens = [ItemLote(i, 'dinamico', _dados(i), f'r{i}.pdf') for i in range(quantidade)]
+        inicio = time.perf_counter()
+        sucessos = 0
+        async for resultado in renderizar_lote(motor, itens, [], max(1, tamanho_pool), 120, 900):
+            sucessos += resultado.sucesso
+        return sucessos, time.perf_counter() - inicio
+    finally:
+        motor.encerrar()
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else ITENS_PADRAO
+    tamanhos = [int(t) for t in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 2, 4]
+
+    print(f"{quantidade} relatórios por lote, {os.cpu_count()} núcleos")
+    print(f"{'pool':>5} {'ok':>4} {'tempo (s)':>10} {'rel/s':>8} {'eficiência':>11}")
+    base = None
+    for tamanho in tamanhos:
+        sucessos, duracao = asyncio.run(_medir(tamanho, quantidade))
+        vazao = sucessos / duracao
+        if base is None:
+            base = vazao / max(1, tamanho)
+        eficiencia = vazao / (base * max(1, tamanho))
+        print(f"{tamanho:>5} {sucessos:>4} {duracao:>10.2f} {vazao:>8.1f} {eficiencia:>10.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# Arquivo: benchmarks/bench_chart_backends.py
+# Compara os backends de gráfico (matplotlib x ReportLab nativo): custo de import, renderização e tamanho
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_chart_backends
+#
+# Os títulos, rótulos e valores desenhados por cada backend são verificados em tests/test_chart_backends.py.
+
+import io
+import subprocess
+import sys
+import time
+
+from PyPDF2 import PdfReader
+
+from pdf_service.core.config import get_color_palette
+from pdf_service.graphics.chart_cache import CHART_CACHE
+from pdf_service.graphics.chart_factory import ChartFactory
+
+GRAFICOS = {
+    'barras': ('Produção por talhão', 'Talhão 1: 120, Talhão 2: 95, Talhão 3: 143, Talhão 4: 80, Talhão 5: 110', None),
+    'barras_monetario': ('Receita', 'Milho: 1200, Soja: 2350.5, Trigo: 800', 'R$'),
+    'barras_percentual': ('Cobertura', 'A: 45%, B: 30%, C: 25%', None),
+    'pizza': ('Uso do solo', 'Pastagem: 55, Lavoura: 30, Reserva: 15', None),
+    'linha': ('Evolução do pH', 'pH=4.8,5.1,5.4,5.9,6.2; labels=Jan,Mar,Mai,Jul,Set', None),
+}
+
+BACKENDS = ('matplotlib', 'reportlab')
+REPETICOES = 5
+
+_SCRIPT_IMPORT = """
+import sys, time
+inicio = time.perf_counter()
+from pdf_service.graphics.chart_factory import ChartFactory
+ChartFactory.carregar_backend({backend!r})
+print(time.perf_counter() - inicio, 'matplotlib' in sys.modules)
+"""
+
+def _tipo(nome):
+    return nome.split('_')[0]
+
+def _medir_import(backend):
+    """Tempo de import a frio do backend, em um processo novo."""
+    saida = subprocess.run(
+        [sys.executable, '-c', _SCRIPT_IMPORT.format(backend=backend)],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(saida[0]), saida[1] == 'True'
+
+def _medir(nome, backend, cores):
+    """Renderiza o gráfico (vetor) sem cache; retorna tempo mínimo, bytes e proporção."""
+    titulo, dados, unidade = GRAFICOS[nome]
+    tempos = []
+    for _ in range(REPETICOES):
+        CHART_CACHE.limpar()
+        inicio = time.perf_counter()
+        buffer = ChartFactory.create_chart(_tipo(nome), titulo, dados, cores, unidade=unidade,
+                                           qualidade='vetor', backend=backend)
+        tempos.append(time.perf_counter() - inicio)
+
+    pdf = buffer.getvalue()
+    pagina = PdfReader(io.BytesIO(pdf)).pages[0]
+    x0, y0, x1, y1 = (float(valor) for valor in pagina.mediabox)
+    return min(tempos), len(pdf), (x1 - x0) / (y1 - y0)
+
+def main():
+    print(f"{'backend':<11} {'import a frio (ms)':>19} {'carrega matplotlib':>19}")
+    for backend in BACKENDS:
+        tempo, com_matplotlib = _medir_import(backend)
+        print(f"{backend:<11} {tempo * 1000:>19.1f} {'sim' if com_matplotlib else 'não':>19}")
+    print()
+
+    cores = get_color_palette('azul_escuro')
+    for backend in BACKENDS:
+        # Aquecimento: imports e fontes
+        _medir('barras', backend, cores)
+
+    print(f"{'gráfico':<18} {'backend':<11} {'render (ms)':>12} {'PDF (KB)':>9} {'proporção':>10}")
+    for nome in GRAFICOS:
+        for backend in BACKENDS:
+            render, tamanho, proporcao = _medir(nome, backend, cores)
+            print(f"{nome:<18} {backend:<11} {render * 1000:>12.1f} {tamanho / 1024:>9.1f} {proporcao:>10.2f}")
+
+if __name__ == '__main__':
+    main()
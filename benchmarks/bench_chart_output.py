@@ -0,0 +1,60 @@
+# Arquivo: benchmarks/bench_chart_output.py
+# Compara os níveis de qualidade dos gráficos (vetor x PNG) em tempo de renderização e tamanho
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_chart_output
+
+import io
+import time
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate
+
+from pdf_service.core.config import CHART_QUALITY_TIERS, get_color_palette
+from pdf_service.graphics.chart_cache import CHART_CACHE
+from pdf_service.graphics.chart_factory import ChartFactory, criar_flowable_grafico
+
+GRAFICOS = {
+    'barras': ('Produção por talhão', 'Talhão 1: 120, Talhão 2: 95, Talhão 3: 143, Talhão 4: 80, Talhão 5: 110'),
+    'pizza': ('Uso do solo', 'Pastagem: 55, Lavoura: 30, Reserva: 15'),
+    'linha': ('Evolução do pH', 'pH=4.8,5.1,5.4,5.9,6.2; labels=Jan,Mar,Mai,Jul,Set'),
+}
+
+REPETICOES = 5
+
+def _medir(tipo, qualidade, cores):
+    """Renderiza o gráfico sem cache e monta um PDF de uma página com ele."""
+    titulo, dados = GRAFICOS[tipo]
+    tempos = []
+    for _ in range(REPETICOES):
+        CHART_CACHE.limpar()
+        inicio = time.perf_counter()
+        buffer_grafico = ChartFactory.create_chart(tipo, titulo, dados, cores, qualidade=qualidade)
+        tempos.append(time.perf_counter() - inicio)
+
+    # O gráfico já está no cache: o tempo de build mede só a montagem do PDF
+    grafico = criar_flowable_grafico(titulo, dados, cores, tipo, 5.5 * inch, 3.5 * inch, qualidade=qualidade)
+    buffer_pdf = io.BytesIO()
+    inicio = time.perf_counter()
+    SimpleDocTemplate(buffer_pdf, pagesize=A4).build([grafico])
+    tempo_build = time.perf_counter() - inicio
+
+    return min(tempos), tempo_build, len(buffer_grafico.getvalue()), len(buffer_pdf.getvalue())
+
+def main():
+    cores = get_color_palette('azul_escuro')
+    # Aquecimento: imports, fontes do matplotlib e primeira figura
+    _medir('barras', 'alta', cores)
+
+    print(f"{'tipo':<8} {'qualidade':<10} {'render (ms)':>12} {'build (ms)':>11} {'gráfico (KB)':>13} {'PDF (KB)':>9}")
+    for tipo in GRAFICOS:
+        for qualidade in CHART_QUALITY_TIERS:
+            render, build, bytes_grafico, bytes_pdf = _medir(tipo, qualidade, cores)
+            print(
+                f"{tipo:<8} {qualidade:<10} {render * 1000:>12.1f} {build * 1000:>11.1f} "
+                f"{bytes_grafico / 1024:>13.1f} {bytes_pdf / 1024:>9.1f}"
+            )
+
+if __name__ == '__main__':
+    main()
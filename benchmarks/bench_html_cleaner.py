@@ -0,0 +1,75 @@
+# Arquivo: benchmarks/bench_html_cleaner.py
+# limpar_html_malformado: regex com lookahead (versão anterior, quadrática) contra o balanceador de tags com pilha,
+# em entradas comuns e adversárias
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_html_cleaner
+#
+# A equivalência com a versão anterior e a robustez em sopa de tags ficam em tests/test_html_cleaner.py.
+
+import logging
+import re
+import time
+import timeit
+
+from pdf_service.text.html_cleaner import limpar_html_malformado
+
+TAMANHOS = (1_000, 4_000, 16_000)
+CHAMADAS = 5_000
+
+# Entradas do dia a dia: células e linhas de informação, parágrafo sem tags e parágrafo com formatação
+COMUNS = {
+    'célula de tabela': '90 kg/ha',
+    'parágrafo sem tags': 'A amostragem do talhão foi feita na camada de 0-20 cm, com 15 subamostras. ' * 4,
+    'parágrafo com tags': 'A amostragem do <b>talhão</b> foi feita a 0-20 cm,<br/>com <i>15</i> subamostras. ' * 4,
+}
+
+def limpar_legado(texto):
+    """limpar_html_malformado anterior, sem alterações."""
+    if not texto:
+        return ""
+    texto = re.sub(r'</?para>', '', texto)
+    texto = re.sub(r'<b>(?!.*</b>.*$)', '<b>', texto)
+    texto = re.sub(r'<b>([^<]*)<b>', r'<b>\1</b>', texto)
+    texto = re.sub(r'<b>([^<]*)$', r'<b>\1</b>', texto)
+    texto = re.sub(r'<i>(?!.*</i>)', '<i>', texto)
+    texto = re.sub(r'<i>([^<]*)<i>', r'<i>\1</i>', texto)
+    texto = re.sub(r'<u>(?!.*</u>)', '<u>', texto)
+    texto = re.sub(r'<u>([^<]*)<u>', r'<u>\1</u>', texto)
+    texto = texto.replace('&', '&amp;')
+    if texto.endswith('<b>'):
+        texto = texto[:-3]
+    return texto
+
+def _adversarios(tamanho):
+    """Parágrafos com `tamanho` trechos de formatação."""
+    return {
+        'negritos fechados': '<b>dose</b> de calcário ' * tamanho,
+        'negritos abertos': '<b>dose de calcário ' * tamanho,
+        'itálicos abertos': 'texto <i>termo ' * tamanho,
+        'tags cruzadas': '<b><i>x</b></i> ' * tamanho,
+    }
+
+def _medir(funcao, texto):
+    inicio = time.perf_counter()
+    funcao(texto)
+    return time.perf_counter() - inicio
+
+def _medir_comum(funcao, texto):
+    """Melhor tempo por chamada (µs) em CHAMADAS chamadas."""
+    return min(timeit.repeat(lambda: funcao(texto), number=CHAMADAS, repeat=5)) / CHAMADAS * 1e6
+
+def main():
+    logging.disable(logging.WARNING)
+    print(f"{'entrada':<20} {'anterior (µs)':>14} {'atual (µs)':>11}")
+    for nome, texto in COMUNS.items():
+        print(f"{nome:<20} {_medir_comum(limpar_legado, texto):>14.2f} {_medir_comum(limpar_html_malformado, texto):>11.2f}")
+    print(f"{'entrada':<20} {'trechos':>8} {'KB':>6} {'anterior (ms)':>14} {'atual (ms)':>11}")
+    for tamanho in TAMANHOS:
+        for nome, texto in _adversarios(tamanho).items():
+            antes = _medir(limpar_legado, texto)
+            depois = _medir(limpar_html_malformado, texto)
+            print(f"{nome:<20} {tamanho:>8} {len(texto) / 1024:>6.0f} {antes * 1000:>14.1f} {depois * 1000:>11.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# Arquivo: benchmarks/bench_image_pipeline.py
+# Compara o caminho antigo das imagens anexadas (decodifica, valida e reabre no parse) com o pipeline de decodificação única
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_image_pipeline
+#
+# Cada modo processa 20 imagens de ~5MB em base64 (metade JPEG, metade PNG, ruído
+# para não comprimir) até o flowable pronto para o doc.build. O desenho no PDF é
+# igual nos dois modos e fica de fora. Alocações medidas com tracemalloc (pico
+# por imagem, acima do base64 já recebido).
+
+import base64
+import io
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+from PIL import Image as PILImage
+from reportlab.lib.units import inch
+from reportlab.platypus import Image
+
+from pdf_service.core.config import MAX_IMAGE_SIZE_MB
+from pdf_service.images.pipeline import decodificar_imagem
+from pdf_service.models import ImagemAnexada
+
+QUANTIDADE = 20
+RODADAS = 3
+
+def _imagem(indice):
+    """Imagem de ruído com o maior tamanho que ainda cabe em MAX_IMAGE_SIZE_MB de base64."""
+    gerador = random.Random(indice)
+    formato = 'JPEG' if indice % 2 == 0 else 'PNG'
+    lado = 1500 if formato == 'JPEG' else 1100
+    while True:
+        imagem = PILImage.frombytes('RGB', (lado, lado), gerador.randbytes(lado * lado * 3))
+        buffer = io.BytesIO()
+        imagem.save(buffer, formato, **({'quality': 95} if formato == 'JPEG' else {}))
+        codificado = base64.b64encode(buffer.getvalue()).decode('ascii')
+        if len(codificado) <= MAX_IMAGE_SIZE_MB * 1024 * 1024:
+            return codificado
+        lado -= 50
+
+def _timeout_legado(func, timeout_seconds):
+    """timeout_operation de antes: uma thread nova por imagem."""
+    resultado = [None]
+    thread = threading.Thread(target=lambda: resultado.__setitem__(0, func()), daemon=True)
+    thread.start()
+    thread.join(timeout_seconds)
+    return resultado[0]
+
+def _legado(base64_data):
+    """Reproduz o caminho anterior: regex do pydantic, b64decode (que repete o regex), PIL na validação e de novo no parse."""
+    if not re.match(r'^[A-Za-z0-9+/]*={0,2}$', base64_data):
+        raise ValueError("Formato base64 inválido")
+    img_bytes = base64.b64decode(base64_data, validate=True)
+
+    def validar():
+        with PILImage.open(io.BytesIO(img_bytes)) as pil_img:
+            tamanho = pil_img.size
+            pil_img.verify()
+            return tamanho
+    _timeout_legado(validar, 30)
+
+    with PILImage.open(io.BytesIO(img_bytes)) as pil_img:
+        w, h = pil_img.size
+        caixa = (5.5*inch, 3.5*inch) if w > h else (3.5*inch, 5*inch)
+    return Image(io.BytesIO(img_bytes), width=caixa[0], height=caixa[1], kind='proportional')
+
+def _pipeline(base64_data):
+    """Caminho atual: checagem do alfabeto no pydantic e o pipeline de decodificação única."""
+    anexo = ImagemAnexada(id=0, base64=base64_data)
+    imagem = decodificar_imagem(anexo.base64, anexo.id)
+    caixa = (5.5*inch, 3.5*inch) if imagem.paisagem else (3.5*inch, 5*inch)
+    return Image(imagem.buffer(), width=caixa[0], height=caixa[1], kind='proportional')
+
+def _medir(funcao, imagens):
+    cpu = []
+    picos = []
+    for _ in range(RODADAS):
+        for dados in imagens:
+            tracemalloc.start()
+            inicio = time.process_time()
+            flowable = funcao(dados)
+            cpu.append(time.process_time() - inicio)
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            del flowable
+    cpu.sort()
+    picos.sort()
+    return cpu[len(cpu) // 2], picos[len(picos) // 2]
+
+def main():
+    imagens = [_imagem(i) for i in range(QUANTIDADE)]
+    tamanho_medio = sum(len(dados) for dados in imagens) / len(imagens) / (1024 * 1024)
+    print(f"{QUANTIDADE} imagens, {tamanho_medio:.2f}MB de base64 em média, mediana de {RODADAS} rodadas")
+    print(f"{'modo':<10} {'CPU/imagem (ms)':>16} {'pico alocado/imagem (MB)':>25}")
+    for nome, funcao in (('antes', _legado), ('pipeline', _pipeline)):
+        cpu, pico = _medir(funcao, imagens)
+        print(f"{nome:<10} {cpu * 1000:>16.1f} {pico / (1024 * 1024):>25.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Arquivo: benchmarks/bench_image_resample.py
+# Tamanho do PDF e tempo de renderização com fotos grandes em cada perfil de qualidade_imagens
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_image_resample
+#
+# As fotos são sintéticas (gradiente com textura), em JPEG e PNG de até 4000px,
+# dentro dos limites de MAX_IMAGE_SIZE_MB e MAX_DECODE_SIZE_MB.
+
+import base64
+import io
+import logging
+import random
+import time
+
+from PIL import Image as PILImage, ImageFilter
+
+from pdf_service.core.config import IMAGE_QUALITY_PROFILES, MAX_IMAGE_SIZE_MB
+from pdf_service.images.resample import ESTATISTICAS_IMAGENS
+from pdf_service.pdf_generator import create_pdf_from_data
+
+FOTOS = [
+    ('JPEG', 4000, 3000),
+    ('JPEG', 3000, 4000),
+    ('JPEG', 3200, 2400),
+    ('PNG', 1600, 1200),
+    ('PNG', 900, 1200),
+]
+
+def _foto(indice, formato, largura, altura):
+    """Gradiente com textura suave: comprime como uma foto, não como ruído puro."""
+    gerador = random.Random(indice)
+    textura = PILImage.frombytes('L', (largura // 8, altura // 8), gerador.randbytes((largura // 8) * (altura // 8)))
+    textura = textura.resize((largura, altura), PILImage.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+    gradiente = PILImage.linear_gradient('L').resize((largura, altura))
+    imagem = PILImage.merge('RGB', (gradiente, textura, PILImage.blend(gradiente, textura, 0.5)))
+    qualidade = 92
+    while True:
+        buffer = io.BytesIO()
+        imagem.save(buffer, formato, **({'quality': qualidade} if formato == 'JPEG' else {'compress_level': 6}))
+        codificado = base64.b64encode(buffer.getvalue()).decode('ascii')
+        if len(codificado) <= MAX_IMAGE_SIZE_MB * 1024 * 1024 or qualidade <= 60:
+            return codificado
+        qualidade -= 4
+
+def _dados(imagens, perfil):
+    return {
+        'tipo_documento': 'relatorio',
+        'titulo_documento': 'Benchmark de imagens',
+        'tecnico_nome': 'Benchmark',
+        'conteudo_principal': '# Fotos da visita\n\n' + '\n\n'.join(f'[IMAGEM:{i}]' for i in range(len(imagens))),
+        'imagens_anexadas': [{'id': i, 'base64': dados, 'legenda': f'Foto {i}'} for i, dados in enumerate(imagens)],
+        'qualidade_imagens': perfil,
+    }
+
+def main():
+    logging.disable(logging.INFO)
+    imagens = [_foto(i, *foto) for i, foto in enumerate(FOTOS)]
+    entrada = sum(len(dados) * 3 // 4 for dados in imagens)
+    print(f"{len(imagens)} fotos, {entrada / (1024 * 1024):.1f}MB decodificados")
+    print(f"{'perfil':<10} {'PDF (KB)':>10} {'render (s)':>11} {'preparo (s)':>12} {'economizado (KB)':>17}")
+    for perfil in IMAGE_QUALITY_PROFILES:
+        create_pdf_from_data(_dados(imagens, perfil))  # aquecimento (fontes, imports)
+        antes = ESTATISTICAS_IMAGENS.estatisticas()
+        inicio = time.perf_counter()
+        pdf = create_pdf_from_data(_dados(imagens, perfil))
+        duracao = time.perf_counter() - inicio
+        depois = ESTATISTICAS_IMAGENS.estatisticas()
+        preparo = depois['tempo_s'] - antes['tempo_s']
+        economizado = depois['bytes_economizados'] - antes['bytes_economizados']
+        print(f"{perfil:<10} {len(pdf) / 1024:>10.0f} {duracao:>11.2f} {preparo:>12.2f} {economizado / 1024:>17.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Arquivo: benchmarks/bench_image_validation.py
+# Tempo de validar_imagens (validação + preparo) com 20 fotos conforme o tamanho do pool de imagens, e a parada na primeira falha
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_image_validation [threads separadas por vírgula]
+#
+# Cada tamanho de pool roda em um subprocesso com IMAGE_WORKERS definido (o pool é
+# criado no import). Acima de os.cpu_count() as threads disputam os mesmos núcleos.
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+QUANTIDADE = 20
+
+def _medir():
+    """Roda dentro do subprocesso: lote válido e lote com a primeira imagem corrompida."""
+    from benchmarks.bench_image_resample import _foto
+    from pdf_service.core.exceptions import ImageSecurityError
+    from pdf_service.images.pipeline import validar_imagens
+
+    logging.disable(logging.INFO)
+    # ~2.3MB por foto, para as 20 caberem em MAX_DECODE_SIZE_MB
+    fotos = [{'id': i, 'base64': _foto(i, 'JPEG', 2800, 2100)} for i in range(QUANTIDADE)]
+    validar_imagens(fotos[:1])  # aquecimento (pool e plugins do PIL)
+
+    inicio = time.perf_counter()
+    validar_imagens(fotos, 'alta')
+    valido = time.perf_counter() - inicio
+
+    corrompido = [{'id': 0, 'base64': 'QUJD' * 1000}] + fotos[1:]  # magic bytes inválidos
+    inicio = time.perf_counter()
+    try:
+        validar_imagens(corrompido, 'alta')
+    except ImageSecurityError:
+        pass
+    falha = time.perf_counter() - inicio
+    print(json.dumps({'valido': valido, 'falha': falha}))
+
+def main():
+    if sys.argv[1:] == ['--medir']:
+        _medir()
+        return
+
+    tamanhos = [int(t) for t in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1, 2, 4]
+    print(f"{QUANTIDADE} fotos JPEG 2800x2100, perfil 'alta', {os.cpu_count()} núcleos")
+    print(f"{'threads':>8} {'lote válido (s)':>16} {'1ª imagem inválida (s)':>23}")
+    for tamanho in tamanhos:
+        saida = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_image_validation', '--medir'],
+            env={**os.environ, 'IMAGE_WORKERS': str(tamanho)},
+            capture_output=True, text=True, check=True,
+        )
+        resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+        print(f"{tamanho:>8} {resultado['valido']:>16.2f} {resultado['falha']:>23.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Arquivo: benchmarks/bench_ingest.py
+# Pico de memória e tempo para receber um corpo de ~50MB com imagens: leitura clássica (corpo inteiro + pydantic) contra a leitura em fluxo
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_ingest
+#
+# O corpo chega em blocos de 64KB nos dois modos (como o servidor entrega). O
+# modo clássico junta o corpo, faz json.loads, valida com ReportData e gera o
+# dict e o pickle enviados ao worker; o modo em fluxo usa ingest.receber_json e
+# o pickle do dict resultante. Alocações medidas com tracemalloc, acima do
+# corpo já montado pelo benchmark.
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import pickle
+import time
+import tracemalloc
+import warnings
+
+from pdf_service.core.config import MAX_IMAGE_SIZE_MB
+from pdf_service.ingest.request import receber_json
+from pdf_service.models import ReportData
+
+BLOCO = 64 * 1024
+QUANTIDADE = 10
+
+def _corpo():
+    """~5MB de base64 por imagem (PNG com o cabeçalho certo e bytes aleatórios; a ingestão não abre a imagem)."""
+    bruto = b'\x89PNG\r\n\x1a\n' + os.urandom(MAX_IMAGE_SIZE_MB * 1024 * 1024 * 3 // 4 - 64)
+    imagem = base64.b64encode(bruto).decode('ascii')
+    return json.dumps({
+        'tipo_documento': 'relatorio',
+        'titulo_documento': 'Benchmark de ingestão',
+        'tecnico_nome': 'Benchmark',
+        'conteudo_principal': '\n\n'.join(f'[IMAGEM:{i}]' for i in range(QUANTIDADE)),
+        'imagens_anexadas': [{'id': i, 'base64': imagem, 'legenda': f'Foto {i}'} for i in range(QUANTIDADE)],
+    }).encode()
+
+def _blocos(corpo):
+    for inicio in range(0, len(corpo), BLOCO):
+        yield corpo[inicio:inicio + BLOCO]
+
+def _classico(corpo):
+    recebido = b''.join(list(_blocos(corpo)))
+    dados = ReportData.parse_obj(json.loads(recebido)).dict()
+    return pickle.dumps(dados)
+
+class _RequisicaoFalsa:
+    """O suficiente de Request para receber_json: cabeçalhos e stream()."""
+
+    def __init__(self, corpo):
+        self.corpo = corpo
+        self.headers = {'content-length': str(len(corpo))}
+
+    async def stream(self):
+        for bloco in _blocos(self.corpo):
+            yield bloco
+
+def _fluxo(corpo):
+    recebido = asyncio.run(receber_json(_RequisicaoFalsa(corpo), ReportData, ('imagens_anexadas',)))
+    try:
+        dados = recebido.modelo.dict()
+        dados['imagens_anexadas'] = recebido.imagens
+        return pickle.dumps(dados)
+    finally:
+        recebido.descartar()
+
+def _medir(funcao, corpo):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(corpo)
+    duracao = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duracao, pico, len(resultado)
+
+def main():
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings('ignore', category=DeprecationWarning)  # .dict()/parse_obj, como no resto do serviço
+    corpo = _corpo()
+    tamanho_mb = len(corpo) / (1024 * 1024)
+    print(f"Corpo de {tamanho_mb:.1f}MB ({QUANTIDADE} imagens), blocos de {BLOCO // 1024}KB")
+    print(f"{'modo':<10} {'tempo (s)':>10} {'pico (MB)':>10} {'pico/corpo':>11} {'enviado ao worker (MB)':>23}")
+    for nome, funcao in (('clássico', _classico), ('fluxo', _fluxo)):
+        funcao(corpo)  # aquecimento
+        duracao, pico, enviado = _medir(funcao, corpo)
+        print(f"{nome:<10} {duracao:>10.2f} {pico / (1024 * 1024):>10.1f} "
+              f"{pico / len(corpo):>11.2f} {enviado / (1024 * 1024):>23.2f}")
+
+if __name__ == '__main__':
+    main()
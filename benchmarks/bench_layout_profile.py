@@ -0,0 +1,73 @@
+# Arquivo: benchmarks/bench_layout_profile.py
+# Custo do perfil de layout (render/profiling.py) em um relatório dinâmico com texto e tabelas
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_layout_profile [repetições]
+#
+# Renderiza o mesmo relatório com e sem o perfil ativo, alternando as duas
+# formas para que aquecimento e caches pesem igual, compara as medianas e
+# imprime o perfil de uma das execuções (o mesmo JSON do header X-Perfil-Layout).
+
+import json
+import statistics
+import sys
+import time
+
+from pdf_service.pdf_generator import create_pdf_from_data
+from pdf_service.render.profiling import perfilar
+
+REPETICOES_PADRAO = 10
+
+CONTEUDO = '\n'.join(
+    f'## {secao}) Talhão {secao}\n\n'
+    + 'Solo argiloso, **boa estrutura** e cobertura uniforme. ' * 40
+    + f'\n\n[TABELA: Análise de solo {secao}\nAmostra | pH | P (mg/dm³) | K (mg/dm³) | Observação\n'
+    + ''.join(f'A{secao}{linha:02d} | {5 + linha % 10 / 10:.1f} | {12 + linha} | {80 + linha} | Coleta 0-20 cm\n'
+              for linha in range(30))
+    + ']\n'
+    for secao in range(1, 13)
+)
+
+DADOS = {
+    'tipo_documento': 'relatorio',
+    'titulo_documento': 'Relatório de perfil',
+    'tecnico_nome': 'Benchmark',
+    'propriedade': 'Fazenda Perfil',
+    'conteudo_principal': CONTEUDO,
+}
+
+def _sem_perfil():
+    return create_pdf_from_data(dict(DADOS))
+
+def _com_perfil():
+    with perfilar('dinamico') as perfil:
+        create_pdf_from_data(dict(DADOS))
+    return perfil
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES_PADRAO
+    _sem_perfil()
+    _com_perfil()
+
+    tempos = {'sem perfil': [], 'com perfil': []}
+    perfil = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        _sem_perfil()
+        tempos['sem perfil'].append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        perfil = _com_perfil()
+        tempos['com perfil'].append(time.perf_counter() - inicio)
+
+    print(f"{len(CONTEUDO) // 1024} KB de markdown, {repeticoes} repetições")
+    print(f"{'modo':<12} {'mediana (ms)':>13}")
+    medianas = {modo: statistics.median(valores) * 1000 for modo, valores in tempos.items()}
+    for modo, mediana in medianas.items():
+        print(f"{modo:<12} {mediana:>13.1f}")
+    print(f"custo do perfil: {medianas['com perfil'] / medianas['sem perfil'] - 1:+.1%}")
+
+    print()
+    print(json.dumps(perfil.como_dict(), indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# Arquivo: benchmarks/bench_markdown.py
+# Conversão dos blocos Markdown de um relatório agronômico de ~50KB: converter_markdown_para_html + tokenizar_bloco
+# (marcadores no texto) contra converter_markdown_em_elementos (descritores em uma passada)
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_markdown
+#
+# Mede só a conversão dos blocos de texto (o que _processar_bloco faz antes de
+# criar os Paragraphs) e confere que os dois caminhos produzem os mesmos
+# títulos, itens, separadores e texto em todos os blocos.
+
+import time
+
+from pdf_service.text.markdown_processor import converter_markdown_para_html, converter_markdown_em_elementos
+from pdf_service.text.tokenizer import TipoToken, dividir_blocos, tokenizar_bloco
+
+TAMANHO_ALVO = 50 * 1024
+REPETICOES = 20
+
+SECAO = """## ANÁLISE DE SOLO - TALHÃO {n}
+
+A amostragem do talhão {n} foi feita na camada de 0-20 cm, com 15 subamostras por gleba. Os teores de **fósforo** (Mehlich-1) ficaram em 8,5 mg/dm³, abaixo do nível crítico para a cultura, e a saturação por bases em *42%*, o que indica a necessidade de correção antes do plantio da safra.
+O pH em CaCl₂ de 4,8 e o alumínio trocável de 0,6 cmolc/dm³ reforçam a recomendação de calagem com incorporação.
+
+1) RECOMENDAÇÕES DE CORREÇÃO
+1.1) Calagem
+- Aplicar 2,8 t/ha de calcário dolomítico (PRNT 85%)
+- Incorporar com grade aradora a 20 cm, 60 a 90 dias antes do plantio
+- Reavaliar a saturação por bases após 12 meses
+1.2) Gessagem
+Aplicar **1,2 t/ha** de gesso agrícola quando a saturação por alumínio na camada de 20-40 cm passar de 20%.
+
+ADUBAÇÃO DE PLANTIO
+1. Fósforo: 90 kg/ha de P₂O₅ no sulco
+2. Potássio: 60 kg/ha de K₂O a lanço
+3. Nitrogênio: 30 kg/ha no plantio e 120 kg/ha em cobertura no estádio V4
+
+### Observações de campo
+Foram observadas manchas de *compactação* próximas à cabeceira do talhão, com resistência à penetração acima de 2 MPa entre 10 e 25 cm. A presença de plantas daninhas de folha larga (corda-de-viola e picão-preto) foi moderada, e o estande da cultura anterior estava **desuniforme** nas linhas de bordadura.
+
+---
+
+PRODUTIVIDADE ESPERADA
+Com as correções acima, a expectativa é de 65 a 70 sc/ha de soja, contra 52 sc/ha na média das últimas três safras do talhão.
+"""
+
+def _relatorio():
+    secoes = []
+    tamanho = 0
+    n = 1
+    while tamanho < TAMANHO_ALVO:
+        secao = SECAO.format(n=n)
+        secoes.append(secao)
+        tamanho += len(secao.encode())
+        n += 1
+    return '\n'.join(secoes)
+
+def _legado(bloco):
+    """Caminho anterior de _processar_bloco: HTML com marcadores, tokenizado e agrupado."""
+    titulos = [[] for _ in range(6)]
+    itens = []
+    partes = []
+    separador = False
+    for token in tokenizar_bloco(converter_markdown_para_html(bloco)):
+        if token.tipo is TipoToken.TEXTO:
+            partes.append(token.texto)
+        elif token.tipo is TipoToken.TITULO:
+            titulos[token.numero - 1].append(token.texto)
+        elif token.tipo is TipoToken.ITEM_LISTA:
+            itens.append(token.texto)
+        else:
+            separador = True
+    texto = ''.join(partes)
+    saida = [('separador',)] if separador else []
+    saida += [('titulo', nivel, titulo) for nivel, lista in enumerate(titulos, start=1) for titulo in lista]
+    saida += [('item', item) for item in itens]
+    if texto.strip() and texto.strip() != '<br/>':
+        saida.append(('texto', texto))
+    return saida
+
+def _compilado(bloco):
+    saida = []
+    for elemento in converter_markdown_em_elementos(bloco):
+        if elemento.tipo is TipoToken.SEPARADOR:
+            saida.append(('separador',))
+        elif elemento.tipo is TipoToken.TITULO:
+            saida.append(('titulo', elemento.numero, elemento.texto))
+        elif elemento.tipo is TipoToken.ITEM_LISTA:
+            saida.append(('item', elemento.texto))
+        else:
+            saida.append(('texto', elemento.texto))
+    return saida
+
+def _medir(funcao, blocos):
+    melhor = float('inf')
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        for bloco in blocos:
+            funcao(bloco)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    relatorio = _relatorio()
+    blocos = dividir_blocos(relatorio)
+    linhas = relatorio.count('\n') + 1
+    print(f"Relatório de {len(relatorio.encode()) / 1024:.1f}KB: {len(blocos)} blocos, {linhas} linhas (melhor de {REPETICOES})")
+
+    diferentes = sum(1 for bloco in blocos if _legado(bloco) != _compilado(bloco))
+    print(f"Blocos com saída diferente: {diferentes}")
+
+    print(f"{'modo':<12} {'tempo (ms)':>11} {'por linha (µs)':>15}")
+    tempos = {}
+    for nome, funcao in (('marcadores', _legado), ('compilado', _compilado)):
+        tempos[nome] = _medir(funcao, blocos)
+        print(f"{nome:<12} {tempos[nome] * 1000:>11.2f} {tempos[nome] / linhas * 1e6:>15.2f}")
+    print(f"Ganho: {tempos['marcadores'] / tempos['compilado']:.1f}x")
+
+if __name__ == '__main__':
+    main()
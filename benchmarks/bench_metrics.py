@@ -0,0 +1,53 @@
+# Arquivo: benchmarks/bench_metrics.py
+# Custo das métricas (core/metrics.py): observação no caminho das requisições e coleta em /metrics
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_metrics [observações]
+#
+# Mede o custo por observação de um histograma com rótulos e o tempo de
+# montar o texto do /metrics com séries no volume de um serviço em uso
+# (rotas x status, etapas, tipos de job). A coleta não inclui os coletores do
+# main.py (fila, caches, layout e recursos), que só leem contadores prontos.
+
+import statistics
+import sys
+import time
+
+from pdf_service.core.metrics import METRICAS, DURACAO_REQUISICOES, DURACAO_ETAPAS, registrar_documento
+
+OBSERVACOES_PADRAO = 200_000
+
+ROTAS = ['/gerar-pdf-dinamico', '/gerar-relatorio-visita', '/gerar-relatorio-adubacao', '/gerar-lote-dinamico',
+         '/jobs/dinamico', '/jobs/{job_id}', '/jobs/{job_id}/pdf', '/health/resources']
+STATUS = ['200', '400', '408', '413', '503']
+ETAPAS = ['requisicao', 'leitura_corpo', 'validacao', 'render', 'fila', 'job', 'parse_conteudo',
+          'normalizacao_texto', 'grafico', 'tabela', 'doc.build', 'base64']
+
+def main():
+    observacoes = int(sys.argv[1]) if len(sys.argv) > 1 else OBSERVACOES_PADRAO
+
+    inicio = time.perf_counter()
+    for indice in range(observacoes):
+        DURACAO_REQUISICOES.observar((indice % 997) / 100, ROTAS[indice % len(ROTAS)], 'POST', STATUS[indice % len(STATUS)])
+    custo_observacao = (time.perf_counter() - inicio) / observacoes
+
+    for indice in range(len(ETAPAS) * 100):
+        DURACAO_ETAPAS.observar((indice % 97) / 100, ETAPAS[indice % len(ETAPAS)])
+    for indice in range(1000):
+        registrar_documento(('dinamico', 'visita')[indice % 2], 20_000 * (indice % 50 + 1),
+                            {'imagens': indice % 7, 'graficos': indice % 4, 'tabelas': indice % 3})
+
+    METRICAS.texto()
+    tempos = []
+    for _ in range(50):
+        inicio = time.perf_counter()
+        texto = METRICAS.texto()
+        tempos.append(time.perf_counter() - inicio)
+
+    series = sum(1 for linha in texto.splitlines() if not linha.startswith('#'))
+    print(f"observação (histograma com 3 rótulos): {custo_observacao * 1e6:.2f} µs")
+    print(f"coleta de /metrics: {statistics.median(tempos) * 1000:.2f} ms (mediana) "
+          f"para {series} linhas, {len(texto) // 1024} KB")
+
+if __name__ == '__main__':
+    main()
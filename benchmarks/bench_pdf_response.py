@@ -0,0 +1,141 @@
+# Arquivo: benchmarks/bench_pdf_response.py
+# Compara os modos de resposta dos endpoints (JSON com base64 x PDF binário): bytes trafegados e pico de RSS
+#
+# Uso (na raiz do repositório, Linux):
+#     python -m benchmarks.bench_pdf_response
+#
+# Cada modo roda em um servidor uvicorn próprio; o pico de RSS (VmHWM) é lido
+# do processo do servidor, onde a resposta é codificada. Os workers de
+# renderização são processos separados e não entram na medida.
+
+import base64
+import http.client
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from PIL import Image
+
+MODOS = {
+    'json': {'Accept': 'application/json'},
+    'binario': {'Accept': 'application/pdf'},
+}
+
+REQUISICOES = 3
+QUANTIDADE_IMAGENS = 6
+CHAVE_API = 'benchmark'
+
+def _imagem_ruido(semente, largura=1400, altura=1000):
+    """JPEG de ruído (não comprime), para gerar um PDF de vários MB."""
+    gerador = random.Random(semente)
+    imagem = Image.frombytes('RGB', (largura, altura), gerador.randbytes(largura * altura * 3))
+    buffer = io.BytesIO()
+    imagem.save(buffer, 'JPEG', quality=90)
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def _payload(com_imagens):
+    imagens = [{'id': i, 'base64': _imagem_ruido(i), 'legenda': f'Foto {i}'}
+               for i in range(QUANTIDADE_IMAGENS)] if com_imagens else []
+    conteudo = '1) FOTOS\n' + '\n'.join(f'[IMAGEM:{i}]' for i in range(len(imagens))) + '\nFim.'
+    return json.dumps({
+        'tipo_documento': 'relatorio',
+        'titulo_documento': 'Benchmark de resposta',
+        'propriedade': 'Fazenda São João',
+        'tecnico_nome': 'Benchmark',
+        'conteudo_principal': conteudo,
+        'imagens_anexadas': imagens,
+    }).encode('utf-8')
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _memoria(pid):
+    """(VmRSS, VmHWM) do processo em KB."""
+    valores = {}
+    with open(f'/proc/{pid}/status') as status:
+        for linha in status:
+            if linha.startswith(('VmRSS', 'VmHWM')):
+                chave, valor = linha.split(':')
+                valores[chave] = int(valor.split()[0])
+    return valores['VmRSS'], valores['VmHWM']
+
+def _enviar(porta, payload, cabecalhos):
+    """Envia a requisição e lê o corpo em blocos; retorna (status, bytes recebidos, Content-Type)."""
+    conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=120)
+    conexao.request('POST', '/gerar-pdf-dinamico', body=payload, headers={
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {CHAVE_API}',
+        **cabecalhos,
+    })
+    resposta = conexao.getresponse()
+    recebidos = 0
+    while True:
+        bloco = resposta.read(65536)
+        if not bloco:
+            break
+        recebidos += len(bloco)
+    conexao.close()
+    return resposta.status, recebidos, resposta.getheader('Content-Type')
+
+def _aguardar_servidor(porta, processo):
+    for _ in range(300):
+        if processo.poll() is not None:
+            raise RuntimeError('servidor encerrou durante a inicialização')
+        try:
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=1)
+            conexao.request('GET', '/')
+            conexao.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('servidor não respondeu')
+
+def _medir(modo, payload_aquecimento, payload):
+    porta = _porta_livre()
+    ambiente = dict(os.environ, API_KEY=CHAVE_API, RENDER_POOL_SIZE='1')
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'pdf_service.main:app', '--port', str(porta), '--log-level', 'warning'],
+        env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _aguardar_servidor(porta, processo)
+        # Aquecimento com documento pequeno: imports e worker prontos antes da medida
+        _enviar(porta, payload_aquecimento, MODOS[modo])
+        rss_base, _ = _memoria(processo.pid)
+
+        recebidos = []
+        inicio = time.perf_counter()
+        for _ in range(REQUISICOES):
+            status, tamanho, tipo = _enviar(porta, payload, MODOS[modo])
+            if status != 200:
+                raise RuntimeError(f'{modo}: HTTP {status}')
+            recebidos.append(tamanho)
+        tempo = (time.perf_counter() - inicio) / REQUISICOES
+        _, rss_pico = _memoria(processo.pid)
+        return max(recebidos), tipo, rss_base, rss_pico, tempo
+    finally:
+        processo.terminate()
+        processo.wait()
+
+def main():
+    payload_aquecimento = _payload(com_imagens=False)
+    payload = _payload(com_imagens=True)
+    print(f"requisição: {len(payload) / 1024 / 1024:.1f} MB, {REQUISICOES} repetições por modo\n")
+    print(f"{'modo':<8} {'Content-Type':<17} {'trafegado (KB)':>15} {'RSS base (MB)':>14} "
+          f"{'RSS pico (MB)':>14} {'acréscimo (MB)':>15} {'tempo (ms)':>11}")
+    for modo in MODOS:
+        tamanho, tipo, rss_base, rss_pico, tempo = _medir(modo, payload_aquecimento, payload)
+        print(
+            f"{modo:<8} {tipo.split(';')[0]:<17} {tamanho / 1024:>15.1f} {rss_base / 1024:>14.1f} "
+            f"{rss_pico / 1024:>14.1f} {(rss_pico - rss_base) / 1024:>15.1f} {tempo * 1000:>11.0f}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# Arquivo: benchmarks/bench_tables.py
+# Tabelas de análise de solo com 500 linhas: criar_tabela anterior (colunas iguais, um Paragraph por célula, Table
+# quebrado pelo ReportLab) contra tables/builder.py (larguras pelo conteúdo, células leves, paginação em blocos)
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_tables
+#
+# Mede criar_tabela e o doc.build de um documento A4 só com a tabela, e confere
+# no texto extraído do PDF que todas as linhas aparecem, uma vez e em ordem.
+
+import io
+import logging
+import random
+import re
+import sys
+import time
+
+from PyPDF2 import PdfReader
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
+
+from pdf_service.core.config import COLOR_PALETTES
+from pdf_service.tables.builder import criar_tabela
+from pdf_service.text.html_cleaner import limpar_html_malformado
+from pdf_service.text.unicode_handler import corrigir_caracteres_especiais
+from pdf_service.utils.styles import TIPO_VOXY, cor, obter_estilos
+
+TAMANHOS = (50, 200, 500)
+REPETICOES = 3
+PALETA = 'verde_agronegocio'
+
+def criar_tabela_legado(table_string, cores_paleta, total_width, estilos):
+    """criar_tabela anterior (sem o tratamento de erro), com as mesmas células e estilos."""
+    table_string_normalized = re.sub(r'<br\s*/?>', '\n', table_string.strip())
+    linhas = [linha.strip() for linha in table_string_normalized.split('\n') if linha.strip()]
+    titulo_tabela, *dados_tabela_str = linhas
+    dados_tabela = []
+    for linha in dados_tabela_str:
+        celulas = [cell.strip() for cell in linha.split('|')]
+        while celulas and not celulas[0]:
+            celulas.pop(0)
+        while celulas and not celulas[-1]:
+            celulas.pop()
+        if celulas:
+            dados_tabela.append(celulas)
+
+    num_colunas = len(dados_tabela[0])
+    col_widths = [total_width / num_colunas] * num_colunas
+    cell_style = estilos['CelulaTabela']
+    header_style = estilos['CabecalhoTabela']
+    header_row = [Paragraph(f'<b>{corrigir_caracteres_especiais(cell)}</b>', header_style) for cell in dados_tabela[0]]
+    dados_tabela_formatada = [header_row]
+    for row in dados_tabela[1:]:
+        dados_tabela_formatada.append([Paragraph(limpar_html_malformado(corrigir_caracteres_especiais((cell or '').replace('\n', ' '))), cell_style) for cell in row])
+    t = Table(dados_tabela_formatada, colWidths=col_widths, repeatRows=1)
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), cor(cores_paleta['principal'])),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('LINEBELOW', (0, 0), (-1, 0), 2, cor(cores_paleta['destaque'])),
+        ('LINEBELOW', (0, 1), (-1, -2), 0.5, cor('#E0E0E0')),
+    ])
+    for i in range(1, len(dados_tabela_formatada)):
+        if i % 2 == 0:
+            style.add('BACKGROUND', (0, i), (-1, i), cor(cores_paleta.get('zebra', '#F5F5F5')))
+    t.setStyle(style)
+    return [Paragraph(titulo_tabela, estilos['TituloTabela']), t]
+
+OBSERVACOES = ['', '', 'Aplicar calcário', 'Compactação na cabeceira do talhão, reavaliar após a colheita',
+               'Teor de <b>P</b> abaixo do crítico', 'Gesso: 1,2 t/ha']
+
+def _tabela(linhas):
+    """Bloco [TABELA] de análise de solo: amostra, nutrientes e uma coluna de observações."""
+    aleatorio = random.Random(linhas)
+    partes = ['Resultados da análise de solo (0-20 cm)',
+              '| Amostra | pH CaCl₂ | P (mg/dm³) | K (mg/dm³) | Ca | Mg | Al | V% | M.O. (g/dm³) | Observação |']
+    for i in range(1, linhas + 1):
+        valores = [f'{aleatorio.uniform(4, 6.5):.1f}', f'{aleatorio.uniform(2, 40):.1f}', f'{aleatorio.uniform(20, 200):.0f}',
+                   f'{aleatorio.uniform(0.5, 6):.2f}', f'{aleatorio.uniform(0.2, 2):.2f}', f'{aleatorio.uniform(0, 1):.2f}',
+                   f'{aleatorio.uniform(20, 80):.0f}', f'{aleatorio.uniform(10, 45):.0f}']
+        partes.append(f"| T{i:04d} | {' | '.join(valores)} | {aleatorio.choice(OBSERVACOES)} |")
+    return '\n'.join(partes)
+
+def _gerar(funcao, texto, estilos):
+    """Retorna (tempo de criar_tabela, tempo do doc.build, PDF)."""
+    largura = A4[0] - 2 * 72
+    inicio = time.perf_counter()
+    elementos = funcao(texto, COLOR_PALETTES[PALETA], largura, estilos)
+    montagem = time.perf_counter() - inicio
+
+    buffer = io.BytesIO()
+    inicio = time.perf_counter()
+    SimpleDocTemplate(buffer, pagesize=A4).build(elementos)
+    return montagem, time.perf_counter() - inicio, buffer.getvalue()
+
+def _amostras(pdf):
+    """Rótulos das amostras (T0001...) na ordem em que aparecem no PDF, e o número de páginas."""
+    leitor = PdfReader(io.BytesIO(pdf))
+    texto = '\n'.join(pagina.extract_text() for pagina in leitor.pages)
+    return re.findall(r'T\d{4}', texto), len(leitor.pages)
+
+def main():
+    logging.disable(logging.WARNING)
+    estilos = obter_estilos(TIPO_VOXY, PALETA)
+    print(f"{'linhas':>7} {'modo':<9} {'montagem (ms)':>14} {'build (ms)':>11} {'total (ms)':>11} {'páginas':>8}")
+    for linhas in TAMANHOS:
+        texto = _tabela(linhas)
+        totais = {}
+        for nome, funcao in (('anterior', criar_tabela_legado), ('atual', criar_tabela)):
+            melhor = None
+            for _ in range(REPETICOES):
+                medida = _gerar(funcao, texto, estilos)
+                if melhor is None or sum(medida[:2]) < sum(melhor[:2]):
+                    melhor = medida
+            montagem, build, pdf = melhor
+            amostras, paginas = _amostras(pdf)
+            esperadas = [f'T{i:04d}' for i in range(1, linhas + 1)]
+            if amostras != esperadas:
+                print(f"{nome}: linhas faltando, repetidas ou fora de ordem na tabela de {linhas} linhas")
+                sys.exit(1)
+            totais[nome] = montagem + build
+            print(f"{linhas:>7} {nome:<9} {montagem * 1000:>14.1f} {build * 1000:>11.1f} {totais[nome] * 1000:>11.1f} {paginas:>8}")
+        print(f"{'':>7} ganho {totais['anterior'] / totais['atual']:.1f}x")
+
+if __name__ == '__main__':
+    main()
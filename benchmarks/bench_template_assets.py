@@ -0,0 +1,88 @@
+# Arquivo: benchmarks/bench_template_assets.py
+# Custo por página do fundo do template Arizona: drawImage pelo caminho do arquivo (antes), registro de assets desenhado
+# em toda página (direto) e fundo num form XObject por documento (form)
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_template_assets
+#
+# Cada modo gera documentos de várias páginas só com texto, medindo o tempo do
+# callback de página (onFirstPage/onLaterPages) e o doc.build inteiro. A primeira
+# página de cada documento é onde as imagens viram XObject; as demais só as referenciam.
+
+import io
+import logging
+import os
+import time
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+
+from pdf_service.pdf_generator import FUNDO_ARIZONA, desenhar_fundo_arizona
+from pdf_service.utils.assets import ASSET_REGISTRY, ITENS_PNG_DIR
+
+DOCUMENTOS = 10
+PARAGRAFOS = 56
+
+def _template_legado(canvas, doc):
+    """draw_arizona_template de antes: drawImage com o caminho de cada PNG em toda página."""
+    pasta = os.path.join(ITENS_PNG_DIR, 'imagens_arizona')
+    width, height = A4
+    canvas.saveState()
+    canvas.drawImage(os.path.join(pasta, 'arcofinal.png'), -3.8 * cm, 2.5 * cm, width=16 * cm, height=10 * cm, preserveAspectRatio=True, mask='auto')
+    canvas.drawImage(os.path.join(pasta, 'legenda.png'), (width - 12 * cm) / 2, 0.5 * cm, width=12 * cm, height=2 * cm, preserveAspectRatio=True, mask='auto')
+    logo_x = width - doc.rightMargin - 4 * cm
+    logo_y = height - 2.5 * cm
+    canvas.drawImage(os.path.join(pasta, 'logoprincipal.png'), logo_x, logo_y, width=4 * cm, height=2 * cm, preserveAspectRatio=True, mask='auto')
+    canvas.drawImage(os.path.join(pasta, 'linhavermelha.png'), logo_x + 4 * cm - 13 * cm, logo_y - 0.1 * cm, width=13 * cm, height=1.5, preserveAspectRatio=False)
+    canvas.restoreState()
+
+def _fundo_form(canvas, doc):
+    """draw_arizona_template no modo 'form' (independe de TEMPLATE_BACKGROUND_MODE do ambiente)."""
+    if not canvas.hasForm(FUNDO_ARIZONA):
+        canvas.beginForm(FUNDO_ARIZONA)
+        desenhar_fundo_arizona(canvas, doc)
+        canvas.endForm()
+    canvas.doForm(FUNDO_ARIZONA)
+
+def _documento(desenhar_pagina, tempos):
+    def cronometrado(canvas, doc):
+        inicio = time.perf_counter()
+        desenhar_pagina(canvas, doc)
+        tempos.append(time.perf_counter() - inicio)
+
+    estilo = getSampleStyleSheet()['BodyText']
+    story = [Paragraph('Texto de preenchimento da página do relatório de visita. ' * 12, estilo) for _ in range(PARAGRAFOS)]
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=3 * cm, bottomMargin=3 * cm)
+    doc.build(story, onFirstPage=cronometrado, onLaterPages=cronometrado)
+    return buffer.getvalue()
+
+def _medir(desenhar_pagina):
+    primeiras, seguintes, totais = [], [], []
+    tamanho = 0
+    for _ in range(DOCUMENTOS):
+        tempos = []
+        inicio = time.perf_counter()
+        tamanho = len(_documento(desenhar_pagina, tempos))
+        totais.append(time.perf_counter() - inicio)
+        primeiras.append(tempos[0])
+        seguintes.extend(tempos[1:])
+    media = lambda valores: sum(valores) / len(valores) * 1000
+    return media(primeiras), media(seguintes), media(totais), tamanho, len(tempos)
+
+def main():
+    logging.disable(logging.INFO)
+    inicio = time.perf_counter()
+    ASSET_REGISTRY.carregar()
+    preparo = time.perf_counter() - inicio
+    print(f"{DOCUMENTOS} documentos; preparo dos assets (uma vez por processo): {preparo * 1000:.0f}ms")
+    print(f"{'modo':<10} {'1ª página (ms)':>15} {'demais (ms)':>12} {'documento (ms)':>15} {'páginas':>8} {'PDF (KB)':>9}")
+    for nome, desenhar_pagina in (('antes', _template_legado), ('direto', desenhar_fundo_arizona), ('form', _fundo_form)):
+        _documento(desenhar_pagina, [])  # aquecimento
+        primeira, demais, total, tamanho, paginas = _medir(desenhar_pagina)
+        print(f"{nome:<10} {primeira:>15.2f} {demais:>12.3f} {total:>15.1f} {paginas:>8} {tamanho / 1024:>9.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# Arquivo: benchmarks/bench_tokenizer.py
+# Compara o tokenizador de tags (text/tokenizer.py) com a varredura por regex usada antes em parse_conteudo
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_tokenizer
+
+import re
+import time
+
+from pdf_service.models import MAX_CONTEUDO_LENGTH
+from pdf_service.text.markdown_processor import converter_markdown_para_html
+from pdf_service.text.tokenizer import TipoToken, tokenizar_conteudo, tokenizar_bloco, dividir_blocos
+
+TRECHO = """## ANÁLISE DE SOLO
+
+A análise revelou níveis **baixos** de fósforo e P■O■ abaixo de 10 mg/dm³.
+
+1) RECOMENDAÇÕES
+1.1) Calagem
+- Aplicar 2,5 t/ha de calcário dolomítico
+- Incorporar a 20 cm
+1. Primeira etapa
+2. Segunda etapa
+
+---
+
+[GRAFICO_BARRAS: Produção: Milho: 10, Soja: 20, Trigo: 15]
+[TABELA: Nutrientes
+Nutriente|Dose (kg/ha)|Época
+N|150|Plantio
+P|80|Cobertura]
+[IMAGEM:1]
+
+"""
+
+def _varredura_legada(texto):
+    """Reproduz a divisão por regex do parse_conteudo anterior (sem criar flowables)."""
+    padrao_geral = r'(\[GRÁFICO_BARRAS:[^\]]+\]|\[GRAFICO_BARRAS:[^\]]+\]|\[GRÁFICO PIZZA:[^\]]+\]|\[GRAFICO PIZZA:[^\]]+\]|\[GRÁFICO_PIZZA:[^\]]+\]|\[GRAFICO_PIZZA:[^\]]+\]|\[GRÁFICO DE BARRAS:[^\]]+\]|\[GRAFICO DE BARRAS:[^\]]+\]|\[GRÁFICO DE PIZZA:[^\]]+\]|\[GRAFICO DE PIZZA:[^\]]+\]|\[GRÁFICO_LINHA:[^\]]+\]|\[GRAFICO_LINHA:[^\]]+\]|\[GRÁFICO DE LINHA:[^\]]+\]|\[GRAFICO DE LINHA:[^\]]+\]|\[TABELA:[\s\S]*?\]|\[IMAGEM(?::\d+)?\])'
+    saida = []
+    for parte in re.split(padrao_geral, texto):
+        if not parte or parte.isspace():
+            continue
+        if parte.startswith('[IMAGEM'):
+            saida.append(re.match(r'\[IMAGEM:(\d+)\]', parte))
+        elif any(tag in parte.upper() for tag in ['[GRÁFICO', '[GRAFICO']):
+            saida.append(re.search(r'\[(?:GRÁFICO|GRAFICO)[^:]*:\s*([^:]+):\s*(.*)\]', parte))
+        elif parte.startswith('[TABELA:'):
+            saida.append(re.search(r'\[TABELA:\s*([\s\S]*?)\]', parte))
+        else:
+            for bloco in re.split(r'\n\s*\n', parte.strip()):
+                if not bloco or bloco.isspace():
+                    continue
+                bloco_html = converter_markdown_para_html(bloco)
+                bloco_html = bloco_html.replace('[SEPARADOR_HORIZONTAL]', '')
+                for nivel in range(1, 7):
+                    padrao_titulo = f'\\[TITULO_NIVEL_{nivel}\\](.*?)\\[/TITULO_NIVEL_{nivel}\\]'
+                    for match in re.findall(padrao_titulo, bloco_html):
+                        saida.append(match)
+                        bloco_html = re.sub(padrao_titulo, '', bloco_html)
+                padrao_lista = r'\[ITEM_LISTA\](.*?)\[/ITEM_LISTA\]'
+                for match in re.findall(padrao_lista, bloco_html):
+                    saida.append(match)
+                    bloco_html = re.sub(padrao_lista, '', bloco_html)
+                saida.append(bloco_html)
+    return saida
+
+def _varredura_tokenizador(texto):
+    """Mesma varredura usando o tokenizador."""
+    saida = []
+    for token in tokenizar_conteudo(texto):
+        if token.tipo is TipoToken.TEXTO:
+            for bloco in dividir_blocos(token.texto):
+                saida.extend(tokenizar_bloco(converter_markdown_para_html(bloco)))
+        else:
+            saida.append(token)
+    return saida
+
+def medir(funcao, texto, repeticoes=20):
+    """Retorna o melhor tempo (em ms) entre as repetições."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+def main():
+    texto = (TRECHO * (MAX_CONTEUDO_LENGTH // len(TRECHO) + 1))[:MAX_CONTEUDO_LENGTH]
+    print(f"Entrada: {len(texto)} caracteres")
+    legado = medir(_varredura_legada, texto)
+    novo = medir(_varredura_tokenizador, texto)
+    print(f"Varredura legada (regex por parte):   {legado:8.2f} ms")
+    print(f"Tokenizador (passada única):          {novo:8.2f} ms")
+    print(f"Ganho: {legado / novo:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Arquivo: benchmarks/bench_tracing.py
+# Custo dos spans de rastreamento (core/tracing.py) com e sem rastro ativo, e da montagem do Server-Timing e do OTLP
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_tracing [repetições]
+#
+# Uma requisição típica abre da ordem de 20 spans (um por gráfico, tabela e
+# bloco de texto, mais as etapas fixas); o custo por requisição é estimado
+# com esse número.
+
+import sys
+import time
+
+from pdf_service.core.tracing import rastrear, span
+
+REPETICOES_PADRAO = 100_000
+SPANS_POR_REQUISICAO = 20
+
+def _medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+def _abrir_span():
+    with span('grafico', tipo='barras'):
+        pass
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else REPETICOES_PADRAO
+
+    sem_rastro = _medir(_abrir_span, repeticoes)
+    with rastrear():
+        with span('requisicao'):
+            com_rastro = _medir(_abrir_span, repeticoes)
+
+    # Resumo de uma requisição típica
+    with rastrear() as tipico:
+        with span('requisicao'):
+            for _ in range(SPANS_POR_REQUISICAO):
+                _abrir_span()
+    server_timing = _medir(tipico.server_timing, 10_000)
+    otlp = _medir(tipico.como_otlp, 10_000)
+
+    print(f"{'operação':<32} {'µs':>8}")
+    print(f"{'span sem rastro ativo':<32} {sem_rastro:>8.2f}")
+    print(f"{'span com rastro ativo':<32} {com_rastro:>8.2f}")
+    print(f"{'Server-Timing (21 spans)':<32} {server_timing:>8.2f}")
+    print(f"{'OTLP (21 spans)':<32} {otlp:>8.2f}")
+    print(f"por requisição (~{SPANS_POR_REQUISICAO} spans): "
+          f"{com_rastro * SPANS_POR_REQUISICAO + server_timing + otlp:.0f} µs")
+
+if __name__ == '__main__':
+    main()
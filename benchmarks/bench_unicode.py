@@ -0,0 +1,64 @@
+# Arquivo: benchmarks/bench_unicode.py
+# corrigir_caracteres_especiais: substituições em sequência (um str.replace por chave, como antes) contra a varredura
+# única (alternação compilada)
+#
+# Uso (na raiz do repositório):
+#     python -m benchmarks.bench_unicode
+#
+# A equivalência com a versão anterior é verificada em tests/test_unicode_handler.py.
+
+import time
+
+from benchmarks.bench_markdown import _relatorio
+from pdf_service.text.unicode_handler import corrigir_caracteres_especiais
+
+# Tabela da versão anterior, na ordem em que os str.replace eram aplicados
+SUBSTITUICOES_LEGADAS = [
+    ('⁻¹', '<sup>-1</sup>'), ('⁻²', '<sup>-2</sup>'), ('⁻³', '<sup>-3</sup>'), ('⁻⁴', '<sup>-4</sup>'),
+    ('¹', '<sup>1</sup>'), ('²', '<sup>2</sup>'), ('³', '<sup>3</sup>'), ('⁴', '<sup>4</sup>'),
+    ('₀', '<sub>0</sub>'), ('₁', '<sub>1</sub>'), ('₂', '<sub>2</sub>'), ('₃', '<sub>3</sub>'), ('₄', '<sub>4</sub>'),
+    ('₅', '<sub>5</sub>'), ('₆', '<sub>6</sub>'), ('₇', '<sub>7</sub>'), ('₈', '<sub>8</sub>'), ('₉', '<sub>9</sub>'),
+    ('■¹', '<sup>-1</sup>'), ('■²', '<sup>-2</sup>'), ('■³', '<sup>-3</sup>'),
+    ('P■O■', 'P<sub>2</sub>O<sub>5</sub>'), ('K■O', 'K<sub>2</sub>O'), ('N■O■', 'N<sub>2</sub>O<sub>5</sub>'),
+    ('Ca■', 'Ca<sub>2</sub>'), ('Mg■', 'Mg<sub>2</sub>'), ('SO■', 'SO<sub>4</sub>'),
+    ('■', ''),
+    ('≈', '~'), ('≤', '<='), ('≥', '>='), ('±', '+/-'),
+    ('°C', '&deg;C'), ('°F', '&deg;F'), ('°', '&deg;'),
+    ('½', '1/2'), ('¼', '1/4'), ('¾', '3/4'),
+    ('µ', 'u'), ('α', 'alfa'), ('β', 'beta'), ('γ', 'gama'),
+]
+
+REPETICOES = 20
+
+def corrigir_legado(texto):
+    if not texto:
+        return texto
+    for original, substituto in SUBSTITUICOES_LEGADAS:
+        texto = texto.replace(original, substituto)
+    return texto
+
+def _medir(funcao, textos):
+    melhor = float('inf')
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        for texto in textos:
+            funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    relatorio = _relatorio()
+    # Células de tabela: valores curtos, como os que criar_tabela corrige um a um
+    celulas = ['P■O■ (kg/ha)', '90', 'K₂O', '60', '25 °C', 'Ca²⁺ 3,2 cmolc/dm³', 'Plantio', 'Cobertura V4'] * 500
+    cargas = (
+        (f'relatório ({len(relatorio.encode()) / 1024:.0f}KB)', [relatorio]),
+        (f'{len(celulas)} células de tabela', celulas),
+    )
+    print(f"{'entrada':<26} {'sequencial (ms)':>16} {'varredura única (ms)':>21} {'ganho':>7}")
+    for nome, textos in cargas:
+        antes = _medir(corrigir_legado, textos)
+        depois = _medir(corrigir_caracteres_especiais, textos)
+        print(f"{nome:<26} {antes * 1000:>16.2f} {depois * 1000:>21.2f} {antes / depois:>6.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 # Arquivo: core/config.py
 # Configurações centralizadas e constantes do sistema
 
+import os
+import tempfile
+
 # ===============================
 # CONSTANTES DE SEGURANÇA CRÍTICAS
 # ===============================
@@ -11,6 +14,9 @@ MAX_IMAGE_COUNT = 20   # Máximo 20 imagens por documento
 MAX_DECODE_SIZE_MB = 50  # Máximo 50MB total de dados decodificados
 IMAGE_PROCESSING_TIMEOUT = 30  # Timeout de 30 segundos por imagem
 
+# Threads do pool que valida e prepara as imagens (compartilhado pelo processo)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
 # Formatos de imagem permitidos (magic bytes)
 ALLOWED_IMAGE_FORMATS = {
     b'\x89PNG\r\n\x1a\n': 'PNG',
@@ -84,7 +90,8 @@ DEFAULT_MARGINS = 72
 IGNORED_CONTENT_FIELDS = [
     'tipo_documento', 'titulo_documento', 'tecnico_nome', 
     'paleta_cores', 'cliente', 'propriedade', 
-    'data_documento', 'imagens_anexadas'
+    'data_documento', 'imagens_anexadas', 'qualidade_graficos', 'backend_graficos',
+    'qualidade_imagens'
 ]
 
 # Ordem preferida para processamento de campos de conteúdo
@@ -92,6 +99,209 @@ CONTENT_FIELD_ORDER = [
     'conteudo_principal', 'recomendacoes', 'conclusoes'
 ]
 
+# ===============================
+# MOTOR DE RENDERIZAÇÃO (POOL DE PROCESSOS)
+# ===============================
+
+# Número de processos pré-criados para renderizar PDFs (0 = renderiza em thread no próprio processo)
+RENDER_POOL_SIZE = int(os.getenv("RENDER_POOL_SIZE", "2"))
+
+# Quantos jobs podem aguardar na fila além dos que já estão em execução
+RENDER_QUEUE_DEPTH = int(os.getenv("RENDER_QUEUE_DEPTH", "8"))
+
+# Valor (em segundos) do header Retry-After quando a fila está cheia
+RENDER_RETRY_AFTER = int(os.getenv("RENDER_RETRY_AFTER", "10"))
+
+# Método de criação dos processos: 'spawn' (padrão, seguro) ou 'forkserver'/'fork'
+RENDER_START_METHOD = os.getenv("RENDER_START_METHOD", "spawn")
+
+# ===============================
+# RESPOSTA DOS PDFs
+# ===============================
+
+# Tamanho dos blocos enviados no modo binário (Accept: application/pdf ou ?formato=pdf)
+PDF_STREAM_CHUNK_KB = float(os.getenv("PDF_STREAM_CHUNK_KB", "64"))
+
+# ===============================
+# JOBS ASSÍNCRONOS
+# ===============================
+
+# Diretório onde os jobs e PDFs ficam guardados (vazio = memória do processo);
+# com diretório, qualquer processo da API consegue responder o status e o PDF
+JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", "")
+
+# Por quanto tempo um job (e o seu PDF) fica disponível depois de concluído
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+
+# Total de PDFs guardados em memória (sem JOB_STORE_DIR); acima disso os PDFs
+# mais antigos são descartados antes do TTL, com o job (0 = sem limite)
+JOB_STORE_MAX_MB = float(os.getenv("JOB_STORE_MAX_MB", "256"))
+
+# Quantos jobs podem estar na fila ou executando (acima disso HTTP 503)
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "32"))
+
+# Quantos jobs usam o motor de renderização ao mesmo tempo (o restante do pool
+# fica para as requisições síncronas)
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "1"))
+
+# Tempo máximo de um job, contando a espera por vaga no motor
+JOB_RENDER_TIMEOUT = int(os.getenv("JOB_RENDER_TIMEOUT", "300"))
+
+# Webhook (callback_url): timeout por tentativa e número de tentativas
+JOB_WEBHOOK_TIMEOUT = int(os.getenv("JOB_WEBHOOK_TIMEOUT", "10"))
+JOB_WEBHOOK_RETRIES = int(os.getenv("JOB_WEBHOOK_RETRIES", "3"))
+
+# Hosts aceitos em callback_url, separados por vírgula. Vazio = qualquer host que
+# resolva só para endereços públicos; hosts da lista podem ser internos
+JOB_WEBHOOK_ALLOWED_HOSTS = [
+    host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+]
+
+# ===============================
+# LOTES (VÁRIOS RELATÓRIOS POR REQUISIÇÃO)
+# ===============================
+
+# Máximo de relatórios em um lote
+LOTE_MAX_ITENS = int(os.getenv("LOTE_MAX_ITENS", "200"))
+
+# Relatórios do lote renderizados ao mesmo tempo (0 = um por worker do pool)
+LOTE_CONCURRENCY = int(os.getenv("LOTE_CONCURRENCY", "0"))
+
+# Tempo máximo do lote inteiro; itens que não terminarem a tempo voltam como erro
+LOTE_TIMEOUT = int(os.getenv("LOTE_TIMEOUT", "900"))
+
+# ===============================
+# INGESTÃO DAS REQUISIÇÕES
+# ===============================
+
+# Tamanho máximo do corpo JSON das rotas com leitura em fluxo (conferido no
+# Content-Length e enquanto o corpo chega)
+INGEST_MAX_BODY_MB = float(os.getenv("INGEST_MAX_BODY_MB", "80"))
+
+# Limite de cada string comum do JSON (os base64 das imagens não entram aqui)
+INGEST_MAX_TEXT_KB = int(os.getenv("INGEST_MAX_TEXT_KB", "512"))
+
+# Imagens decodificadas ficam em memória até este tamanho; acima disso vão para disco
+INGEST_SPOOL_MEMORY_KB = int(os.getenv("INGEST_SPOOL_MEMORY_KB", "256"))
+
+# Diretório dos arquivos temporários das imagens (apagados ao fim da requisição)
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "voxy_pdf_ingest"))
+
+# ===============================
+# QUALIDADE DOS GRÁFICOS
+# ===============================
+
+# Níveis de qualidade: 'vetor' embute o gráfico como desenho vetorial (PDF form XObject);
+# os demais geram PNG na resolução indicada
+CHART_QUALITY_TIERS = {
+    'vetor': {'formato': 'pdf'},
+    'alta': {'formato': 'png', 'dpi': 300},
+    'media': {'formato': 'png', 'dpi': 150},
+    'rascunho': {'formato': 'png', 'dpi': 96},
+}
+
+# Qualidade usada quando a requisição não escolhe uma
+CHART_QUALITY = os.getenv("CHART_QUALITY", "vetor")
+
+# Backends de desenho: 'matplotlib' ou 'reportlab' (nativo, não carrega o matplotlib)
+CHART_BACKENDS = ('matplotlib', 'reportlab')
+
+# Backend usado quando a requisição não escolhe um
+CHART_BACKEND = os.getenv("CHART_BACKEND", "matplotlib")
+
+# ===============================
+# QUALIDADE DAS IMAGENS ANEXADAS
+# ===============================
+
+# Perfis de preparação: cada foto é reamostrada para `dpi` no tamanho em que é
+# impressa e recodificada em JPEG com `qualidade_jpeg` (imagens com transparência
+# continuam PNG); 'original' embute a imagem exatamente como foi recebida
+IMAGE_QUALITY_PROFILES = {
+    'original': None,
+    'alta': {'dpi': 300, 'qualidade_jpeg': 90},
+    'media': {'dpi': 200, 'qualidade_jpeg': 85},
+    'rascunho': {'dpi': 150, 'qualidade_jpeg': 75},
+}
+
+# Perfil usado quando a requisição não escolhe um
+IMAGE_QUALITY = os.getenv("IMAGE_QUALITY", "alta")
+
+# ===============================
+# IMAGENS FIXAS DOS TEMPLATES
+# ===============================
+
+# Resolução em que os PNGs de itens_png_voxy são guardados, na maior caixa em que
+# cada um é desenhado (0 = mantém os pixels originais)
+TEMPLATE_ASSET_DPI = int(os.getenv("TEMPLATE_ASSET_DPI", "300"))
+
+# Fundo das páginas do template Arizona: 'form' desenha cabeçalho e rodapé uma vez por
+# documento num form XObject e só o referencia em cada página; 'direto' desenha em toda página
+TEMPLATE_BACKGROUND_MODE = os.getenv("TEMPLATE_BACKGROUND_MODE", "form")
+
+# ===============================
+# TABELAS
+# ===============================
+
+# Tabelas com mais linhas de dados que isto são paginadas em blocos do tamanho do espaço
+# livre na página, em vez de o ReportLab recalcular todas as linhas restantes a cada quebra
+TABLE_PAGINATION_ROWS = int(os.getenv("TABLE_PAGINATION_ROWS", "40"))
+
+# ===============================
+# PERFIL DE LAYOUT
+# ===============================
+
+# Mede wrap/split/draw por tipo de flowable, páginas e passadas de cada doc.build
+# (histogramas em /health/resources e header X-Perfil-Layout sob demanda); 0 desativa
+LAYOUT_PROFILING = os.getenv("LAYOUT_PROFILING", "1") == "1"
+
+# Limites dos buckets dos histogramas de tempo de layout (segundos)
+LAYOUT_HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ===============================
+# RASTREAMENTO DAS REQUISIÇÕES
+# ===============================
+
+# Spans por etapa (leitura, validação, imagens, texto, gráficos, doc.build, base64)
+# resumidos no header Server-Timing de cada resposta; 0 desativa
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+
+# Arquivo onde cada requisição rastreada vira uma linha JSON no formato OTLP
+# (o mesmo do file exporter do OpenTelemetry Collector); vazio = não exporta
+TRACING_EXPORT_FILE = os.getenv("TRACING_EXPORT_FILE", "")
+
+# service.name dos spans exportados
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "voxy-pdf-service")
+
+# ===============================
+# MÉTRICAS (/metrics)
+# ===============================
+
+# Buckets (segundos) da duração das requisições HTTP e das etapas dos spans
+METRICS_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Buckets (bytes) do tamanho dos PDFs gerados
+METRICS_PDF_SIZE_BUCKETS = (10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6)
+
+# Buckets da quantidade de imagens, gráficos e tabelas por documento
+METRICS_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+# Intervalo (segundos) entre as amostras de memória, CPU e descritores do processo
+# e dos workers; /health/resources e /metrics só leem a última amostra
+RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", "15"))
+
+# ===============================
+# CACHE DE GRÁFICOS
+# ===============================
+
+# Limite da camada em memória do cache de gráficos, por processo (0 = desativado)
+CHART_CACHE_MAX_MB = float(os.getenv("CHART_CACHE_MAX_MB", "32"))
+
+# Diretório da camada em disco (vazio = sem disco); sobrevive a reinícios e é compartilhado entre workers
+CHART_CACHE_DIR = os.getenv("CHART_CACHE_DIR", "")
+
+# Limite do diretório em disco (0 = sem limite)
+CHART_CACHE_DISK_MAX_MB = float(os.getenv("CHART_CACHE_DISK_MAX_MB", "256"))
+
 # ===============================
 # FUNÇÕES UTILITÁRIAS DE CONFIGURAÇÃO
 # ===============================
@@ -135,6 +345,57 @@ def validate_palette_name(palette_name: str) -> str:
     
     return DEFAULT_COLOR_PALETTE
 
+def validate_chart_quality(quality_name: str) -> str:
+    """
+    Valida e normaliza o nível de qualidade dos gráficos.
+
+    Args:
+        quality_name: Nível desejado ('vetor', 'alta', 'media', 'rascunho')
+
+    Returns:
+        str: Nível normalizado ou o padrão (CHART_QUALITY) se inválido
+    """
+    normalized_name = (quality_name or '').strip().lower()
+    if normalized_name in CHART_QUALITY_TIERS:
+        return normalized_name
+    if CHART_QUALITY in CHART_QUALITY_TIERS:
+        return CHART_QUALITY
+    return 'alta'
+
+def validate_chart_backend(backend_name: str) -> str:
+    """
+    Valida e normaliza o backend de desenho dos gráficos.
+
+    Args:
+        backend_name: Backend desejado ('matplotlib' ou 'reportlab')
+
+    Returns:
+        str: Backend normalizado ou o padrão (CHART_BACKEND) se inválido
+    """
+    normalized_name = (backend_name or '').strip().lower()
+    if normalized_name in CHART_BACKENDS:
+        return normalized_name
+    if CHART_BACKEND in CHART_BACKENDS:
+        return CHART_BACKEND
+    return 'matplotlib'
+
+def validate_image_quality(quality_name: str) -> str:
+    """
+    Valida e normaliza o perfil de qualidade das imagens anexadas.
+
+    Args:
+        quality_name: Perfil desejado ('original', 'alta', 'media', 'rascunho')
+
+    Returns:
+        str: Perfil normalizado ou o padrão (IMAGE_QUALITY) se inválido
+    """
+    normalized_name = (quality_name or '').strip().lower()
+    if normalized_name in IMAGE_QUALITY_PROFILES:
+        return normalized_name
+    if IMAGE_QUALITY in IMAGE_QUALITY_PROFILES:
+        return IMAGE_QUALITY
+    return 'alta'
+
 def get_available_palettes() -> list:
     """
     Retorna lista de paletas disponíveis.
@@ -15,6 +15,13 @@ class ImageProcessingTimeoutError(Exception):
     """
     pass
 
+class RequestTooLargeError(Exception):
+    """
+    Exceção para requisição acima dos limites de tamanho.
+    Levantada durante a leitura em fluxo, assim que um limite é ultrapassado.
+    """
+    pass
+
 class PDFGenerationError(Exception):
     """
     Exceção base para erros na geração de PDF.
@@ -34,3 +41,39 @@ class ChartGenerationError(PDFGenerationError):
     Levantada quando há problemas na criação de gráficos matplotlib.
     """
     pass
+
+class RenderEngineError(PDFGenerationError):
+    """
+    Exceção base para erros do motor de renderização (pool de processos).
+    """
+    pass
+
+class RenderQueueFullError(RenderEngineError):
+    """
+    Exceção para fila de renderização cheia.
+    Levantada quando não há vaga no pool nem na fila de espera.
+    """
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class RenderTimeoutError(RenderEngineError):
+    """
+    Exceção para renderização que excedeu o tempo limite.
+    Levantada depois que o processo worker responsável foi encerrado.
+    """
+    pass
+
+class RenderCancelledError(RenderEngineError):
+    """
+    Exceção para renderização cancelada antes de terminar.
+    Levantada quando a requisição que aguardava o PDF desistiu e o worker foi encerrado.
+    """
+    pass
+
+class JobStoreFullError(Exception):
+    """
+    Exceção para PDF de job que não cabe no armazenamento em memória.
+    Levantada quando o PDF sozinho é maior que JOB_STORE_MAX_MB.
+    """
+    pass
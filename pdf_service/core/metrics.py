@@ -0,0 +1,196 @@
+# Arquivo: core/metrics.py
+# Contadores e histogramas do processo principal, atualizados no caminho das requisições, e a exposição no
+# formato texto do Prometheus (/metrics)
+
+import bisect
+import math
+import threading
+
+from .config import METRICS_DURATION_BUCKETS, METRICS_PDF_SIZE_BUCKETS, METRICS_COUNT_BUCKETS
+
+def _escapar(valor):
+    """Escapa o valor de um rótulo (barra invertida, aspas e quebra de linha)."""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _rotulos(rotulos):
+    """Formata {'rota': '/x', 'le': 0.5} como '{rota="/x",le="0.5"}' (vazio sem rótulos)."""
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos.items()) + '}'
+
+def _numero(valor):
+    """Formata um valor de amostra (inteiros sem casa decimal, infinito como +Inf)."""
+    if isinstance(valor, float):
+        if math.isinf(valor):
+            return '+Inf' if valor > 0 else '-Inf'
+        return repr(valor)
+    return str(valor)
+
+def linhas_metrica(nome, tipo, ajuda, amostras):
+    """
+    Linhas de uma métrica simples (counter ou gauge).
+
+    Args:
+        nome (str): Nome da métrica
+        tipo (str): 'counter' ou 'gauge'
+        ajuda (str): Texto do HELP
+        amostras (list): (rótulos como dict, valor) de cada série
+
+    Returns:
+        list: Linhas no formato texto do Prometheus
+    """
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+    linhas.extend(f"{nome}{_rotulos(rotulos)} {_numero(valor)}" for rotulos, valor in amostras)
+    return linhas
+
+def linhas_histograma(nome, ajuda, buckets, series):
+    """
+    Linhas de um histograma.
+
+    Args:
+        nome (str): Nome da métrica (sem _bucket/_sum/_count)
+        ajuda (str): Texto do HELP
+        buckets (tuple): Limites superiores dos buckets, crescentes
+        series (list): (rótulos como dict, contagens por bucket NÃO acumuladas com a
+            de +Inf no fim, soma) de cada série, como em EstatisticasLayout
+
+    Returns:
+        list: Linhas no formato texto do Prometheus (buckets acumulados)
+    """
+    limites = [_numero(float(limite)) for limite in buckets] + ['+Inf']
+    linhas = [f"# HELP {nome} {ajuda}", f"# TYPE {nome} histogram"]
+    for rotulos, contagens, soma in series:
+        acumulado = 0
+        for limite, contagem in zip(limites, contagens):
+            acumulado += contagem
+            linhas.append(f"{nome}_bucket{_rotulos({**rotulos, 'le': limite})} {acumulado}")
+        linhas.append(f"{nome}_sum{_rotulos(rotulos)} {_numero(float(soma))}")
+        linhas.append(f"{nome}_count{_rotulos(rotulos)} {acumulado}")
+    return linhas
+
+class Contador:
+    """Contador com rótulos, seguro entre threads."""
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}  # valores dos rótulos -> total
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_rotulos, valor=1):
+        with self._lock:
+            self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + valor
+
+    def linhas(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return linhas_metrica(self.nome, 'counter', self.ajuda,
+                              [(dict(zip(self.rotulos, chave)), total) for chave, total in valores])
+
+class Histograma:
+    """
+    Histograma com rótulos, seguro entre threads.
+
+    Cada observação custa uma busca binária nos limites e duas somas; os
+    buckets só são acumulados na exposição.
+    """
+
+    def __init__(self, nome, ajuda, buckets, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = tuple(buckets)
+        self.rotulos = tuple(rotulos)
+        self._series = {}  # valores dos rótulos -> [contagens por bucket (+Inf no fim), soma]
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_rotulos):
+        with self._lock:
+            serie = self._series.get(valores_rotulos)
+            if serie is None:
+                serie = self._series[valores_rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][bisect.bisect_left(self.buckets, valor)] += 1
+            serie[1] += valor
+
+    def linhas(self):
+        with self._lock:
+            series = [(dict(zip(self.rotulos, chave)), list(contagens), soma)
+                      for chave, (contagens, soma) in sorted(self._series.items())]
+        return linhas_histograma(self.nome, self.ajuda, self.buckets, series)
+
+class RegistroMetricas:
+    """
+    Métricas expostas em /metrics.
+
+    Contadores e histogramas são atualizados no caminho das requisições; os
+    coletores são funções chamadas na exposição para o que já existe em
+    outros lugares (fila do motor, caches e histogramas dos workers, última
+    amostra de recursos) e devolvem linhas prontas.
+    """
+
+    def __init__(self):
+        self._metricas = []
+        self._coletores = []
+
+    def contador(self, nome, ajuda, rotulos=()):
+        metrica = Contador(nome, ajuda, rotulos)
+        self._metricas.append(metrica)
+        return metrica
+
+    def histograma(self, nome, ajuda, buckets, rotulos=()):
+        metrica = Histograma(nome, ajuda, buckets, rotulos)
+        self._metricas.append(metrica)
+        return metrica
+
+    def coletor(self, funcao):
+        """Registra uma função sem argumentos que retorna linhas (ver linhas_metrica/linhas_histograma)."""
+        self._coletores.append(funcao)
+        return funcao
+
+    def texto(self):
+        """Todas as métricas no formato texto do Prometheus (versão 0.0.4)."""
+        linhas = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.linhas())
+        for coletor in self._coletores:
+            linhas.extend(coletor())
+        return '\n'.join(linhas) + '\n'
+
+# Instância única por processo (só o processo principal expõe /metrics)
+METRICAS = RegistroMetricas()
+
+DURACAO_REQUISICOES = METRICAS.histograma(
+    'pdf_service_http_request_duration_seconds', 'Duração das requisições HTTP por rota, método e status.',
+    METRICS_DURATION_BUCKETS, ('rota', 'metodo', 'status'),
+)
+DURACAO_ETAPAS = METRICAS.histograma(
+    'pdf_service_stage_duration_seconds', 'Duração das etapas das requisições (spans de core/tracing.py).',
+    METRICS_DURATION_BUCKETS, ('etapa',),
+)
+TAMANHO_PDFS = METRICAS.histograma(
+    'pdf_service_pdf_size_bytes', 'Tamanho dos PDFs gerados por job.',
+    METRICS_PDF_SIZE_BUCKETS, ('job',),
+)
+ITENS_DOCUMENTO = METRICAS.histograma(
+    'pdf_service_document_items', 'Imagens, gráficos e tabelas inseridos por documento.',
+    METRICS_COUNT_BUCKETS, ('job', 'item'),
+)
+
+def registrar_spans(spans):
+    """Observa a duração de cada span de um rastro encerrado em DURACAO_ETAPAS."""
+    for span in spans:
+        DURACAO_ETAPAS.observar((span['fim'] - span['inicio']) / 1e9, span['nome'])
+
+def registrar_documento(nome_job, tamanho, contagens):
+    """
+    Observa um PDF gerado pelo motor de renderização.
+
+    Args:
+        nome_job (str): Nome do job ('dinamico' ou 'visita')
+        tamanho (int): Tamanho do PDF em bytes
+        contagens (dict): Itens inseridos (ver PerfilLayout.contagens), ou None sem perfil de layout
+    """
+    TAMANHO_PDFS.observar(tamanho, nome_job)
+    if contagens is not None:
+        for item in ('imagens', 'graficos', 'tabelas'):
+            ITENS_DOCUMENTO.observar(contagens.get(item, 0), nome_job, item)
@@ -0,0 +1,124 @@
+# Arquivo: core/resources.py
+# Amostragem periódica, em thread própria, da memória, CPU e descritores do processo principal e dos workers
+
+import logging
+import threading
+import time
+
+import psutil
+
+from .config import RESOURCE_SAMPLE_INTERVAL
+
+class AmostradorRecursos:
+    """
+    Amostra o uso de recursos a cada `intervalo` segundos.
+
+    O uso de CPU é medido entre duas amostras (cpu_percent sem intervalo,
+    que não dorme); /health/resources e /metrics só leem a última amostra.
+    Os descritores abertos são contados (num_fds), sem listar conexões e
+    arquivos um a um.
+    """
+
+    def __init__(self, pids_workers, intervalo=RESOURCE_SAMPLE_INTERVAL):
+        """
+        Args:
+            pids_workers: Função sem argumentos que retorna os PIDs dos workers de renderização
+            intervalo (float): Segundos entre amostras
+        """
+        self.pids_workers = pids_workers
+        self.intervalo = max(1.0, float(intervalo))
+        self._processo = psutil.Process()
+        self._workers = {}  # pid -> psutil.Process (cpu_percent compara com a chamada anterior do mesmo objeto)
+        self._amostra = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        """Faz a primeira amostra e inicia a thread de amostragem."""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self.amostrar()
+        self._thread = threading.Thread(target=self._executar, name='amostrador-recursos', daemon=True)
+        self._thread.start()
+
+    def encerrar(self):
+        """Para a thread de amostragem."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.amostrar()
+            except Exception as e:
+                logging.warning(f"Falha ao amostrar o uso de recursos: {e}")
+
+    def _amostrar_workers(self):
+        workers = []
+        pids = set(self.pids_workers())
+        for pid in list(self._workers):
+            if pid not in pids:
+                del self._workers[pid]
+        for pid in sorted(pids):
+            try:
+                processo = self._workers.get(pid)
+                if processo is None:
+                    processo = self._workers[pid] = psutil.Process(pid)
+                with processo.oneshot():
+                    workers.append({
+                        'pid': pid,
+                        'rss_bytes': processo.memory_info().rss,
+                        'cpu_percent': processo.cpu_percent(None),
+                    })
+            except psutil.Error:
+                # Worker reiniciado entre a leitura dos PIDs e a amostra
+                self._workers.pop(pid, None)
+        return workers
+
+    def amostrar(self):
+        """
+        Lê o uso atual de recursos e substitui a última amostra.
+
+        Returns:
+            dict: A nova amostra (ver ultima_amostra)
+        """
+        processo = self._processo
+        with processo.oneshot():
+            memoria = processo.memory_info()
+            amostra_processo = {
+                'pid': processo.pid,
+                'rss_bytes': memoria.rss,
+                'vms_bytes': memoria.vms,
+                'memory_percent': processo.memory_percent(),
+                'cpu_percent': processo.cpu_percent(None),
+                'threads': processo.num_threads(),
+                'open_fds': processo.num_fds() if hasattr(processo, 'num_fds') else None,
+            }
+        memoria_sistema = psutil.virtual_memory()
+        self._amostra = {
+            'timestamp': time.time(),
+            'intervalo_s': self.intervalo,
+            'process': amostra_processo,
+            'system': {
+                'memory_total_bytes': memoria_sistema.total,
+                'memory_available_bytes': memoria_sistema.available,
+                'memory_percent': memoria_sistema.percent,
+                'cpu_percent': psutil.cpu_percent(None),
+            },
+            'render_workers': self._amostrar_workers(),
+        }
+        return self._amostra
+
+    def ultima_amostra(self):
+        """
+        Retorna a amostra mais recente, sem medir nada.
+
+        Returns:
+            dict: timestamp, process (memória, CPU, threads, descritores), system
+            (memória e CPU) e render_workers (memória e CPU de cada worker), ou
+            None antes de iniciar()
+        """
+        return self._amostra
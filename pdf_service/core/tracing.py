@@ -0,0 +1,243 @@
+# Arquivo: core/tracing.py
+# Spans de rastreamento das etapas de cada requisição, exportados em JSON no formato OTLP e resumidos no
+# header Server-Timing
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from .config import TRACING_EXPORT_FILE, TRACING_SERVICE_NAME
+
+# ===============================
+# PADRÕES COMPILADOS (UMA VEZ POR PROCESSO)
+# ===============================
+
+# Header W3C traceparent: versão-trace_id-span_id-flags
+_PADRAO_TRACEPARENT = re.compile(r'[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}')
+
+# Rastro da requisição (ou do job, no processo worker) e span aberto no contexto atual
+_RASTRO_ATIVO = contextvars.ContextVar('rastro', default=None)
+_SPAN_ATUAL = contextvars.ContextVar('span_atual', default=None)
+
+# Tipos de span do OTLP
+_KIND_INTERNO = 1
+_KIND_SERVIDOR = 2
+
+# Tamanho máximo da mensagem de erro guardada no status do span (erros de validação repetem a entrada)
+_MAX_MENSAGEM_ERRO = 300
+
+_lock_exportacao = threading.Lock()
+
+class Span:
+    """Trecho em andamento; ao terminar vira um dict (ver Rastro.spans)."""
+
+    __slots__ = ('rastro', 'nome', 'span_id', 'pai', 'inicio', 'atributos')
+
+    def __init__(self, rastro, nome, pai, atributos):
+        self.rastro = rastro
+        self.nome = nome
+        self.span_id = os.urandom(8).hex()
+        self.pai = pai
+        self.inicio = time.time_ns()
+        self.atributos = atributos
+
+    def contexto(self):
+        """(trace_id, span_id) para continuar o rastro em outro processo (ver rastrear)."""
+        return self.rastro.trace_id, self.span_id
+
+class Rastro:
+    """
+    Spans de uma requisição.
+
+    Cada span é um dict com nome, span_id, pai, inicio e fim (nanossegundos
+    de relógio de parede, comparáveis entre processos), atributos e erro.
+    Os spans dos processos worker chegam prontos e entram com adicionar().
+    """
+
+    def __init__(self, trace_id=None, pai=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.pai = pai  # span remoto (traceparent da requisição) ou None
+        self.spans = []
+        self.encerrado = False
+        self._lock = threading.Lock()
+
+    def adicionar(self, spans):
+        """Junta spans terminados (ignorados depois que o rastro foi encerrado)."""
+        with self._lock:
+            if not self.encerrado:
+                self.spans.extend(spans)
+
+    def encerrar(self):
+        """Fecha o rastro: spans de tarefas que sobreviveram à requisição não entram mais."""
+        with self._lock:
+            self.encerrado = True
+
+    def server_timing(self):
+        """
+        Monta o valor do header Server-Timing.
+
+        Spans de mesmo nome são somados (ex: um por gráfico), com a contagem
+        em `desc`; o traceparent da raiz identifica o rastro no arquivo exportado.
+
+        Returns:
+            str: Ex: 'requisicao;dur=812.4, validacao;dur=3.1, grafico;desc="3x";dur=240.7, ...'
+        """
+        totais = {}
+        raiz = None
+        for span in sorted(self.spans, key=lambda s: s['inicio']):
+            if raiz is None and span['pai'] == self.pai:
+                raiz = span['span_id']
+            total = totais.setdefault(span['nome'], [0, 0])
+            total[0] += 1
+            total[1] += span['fim'] - span['inicio']
+
+        metricas = []
+        for nome, (quantidade, duracao) in totais.items():
+            descricao = f';desc="{quantidade}x"' if quantidade > 1 else ''
+            metricas.append(f"{nome}{descricao};dur={duracao / 1e6:.1f}")
+        if raiz is not None:
+            metricas.append(f'traceparent;desc="00-{self.trace_id}-{raiz}-01"')
+        return ', '.join(metricas)
+
+    def como_otlp(self):
+        """
+        Converte o rastro para o JSON do OTLP (ExportTraceServiceRequest).
+
+        Returns:
+            dict: resourceSpans com um scope e todos os spans do rastro
+        """
+        spans = []
+        for span in self.spans:
+            otlp = {
+                'traceId': self.trace_id,
+                'spanId': span['span_id'],
+                'name': span['nome'],
+                'kind': _KIND_SERVIDOR if span['pai'] == self.pai else _KIND_INTERNO,
+                'startTimeUnixNano': str(span['inicio']),
+                'endTimeUnixNano': str(span['fim']),
+                'attributes': [{'key': chave, 'value': _valor_otlp(valor)} for chave, valor in span['atributos'].items()],
+            }
+            if span['pai']:
+                otlp['parentSpanId'] = span['pai']
+            if span['erro']:
+                otlp['status'] = {'code': 2, 'message': span['erro']}
+            spans.append(otlp)
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': TRACING_SERVICE_NAME}}]},
+                'scopeSpans': [{'scope': {'name': 'pdf_service'}, 'spans': spans}],
+            }]
+        }
+
+def _valor_otlp(valor):
+    """AnyValue do OTLP para um atributo."""
+    if isinstance(valor, bool):
+        return {'boolValue': valor}
+    if isinstance(valor, int):
+        return {'intValue': str(valor)}
+    if isinstance(valor, float):
+        return {'doubleValue': valor}
+    return {'stringValue': str(valor)}
+
+def ler_traceparent(valor):
+    """
+    Lê o header traceparent (W3C Trace Context).
+
+    Args:
+        valor (str): Valor do header (ou None)
+
+    Returns:
+        tuple: (trace_id, span_id) ou None se ausente ou inválido
+    """
+    match = _PADRAO_TRACEPARENT.fullmatch((valor or '').strip().lower())
+    if match is None or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None
+    return match.group(1), match.group(2)
+
+@contextlib.contextmanager
+def rastrear(trace_id=None, pai=None):
+    """
+    Ativa um rastro para o código executado dentro do bloco.
+
+    Args:
+        trace_id (str): Trace a continuar (None = novo)
+        pai (str): Span de outro processo ao qual os spans de primeiro nível se ligam
+
+    Yields:
+        Rastro: Rastro preenchido pelos spans do bloco
+    """
+    rastro = Rastro(trace_id, pai)
+    token_rastro = _RASTRO_ATIVO.set(rastro)
+    token_span = _SPAN_ATUAL.set(None)
+    try:
+        yield rastro
+    finally:
+        _SPAN_ATUAL.reset(token_span)
+        _RASTRO_ATIVO.reset(token_rastro)
+
+def contexto_sem_rastro():
+    """
+    Cópia do contexto atual sem o rastro, para tarefas que continuam depois da
+    resposta (jobs assíncronos, itens de lote): create_task(..., context=contexto_sem_rastro()).
+    """
+    contexto = contextvars.copy_context()
+    contexto.run(_RASTRO_ATIVO.set, None)
+    return contexto
+
+@contextlib.contextmanager
+def span(nome, **atributos):
+    """
+    Mede o bloco como um span filho do span aberto no contexto atual.
+
+    Sem rastro ativo não mede nada (custo de uma leitura de ContextVar).
+
+    Args:
+        nome (str): Nome do span (também o nome da métrica no Server-Timing)
+        **atributos: Atributos do span; podem ser completados pelo bloco em span.atributos
+
+    Yields:
+        Span: Span em andamento, ou None sem rastro ativo
+    """
+    rastro = _RASTRO_ATIVO.get()
+    if rastro is None or rastro.encerrado:
+        yield None
+        return
+    atual = Span(rastro, nome, _SPAN_ATUAL.get() or rastro.pai, atributos)
+    token = _SPAN_ATUAL.set(atual.span_id)
+    erro = None
+    try:
+        yield atual
+    except BaseException as e:
+        erro = f"{type(e).__name__}: {e}"[:_MAX_MENSAGEM_ERRO]
+        raise
+    finally:
+        _SPAN_ATUAL.reset(token)
+        rastro.adicionar([{
+            'nome': nome, 'span_id': atual.span_id, 'pai': atual.pai, 'inicio': atual.inicio,
+            'fim': time.time_ns(), 'atributos': atual.atributos, 'erro': erro,
+        }])
+
+def exportar(rastro, caminho=TRACING_EXPORT_FILE):
+    """
+    Acrescenta o rastro como uma linha JSON (OTLP) ao arquivo de exportação.
+
+    O arquivo segue o formato do file exporter do OpenTelemetry Collector:
+    pode ser lido por testes ou reenviado pelo receiver otlpjsonfile.
+
+    Args:
+        rastro (Rastro): Rastro encerrado
+        caminho (str): Arquivo de destino (vazio = não exporta)
+    """
+    if not caminho or not rastro.spans:
+        return
+    linha = json.dumps(rastro.como_otlp(), separators=(',', ':'), ensure_ascii=False)
+    try:
+        with _lock_exportacao, open(caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(linha + '\n')
+    except OSError as e:
+        logging.warning(f"Não foi possível exportar o rastro {rastro.trace_id} para {caminho}: {e}")
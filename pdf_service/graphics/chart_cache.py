@@ -0,0 +1,270 @@
+# Arquivo: graphics/chart_cache.py
+# Cache de imagens de gráficos endereçado pelo conteúdo (LRU em memória + disco opcional)
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from ..core.config import CHART_CACHE_MAX_MB, CHART_CACHE_DIR, CHART_CACHE_DISK_MAX_MB
+
+class ChartCache:
+    """
+    Cache dos bytes renderizados de cada gráfico.
+
+    - A chave é o SHA-256 de (tipo, título, dados, unidade, paleta, formato, backend), então
+      o mesmo gráfico em relatórios diferentes é renderizado uma única vez
+    - A camada em memória é um LRU limitado por bytes (não por quantidade)
+    - A camada em disco é opcional (`diretorio`), sobrevive a reinícios e é
+      compartilhada entre os processos do pool de renderização
+    - Gráficos que falharam não são armazenados
+    """
+
+    EXTENSAO = '.bin'
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_MB * 1024 * 1024, diretorio=CHART_CACHE_DIR,
+                 max_bytes_disco=CHART_CACHE_DISK_MAX_MB * 1024 * 1024):
+        self.max_bytes = max(0, int(max_bytes))
+        self.diretorio = diretorio or None
+        self.max_bytes_disco = max(0, int(max_bytes_disco))
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._bytes_disco = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+
+        if self.diretorio:
+            try:
+                os.makedirs(self.diretorio, exist_ok=True)
+            except OSError as e:
+                logging.warning(f"Cache de gráficos em disco desativado ({self.diretorio}): {e}")
+                self.diretorio = None
+
+        if self.diretorio and self.max_bytes_disco:
+            # O diretório é percorrido uma vez aqui; depois o total é mantido a cada gravação
+            self._bytes_disco = sum(tamanho for _, tamanho, _ in self._listar_disco())
+
+    @staticmethod
+    def chave(tipo, titulo, dados, unidade, cores_paleta, formato='png', backend='matplotlib'):
+        """
+        Calcula a chave de conteúdo de um gráfico.
+
+        Args:
+            tipo (str): Tipo normalizado do gráfico ('barras', 'pizza', 'linha')
+            titulo (str): Título do gráfico
+            dados (str): Dados em formato texto
+            unidade (str): Unidade dos valores ou None
+            cores_paleta (dict): Paleta de cores do documento
+            formato (str): Formato dos bytes armazenados (ex: 'png')
+            backend (str): Backend que desenhou o gráfico ('matplotlib' ou 'reportlab')
+
+        Returns:
+            str: Hash hexadecimal SHA-256
+        """
+        conteudo = json.dumps(
+            [tipo, titulo, dados, unidade, cores_paleta, formato, backend],
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave + self.EXTENSAO)
+
+    def _guardar_memoria(self, chave, dados):
+        """Insere na camada em memória e remove os itens menos usados até caber no limite (com lock)."""
+        if len(dados) > self.max_bytes:
+            return
+        anterior = self._itens.pop(chave, None)
+        if anterior is not None:
+            self._bytes -= len(anterior)
+        self._itens[chave] = dados
+        self._bytes += len(dados)
+        while self._bytes > self.max_bytes:
+            _, removido = self._itens.popitem(last=False)
+            self._bytes -= len(removido)
+            self.evictions += 1
+
+    def _ler_disco(self, chave):
+        try:
+            with open(self._caminho(chave), 'rb') as arquivo:
+                dados = arquivo.read()
+        except OSError:
+            return None
+        try:
+            # Atualiza o mtime: a limpeza do disco remove os arquivos menos usados
+            os.utime(self._caminho(chave))
+        except OSError:
+            pass
+        return dados
+
+    def _gravar_disco(self, chave, dados):
+        """Grava de forma atômica (arquivo temporário + rename) para não expor arquivos parciais."""
+        caminho = self._caminho(chave)
+        try:
+            anterior = os.stat(caminho).st_size
+        except OSError:
+            anterior = 0
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as arquivo:
+                    arquivo.write(dados)
+                os.replace(temporario, caminho)
+            except BaseException:
+                os.unlink(temporario)
+                raise
+        except OSError as e:
+            logging.warning(f"Falha ao gravar gráfico no cache em disco: {e}")
+            return
+        with self._lock:
+            self.disk_writes += 1
+            self._bytes_disco += len(dados) - anterior
+            passou_do_limite = self.max_bytes_disco and self._bytes_disco > self.max_bytes_disco
+        if passou_do_limite:
+            self._limpar_disco()
+
+    def _listar_disco(self):
+        """Arquivos do cache em disco como (mtime, tamanho, caminho)."""
+        arquivos = []
+        for raiz, _, nomes in os.walk(self.diretorio):
+            for nome in nomes:
+                if not nome.endswith(self.EXTENSAO):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                try:
+                    info = os.stat(caminho)
+                except OSError:
+                    continue
+                arquivos.append((info.st_mtime, info.st_size, caminho))
+        return arquivos
+
+    def _limpar_disco(self):
+        """
+        Remove os arquivos acessados há mais tempo até o diretório voltar ao limite.
+
+        Só é chamada quando o total mantido por _gravar_disco passa do limite. O
+        diretório é compartilhado pelos workers e cada processo soma apenas as
+        próprias gravações, então a contagem aqui (do diretório real) também
+        corrige o total deste processo.
+        """
+        arquivos = self._listar_disco()
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        if total > self.max_bytes_disco:
+            arquivos.sort()
+            for _, tamanho, caminho in arquivos:
+                if total <= self.max_bytes_disco:
+                    break
+                try:
+                    os.unlink(caminho)
+                except OSError:
+                    continue
+                total -= tamanho
+                with self._lock:
+                    self.disk_evictions += 1
+        with self._lock:
+            self._bytes_disco = total
+
+    def obter(self, chave):
+        """
+        Procura um gráfico no cache (memória e depois disco).
+
+        Args:
+            chave (str): Chave calculada por ChartCache.chave()
+
+        Returns:
+            bytes: Bytes do gráfico ou None se não estiver no cache
+        """
+        with self._lock:
+            dados = self._itens.get(chave)
+            if dados is not None:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return dados
+
+        if self.diretorio:
+            dados = self._ler_disco(chave)
+            if dados is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._guardar_memoria(chave, dados)
+                return dados
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def guardar(self, chave, dados):
+        """
+        Armazena os bytes de um gráfico renderizado com sucesso.
+
+        Args:
+            chave (str): Chave calculada por ChartCache.chave()
+            dados (bytes): Bytes do gráfico
+        """
+        with self._lock:
+            self._guardar_memoria(chave, dados)
+        if self.diretorio:
+            self._gravar_disco(chave, dados)
+
+    def limpar(self):
+        """Esvazia a camada em memória (o disco é mantido)."""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache deste processo.
+
+        Returns:
+            dict: Hits, misses, evictions, ocupação e taxa de acerto
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'disco': {
+                    'diretorio': self.diretorio,
+                    'hits': self.disk_hits,
+                    'gravacoes': self.disk_writes,
+                    'evictions': self.disk_evictions,
+                } if self.diretorio else None,
+            }
+
+# Instância única por processo (cada worker do pool tem a sua camada em memória)
+CHART_CACHE = ChartCache()
+
+def somar_estatisticas(lista):
+    """
+    Soma os contadores de cache de vários processos (ex: workers do pool).
+
+    Args:
+        lista (list): Dicts retornados por ChartCache.estatisticas()
+
+    Returns:
+        dict: Totais de itens, bytes, hits, misses e evictions com a taxa de acerto geral
+    """
+    total = {'processos': len(lista), 'itens': 0, 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'disk_hits': 0}
+    for estatisticas in lista:
+        for campo in ('itens', 'bytes', 'hits', 'misses', 'evictions'):
+            total[campo] += estatisticas.get(campo, 0)
+        total['disk_hits'] += (estatisticas.get('disco') or {}).get('hits', 0)
+    consultas = total['hits'] + total['misses']
+    total['hit_rate'] = round(total['hits'] / consultas, 4) if consultas else 0.0
+    return total
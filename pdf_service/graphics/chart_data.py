@@ -0,0 +1,237 @@
+# Arquivo: graphics/chart_data.py
+# Parsing dos dados textuais e regras de estilo compartilhadas pelos backends de gráfico
+
+import logging
+import re
+
+from ..core.exceptions import ChartGenerationError
+
+# Escala de cinzas usada no lugar das cores quando a paleta é preto e branco
+ESCALA_CINZA = ['#2D2D2D', '#4A4A4A', '#6B6B6B', '#8C8C8C', '#ADADAD', '#C4C4C4', '#DBDBDB']
+
+# Cores complementares usadas pelas fatias da pizza depois das cores da paleta
+CORES_COMPLEMENTARES_PIZZA = ['#95A5A6', '#E74C3C', '#F39C12', '#27AE60', '#8E44AD']
+
+UNIDADES_MONETARIAS = ['R$', 'US$', '$']
+
+_PADROES_PARES = [
+    (re.compile(r'([^:,]+?):\s*(\d+(?:[.,]\d+)?)%?\s*(?:,|$)'), ','),
+    (re.compile(r'([^:,]+?):\s*(\d+(?:[.,]\d+)?)%?'), ''),
+    (re.compile(r'([^:,]+?)\s*:\s*(\d+(?:[.,]\d+)?)%?'), ''),
+]
+
+_PADRAO_ATRIBUICAO = re.compile(r'([^=]+)=([^;]+)')
+
+def detectar_unidade(dados_texto, unidade=None):
+    """
+    Retorna a unidade informada ou '%' quando os dados contêm percentuais.
+
+    Args:
+        dados_texto (str): Dados em formato texto
+        unidade (str, optional): Unidade informada pela requisição
+
+    Returns:
+        str: Unidade a usar ou None
+    """
+    if not unidade and '%' in dados_texto:
+        return '%'
+    return unidade
+
+def extrair_pares(titulo, dados_texto, descricao):
+    """
+    Extrai pares "Label: valor" (gráficos de barras e pizza).
+
+    Args:
+        titulo (str): Título do gráfico (usado nas mensagens de erro)
+        dados_texto (str): Dados no formato "Label1: valor1, Label2: valor2"
+        descricao (str): Nome do gráfico nas mensagens (ex: 'gráfico de barras')
+
+    Returns:
+        tuple: (labels, valores)
+
+    Raises:
+        ChartGenerationError: Se nenhum par puder ser extraído
+    """
+    matches = []
+    for padrao, sufixo in _PADROES_PARES:
+        matches = padrao.findall(dados_texto + sufixo)
+        if matches:
+            break
+
+    if not matches:
+        error_msg = f"Não foi possível extrair dados para o {descricao} '{titulo}' com o texto: '{dados_texto}'"
+        logging.warning(error_msg)
+        raise ChartGenerationError(error_msg)
+
+    labels = []
+    valores = []
+    for nome, valor in matches:
+        labels.append(nome.strip())
+        try:
+            valores.append(float(valor.replace(',', '.')))
+        except ValueError as e:
+            error_msg = f"Erro na conversão do valor '{valor}' para float: {e}"
+            logging.error(error_msg)
+            raise ChartGenerationError(error_msg)
+
+    return labels, valores
+
+def extrair_serie_linha(titulo, dados_texto):
+    """
+    Extrai a série de um gráfico de linha.
+
+    Args:
+        titulo (str): Título do gráfico
+        dados_texto (str): "serie=valores; labels=nomes" ou "titulo; serie=valores; labels=nomes"
+
+    Returns:
+        tuple: (titulo, nome da série, labels, valores); o título pode vir dos dados
+
+    Raises:
+        ChartGenerationError: Se o formato for inválido
+    """
+    partes = dados_texto.split(';')
+
+    # Suporte para formato com título customizado
+    if len(partes) == 3:
+        titulo_customizado = partes[0].strip()
+        if titulo_customizado:
+            titulo = titulo_customizado
+        serie_parte = partes[1].strip()
+        labels_parte = partes[2].strip()
+    elif len(partes) == 2:
+        serie_parte = partes[0].strip()
+        labels_parte = partes[1].strip()
+    else:
+        error_msg = f"Formato inválido para gráfico de linha. Esperado 2 ou 3 partes, recebido {len(partes)}: {dados_texto}"
+        logging.error(error_msg)
+        raise ChartGenerationError(error_msg)
+
+    # Parse da série: "nome=valores"
+    serie_match = _PADRAO_ATRIBUICAO.match(serie_parte)
+    if not serie_match:
+        error_msg = f"Erro ao fazer parse da série do gráfico de linha: {serie_parte}"
+        logging.error(error_msg)
+        raise ChartGenerationError(error_msg)
+
+    serie_nome = serie_match.group(1).strip()
+    valores_str = serie_match.group(2).strip()
+
+    # Parse das labels: "labels=nomes"
+    labels_match = _PADRAO_ATRIBUICAO.match(labels_parte)
+    if not labels_match:
+        error_msg = f"Erro ao fazer parse das labels do gráfico de linha: {labels_parte}"
+        logging.error(error_msg)
+        raise ChartGenerationError(error_msg)
+
+    labels_str = labels_match.group(2).strip()
+
+    # Conversão de dados
+    try:
+        valores = [float(v.strip().replace(',', '.')) for v in valores_str.split(',')]
+        labels = [l.strip() for l in labels_str.split(',')]
+    except ValueError as e:
+        error_msg = f"Erro na conversão de valores numéricos: {e}"
+        logging.error(error_msg)
+        raise ChartGenerationError(error_msg)
+
+    # Validação de dados
+    if len(valores) != len(labels):
+        error_msg = f"Número de valores ({len(valores)}) não coincide com labels ({len(labels)}) no gráfico de linha."
+        logging.error(error_msg)
+        raise ChartGenerationError(error_msg)
+
+    return titulo, serie_nome, labels, valores
+
+def formatar_valor(valor, unidade):
+    """
+    Formata o rótulo de um valor com a unidade (ex: '45%', 'R$ 1,200', '12.5 kg').
+
+    Args:
+        valor (float): Valor numérico
+        unidade (str): Unidade detectada ou None
+
+    Returns:
+        str: Texto do rótulo
+    """
+    inteiro = valor == int(valor)
+    if unidade == '%':
+        return f'{valor:.0f}%' if inteiro else f'{valor:.1f}%'
+    if unidade in UNIDADES_MONETARIAS:
+        return f'{unidade} {valor:,.0f}' if inteiro else f'{unidade} {valor:,.2f}'
+    if unidade:
+        return f'{valor:.0f} {unidade}' if inteiro else f'{valor:.1f} {unidade}'
+    return f'{valor:.0f}' if inteiro else f'{valor:.1f}'
+
+def rotulo_eixo_y(unidade):
+    """
+    Texto do eixo Y de acordo com a unidade.
+
+    Args:
+        unidade (str): Unidade detectada ou None
+
+    Returns:
+        str: Rótulo do eixo
+    """
+    if unidade == '%':
+        return 'Percentual (%)'
+    if unidade in UNIDADES_MONETARIAS:
+        return f'Valor ({unidade})'
+    if unidade:
+        return f'Quantidade ({unidade})'
+    return 'Quantidade'
+
+def _paleta_preto_e_branco(cores_paleta):
+    return cores_paleta['principal'] in ['#000000', '#1A1A1A']
+
+def cores_barras(cores_paleta, quantidade):
+    """
+    Cores das barras, uma por valor.
+
+    Args:
+        cores_paleta (dict): Paleta de cores do documento
+        quantidade (int): Número de barras
+
+    Returns:
+        list: Cores em hexadecimal
+    """
+    if _paleta_preto_e_branco(cores_paleta):
+        base = ESCALA_CINZA
+    else:
+        base = [cores_paleta['principal'], cores_paleta['secundaria'], cores_paleta['destaque']]
+    return (base * (quantidade // len(base) + 1))[:quantidade]
+
+def cores_pizza(cores_paleta, quantidade):
+    """
+    Cores das fatias da pizza.
+
+    Args:
+        cores_paleta (dict): Paleta de cores do documento
+        quantidade (int): Número de fatias
+
+    Returns:
+        list: Cores em hexadecimal (no máximo uma por cor disponível)
+    """
+    # A pizza só troca para cinzas com preto puro (a paleta preto_e_branco usa #1A1A1A)
+    if cores_paleta['principal'] == '#000000':
+        base = ESCALA_CINZA
+    else:
+        base = [
+            cores_paleta['principal'],
+            cores_paleta['secundaria'],
+            cores_paleta['destaque'],
+            cores_paleta['fundo'],
+        ] + CORES_COMPLEMENTARES_PIZZA
+    return base[:quantidade]
+
+def cor_linha(cores_paleta):
+    """
+    Cor da linha do gráfico de linha (azul quando a paleta é preto e branco).
+
+    Args:
+        cores_paleta (dict): Paleta de cores do documento
+
+    Returns:
+        str: Cor em hexadecimal
+    """
+    return '#4299E1' if _paleta_preto_e_branco(cores_paleta) else cores_paleta['principal']
@@ -1,10 +1,13 @@
 # Arquivo: graphics/chart_factory.py
 # Factory para criação de gráficos
 
+import importlib
+import io
 import logging
-from .charts.bar_chart import criar_grafico_barras
-from .charts.pie_chart import criar_grafico_pizza
-from .charts.line_chart import criar_grafico_linha
+from reportlab.platypus import Image
+from .chart_cache import CHART_CACHE
+from .vector_chart import GraficoVetorial
+from ..core.config import CHART_QUALITY_TIERS, validate_chart_quality, validate_chart_backend
 from ..core.exceptions import ChartGenerationError
 
 class ChartFactory:
@@ -12,20 +15,61 @@ class ChartFactory:
     Factory para criação de diferentes tipos de gráficos.
     
     Centraliza a lógica de criação e fornece interface unificada.
+
+    Os backends ('matplotlib' e 'reportlab') são importados sob demanda: um
+    deploy que só usa o backend nativo nunca carrega o matplotlib.
     """
     
+    # Tipo aceito -> nome canônico
     SUPPORTED_CHART_TYPES = {
-        'barras': criar_grafico_barras,
-        'pizza': criar_grafico_pizza,
-        'linha': criar_grafico_linha,
+        'barras': 'barras',
+        'pizza': 'pizza',
+        'linha': 'linha',
         # Aliases
-        'bar': criar_grafico_barras,
-        'pie': criar_grafico_pizza,
-        'line': criar_grafico_linha,
+        'bar': 'barras',
+        'pie': 'pizza',
+        'line': 'linha',
+    }
+
+    # Backend -> (módulo, função) de cada tipo canônico
+    BACKENDS = {
+        'matplotlib': {
+            'barras': ('.charts.bar_chart', 'criar_grafico_barras'),
+            'pizza': ('.charts.pie_chart', 'criar_grafico_pizza'),
+            'linha': ('.charts.line_chart', 'criar_grafico_linha'),
+        },
+        'reportlab': {
+            'barras': ('.native_charts', 'criar_grafico_barras_nativo'),
+            'pizza': ('.native_charts', 'criar_grafico_pizza_nativo'),
+            'linha': ('.native_charts', 'criar_grafico_linha_nativo'),
+        },
     }
+
+    # Funções já importadas: (backend, tipo canônico) -> função
+    _criadores = {}
+
+    @classmethod
+    def carregar_backend(cls, backend):
+        """
+        Importa as funções de um backend (usado também para pré-carregar nos workers).
+
+        Args:
+            backend (str): 'matplotlib' ou 'reportlab'
+
+        Returns:
+            dict: Tipo canônico -> função criadora
+        """
+        funcoes = {}
+        for tipo, (modulo, nome) in cls.BACKENDS[backend].items():
+            chave = (backend, tipo)
+            if chave not in cls._criadores:
+                cls._criadores[chave] = getattr(importlib.import_module(modulo, __package__), nome)
+            funcoes[tipo] = cls._criadores[chave]
+        return funcoes
     
     @classmethod
-    def create_chart(cls, tipo_grafico, titulo, dados_texto, cores_paleta, unidade=None):
+    def create_chart(cls, tipo_grafico, titulo, dados_texto, cores_paleta, unidade=None, qualidade='alta',
+                     backend=None):
         """
         Cria um gráfico do tipo especificado.
 
@@ -35,9 +79,12 @@ class ChartFactory:
             dados_texto (str): Dados em formato texto
             cores_paleta (dict): Paleta de cores do documento
             unidade (str, optional): Unidade dos valores (ex: "kg", "%", "cabeças")
+            qualidade (str): Nível de qualidade (ver CHART_QUALITY_TIERS); 'vetor' gera PDF
+            backend (str, optional): 'matplotlib' ou 'reportlab'; None usa CHART_BACKEND
 
         Returns:
-            io.BytesIO: Buffer com imagem PNG do gráfico
+            io.BytesIO: Buffer com o gráfico em PNG ou PDF (vindo do cache quando o
+                mesmo gráfico já foi renderizado neste processo)
 
         Raises:
             ChartGenerationError: Se tipo não suportado ou erro na criação
@@ -50,20 +97,32 @@ class ChartFactory:
             logging.error(error_msg)
             raise ChartGenerationError(error_msg)
 
-        chart_creator = cls.SUPPORTED_CHART_TYPES[tipo_normalizado]
+        tipo_canonico = cls.SUPPORTED_CHART_TYPES[tipo_normalizado]
+        backend = validate_chart_backend(backend)
+
+        # O mesmo gráfico (tipo, título, dados, unidade, paleta) é renderizado uma única vez
+        chave = CHART_CACHE.chave(tipo_canonico, titulo, dados_texto, unidade, cores_paleta, qualidade, backend)
+        em_cache = CHART_CACHE.obter(chave)
+        if em_cache is not None:
+            return io.BytesIO(em_cache)
 
         try:
+            chart_creator = cls.carregar_backend(backend)[tipo_canonico]
             # Passa unidade apenas para gráficos que suportam (barras, linha)
-            if tipo_normalizado in ['barras', 'bar', 'linha', 'line']:
-                return chart_creator(titulo, dados_texto, cores_paleta, unidade=unidade)
+            if tipo_canonico in ['barras', 'linha']:
+                buffer = chart_creator(titulo, dados_texto, cores_paleta, unidade=unidade, qualidade=qualidade)
             else:
-                return chart_creator(titulo, dados_texto, cores_paleta)
+                buffer = chart_creator(titulo, dados_texto, cores_paleta, qualidade=qualidade)
         except ChartGenerationError:
             raise  # Re-raise ChartGenerationError
         except Exception as e:
             error_msg = f"Erro inesperado ao criar gráfico {tipo_grafico}: {e}"
             logging.error(error_msg, exc_info=True)
             raise ChartGenerationError(error_msg) from e
+
+        if buffer is not None:
+            CHART_CACHE.guardar(chave, buffer.getvalue())
+        return buffer
     
     @classmethod
     def get_supported_types(cls):
@@ -89,7 +148,8 @@ class ChartFactory:
         return tipo_grafico.lower().strip() in cls.SUPPORTED_CHART_TYPES
 
 # Função de conveniência para compatibilidade com código existente
-def criar_grafico(titulo, dados_texto, cores_paleta, tipo_grafico='barras', unidade=None):
+def criar_grafico(titulo, dados_texto, cores_paleta, tipo_grafico='barras', unidade=None, qualidade='alta',
+                  backend=None):
     """
     Função de conveniência que mantém compatibilidade com o código existente.
 
@@ -99,15 +159,63 @@ def criar_grafico(titulo, dados_texto, cores_paleta, tipo_grafico='barras', unid
         cores_paleta (dict): Paleta de cores
         tipo_grafico (str): Tipo do gráfico (padrão: 'barras')
         unidade (str, optional): Unidade dos valores (ex: "kg", "%", "cabeças")
+        qualidade (str): Nível de qualidade (padrão: 'alta', PNG 300 dpi)
+        backend (str, optional): 'matplotlib' ou 'reportlab'; None usa CHART_BACKEND
 
     Returns:
-        io.BytesIO: Buffer com imagem PNG do gráfico ou None se erro
+        io.BytesIO: Buffer com o gráfico (PNG, ou PDF na qualidade 'vetor') ou None se erro
     """
     try:
-        return ChartFactory.create_chart(tipo_grafico, titulo, dados_texto, cores_paleta, unidade=unidade)
+        return ChartFactory.create_chart(tipo_grafico, titulo, dados_texto, cores_paleta, unidade=unidade,
+                                         qualidade=qualidade, backend=backend)
     except ChartGenerationError as e:
         logging.error(f"Erro na criação do gráfico: {e}")
         return None
     except Exception as e:
         logging.error(f"Erro inesperado na criação do gráfico: {e}", exc_info=True)
         return None
+
+def criar_flowable_grafico(titulo, dados_texto, cores_paleta, tipo_grafico, largura, altura,
+                           unidade=None, qualidade=None, backend=None):
+    """
+    Cria o gráfico já como flowable para a story do ReportLab.
+
+    Com o backend nativo na qualidade 'vetor' o Drawing entra direto na story
+    (montá-lo custa menos que serializar e reimportar um PDF).
+
+    Args:
+        titulo (str): Título do gráfico
+        dados_texto (str): Dados em formato texto
+        cores_paleta (dict): Paleta de cores
+        tipo_grafico (str): Tipo do gráfico ('barras', 'pizza', 'linha')
+        largura (float): Largura reservada na página (pontos)
+        altura (float): Altura reservada na página (pontos)
+        unidade (str, optional): Unidade dos valores
+        qualidade (str, optional): Nível de qualidade; None usa CHART_QUALITY
+        backend (str, optional): 'matplotlib' ou 'reportlab'; None usa CHART_BACKEND
+
+    Returns:
+        Flowable: Drawing, GraficoVetorial ou Image (PNG), ou None se erro
+    """
+    qualidade = validate_chart_quality(qualidade)
+    backend = validate_chart_backend(backend)
+
+    if backend == 'reportlab' and CHART_QUALITY_TIERS[qualidade]['formato'] == 'pdf':
+        tipo_canonico = ChartFactory.SUPPORTED_CHART_TYPES.get(tipo_grafico.lower().strip())
+        try:
+            from .native_charts import DESENHOS, encaixar_desenho
+            desenho = DESENHOS[tipo_canonico](titulo, dados_texto, cores_paleta, unidade=unidade)
+            return encaixar_desenho(desenho, largura, altura)
+        except Exception as e:
+            logging.error(f"Erro na criação do gráfico nativo {tipo_grafico}: {e}")
+            return None
+
+    buffer = criar_grafico(titulo, dados_texto, cores_paleta, tipo_grafico, unidade=unidade,
+                           qualidade=qualidade, backend=backend)
+    if buffer is None:
+        return None
+    dados = buffer.getvalue()
+    # O formato vem dos próprios bytes: o backend nativo sem renderPM devolve PDF mesmo em níveis PNG
+    if dados.startswith(b'%PDF'):
+        return GraficoVetorial(dados, largura, altura)
+    return Image(buffer, width=largura, height=altura)
@@ -1,14 +1,15 @@
 # Arquivo: graphics/charts/bar_chart.py
 # Geração de gráficos de barras
 
-import io
-import re
 import logging
 import matplotlib.pyplot as plt
-from ..matplotlib_utils import safe_matplotlib_figure
+from ..matplotlib_utils import safe_matplotlib_figure, salvar_figura
+from ..chart_data import (
+    detectar_unidade, extrair_pares, formatar_valor, rotulo_eixo_y, cores_barras
+)
 from ...core.exceptions import ChartGenerationError
 
-def criar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None):
+def criar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None, qualidade='alta'):
     """
     Cria um gráfico de barras a partir de dados textuais.
 
@@ -17,61 +18,26 @@ def criar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None):
         dados_texto (str): Dados no formato "Label1: valor1, Label2: valor2"
         cores_paleta (dict): Paleta de cores do documento
         unidade (str, optional): Unidade dos valores (ex: "kg", "%", "R$", "cabeças")
+        qualidade (str): Nível de qualidade ('vetor' gera PDF, os demais PNG)
 
     Returns:
-        io.BytesIO: Buffer com imagem PNG do gráfico ou None se erro
+        io.BytesIO: Buffer com o gráfico (PNG ou PDF conforme a qualidade)
 
     Example:
         dados = "Vendas: 100, Marketing: 50, Operações: 75"
         buffer = criar_grafico_barras("Orçamento", dados, cores, unidade="R$")
     """
     try:
-        # Detectar unidade automaticamente se não fornecida
-        unidade_detectada = unidade
-        is_percentual = '%' in dados_texto
-        if is_percentual and not unidade_detectada:
-            unidade_detectada = '%'
-
-        # Parse dos dados usando regex flexível
-        matches = re.findall(r'([^:,]+?):\s*(\d+(?:[.,]\d+)?)%?\s*(?:,|$)', dados_texto + ',')
-        if not matches:
-            matches = re.findall(r'([^:,]+?):\s*(\d+(?:[.,]\d+)?)%?', dados_texto)
-        if not matches:
-            matches = re.findall(r'([^:,]+?)\s*:\s*(\d+(?:[.,]\d+)?)%?', dados_texto)
-
-        if not matches:
-            error_msg = f"Não foi possível extrair dados para o gráfico de barras '{titulo}' com o texto: '{dados_texto}'"
-            logging.warning(error_msg)
-            raise ChartGenerationError(error_msg)
-
-        # Processar valores
-        labels = []
-        valores = []
-        for nome, valor in matches:
-            labels.append(nome.strip())
-            try:
-                valor_limpo = valor.replace(',', '.')
-                valores.append(float(valor_limpo))
-            except ValueError as e:
-                error_msg = f"Erro na conversão do valor '{valor}' para float: {e}"
-                logging.error(error_msg)
-                raise ChartGenerationError(error_msg)
+        # Parse compartilhado com o backend nativo (graphics/chart_data.py)
+        unidade_detectada = detectar_unidade(dados_texto, unidade)
+        labels, valores = extrair_pares(titulo, dados_texto, 'gráfico de barras')
 
         # Criação do gráfico com context manager seguro
         with safe_matplotlib_figure(figsize=(8, 5)) as fig:
             ax = fig.add_subplot(111)
 
             # Definir cores baseadas na paleta
-            if cores_paleta['principal'] in ['#000000', '#1A1A1A']:  # Paleta preto e branco
-                # Usar escala de cinzas em vez de cores coloridas
-                escala_cinza = ['#2D2D2D', '#4A4A4A', '#6B6B6B', '#8C8C8C', '#ADADAD', '#C4C4C4', '#DBDBDB']
-                colors_barras = escala_cinza * (len(valores) // len(escala_cinza) + 1)
-            else:
-                colors_barras = [
-                    cores_paleta['principal'],
-                    cores_paleta['secundaria'],
-                    cores_paleta['destaque']
-                ] * (len(valores) // 3 + 1)
+            colors_barras = cores_barras(cores_paleta, len(valores))
 
             # Criar barras
             if len(valores) > 1:
@@ -83,15 +49,7 @@ def criar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None):
             ax.set_title(titulo, fontsize=14, fontweight='bold', pad=20)
 
             # Label do eixo Y com unidade
-            if unidade_detectada:
-                if unidade_detectada == '%':
-                    ax.set_ylabel('Percentual (%)', fontsize=10)
-                elif unidade_detectada in ['R$', 'US$', '$']:
-                    ax.set_ylabel(f'Valor ({unidade_detectada})', fontsize=10)
-                else:
-                    ax.set_ylabel(f'Quantidade ({unidade_detectada})', fontsize=10)
-            else:
-                ax.set_ylabel('Quantidade', fontsize=10)
+            ax.set_ylabel(rotulo_eixo_y(unidade_detectada), fontsize=10)
 
             # Grid minimalista apenas no eixo Y
             ax.grid(axis='y', linestyle='-', alpha=0.2, linewidth=0.5)
@@ -107,14 +65,7 @@ def criar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None):
             for bar, valor in zip(bars, valores):
                 height = bar.get_height()
                 # Formatar valor com unidade
-                if unidade_detectada == '%':
-                    valor_texto = f'{valor:.0f}%' if valor == int(valor) else f'{valor:.1f}%'
-                elif unidade_detectada in ['R$', 'US$', '$']:
-                    valor_texto = f'{unidade_detectada} {valor:,.0f}' if valor == int(valor) else f'{unidade_detectada} {valor:,.2f}'
-                elif unidade_detectada:
-                    valor_texto = f'{valor:.0f} {unidade_detectada}' if valor == int(valor) else f'{valor:.1f} {unidade_detectada}'
-                else:
-                    valor_texto = f'{valor:.0f}' if valor == int(valor) else f'{valor:.1f}'
+                valor_texto = formatar_valor(valor, unidade_detectada)
 
                 ax.text(bar.get_x() + bar.get_width()/2., height + max(valores)*0.02,
                        valor_texto, ha='center', va='bottom', fontweight='normal', fontsize=9, color='black')
@@ -125,9 +76,7 @@ def criar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None):
             plt.tight_layout()
 
             # Salva em buffer
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-            buf.seek(0)
+            buf = salvar_figura(fig, qualidade)
 
             logging.info(f"Gráfico de barras criado com sucesso: {titulo}")
             return buf
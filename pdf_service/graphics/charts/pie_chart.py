@@ -1,14 +1,13 @@
 # Arquivo: graphics/charts/pie_chart.py
 # Geração de gráficos de pizza
 
-import io
-import re
 import logging
 import matplotlib.pyplot as plt
-from ..matplotlib_utils import safe_matplotlib_figure
+from ..matplotlib_utils import safe_matplotlib_figure, salvar_figura
+from ..chart_data import extrair_pares, cores_pizza
 from ...core.exceptions import ChartGenerationError
 
-def criar_grafico_pizza(titulo, dados_texto, cores_paleta):
+def criar_grafico_pizza(titulo, dados_texto, cores_paleta, qualidade='alta'):
     """
     Cria um gráfico de pizza a partir de dados textuais.
     
@@ -16,64 +15,32 @@ def criar_grafico_pizza(titulo, dados_texto, cores_paleta):
         titulo (str): Título do gráfico
         dados_texto (str): Dados no formato "Label1: valor1, Label2: valor2"
         cores_paleta (dict): Paleta de cores do documento
+        qualidade (str): Nível de qualidade ('vetor' gera PDF, os demais PNG)
         
     Returns:
-        io.BytesIO: Buffer com imagem PNG do gráfico ou None se erro
+        io.BytesIO: Buffer com o gráfico (PNG ou PDF conforme a qualidade)
         
     Example:
         dados = "Desktop: 60, Mobile: 30, Tablet: 10"
         buffer = criar_grafico_pizza("Dispositivos", dados, cores)
     """
     try:
-        # Parse dos dados usando regex flexível
-        matches = re.findall(r'([^:,]+?):\s*(\d+(?:[.,]\d+)?)%?\s*(?:,|$)', dados_texto + ',')
-        if not matches: 
-            matches = re.findall(r'([^:,]+?):\s*(\d+(?:[.,]\d+)?)%?', dados_texto)
-        if not matches:
-            matches = re.findall(r'([^:,]+?)\s*:\s*(\d+(?:[.,]\d+)?)%?', dados_texto)
-        
-        if not matches:
-            error_msg = f"Não foi possível extrair dados para o gráfico de pizza '{titulo}' com o texto: '{dados_texto}'"
-            logging.warning(error_msg)
-            raise ChartGenerationError(error_msg)
-        
-        # Processar valores
-        labels = []
-        valores = []
-        for nome, valor in matches:
-            labels.append(nome.strip())
-            try:
-                valor_limpo = valor.replace(',', '.')
-                valores.append(float(valor_limpo))
-            except ValueError as e:
-                error_msg = f"Erro na conversão do valor '{valor}' para float: {e}"
-                logging.error(error_msg)
-                raise ChartGenerationError(error_msg)
+        # Parse compartilhado com o backend nativo (graphics/chart_data.py)
+        labels, valores = extrair_pares(titulo, dados_texto, 'gráfico de pizza')
         
         # Criação do gráfico com context manager seguro
         with safe_matplotlib_figure(figsize=(7, 7)) as fig:
             ax = fig.add_subplot(111)
             
             # Definir cores baseadas na paleta
-            if cores_paleta['principal'] == '#000000':  # Paleta preto e branco
-                # Usar escala de cinzas em vez de cores coloridas
-                escala_cinza = ['#2D2D2D', '#4A4A4A', '#6B6B6B', '#8C8C8C', '#ADADAD', '#C4C4C4', '#DBDBDB']
-                colors = escala_cinza
-            else:
-                colors = [
-                    cores_paleta['principal'],
-                    cores_paleta['secundaria'],
-                    cores_paleta['destaque'],
-                    cores_paleta['fundo'],
-                    '#95A5A6', '#E74C3C', '#F39C12', '#27AE60', '#8E44AD'  # cores complementares
-                ]
+            colors = cores_pizza(cores_paleta, len(valores))
             
             # Configurar o gráfico pizza com estilo minimalista
             wedges, texts, autotexts = ax.pie(
                 valores, 
                 labels=labels, 
                 autopct='%1.1f%%', 
-                colors=colors[:len(valores)], 
+                colors=colors, 
                 startangle=90,
                 explode=[0.02] * len(valores),  # Separação mínima entre fatias
                 shadow=False,                   # Sem sombra para estilo minimalista
@@ -101,9 +68,7 @@ def criar_grafico_pizza(titulo, dados_texto, cores_paleta):
             plt.tight_layout()
             
             # Salva em buffer
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-            buf.seek(0)
+            buf = salvar_figura(fig, qualidade)
             
             logging.info(f"Gráfico de pizza criado com sucesso: {titulo}")
             return buf
@@ -2,6 +2,8 @@
 # Utilitários seguros para matplotlib
 
 import logging
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from contextlib import contextmanager
 
@@ -61,3 +63,37 @@ def cleanup_matplotlib():
     plt.clf()
     plt.cla()
     logging.debug("Recursos matplotlib limpos")
+
+def salvar_figura(fig, qualidade='alta'):
+    """
+    Salva a figura no formato do nível de qualidade (ver CHART_QUALITY_TIERS).
+
+    - 'vetor': PDF de uma página, embutido depois como form XObject. Usa fontes
+      Type 3 (padrão do matplotlib): o subset TrueType (pdf.fonttype 42) custa
+      cerca do dobro do tempo com tamanho final equivalente
+    - 'alta' / 'media' / 'rascunho': PNG na resolução do nível
+
+    Args:
+        fig (matplotlib.figure.Figure): Figura já montada
+        qualidade (str): Nível de qualidade
+
+    Returns:
+        io.BytesIO: Buffer posicionado no início
+    """
+    import io
+    import matplotlib
+    from ..core.config import CHART_QUALITY_TIERS
+
+    nivel = CHART_QUALITY_TIERS.get(qualidade, CHART_QUALITY_TIERS['alta'])
+    buf = io.BytesIO()
+
+    if nivel['formato'] == 'pdf':
+        # Metadados fixos: o mesmo gráfico gera sempre os mesmos bytes
+        with matplotlib.rc_context({'pdf.fonttype': 3}):
+            fig.savefig(buf, format='pdf', bbox_inches='tight', facecolor='white',
+                        metadata={'Creator': None, 'Producer': None, 'CreationDate': None})
+    else:
+        fig.savefig(buf, format='png', dpi=nivel['dpi'], bbox_inches='tight', facecolor='white')
+
+    buf.seek(0)
+    return buf
@@ -0,0 +1,295 @@
+# Arquivo: graphics/native_charts.py
+# Backend nativo de gráficos: desenha com reportlab.graphics, sem carregar o matplotlib
+
+import io
+import logging
+import math
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.shapes import Drawing, Group, Polygon, String, Wedge
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+
+from .chart_data import (
+    detectar_unidade, extrair_pares, extrair_serie_linha, formatar_valor, rotulo_eixo_y,
+    cores_barras, cores_pizza, cor_linha
+)
+from ..core.config import CHART_QUALITY_TIERS
+from ..core.exceptions import ChartGenerationError
+from ..utils.fonts import obter_fontes
+
+# Mesmas proporções das figuras do matplotlib (8x5 e 7x7 polegadas), em pontos
+TAMANHO_RETANGULAR = (576, 360)
+TAMANHO_QUADRADO = (504, 504)
+
+COR_EIXOS = colors.HexColor('#E0E0E0')
+COR_GRADE = colors.HexColor('#EDEDED')
+
+def _cor(hexadecimal, alpha=1.0):
+    """Converte '#RRGGBB' em cor do ReportLab com transparência."""
+    return colors.HexColor(hexadecimal).clone(alpha=alpha)
+
+def _titulo(desenho, titulo, fonte_bold):
+    largura, altura = desenho.width, desenho.height
+    desenho.add(String(largura / 2, altura - 24, titulo, fontName=fonte_bold, fontSize=14,
+                       textAnchor='middle'))
+
+def _rotulo_vertical(desenho, texto, x, y, fonte):
+    grupo = Group(String(0, 0, texto, fontName=fonte, fontSize=10, textAnchor='middle'))
+    grupo.transform = (0, 1, -1, 0, x, y)  # Rotação de 90 graus
+    desenho.add(grupo)
+
+def _configurar_eixos(grafico, fonte, valores, folga_topo):
+    """Eixos discretos como no estilo do matplotlib: só esquerda/baixo, cinza claro, grade em Y."""
+    grafico.categoryAxis.strokeColor = COR_EIXOS
+    grafico.categoryAxis.labels.fontName = fonte
+    grafico.categoryAxis.labels.fontSize = 9
+    grafico.categoryAxis.labels.dy = -4
+    grafico.valueAxis.strokeColor = COR_EIXOS
+    grafico.valueAxis.labels.fontName = fonte
+    grafico.valueAxis.labels.fontSize = 9
+    grafico.valueAxis.visibleGrid = True
+    grafico.valueAxis.gridStrokeColor = COR_GRADE
+    grafico.valueAxis.gridStrokeWidth = 0.5
+    grafico.valueAxis.valueMin = min(0, min(valores))
+    maximo = max(valores)
+    if maximo > 0:
+        # Espaço para os rótulos de valor acima das barras/pontos
+        grafico.valueAxis.valueMax = maximo * folga_topo
+
+class _PreenchimentoSobALinha:
+    """
+    Filler do HorizontalLineChart que fecha a área no primeiro e no último ponto.
+
+    O inFill padrão vai de uma ponta à outra do eixo de categorias; o
+    fill_between do matplotlib termina nos pontos extremos da série.
+    """
+
+    def fill(self, grafico, grupo, indice_serie, cor, pontos):
+        # pontos = [x_inicio_eixo, y_base] + série + [x_fim_eixo, y_base]
+        pontos = list(pontos)
+        pontos[0] = pontos[2]
+        pontos[-2] = pontos[-4]
+        grupo.add(Polygon(pontos, fillColor=cor, strokeColor=None))
+
+def desenhar_grafico_barras(titulo, dados_texto, cores_paleta, unidade=None):
+    """
+    Monta um gráfico de barras como Drawing do ReportLab.
+
+    Args:
+        titulo (str): Título do gráfico
+        dados_texto (str): Dados no formato "Label1: valor1, Label2: valor2"
+        cores_paleta (dict): Paleta de cores do documento
+        unidade (str, optional): Unidade dos valores
+
+    Returns:
+        Drawing: Gráfico vetorial
+
+    Raises:
+        ChartGenerationError: Se os dados forem inválidos
+    """
+    unidade_detectada = detectar_unidade(dados_texto, unidade)
+    labels, valores = extrair_pares(titulo, dados_texto, 'gráfico de barras')
+    fonte, fonte_bold = obter_fontes()
+
+    desenho = Drawing(*TAMANHO_RETANGULAR)
+    _titulo(desenho, titulo, fonte_bold)
+    _rotulo_vertical(desenho, rotulo_eixo_y(unidade_detectada), 16, 180, fonte)
+
+    grafico = VerticalBarChart()
+    grafico.x, grafico.y = 64, 36
+    grafico.width, grafico.height = desenho.width - 80, desenho.height - 100
+    grafico.data = [valores]
+    grafico.categoryAxis.categoryNames = labels
+    _configurar_eixos(grafico, fonte, valores, folga_topo=1.1)
+
+    # Barras ocupando 60% da categoria, como width=0.6 no matplotlib
+    grafico.barWidth = 6
+    grafico.groupSpacing = 4
+    grafico.bars.strokeColor = None
+    for indice, cor in enumerate(cores_barras(cores_paleta, len(valores))):
+        grafico.bars[(0, indice)].fillColor = _cor(cor, 0.9)
+
+    grafico.barLabelFormat = lambda valor: formatar_valor(valor, unidade_detectada)
+    grafico.barLabels.fontName = fonte
+    grafico.barLabels.fontSize = 9
+    grafico.barLabels.boxAnchor = 's'
+    grafico.barLabels.nudge = 4
+
+    desenho.add(grafico)
+    return desenho
+
+def desenhar_grafico_pizza(titulo, dados_texto, cores_paleta, unidade=None):
+    """
+    Monta um gráfico de pizza como Drawing do ReportLab.
+
+    As fatias começam em 90 graus e seguem no sentido anti-horário, com a mesma
+    separação (explode de 2%), rótulos externos e percentuais internos do matplotlib.
+
+    Args:
+        titulo (str): Título do gráfico
+        dados_texto (str): Dados no formato "Label1: valor1, Label2: valor2"
+        cores_paleta (dict): Paleta de cores do documento
+        unidade (str, optional): Ignorada (a pizza mostra percentuais)
+
+    Returns:
+        Drawing: Gráfico vetorial
+
+    Raises:
+        ChartGenerationError: Se os dados forem inválidos
+    """
+    labels, valores = extrair_pares(titulo, dados_texto, 'gráfico de pizza')
+    total = sum(valores)
+    if total <= 0:
+        raise ChartGenerationError(f"Gráfico de pizza '{titulo}' sem valores positivos: '{dados_texto}'")
+    fonte, fonte_bold = obter_fontes()
+
+    desenho = Drawing(*TAMANHO_QUADRADO)
+    _titulo(desenho, titulo, fonte_bold)
+
+    raio = 180
+    centro_x, centro_y = desenho.width / 2, (desenho.height - 40) / 2
+    paleta = cores_pizza(cores_paleta, len(valores))
+    angulo = 90.0
+
+    for indice, (label, valor) in enumerate(zip(labels, valores)):
+        varredura = 360.0 * valor / total
+        meio = math.radians(angulo + varredura / 2)
+        dx, dy = math.cos(meio), math.sin(meio)
+        deslocamento = raio * 0.02
+        x, y = centro_x + dx * deslocamento, centro_y + dy * deslocamento
+
+        if varredura > 0:
+            desenho.add(Wedge(x, y, raio, angulo, angulo + varredura,
+                              fillColor=_cor(paleta[indice % len(paleta)]), strokeColor=None))
+
+        desenho.add(String(x + dx * raio * 1.1, y + dy * raio * 1.1 - 3, label, fontName=fonte, fontSize=9,
+                           textAnchor='start' if dx >= 0 else 'end'))
+        desenho.add(String(x + dx * raio * 0.6, y + dy * raio * 0.6 - 3, f'{100.0 * valor / total:.1f}%',
+                           fontName=fonte_bold, fontSize=10, fillColor=colors.white, textAnchor='middle'))
+        angulo += varredura
+
+    return desenho
+
+def desenhar_grafico_linha(titulo, dados_texto, cores_paleta, unidade=None):
+    """
+    Monta um gráfico de linha (com área preenchida) como Drawing do ReportLab.
+
+    Args:
+        titulo (str): Título do gráfico
+        dados_texto (str): Dados no formato "serie=valores; labels=nomes"
+        cores_paleta (dict): Paleta de cores do documento
+        unidade (str, optional): Unidade dos valores
+
+    Returns:
+        Drawing: Gráfico vetorial
+
+    Raises:
+        ChartGenerationError: Se os dados forem inválidos
+    """
+    unidade_detectada = detectar_unidade(dados_texto, unidade)
+    titulo, _, labels, valores = extrair_serie_linha(titulo, dados_texto)
+    fonte, fonte_bold = obter_fontes()
+    cor = cor_linha(cores_paleta)
+
+    desenho = Drawing(*TAMANHO_RETANGULAR)
+    _titulo(desenho, titulo, fonte_bold)
+    _rotulo_vertical(desenho, rotulo_eixo_y(unidade_detectada), 16, 180, fonte)
+
+    grafico = HorizontalLineChart()
+    grafico.x, grafico.y = 64, 36
+    grafico.width, grafico.height = desenho.width - 80, desenho.height - 100
+    grafico.data = [valores]
+    grafico.categoryAxis.categoryNames = labels
+    grafico.categoryAxis.visibleGrid = True
+    grafico.categoryAxis.gridStrokeColor = COR_GRADE
+    grafico.categoryAxis.gridStrokeWidth = 0.5
+    _configurar_eixos(grafico, fonte, valores, folga_topo=1.12)
+
+    linha = grafico.lines[0]
+    linha.strokeColor = _cor(cor, 0.9)
+    linha.strokeWidth = 2.5
+    linha.symbol = makeMarker('FilledCircle', size=6, fillColor=_cor(cor), strokeColor=None)
+    # Área sob a linha, como o fill_between do matplotlib
+    linha.inFill = True
+    linha.fillColor = _cor(cor, 0.15)
+    linha.filler = _PreenchimentoSobALinha()
+
+    grafico.lineLabelFormat = lambda valor: formatar_valor(valor, unidade_detectada)
+    grafico.lineLabels.fontName = fonte
+    grafico.lineLabels.fontSize = 9
+    grafico.lineLabels.boxAnchor = 's'
+    grafico.lineLabels.dy = 7
+
+    desenho.add(grafico)
+    return desenho
+
+DESENHOS = {
+    'barras': desenhar_grafico_barras,
+    'pizza': desenhar_grafico_pizza,
+    'linha': desenhar_grafico_linha,
+}
+
+_aviso_png_emitido = False
+
+def renderizar_desenho(desenho, qualidade='vetor'):
+    """
+    Serializa o Drawing no formato do nível de qualidade.
+
+    PNG depende do renderPM (pacote rlPyCairo); sem ele o gráfico sai em PDF
+    vetorial, que o gerador embute normalmente.
+
+    Args:
+        desenho (Drawing): Gráfico montado
+        qualidade (str): Nível de qualidade (ver CHART_QUALITY_TIERS)
+
+    Returns:
+        io.BytesIO: Buffer com PDF ou PNG
+    """
+    global _aviso_png_emitido
+
+    nivel = CHART_QUALITY_TIERS.get(qualidade, CHART_QUALITY_TIERS['alta'])
+    if nivel['formato'] == 'png':
+        try:
+            from reportlab.graphics import renderPM
+            return io.BytesIO(renderPM.drawToString(desenho, fmt='PNG', dpi=nivel['dpi']))
+        except Exception as e:
+            if not _aviso_png_emitido:
+                logging.warning(f"PNG indisponível no backend nativo ({e}); usando saída vetorial")
+                _aviso_png_emitido = True
+
+    return io.BytesIO(renderPDF.drawToString(desenho))
+
+# Mesma assinatura dos criadores do matplotlib (graphics/charts), usada pelo ChartFactory
+def criar_grafico_barras_nativo(titulo, dados_texto, cores_paleta, unidade=None, qualidade='alta'):
+    return renderizar_desenho(desenhar_grafico_barras(titulo, dados_texto, cores_paleta, unidade), qualidade)
+
+def criar_grafico_pizza_nativo(titulo, dados_texto, cores_paleta, qualidade='alta'):
+    return renderizar_desenho(desenhar_grafico_pizza(titulo, dados_texto, cores_paleta), qualidade)
+
+def criar_grafico_linha_nativo(titulo, dados_texto, cores_paleta, unidade=None, qualidade='alta'):
+    return renderizar_desenho(desenhar_grafico_linha(titulo, dados_texto, cores_paleta, unidade), qualidade)
+
+def encaixar_desenho(desenho, largura, altura):
+    """
+    Escala o Drawing para a área reservada na página, mantendo a proporção.
+
+    Args:
+        desenho (Drawing): Gráfico no tamanho original
+        largura (float): Largura da área (pontos)
+        altura (float): Altura da área (pontos)
+
+    Returns:
+        Drawing: Novo Drawing com exatamente largura x altura, centralizado
+    """
+    escala = min(largura / desenho.width, altura / desenho.height)
+    grupo = Group(*desenho.contents)
+    grupo.transform = (escala, 0, 0, escala,
+                       (largura - desenho.width * escala) / 2,
+                       (altura - desenho.height * escala) / 2)
+    encaixado = Drawing(largura, altura)
+    encaixado.add(grupo)
+    encaixado.hAlign = 'CENTER'
+    return encaixado
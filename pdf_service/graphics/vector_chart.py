@@ -0,0 +1,120 @@
+# Arquivo: graphics/vector_chart.py
+# Embute gráficos vetoriais (PDF de uma página) na story do ReportLab como form XObject
+
+import hashlib
+import io
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+from reportlab.pdfbase import pdfdoc
+from reportlab.platypus import Flowable
+
+def _converter_objeto(objeto, documento, convertidos):
+    """
+    Converte recursivamente um objeto do PyPDF2 para o equivalente do ReportLab.
+
+    Dicionários, arrays e streams são recriados; os demais objetos (nomes,
+    números, strings, booleanos) são serializados pelo próprio PyPDF2 e
+    escritos como estão.
+
+    Args:
+        objeto: Objeto PyPDF2
+        documento: PDFDocument do canvas que receberá o objeto
+        convertidos (dict): Objetos indiretos já convertidos (idnum -> referência)
+
+    Returns:
+        Objeto formatável pelo ReportLab
+    """
+    if isinstance(objeto, IndirectObject):
+        chave = (objeto.idnum, objeto.generation)
+        if chave not in convertidos:
+            convertidos[chave] = documento.Reference(
+                _converter_objeto(objeto.get_object(), documento, convertidos)
+            )
+        return convertidos[chave]
+
+    if isinstance(objeto, StreamObject):
+        dicionario = pdfdoc.PDFDictionary({
+            chave[1:]: _converter_objeto(valor, documento, convertidos)
+            for chave, valor in objeto.items() if chave != '/Length'
+        })
+        # Os bytes continuam codificados; com /Filter no dicionário o ReportLab não recodifica
+        return pdfdoc.PDFStream(dicionario, objeto._data, filters=None if '/Filter' not in objeto else [])
+
+    if isinstance(objeto, DictionaryObject):
+        return pdfdoc.PDFDictionary({
+            chave[1:]: _converter_objeto(valor, documento, convertidos)
+            for chave, valor in objeto.items()
+        })
+
+    if isinstance(objeto, ArrayObject):
+        return pdfdoc.PDFArray([_converter_objeto(item, documento, convertidos) for item in objeto])
+
+    saida = io.BytesIO()
+    objeto.write_to_stream(saida, None)
+    return saida.getvalue()
+
+def registrar_form_pdf(canvas, pdf_bytes):
+    """
+    Registra a primeira página de um PDF como form XObject no documento do canvas.
+
+    Um mesmo PDF (mesmo hash) é registrado uma única vez por documento, então
+    gráficos repetidos compartilham o mesmo XObject.
+
+    Args:
+        canvas: Canvas do ReportLab em uso
+        pdf_bytes (bytes): PDF de uma página (ex: gráfico salvo pelo matplotlib)
+
+    Returns:
+        tuple: (nome do form para canvas.doForm, caixa (x0, y0, x1, y1) em pontos)
+    """
+    nome = 'Grafico' + hashlib.sha1(pdf_bytes).hexdigest()[:16]
+    pagina = PdfReader(io.BytesIO(pdf_bytes)).pages[0]
+    x0, y0, x1, y1 = (float(valor) for valor in pagina.mediabox)
+
+    if not canvas.hasForm(nome):
+        documento = canvas._doc
+        convertidos = {}
+        recursos = pagina.get('/Resources')
+        dicionario = pdfdoc.PDFDictionary({
+            'Type': pdfdoc.PDFName('XObject'),
+            'Subtype': pdfdoc.PDFName('Form'),
+            'FormType': 1,
+            'BBox': pdfdoc.PDFArray([x0, y0, x1, y1]),
+            'Resources': _converter_objeto(recursos, documento, convertidos) if recursos is not None else pdfdoc.PDFDictionary(),
+        })
+        conteudo = pagina.get_contents()
+        dados = conteudo.get_data() if conteudo is not None else b''
+        form = pdfdoc.PDFStream(dicionario, dados, filters=[pdfdoc.PDFZCompress])
+        documento.Reference(form, pdfdoc.xObjectName(nome))
+
+    return nome, (x0, y0, x1, y1)
+
+class GraficoVetorial(Flowable):
+    """
+    Flowable que desenha um gráfico vetorial (PDF de uma página) como form XObject.
+
+    Ocupa exatamente `width` x `height`, como o Image que substitui; o gráfico
+    é escalado mantendo a proporção e centralizado nessa área.
+    """
+
+    def __init__(self, pdf_bytes, width, height):
+        super().__init__()
+        self.pdf_bytes = pdf_bytes
+        self.width = width
+        self.height = height
+        self.hAlign = 'CENTER'
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        nome, (x0, y0, x1, y1) = registrar_form_pdf(self.canv, self.pdf_bytes)
+        largura, altura = x1 - x0, y1 - y0
+        escala = min(self.width / largura, self.height / altura)
+        self.canv.saveState()
+        self.canv.translate((self.width - largura * escala) / 2, (self.height - altura * escala) / 2)
+        self.canv.scale(escala, escala)
+        self.canv.translate(-x0, -y0)
+        self.canv.doForm(nome)
+        self.canv.restoreState()
@@ -0,0 +1 @@
+# Images module - Single-decode validation pipeline for attached images
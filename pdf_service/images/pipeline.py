@@ -0,0 +1,301 @@
+# Arquivo: images/pipeline.py
+# Decodifica e valida cada imagem anexada uma única vez, guardando formato e dimensões para as etapas seguintes
+
+import binascii
+import io
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from typing import NamedTuple, Optional
+
+from PIL import Image as PILImage
+
+from ..core.config import (
+    MAX_IMAGE_SIZE_MB, MAX_IMAGE_COUNT, MAX_DECODE_SIZE_MB, IMAGE_PROCESSING_TIMEOUT,
+    ALLOWED_IMAGE_FORMATS, MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT, IMAGE_WORKERS, INGEST_SPOOL_DIR
+)
+from ..core.exceptions import ImageSecurityError
+
+class ImagemValidada(NamedTuple):
+    """
+    Imagem anexada já decodificada e validada.
+
+    Carrega os bytes e os metadados lidos na validação (formato, dimensões),
+    para que parse_conteudo e o rodapé não precisem decodificar nem abrir a
+    imagem de novo.
+    """
+    id: Optional[int]
+    legenda: str
+    dados: bytes
+    formato: str
+    largura: int
+    altura: int
+
+    @property
+    def tamanho_mb(self):
+        return len(self.dados) / (1024 * 1024)
+
+    @property
+    def paisagem(self):
+        return self.largura > self.altura
+
+    def buffer(self):
+        """Arquivo em memória sobre os bytes (sem cópia) para o ReportLab."""
+        return io.BytesIO(self.dados)
+
+# Pool de threads compartilhado pelas requisições do processo (criado no primeiro uso).
+# O PIL libera o GIL ao decodificar, reamostrar e codificar, então as imagens de
+# um documento são processadas em paralelo; o limite de threads vale para o
+# processo todo, e uma imagem travada ocupa uma thread em vez de vazar uma nova.
+_POOL_IMAGENS = None
+_POOL_LOCK = threading.Lock()
+
+def _pool_imagens():
+    global _POOL_IMAGENS
+    with _POOL_LOCK:
+        if _POOL_IMAGENS is None:
+            _POOL_IMAGENS = ThreadPoolExecutor(max_workers=max(1, IMAGE_WORKERS), thread_name_prefix='imagens')
+        return _POOL_IMAGENS
+
+def tamanho_decodificado(base64_data):
+    """Tamanho exato (bytes) que o base64 terá decodificado, sem decodificar."""
+    padding = 2 if base64_data.endswith('==') else 1 if base64_data.endswith('=') else 0
+    return len(base64_data) // 4 * 3 - padding if len(base64_data) % 4 == 0 else len(base64_data) * 3 // 4
+
+def _inspecionar_com_pil(img_bytes, image_ref):
+    """Lê as dimensões do cabeçalho e confere a integridade (verify) em uma única abertura."""
+    with PILImage.open(io.BytesIO(img_bytes)) as pil_img:
+        width, height = pil_img.size
+        if width > MAX_IMAGE_WIDTH or height > MAX_IMAGE_HEIGHT:
+            raise ImageSecurityError(
+                f"Imagem {image_ref} muito grande: {width}x{height}px. "
+                f"Máximo permitido: {MAX_IMAGE_WIDTH}x{MAX_IMAGE_HEIGHT}px"
+            )
+
+        # Verifica se a imagem não está corrompida
+        pil_img.verify()
+
+        return width, height
+
+def decodificar_imagem(base64_data, image_id=None, legenda=''):
+    """
+    Validação completa de segurança para uma imagem, com uma única decodificação.
+
+    Implementa TODAS as validações de segurança necessárias:
+    - Tamanho máximo do base64
+    - Formato de imagem válido (magic bytes)
+    - Dimensões da imagem
+    - Proteção contra ataques
+
+    Args:
+        base64_data (str): Dados da imagem em base64
+        image_id (int, optional): ID da imagem para logs e referência no texto
+        legenda (str, optional): Legenda exibida abaixo da imagem
+
+    Returns:
+        ImagemValidada: Bytes decodificados com formato e dimensões
+
+    Raises:
+        ImageSecurityError: Se a imagem não passar nas validações
+    """
+    image_ref = f"ID:{image_id}" if image_id is not None else "sequencial"
+
+    # 1. VALIDAÇÃO DE TAMANHO DO BASE64
+    base64_size_mb = len(base64_data) / (1024 * 1024)
+    if base64_size_mb > MAX_IMAGE_SIZE_MB:
+        raise ImageSecurityError(
+            f"Imagem {image_ref} muito grande: {base64_size_mb:.2f}MB. "
+            f"Máximo permitido: {MAX_IMAGE_SIZE_MB}MB"
+        )
+
+    # 2. DECODIFICAÇÃO (a única do pipeline); strict_mode valida o alfabeto e o
+    # padding na mesma passada, sem o regex extra do b64decode(validate=True)
+    logging.info(f"Validando imagem {image_ref} ({base64_size_mb:.2f}MB)")
+
+    try:
+        img_bytes = binascii.a2b_base64(base64_data, strict_mode=True)
+    except (binascii.Error, ValueError) as e:
+        raise ImageSecurityError(f"Dados base64 inválidos na imagem {image_ref}: {e}")
+
+    return validar_bytes_imagem(img_bytes, image_id, legenda)
+
+def validar_bytes_imagem(img_bytes, image_id=None, legenda=''):
+    """
+    Validações de uma imagem já decodificada (tamanho, magic bytes, dimensões e integridade).
+
+    Usada diretamente quando o base64 foi decodificado na leitura da
+    requisição (ingest/); decodificar_imagem chama esta função em seguida.
+
+    Args:
+        img_bytes (bytes): Conteúdo binário da imagem
+        image_id (int, optional): ID da imagem para logs e referência no texto
+        legenda (str, optional): Legenda exibida abaixo da imagem
+
+    Returns:
+        ImagemValidada: Bytes com formato e dimensões
+
+    Raises:
+        ImageSecurityError: Se a imagem não passar nas validações
+    """
+    image_ref = f"ID:{image_id}" if image_id is not None else "sequencial"
+
+    try:
+        # 3. VALIDAÇÃO DE TAMANHO DECODIFICADO
+        decoded_size_mb = len(img_bytes) / (1024 * 1024)
+        if decoded_size_mb > MAX_DECODE_SIZE_MB:
+            raise ImageSecurityError(
+                f"Imagem {image_ref} decodificada muito grande: {decoded_size_mb:.2f}MB. "
+                f"Máximo permitido: {MAX_DECODE_SIZE_MB}MB"
+            )
+
+        # 4. VALIDAÇÃO DE FORMATO (MAGIC BYTES)
+        format_detected = None
+        for magic_bytes, format_name in ALLOWED_IMAGE_FORMATS.items():
+            if img_bytes.startswith(magic_bytes):
+                format_detected = format_name
+                break
+
+        if not format_detected:
+            # Mostra os primeiros bytes para debug (seguro)
+            first_bytes = img_bytes[:16].hex()
+            raise ImageSecurityError(
+                f"Formato de imagem não suportado na imagem {image_ref}. "
+                f"Formatos permitidos: PNG, JPEG, GIF. "
+                f"Magic bytes detectados: {first_bytes}"
+            )
+
+        # 5. VALIDAÇÃO PROFUNDA COM PIL (o timeout é aplicado por validar_imagens)
+        width, height = _inspecionar_com_pil(img_bytes, image_ref)
+
+        logging.info(
+            f"Imagem {image_ref} validada com sucesso: "
+            f"{format_detected}, {width}x{height}px, {decoded_size_mb:.2f}MB"
+        )
+
+        return ImagemValidada(image_id, legenda or '', img_bytes, format_detected, width, height)
+
+    except ImageSecurityError:
+        # Re-raise security errors
+        raise
+
+    except Exception as e:
+        logging.error(f"Erro inesperado ao validar imagem {image_ref}: {e}")
+        raise ImageSecurityError(f"Erro na validação da imagem {image_ref}: {e}")
+
+def _caminho_spool(caminho):
+    """Só aceita arquivos do diretório de spool da ingestão (o caminho vem do dict da requisição)."""
+    diretorio = os.path.realpath(INGEST_SPOOL_DIR)
+    real = os.path.realpath(caminho) if isinstance(caminho, str) else ''
+    if os.path.dirname(real) != diretorio:
+        raise ImageSecurityError("Arquivo de imagem fora do diretório de ingestão")
+    return real
+
+def _tamanho_anexo(img_data):
+    """Tamanho decodificado de uma entrada de imagens_anexadas (base64, dados ou arquivo)."""
+    if isinstance(img_data.get('dados'), bytes):
+        return len(img_data['dados'])
+    if 'arquivo' in img_data:
+        try:
+            return os.path.getsize(_caminho_spool(img_data['arquivo']))
+        except OSError:
+            raise ImageSecurityError("Arquivo de imagem não encontrado")
+    return tamanho_decodificado(img_data['base64'])
+
+def _processar(img_data, qualidade_imagens, cancelado, caixa=None):
+    """Tarefa do pool: valida e prepara uma imagem, a menos que o lote já tenha falhado."""
+    if cancelado.is_set():
+        return None
+    if isinstance(img_data.get('dados'), bytes):
+        imagem = validar_bytes_imagem(img_data['dados'], img_data.get('id'), img_data.get('legenda'))
+    elif 'arquivo' in img_data:
+        with open(_caminho_spool(img_data['arquivo']), 'rb') as arquivo:
+            imagem = validar_bytes_imagem(arquivo.read(), img_data.get('id'), img_data.get('legenda'))
+    else:
+        imagem = decodificar_imagem(img_data['base64'], img_data.get('id'), img_data.get('legenda'))
+    if cancelado.is_set():
+        return None
+    # Import tardio: resample depende de ImagemValidada deste módulo
+    from .resample import preparar_para_impressao, caixa_impressao
+    largura_pt, altura_pt = caixa or caixa_impressao(imagem)
+    return preparar_para_impressao(imagem, largura_pt, altura_pt, qualidade_imagens)
+
+def validar_imagens(imagens_anexadas, qualidade_imagens=None, caixas=None):
+    """
+    Valida e prepara um lote de imagens em paralelo, aplicando limites globais.
+
+    O limite total (MAX_DECODE_SIZE_MB) é conferido pelo tamanho do base64
+    (ou dos bytes já decodificados) antes de qualquer decodificação. As imagens são então validadas e
+    preparadas para impressão (images/resample.py) no pool compartilhado; na
+    primeira falha, as imagens que ainda não começaram são canceladas.
+
+    Args:
+        imagens_anexadas (list): Imagens da requisição (dicts com id, legenda e o conteúdo
+            em 'base64', ou já decodificado pela ingestão em 'dados' ou 'arquivo')
+        qualidade_imagens (str, optional): Perfil de resolução (ver IMAGE_QUALITY_PROFILES)
+        caixas (dict, optional): Caixa de impressão (largura_pt, altura_pt) por posição na lista, para
+            imagens que não vão no corpo do documento (ex: o logo do rodapé)
+
+    Returns:
+        list: ImagemValidada na mesma ordem da requisição
+
+    Raises:
+        ImageSecurityError: Se o lote não passar nas validações
+    """
+    if not isinstance(imagens_anexadas, list):
+        raise ImageSecurityError("Lista de imagens deve ser um array")
+
+    # VALIDAÇÃO DE QUANTIDADE
+    if len(imagens_anexadas) > MAX_IMAGE_COUNT:
+        raise ImageSecurityError(
+            f"Muitas imagens enviadas: {len(imagens_anexadas)}. "
+            f"Máximo permitido: {MAX_IMAGE_COUNT} imagens por documento"
+        )
+
+    if len(imagens_anexadas) == 0:
+        return []
+
+    logging.info(f"Validando lote de {len(imagens_anexadas)} imagens...")
+
+    # VALIDAÇÃO DO TAMANHO TOTAL (antes de decodificar qualquer imagem)
+    total_size_mb = 0
+    for i, img_data in enumerate(imagens_anexadas):
+        if not isinstance(img_data, dict) or not (
+            isinstance(img_data.get('base64'), str) or isinstance(img_data.get('dados'), bytes) or 'arquivo' in img_data
+        ):
+            raise ImageSecurityError(f"Imagem {i} tem formato inválido")
+        total_size_mb += _tamanho_anexo(img_data) / (1024 * 1024)
+        if total_size_mb > MAX_DECODE_SIZE_MB:
+            raise ImageSecurityError(
+                f"Tamanho total das imagens muito grande: {total_size_mb:.2f}MB. "
+                f"Máximo permitido: {MAX_DECODE_SIZE_MB}MB total"
+            )
+
+    pool = _pool_imagens()
+    cancelado = threading.Event()
+    caixas = caixas or {}
+    futuros = [
+        pool.submit(_processar, img_data, qualidade_imagens, cancelado, caixas.get(i))
+        for i, img_data in enumerate(imagens_anexadas)
+    ]
+    # Mesmo limite por imagem de antes, escalado pelas rodadas que o pool precisa
+    prazo = IMAGE_PROCESSING_TIMEOUT * math.ceil(len(futuros) / max(1, IMAGE_WORKERS))
+
+    try:
+        concluidos, pendentes = wait(futuros, timeout=prazo, return_when=FIRST_EXCEPTION)
+        for futuro in futuros:
+            if futuro in concluidos and futuro.exception() is not None:
+                raise futuro.exception()
+        if pendentes:
+            logging.error(f"Timeout ao processar {len(pendentes)} de {len(futuros)} imagens")
+            raise ImageSecurityError(f"Timeout no processamento das imagens ({prazo}s)")
+    finally:
+        # Falha ou timeout: o que não começou é descartado e o que está rodando para no próximo ponto de checagem
+        cancelado.set()
+        for futuro in futuros:
+            futuro.cancel()
+
+    validated_images = [futuro.result() for futuro in futuros]
+    logging.info(f"Lote validado com sucesso: {len(validated_images)} imagens, {total_size_mb:.2f}MB total")
+    return validated_images
@@ -0,0 +1,172 @@
+# Arquivo: images/resample.py
+# Reamostra e recodifica as imagens anexadas para a resolução em que são impressas no PDF
+
+import io
+import logging
+import math
+import threading
+import time
+
+from PIL import Image as PILImage
+from reportlab.lib.units import inch
+
+from ..core.config import IMAGE_QUALITY_PROFILES, validate_image_quality
+from .pipeline import ImagemValidada
+
+# Modos do PIL que carregam transparência (continuam PNG para não perder o alfa)
+_MODOS_COM_ALFA = ('RGBA', 'LA', 'PA', 'RGBa', 'La')
+
+# Caixas onde parse_conteudo imprime as fotos (largura, altura em pontos)
+CAIXA_PAISAGEM = (5.5 * inch, 3.5 * inch)
+CAIXA_RETRATO = (3.5 * inch, 5 * inch)
+
+def caixa_impressao(imagem):
+    """Caixa em que a imagem é impressa no corpo do documento, pela orientação."""
+    return CAIXA_PAISAGEM if imagem.paisagem else CAIXA_RETRATO
+
+class EstatisticasPreparo:
+    """Contadores da preparação de imagens deste processo (bytes economizados e tempo gasto)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.imagens = 0
+        self.reamostradas = 0
+        self.mantidas = 0
+        self.bytes_entrada = 0
+        self.bytes_saida = 0
+        self.tempo_s = 0.0
+
+    def registrar(self, bytes_entrada, bytes_saida, reamostrada, duracao):
+        with self._lock:
+            self.imagens += 1
+            self.reamostradas += int(reamostrada)
+            self.mantidas += int(bytes_saida == bytes_entrada)
+            self.bytes_entrada += bytes_entrada
+            self.bytes_saida += bytes_saida
+            self.tempo_s += duracao
+
+    def estatisticas(self):
+        """
+        Retorna os contadores deste processo.
+
+        Returns:
+            dict: Imagens preparadas, bytes antes/depois, economia e tempo total
+        """
+        with self._lock:
+            return {
+                'imagens': self.imagens,
+                'reamostradas': self.reamostradas,
+                'mantidas': self.mantidas,
+                'bytes_entrada': self.bytes_entrada,
+                'bytes_saida': self.bytes_saida,
+                'bytes_economizados': self.bytes_entrada - self.bytes_saida,
+                'tempo_s': round(self.tempo_s, 3),
+            }
+
+# Instância única por processo (cada worker do pool tem a sua)
+ESTATISTICAS_IMAGENS = EstatisticasPreparo()
+
+def somar_estatisticas_imagens(lista):
+    """
+    Soma os contadores de preparação de vários processos (ex: workers do pool).
+
+    Args:
+        lista (list): Dicts retornados por EstatisticasPreparo.estatisticas()
+
+    Returns:
+        dict: Totais de imagens, bytes e tempo, com a economia relativa
+    """
+    total = {'processos': len(lista), 'imagens': 0, 'reamostradas': 0, 'mantidas': 0,
+             'bytes_entrada': 0, 'bytes_saida': 0, 'bytes_economizados': 0, 'tempo_s': 0.0}
+    for estatisticas in lista:
+        for campo in ('imagens', 'reamostradas', 'mantidas', 'bytes_entrada', 'bytes_saida',
+                      'bytes_economizados', 'tempo_s'):
+            total[campo] += estatisticas.get(campo, 0)
+    total['tempo_s'] = round(total['tempo_s'], 3)
+    total['economia'] = round(total['bytes_economizados'] / total['bytes_entrada'], 4) if total['bytes_entrada'] else 0.0
+    return total
+
+def _tamanho_alvo(imagem, largura_pt, altura_pt, dpi):
+    """Pixels necessários para imprimir a imagem na caixa (encaixe proporcional, como kind='proportional')."""
+    fator = min(largura_pt / imagem.largura, altura_pt / imagem.altura)
+    largura = math.ceil(imagem.largura * fator / 72 * dpi)
+    altura = math.ceil(imagem.altura * fator / 72 * dpi)
+    return max(1, largura), max(1, altura)
+
+def _recodificar(imagem, alvo, qualidade_jpeg):
+    """Decodifica (reduzida, quando JPEG), reamostra e codifica; retorna (bytes, formato, largura, altura)."""
+    with PILImage.open(imagem.buffer()) as pil_img:
+        # JPEG: decodifica direto em escala menor (DCT), bem mais rápido que decodificar tudo
+        if imagem.formato == 'JPEG':
+            pil_img.draft('RGB', alvo)
+        tem_alfa = pil_img.mode in _MODOS_COM_ALFA or 'transparency' in pil_img.info
+
+        if tem_alfa:
+            convertida = pil_img.convert('RGBA')
+        elif pil_img.mode in ('L', 'RGB'):
+            convertida = pil_img
+        else:
+            # CMYK, paletas (GIF/PNG 8 bits), 16 bits...
+            convertida = pil_img.convert('RGB')
+
+        if alvo[0] < convertida.width:
+            convertida = convertida.resize(alvo, PILImage.LANCZOS, reducing_gap=3.0)
+
+        saida = io.BytesIO()
+        if tem_alfa:
+            convertida.save(saida, 'PNG', optimize=False)
+            formato = 'PNG'
+        else:
+            convertida.save(saida, 'JPEG', quality=qualidade_jpeg, optimize=True)
+            formato = 'JPEG'
+        return saida.getvalue(), formato, convertida.width, convertida.height
+
+def preparar_para_impressao(imagem, largura_pt, altura_pt, perfil=None):
+    """
+    Ajusta a imagem ao tamanho em que será impressa.
+
+    A imagem é reduzida para o DPI do perfil na caixa onde aparece e
+    recodificada em JPEG (PNG se tiver transparência). O resultado só é usado
+    se ficar menor que o original; imagens já pequenas passam intactas.
+
+    Args:
+        imagem (ImagemValidada): Imagem vinda de validar_imagens
+        largura_pt (float): Largura máxima da caixa no PDF (pontos)
+        altura_pt (float): Altura máxima da caixa no PDF (pontos)
+        perfil (str, optional): Perfil de IMAGE_QUALITY_PROFILES (padrão: IMAGE_QUALITY)
+
+    Returns:
+        ImagemValidada: Imagem preparada ou a própria imagem
+    """
+    configuracao = IMAGE_QUALITY_PROFILES[validate_image_quality(perfil)]
+    if configuracao is None:
+        return imagem
+
+    inicio = time.perf_counter()
+    alvo = _tamanho_alvo(imagem, largura_pt, altura_pt, configuracao['dpi'])
+    reamostrar = alvo[0] < imagem.largura
+
+    # Já está na resolução de impressão e num formato que o PDF embute sem recodificar
+    if not reamostrar and imagem.formato == 'JPEG':
+        ESTATISTICAS_IMAGENS.registrar(len(imagem.dados), len(imagem.dados), False, time.perf_counter() - inicio)
+        return imagem
+
+    try:
+        dados, formato, largura, altura = _recodificar(imagem, alvo, configuracao['qualidade_jpeg'])
+    except Exception as e:
+        logging.warning(f"Não foi possível preparar a imagem {imagem.id}, usando a original: {e}")
+        ESTATISTICAS_IMAGENS.registrar(len(imagem.dados), len(imagem.dados), False, time.perf_counter() - inicio)
+        return imagem
+
+    duracao = time.perf_counter() - inicio
+    if len(dados) >= len(imagem.dados):
+        ESTATISTICAS_IMAGENS.registrar(len(imagem.dados), len(imagem.dados), False, duracao)
+        return imagem
+
+    ESTATISTICAS_IMAGENS.registrar(len(imagem.dados), len(dados), reamostrar, duracao)
+    logging.info(
+        f"Imagem {imagem.id} preparada para {configuracao['dpi']} DPI: "
+        f"{imagem.largura}x{imagem.altura} {imagem.formato} ({len(imagem.dados) / 1024:.0f}KB) -> "
+        f"{largura}x{altura} {formato} ({len(dados) / 1024:.0f}KB) em {duracao * 1000:.0f}ms"
+    )
+    return ImagemValidada(imagem.id, imagem.legenda, dados, formato, largura, altura)
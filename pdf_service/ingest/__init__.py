@@ -0,0 +1 @@
+# Ingest module - Streaming request parsing with chunked base64 decoding into spooled buffers
@@ -0,0 +1,287 @@
+# Arquivo: ingest/json_stream.py
+# Parser JSON incremental: monta o objeto à medida que os blocos chegam e desvia strings escolhidas (base64) para destinos em fluxo
+
+import json
+import re
+
+_ESPACOS = frozenset(b' \t\r\n')
+_BOM = b'\xef\xbb\xbf'
+_FIM_STRING = re.compile(rb'["\\]')
+_NUMERO = re.compile(rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+_TOKEN_NUMERO = re.compile(rb'[-+.eE0-9]+')
+_LITERAIS = ((b'true', True), (b'false', False), (b'null', None))
+
+# Estados do parser (o que é aceito no próximo byte que não seja espaço)
+_VALOR = 'valor'
+_VALOR_OU_FECHA = 'valor_ou_fecha'   # logo após '['
+_CHAVE = 'chave'                     # depois de ',' dentro de objeto
+_CHAVE_OU_FECHA = 'chave_ou_fecha'   # logo após '{'
+_DOIS_PONTOS = 'dois_pontos'
+_VIRGULA = 'virgula'                 # depois de um valor dentro de objeto/lista
+_FIM = 'fim'
+
+class ErroJSON(ValueError):
+    """JSON malformado; `posicao` é o deslocamento em bytes desde o início do corpo."""
+
+    def __init__(self, mensagem, posicao):
+        super().__init__(f"{mensagem} (byte {posicao})")
+        self.posicao = posicao
+
+class LimiteTextoError(ValueError):
+    """Uma string comum (fora dos campos desviados) passou do limite."""
+
+class _StringAberta:
+    """String em leitura: partes cruas (texto) ou destino em fluxo (campo desviado)."""
+    __slots__ = ('partes', 'tamanho', 'destino', 'eh_chave', 'escape')
+
+    def __init__(self, destino, eh_chave):
+        self.partes = []
+        self.tamanho = 0
+        self.destino = destino
+        self.eh_chave = eh_chave
+        self.escape = False
+
+class LeitorJSON:
+    """
+    Monta um objeto JSON a partir de blocos de bytes, sem precisar do corpo inteiro.
+
+    Estruturas e strings comuns são montadas normalmente (strings comuns têm
+    limite de `max_texto` bytes). Quando uma string começa num caminho para o
+    qual `abrir_destino(caminho)` devolve um destino, o conteúdo vai direto
+    para `destino.escrever(bytes)` à medida que chega, e o valor final no
+    objeto é o que `destino.fechar()` retornar. Assim um base64 de vários MB
+    nunca existe inteiro na memória.
+
+    O caminho é uma tupla de chaves, com '*' para posições de lista
+    (ex: ('imagens_anexadas', '*', 'base64')).
+
+    Uso:
+        leitor = LeitorJSON(abrir_destino)
+        for bloco in blocos:
+            leitor.alimentar(bloco)
+        objeto = leitor.finalizar()
+    """
+
+    def __init__(self, abrir_destino=None, max_texto=1024 * 1024, max_profundidade=64):
+        self.abrir_destino = abrir_destino
+        self.max_texto = max_texto
+        self.max_profundidade = max_profundidade
+        self._buf = bytearray()
+        self._pos = 0
+        self._descartados = 0
+        self._pilha = []  # [container, chave atual] (chave None em listas)
+        self._estado = _VALOR
+        self._string = None
+        self._resultado = None
+        self._inicio = True
+
+    def _erro(self, mensagem):
+        return ErroJSON(mensagem, self._descartados + self._pos)
+
+    def _caminho(self):
+        return tuple('*' if isinstance(container, list) else chave for container, chave in self._pilha)
+
+    def alimentar(self, bloco):
+        """
+        Processa mais um bloco do corpo.
+
+        Args:
+            bloco (bytes): Próximos bytes do JSON (qualquer tamanho, cortado em qualquer ponto)
+
+        Raises:
+            ErroJSON: Se o JSON for inválido até aqui
+            LimiteTextoError: Se uma string comum passar de max_texto
+        """
+        self._buf += bloco
+        self._processar(final=False)
+        # Descarta o que já foi consumido; sobra no máximo um token incompleto
+        del self._buf[:self._pos]
+        self._descartados += self._pos
+        self._pos = 0
+
+    def finalizar(self):
+        """
+        Encerra a leitura.
+
+        Returns:
+            O objeto JSON completo
+
+        Raises:
+            ErroJSON: Se o JSON estiver incompleto ou inválido
+        """
+        self._processar(final=True)
+        if self._estado != _FIM or self._string is not None:
+            raise self._erro("JSON incompleto")
+        return self._resultado
+
+    def _processar(self, final):
+        buf = self._buf
+        if self._inicio:
+            # BOM UTF-8 no início é ignorado, como no json.loads de bytes (pode vir cortado entre blocos)
+            if not final and len(buf) < len(_BOM) and _BOM.startswith(bytes(buf)):
+                return
+            if buf.startswith(_BOM):
+                self._pos = len(_BOM)
+            self._inicio = False
+        while True:
+            if self._string is not None:
+                if not self._ler_string():
+                    return
+                continue
+
+            while self._pos < len(buf) and buf[self._pos] in _ESPACOS:
+                self._pos += 1
+            if self._pos >= len(buf):
+                return
+
+            c = buf[self._pos]
+            estado = self._estado
+
+            if estado == _FIM:
+                raise self._erro("Conteúdo extra depois do JSON")
+
+            if estado in (_CHAVE, _CHAVE_OU_FECHA):
+                if estado == _CHAVE_OU_FECHA and c == 0x7D:  # }
+                    self._pos += 1
+                    self._fechar()
+                elif c == 0x22:  # "
+                    self._pos += 1
+                    self._string = _StringAberta(None, eh_chave=True)
+                else:
+                    raise self._erro("Esperava o nome de um campo entre aspas")
+
+            elif estado == _DOIS_PONTOS:
+                if c != 0x3A:  # :
+                    raise self._erro("Esperava ':'")
+                self._pos += 1
+                self._estado = _VALOR
+
+            elif estado == _VIRGULA:
+                container = self._pilha[-1][0]
+                if c == 0x2C:  # ,
+                    self._pos += 1
+                    self._estado = _CHAVE if isinstance(container, dict) else _VALOR
+                elif (c == 0x7D and isinstance(container, dict)) or (c == 0x5D and isinstance(container, list)):
+                    self._pos += 1
+                    self._fechar()
+                else:
+                    raise self._erro("Esperava ',' ou o fechamento do objeto/lista")
+
+            else:  # _VALOR ou _VALOR_OU_FECHA
+                if estado == _VALOR_OU_FECHA and c == 0x5D:  # ]
+                    self._pos += 1
+                    self._fechar()
+                elif c == 0x7B:  # {
+                    self._pos += 1
+                    self._abrir({}, _CHAVE_OU_FECHA)
+                elif c == 0x5B:  # [
+                    self._pos += 1
+                    self._abrir([], _VALOR_OU_FECHA)
+                elif c == 0x22:  # "
+                    self._pos += 1
+                    destino = self.abrir_destino(self._caminho()) if self.abrir_destino else None
+                    self._string = _StringAberta(destino, eh_chave=False)
+                elif c == 0x2D or 0x30 <= c <= 0x39:  # - ou dígito
+                    token = _TOKEN_NUMERO.match(buf, self._pos)
+                    if token.end() == len(buf) and not final:
+                        return  # o número pode continuar no próximo bloco
+                    if not _NUMERO.fullmatch(buf, self._pos, token.end()):
+                        raise self._erro("Número inválido")
+                    texto = token.group()
+                    self._pos = token.end()
+                    self._entregar(float(texto) if any(ch in texto for ch in b'.eE') else int(texto))
+                else:
+                    for literal, valor in _LITERAIS:
+                        if buf.startswith(literal, self._pos):
+                            self._pos += len(literal)
+                            self._entregar(valor)
+                            break
+                        if not final and len(buf) - self._pos < len(literal) and literal.startswith(bytes(buf[self._pos:])):
+                            return  # literal cortado entre blocos
+                    else:
+                        raise self._erro("Valor inválido")
+
+    def _abrir(self, container, estado):
+        if len(self._pilha) >= self.max_profundidade:
+            raise self._erro(f"JSON com mais de {self.max_profundidade} níveis")
+        self._pilha.append([container, None])
+        self._estado = estado
+
+    def _fechar(self):
+        container, _ = self._pilha.pop()
+        self._entregar(container)
+
+    def _entregar(self, valor):
+        if not self._pilha:
+            self._resultado = valor
+            self._estado = _FIM
+            return
+        topo = self._pilha[-1]
+        if isinstance(topo[0], dict):
+            topo[0][topo[1]] = valor
+        else:
+            topo[0].append(valor)
+        self._estado = _VIRGULA
+
+    def _ler_string(self):
+        """Consome o que houver da string aberta; retorna True quando ela termina."""
+        string = self._string
+        buf = self._buf
+        while True:
+            if string.escape:
+                if self._pos >= len(buf):
+                    return False
+                c = buf[self._pos]
+                if string.destino is not None:
+                    # Em base64 o único escape possível é '\/' (alguns encoders escapam a barra)
+                    if c != 0x2F:
+                        raise self._erro("Escape inválido em campo base64")
+                    string.destino.escrever(b'/')
+                else:
+                    # Texto: a sequência fica crua e é resolvida por json.loads no final
+                    self._adicionar(string, b'\\' + bytes((c,)))
+                self._pos += 1
+                string.escape = False
+                continue
+
+            encontrado = _FIM_STRING.search(buf, self._pos)
+            fim = encontrado.start() if encontrado else len(buf)
+            if fim > self._pos:
+                parte = bytes(buf[self._pos:fim])
+                if string.destino is not None:
+                    string.destino.escrever(parte)
+                else:
+                    self._adicionar(string, parte)
+            self._pos = fim
+            if not encontrado:
+                return False
+
+            self._pos += 1
+            if buf[fim] == 0x5C:  # \
+                string.escape = True
+                continue
+
+            self._string = None
+            self._concluir_string(string)
+            return True
+
+    def _adicionar(self, string, parte):
+        string.tamanho += len(parte)
+        if string.tamanho > self.max_texto:
+            campo = '.'.join(str(chave) for chave in self._caminho()) or 'raiz'
+            raise LimiteTextoError(f"Texto do campo '{campo}' maior que {self.max_texto // 1024}KB")
+        string.partes.append(parte)
+
+    def _concluir_string(self, string):
+        if string.destino is not None:
+            self._entregar(string.destino.fechar())
+            return
+        try:
+            valor = json.loads(b'"' + b''.join(string.partes) + b'"')
+        except ValueError as e:
+            raise self._erro(f"String inválida: {e}")
+        if string.eh_chave:
+            self._pilha[-1][1] = valor
+            self._estado = _DOIS_PONTOS
+        else:
+            self._entregar(valor)
@@ -0,0 +1,255 @@
+# Arquivo: ingest/request.py
+# Lê o corpo JSON em blocos, decodificando as imagens em fluxo, e valida o restante com o modelo pydantic
+
+import asyncio
+import json
+import logging
+from typing import List, NamedTuple
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from ..core.config import (
+    MAX_IMAGE_SIZE_MB, MAX_IMAGE_COUNT, MAX_DECODE_SIZE_MB,
+    INGEST_MAX_BODY_MB, INGEST_MAX_TEXT_KB
+)
+from ..core.exceptions import RequestTooLargeError
+from ..core.tracing import span
+from ..models import ImagemAnexadaMetadados
+from .json_stream import LeitorJSON, ErroJSON, LimiteTextoError
+from .spool import ArquivoSpool, DecodificadorBase64, OrcamentoDecodificado, Base64InvalidoError
+
+# Mesmo mínimo do campo base64 de ImagemAnexada
+MIN_BASE64_LENGTH = 100
+
+class RequisicaoRecebida(NamedTuple):
+    """
+    Corpo já validado de uma rota com leitura em fluxo.
+
+    `imagens` está no formato aceito por validar_imagens (dicts com id,
+    legenda e 'dados' ou 'arquivo'); descartar() apaga os temporários e deve
+    ser chamado quando o PDF estiver pronto.
+    """
+    modelo: BaseModel
+    imagens: List[dict]
+    spools: List[ArquivoSpool]
+
+    def descartar(self):
+        for spool in self.spools:
+            spool.descartar()
+
+    def transferir(self):
+        """
+        Passa os temporários para quem vai usá-los depois da resposta (ex: um job).
+
+        Retorna uma cópia dona dos spools; a partir daí descartar() neste
+        objeto (o da dependência da rota) não apaga mais nada.
+        """
+        transferida = self._replace(spools=list(self.spools))
+        self.spools.clear()
+        return transferida
+
+def _erro_validacao(loc, mensagem, tipo='value_error'):
+    return {'type': tipo, 'loc': loc, 'msg': mensagem, 'input': None}
+
+def _prefixar(erros, prefixo):
+    """Erros do pydantic com o loc relativo ao corpo (como a validação padrão do FastAPI)."""
+    return [{**erro, 'loc': prefixo + tuple(erro['loc'])} for erro in erros]
+
+def _lista_imagens(objeto, caminho_imagens):
+    """Segue o caminho até a lista de imagens; retorna (container, chave) ou None."""
+    container = objeto
+    for chave in caminho_imagens[:-1]:
+        if not isinstance(container, dict) or not isinstance(container.get(chave), dict):
+            return None
+        container = container[chave]
+    if not isinstance(container, dict) or not isinstance(container.get(caminho_imagens[-1]), list):
+        return None
+    return container, caminho_imagens[-1]
+
+def _limite_corpo(request: Request):
+    """
+    Limite de INGEST_MAX_BODY_MB; recusa na hora o corpo cujo Content-Length já passa dele.
+
+    Returns:
+        tuple: (limite em bytes, mensagem do 413) para conferir os bytes recebidos
+    """
+    limite_corpo = int(INGEST_MAX_BODY_MB * 1024 * 1024)
+    mensagem_corpo = f"Requisição muito grande. Máximo permitido: {INGEST_MAX_BODY_MB:g}MB"
+    tamanho_declarado = request.headers.get('content-length')
+    if tamanho_declarado and tamanho_declarado.isdigit() and int(tamanho_declarado) > limite_corpo:
+        raise HTTPException(status_code=413, detail=mensagem_corpo)
+    return limite_corpo, mensagem_corpo
+
+async def receber_json(request: Request, modelo, caminho_imagens) -> RequisicaoRecebida:
+    """
+    Lê e valida o corpo JSON sem carregá-lo inteiro na memória.
+
+    O corpo é consumido em blocos pelo LeitorJSON. Os campos base64 das
+    imagens (em `caminho_imagens` + [i].base64) são decodificados bloco a
+    bloco para ArquivoSpool (memória até INGEST_SPOOL_MEMORY_KB, depois
+    disco), e os limites de tamanho são aplicados durante a leitura: a
+    requisição é recusada com 413 assim que um deles é ultrapassado. O resto
+    do objeto é validado com `modelo`, com a lista de imagens vazia.
+
+    Args:
+        request (Request): Requisição FastAPI
+        modelo: Classe pydantic do corpo (ex: ReportData)
+        caminho_imagens (tuple): Caminho até imagens_anexadas (ex: ('function_args', 'imagens_anexadas'))
+
+    Returns:
+        RequisicaoRecebida: Modelo validado, imagens decodificadas e temporários
+
+    Raises:
+        HTTPException: 413 se um limite de tamanho for ultrapassado
+        RequestValidationError: Se o JSON ou os campos forem inválidos (422)
+    """
+    limite_corpo, mensagem_corpo = _limite_corpo(request)
+
+    spools = []
+    decodificadores = []
+    orcamento = OrcamentoDecodificado(MAX_DECODE_SIZE_MB)
+    caminho_base64 = tuple(caminho_imagens) + ('*', 'base64')
+
+    def abrir_destino(caminho):
+        if caminho != caminho_base64:
+            return None
+        if len(decodificadores) >= MAX_IMAGE_COUNT:
+            raise RequestTooLargeError(
+                f"Muitas imagens enviadas. Máximo permitido: {MAX_IMAGE_COUNT} imagens por documento"
+            )
+        spool = ArquivoSpool()
+        spools.append(spool)
+        decodificador = DecodificadorBase64(spool, len(decodificadores), MAX_IMAGE_SIZE_MB, orcamento)
+        decodificadores.append(decodificador)
+        return decodificador
+
+    leitor = LeitorJSON(abrir_destino, max_texto=INGEST_MAX_TEXT_KB * 1024)
+    recebido = 0
+    try:
+        # Leitura do corpo com a decodificação em fluxo dos base64 das imagens
+        with span('leitura_corpo') as trecho:
+            async for bloco in request.stream():
+                recebido += len(bloco)
+                if recebido > limite_corpo:
+                    raise RequestTooLargeError(mensagem_corpo)
+                leitor.alimentar(bloco)
+            objeto = leitor.finalizar()
+            if trecho is not None:
+                trecho.atributos.update(bytes=recebido, imagens=len(decodificadores))
+    except (RequestTooLargeError, LimiteTextoError) as e:
+        _descartar(spools)
+        logging.warning(f"Requisição recusada durante a leitura ({recebido} bytes lidos): {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except ErroJSON as e:
+        _descartar(spools)
+        raise RequestValidationError([_erro_validacao(('body', e.posicao), 'JSON decode error', 'json_invalid')])
+    except Base64InvalidoError as e:
+        _descartar(spools)
+        indice = decodificadores[-1].indice
+        raise RequestValidationError([_erro_validacao(
+            ('body',) + tuple(caminho_imagens) + (indice, 'base64'), f"Formato base64 inválido: {e}"
+        )])
+    except BaseException:
+        _descartar(spools)
+        raise
+
+    try:
+        with span('validacao', modelo=modelo.__name__):
+            return _validar(objeto, modelo, caminho_imagens, spools)
+    except BaseException:
+        _descartar(spools)
+        raise
+
+def _validar(objeto, modelo, caminho_imagens, spools):
+    """Valida os metadados das imagens e o restante do corpo, juntando os erros como o FastAPI faz."""
+    erros = []
+    imagens = []
+    prefixo_imagens = ('body',) + tuple(caminho_imagens)
+
+    encontrado = _lista_imagens(objeto, caminho_imagens) if isinstance(objeto, dict) else None
+    if encontrado is not None:
+        container, chave = encontrado
+        for i, entrada in enumerate(container[chave]):
+            if not isinstance(entrada, dict):
+                erros.append(_erro_validacao(prefixo_imagens + (i,), 'Input should be a valid dictionary', 'dict_type'))
+                continue
+            spool = entrada.get('base64')
+            if not isinstance(spool, ArquivoSpool):
+                erros.append(_erro_validacao(prefixo_imagens + (i, 'base64'), 'Field required', 'missing'))
+                continue
+            if spool.tamanho < MIN_BASE64_LENGTH * 3 // 4:
+                erros.append(_erro_validacao(
+                    prefixo_imagens + (i, 'base64'), f"String should have at least {MIN_BASE64_LENGTH} characters",
+                    'string_too_short'
+                ))
+                continue
+            try:
+                metadados = ImagemAnexadaMetadados.parse_obj({k: v for k, v in entrada.items() if k != 'base64'})
+            except ValidationError as e:
+                erros.extend(_prefixar(e.errors(include_url=False), prefixo_imagens + (i,)))
+                continue
+            imagens.append({'id': metadados.id, 'legenda': metadados.legenda, **spool.como_anexo()})
+        # O modelo valida o resto; as imagens seguem à parte, já decodificadas
+        container[chave] = []
+
+    try:
+        validado = modelo.parse_obj(objeto)
+    except ValidationError as e:
+        erros = _prefixar(e.errors(include_url=False), ('body',)) + erros
+
+    if erros:
+        raise RequestValidationError(erros)
+    return RequisicaoRecebida(validado, imagens, spools)
+
+def _descartar(spools):
+    for spool in spools:
+        spool.descartar()
+
+async def receber_json_simples(request: Request, modelo) -> BaseModel:
+    """
+    Lê e valida um corpo JSON sem imagens em fluxo (ex: lotes, validados item a item depois).
+
+    Aplica o mesmo limite de corpo de receber_json (Content-Length e bytes
+    recebidos, 413); o parse e a validação rodam fora do event loop, para
+    um corpo grande não travar as outras requisições.
+
+    Args:
+        request (Request): Requisição FastAPI
+        modelo: Classe pydantic do corpo (ex: LoteRequest)
+
+    Returns:
+        BaseModel: Corpo validado
+
+    Raises:
+        HTTPException: 413 se o corpo passar de INGEST_MAX_BODY_MB
+        RequestValidationError: Se o JSON ou os campos forem inválidos (422)
+    """
+    limite_corpo, mensagem_corpo = _limite_corpo(request)
+    partes = []
+    recebido = 0
+    with span('leitura_corpo') as trecho:
+        async for bloco in request.stream():
+            recebido += len(bloco)
+            if recebido > limite_corpo:
+                logging.warning(f"Requisição recusada durante a leitura ({recebido} bytes lidos): {mensagem_corpo}")
+                raise HTTPException(status_code=413, detail=mensagem_corpo)
+            partes.append(bloco)
+        if trecho is not None:
+            trecho.atributos.update(bytes=recebido)
+    corpo = b''.join(partes)
+    del partes
+    with span('validacao', modelo=modelo.__name__):
+        return await asyncio.to_thread(_validar_simples, corpo, modelo)
+
+def _validar_simples(corpo, modelo):
+    try:
+        objeto = json.loads(corpo)
+    except ValueError as e:
+        posicao = getattr(e, 'pos', 0)
+        raise RequestValidationError([_erro_validacao(('body', posicao), 'JSON decode error', 'json_invalid')])
+    try:
+        return modelo.parse_obj(objeto)
+    except ValidationError as e:
+        raise RequestValidationError(_prefixar(e.errors(include_url=False), ('body',)))
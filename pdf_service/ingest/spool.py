@@ -0,0 +1,132 @@
+# Arquivo: ingest/spool.py
+# Decodificação de base64 em blocos para buffers limitados em memória ou arquivos temporários
+
+import binascii
+import io
+import logging
+import os
+import tempfile
+
+from ..core.config import INGEST_SPOOL_DIR, INGEST_SPOOL_MEMORY_KB
+from ..core.exceptions import RequestTooLargeError
+
+class Base64InvalidoError(ValueError):
+    """Conteúdo de um campo base64 fora do alfabeto, com padding errado ou tamanho inválido."""
+
+class ArquivoSpool:
+    """
+    Bytes de um anexo recebidos em partes.
+
+    Ficam num BytesIO até `limite_memoria` bytes; a partir daí tudo vai para um
+    arquivo temporário em INGEST_SPOOL_DIR, que o worker de renderização lê
+    pelo caminho. descartar() apaga o arquivo.
+    """
+
+    def __init__(self, limite_memoria=INGEST_SPOOL_MEMORY_KB * 1024, diretorio=INGEST_SPOOL_DIR):
+        self.limite_memoria = limite_memoria
+        self.diretorio = diretorio
+        self.tamanho = 0
+        self._memoria = io.BytesIO()
+        self._arquivo = None
+        self.caminho = None
+
+    def escrever(self, dados):
+        self.tamanho += len(dados)
+        if self._arquivo is None and self.tamanho > self.limite_memoria:
+            self._ir_para_disco()
+        (self._arquivo or self._memoria).write(dados)
+
+    def _ir_para_disco(self):
+        os.makedirs(self.diretorio, mode=0o700, exist_ok=True)
+        self._arquivo = tempfile.NamedTemporaryFile(dir=self.diretorio, prefix='anexo_', suffix='.bin', delete=False)
+        self.caminho = self._arquivo.name
+        self._arquivo.write(self._memoria.getbuffer())
+        self._memoria = None
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+    def como_anexo(self):
+        """Referência aos bytes para o dict da imagem: {'dados': bytes} ou {'arquivo': caminho}."""
+        if self.caminho is not None:
+            return {'arquivo': self.caminho}
+        return {'dados': self._memoria.getvalue()}
+
+    def descartar(self):
+        """Libera a memória e apaga o arquivo temporário, se houver."""
+        if self._arquivo is not None:
+            self._arquivo.close()
+            try:
+                os.unlink(self.caminho)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Não foi possível apagar o anexo temporário {self.caminho}: {e}")
+            self._arquivo = None
+        self._memoria = None
+
+class OrcamentoDecodificado:
+    """Soma dos bytes decodificados de todas as imagens da requisição (MAX_DECODE_SIZE_MB)."""
+
+    def __init__(self, limite_mb):
+        self.limite_mb = limite_mb
+        self.total = 0
+
+    def consumir(self, quantidade):
+        self.total += quantidade
+        if self.total > self.limite_mb * 1024 * 1024:
+            raise RequestTooLargeError(
+                f"Tamanho total das imagens muito grande: mais de {self.limite_mb}MB decodificados"
+            )
+
+class DecodificadorBase64:
+    """
+    Destino do LeitorJSON para um campo base64: decodifica em blocos múltiplos
+    de 4 caracteres e grava os bytes no spool.
+
+    O limite de tamanho do base64 e o orçamento decodificado são conferidos a
+    cada bloco, então uma imagem grande demais é recusada assim que passa do
+    limite, sem esperar o resto do corpo.
+    """
+
+    def __init__(self, spool, indice, max_base64_mb, orcamento):
+        self.spool = spool
+        self.indice = indice
+        self.max_base64 = max_base64_mb * 1024 * 1024
+        self.max_base64_mb = max_base64_mb
+        self.orcamento = orcamento
+        self.tamanho_base64 = 0
+        self._resto = b''
+        self._terminou = False
+
+    def escrever(self, dados):
+        self.tamanho_base64 += len(dados)
+        if self.tamanho_base64 > self.max_base64:
+            raise RequestTooLargeError(
+                f"Imagem {self.indice} muito grande: mais de {self.max_base64_mb}MB em base64"
+            )
+        if self._terminou:
+            raise Base64InvalidoError("Dados depois do padding")
+
+        bloco = self._resto + dados if self._resto else dados
+        corte = len(bloco) - len(bloco) % 4
+        self._resto = bloco[corte:]
+        if not corte:
+            return
+        parte = bloco[:corte] if corte < len(bloco) else bloco
+        try:
+            decodificado = binascii.a2b_base64(parte, strict_mode=True)
+        except binascii.Error as e:
+            raise Base64InvalidoError(str(e))
+        if parte.endswith(b'='):
+            self._terminou = True
+        self.orcamento.consumir(len(decodificado))
+        self.spool.escrever(decodificado)
+
+    def fechar(self):
+        """Fim da string: confere o alinhamento e devolve o spool (vira o valor do campo)."""
+        if self._resto:
+            raise Base64InvalidoError("Tamanho do base64 não é múltiplo de 4")
+        self.spool.fechar()
+        return self.spool
@@ -0,0 +1 @@
+# Jobs module - Asynchronous report jobs (submit, poll, fetch) on top of the render engine
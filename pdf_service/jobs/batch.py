@@ -0,0 +1,165 @@
+# Arquivo: jobs/batch.py
+# Renderização de lotes de relatórios em paralelo, com saída em ZIP ou NDJSON à medida que terminam
+
+import asyncio
+import base64
+import json
+import logging
+import time
+import zipfile
+from typing import NamedTuple, Optional
+
+from ..core.exceptions import RenderTimeoutError
+from ..core.tracing import contexto_sem_rastro
+from .manager import codigo_erro_http
+
+class ItemLote(NamedTuple):
+    """Um relatório do lote já validado e preparado para o motor."""
+    indice: int
+    nome_job: str
+    dados: dict
+    filename: str
+
+class ResultadoLote(NamedTuple):
+    """Resultado de um item: o PDF ou o erro (os demais itens seguem normalmente)."""
+    indice: int
+    filename: Optional[str] = None
+    pdf_bytes: Optional[bytes] = None
+    erro: Optional[str] = None
+    codigo_erro: Optional[int] = None
+    duracao_s: float = 0.0
+
+    @property
+    def sucesso(self):
+        return self.pdf_bytes is not None
+
+async def renderizar_lote(render_engine, itens, erros_validacao, concorrencia, timeout_item, timeout_lote):
+    """
+    Renderiza os itens em paralelo e entrega cada resultado assim que fica pronto.
+
+    Os erros de validação são entregues primeiro; depois, os PDFs (ou erros de
+    renderização) na ordem em que terminam. Se quem consome desistir (cliente
+    desconectou), os itens restantes são cancelados e os workers liberados.
+
+    Args:
+        render_engine (RenderEngine): Motor de renderização
+        itens (list): ItemLote válidos
+        erros_validacao (list): ResultadoLote dos itens rejeitados na validação
+        concorrencia (int): Itens renderizados ao mesmo tempo
+        timeout_item (float): Tempo máximo de cada item (segundos)
+        timeout_lote (float): Tempo máximo do lote inteiro (segundos)
+
+    Yields:
+        ResultadoLote: Um por item do lote
+    """
+    for resultado in erros_validacao:
+        yield resultado
+
+    prazo = time.monotonic() + timeout_lote
+    semaforo = asyncio.Semaphore(max(1, concorrencia))
+    prontos = asyncio.Queue()
+
+    async def executar(item):
+        async with semaforo:
+            inicio = time.monotonic()
+            try:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise RenderTimeoutError(f"Lote excedeu {timeout_lote} segundos antes deste item começar")
+                pdf_bytes = await render_engine.renderizar_com_espera(
+                    item.nome_job, item.dados, min(timeout_item, restante)
+                )
+                prontos.put_nowait(ResultadoLote(item.indice, item.filename, pdf_bytes=pdf_bytes,
+                                                 duracao_s=round(time.monotonic() - inicio, 3)))
+            except Exception as e:
+                logging.warning(f"Item {item.indice} do lote falhou: {e}")
+                prontos.put_nowait(ResultadoLote(item.indice, item.filename, erro=str(e),
+                                                 codigo_erro=codigo_erro_http(e),
+                                                 duracao_s=round(time.monotonic() - inicio, 3)))
+
+    # Os itens são renderizados enquanto a resposta é enviada, fora do rastro da requisição
+    tarefas = [asyncio.create_task(executar(item), context=contexto_sem_rastro()) for item in itens]
+    try:
+        for _ in range(len(tarefas)):
+            yield await prontos.get()
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+def _resumo(total, sucessos, inicio):
+    return {'total': total, 'sucesso': sucessos, 'erro': total - sucessos,
+            'duracao_s': round(time.monotonic() - inicio, 3)}
+
+async def codificar_ndjson(resultados, total):
+    """
+    Uma linha JSON por item (com o PDF em base64) e uma linha final de resumo.
+
+    Args:
+        resultados: Gerador assíncrono de ResultadoLote
+        total (int): Quantidade de itens do lote
+
+    Yields:
+        bytes: Linhas NDJSON
+    """
+    inicio = time.monotonic()
+    sucessos = 0
+    async for resultado in resultados:
+        linha = {'indice': resultado.indice, 'filename': resultado.filename, 'duracao_s': resultado.duracao_s}
+        if resultado.sucesso:
+            sucessos += 1
+            linha.update(status='sucesso', pdf_base64=base64.b64encode(resultado.pdf_bytes).decode('ascii'))
+        else:
+            linha.update(status='erro', erro=resultado.erro, codigo_erro=resultado.codigo_erro)
+        yield (json.dumps(linha, ensure_ascii=False) + '\n').encode('utf-8')
+    yield (json.dumps({'resumo': _resumo(total, sucessos, inicio)}) + '\n').encode('utf-8')
+
+class _SaidaZip:
+    """Destino do ZipFile sem seek: acumula os bytes escritos até o próximo envio."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+async def codificar_zip(resultados, total):
+    """
+    ZIP gerado em fluxo: cada PDF é enviado assim que fica pronto.
+
+    Os PDFs entram sem compressão (já são comprimidos) com o índice no nome,
+    para não colidir quando duas propriedades têm o mesmo nome. No final vai
+    o `resumo.json` com os erros de cada item que falhou.
+
+    Args:
+        resultados: Gerador assíncrono de ResultadoLote
+        total (int): Quantidade de itens do lote
+
+    Yields:
+        bytes: Pedaços do arquivo ZIP
+    """
+    inicio = time.monotonic()
+    saida = _SaidaZip()
+    sucessos = 0
+    erros = []
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_STORED) as arquivo_zip:
+        async for resultado in resultados:
+            if resultado.sucesso:
+                sucessos += 1
+                arquivo_zip.writestr(f"{resultado.indice + 1:03d}_{resultado.filename}", resultado.pdf_bytes)
+                yield saida.esvaziar()
+            else:
+                erros.append({'indice': resultado.indice, 'filename': resultado.filename,
+                              'erro': resultado.erro, 'codigo_erro': resultado.codigo_erro})
+        resumo = dict(_resumo(total, sucessos, inicio), erros=sorted(erros, key=lambda erro: erro['indice']))
+        arquivo_zip.writestr('resumo.json', json.dumps(resumo, ensure_ascii=False, indent=2),
+                             compress_type=zipfile.ZIP_DEFLATED)
+    yield saida.esvaziar()
@@ -0,0 +1,327 @@
+# Arquivo: jobs/manager.py
+# Executa os jobs assíncronos no motor de renderização e notifica o callback_url
+
+import asyncio
+import http.client
+import ipaddress
+import json
+import logging
+import socket
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+
+from ..core.config import (
+    JOB_MAX_PENDING, JOB_CONCURRENCY, JOB_RENDER_TIMEOUT,
+    JOB_WEBHOOK_TIMEOUT, JOB_WEBHOOK_RETRIES, JOB_WEBHOOK_ALLOWED_HOSTS
+)
+from ..core.exceptions import (
+    ImageSecurityError, RenderQueueFullError, RenderTimeoutError, RenderCancelledError, JobStoreFullError
+)
+from ..core.tracing import contexto_sem_rastro
+from .store import JobStore
+
+# Intervalo entre limpezas dos jobs expirados (segundos)
+INTERVALO_LIMPEZA = 60
+
+def _host_permitido(host):
+    """Indica se o host está em JOB_WEBHOOK_ALLOWED_HOSTS (liberado mesmo com endereço privado)."""
+    return host.lower().strip('[]') in JOB_WEBHOOK_ALLOWED_HOSTS
+
+def _endereco_publico(endereco):
+    """
+    Indica se o IP é roteável na internet.
+
+    Loopback, link-local (ex: 169.254.169.254, metadados da nuvem), faixas
+    privadas (RFC 1918, ULA), CGNAT, multicast e reservados são recusados,
+    inclusive escritos como IPv6 mapeado (::ffff:10.0.0.1).
+    """
+    ip = ipaddress.ip_address(endereco.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+def validar_callback_url(url):
+    """
+    Confere se o callback_url pode ser usado como webhook.
+
+    Hosts de JOB_WEBHOOK_ALLOWED_HOSTS são aceitos sem mais verificações;
+    com a lista preenchida, só eles. Com a lista vazia, o host é resolvido e
+    todos os endereços precisam ser públicos (ver _endereco_publico), para
+    que o serviço não faça requisições à rede interna (SSRF). Faz consulta
+    DNS: no event loop, chamar via asyncio.to_thread.
+
+    Args:
+        url (str): URL informada na submissão
+
+    Returns:
+        str: A própria URL
+
+    Raises:
+        ValueError: Se não for http(s), o host não for permitido ou resolver para um endereço interno
+    """
+    partes = urlparse(url)
+    if partes.scheme not in ('http', 'https') or not partes.hostname:
+        raise ValueError("callback_url deve ser uma URL http:// ou https://")
+    if _host_permitido(partes.hostname):
+        return url
+    if JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError(f"Host '{partes.hostname}' não permitido em callback_url")
+
+    try:
+        porta = partes.port
+        enderecos = {info[4][0] for info in socket.getaddrinfo(partes.hostname, porta, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError) as e:
+        raise ValueError(f"Host '{partes.hostname}' de callback_url não pôde ser resolvido: {e}")
+    internos = sorted(endereco for endereco in enderecos if not _endereco_publico(endereco))
+    if internos:
+        raise ValueError(f"Host '{partes.hostname}' aponta para endereço interno ({internos[0]}), não permitido em callback_url")
+    return url
+
+def codigo_erro_http(erro):
+    """Código HTTP equivalente ao erro, o mesmo que o endpoint síncrono devolveria."""
+    if isinstance(erro, ImageSecurityError):
+        return 400
+    if isinstance(erro, (RenderTimeoutError, RenderCancelledError)):
+        return 408
+    if isinstance(erro, JobStoreFullError):
+        return 507
+    return 500
+
+class _ConexaoWebhook:
+    """
+    Confere o endereço realmente conectado antes de enviar a requisição.
+
+    A validação na submissão não basta: o DNS pode mudar até o envio
+    (DNS rebinding). Depois de conectar, o IP do outro lado precisa ser
+    público, a menos que o host esteja em JOB_WEBHOOK_ALLOWED_HOSTS.
+    """
+
+    def connect(self):
+        super().connect()
+        endereco = self.sock.getpeername()[0]
+        if not _host_permitido(self.host) and not _endereco_publico(endereco):
+            self.close()
+            raise ValueError(f"callback_url conectou em endereço interno ({endereco}); envio recusado")
+
+class _ConexaoWebhookHTTP(_ConexaoWebhook, http.client.HTTPConnection):
+    pass
+
+class _ConexaoWebhookHTTPS(_ConexaoWebhook, http.client.HTTPSConnection):
+    pass
+
+class _HandlerWebhookHTTP(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_ConexaoWebhookHTTP, req)
+
+class _HandlerWebhookHTTPS(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_ConexaoWebhookHTTPS, req, context=self._context)
+
+class _SemRedirecionamento(urllib.request.HTTPRedirectHandler):
+    """Um 3xx vira erro (HTTPError) em vez de levar o POST para outro endereço."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+# Sem proxy do ambiente: a conferência do endereço precisa ver o destino real
+_ABRIDOR_WEBHOOK = urllib.request.build_opener(
+    urllib.request.ProxyHandler({}), _HandlerWebhookHTTP, _HandlerWebhookHTTPS, _SemRedirecionamento
+)
+
+def _enviar_webhook(url, corpo, timeout):
+    """POST JSON bloqueante (roda em thread), sem seguir redirecionamentos; retorna o status HTTP da resposta."""
+    requisicao = urllib.request.Request(
+        url,
+        data=json.dumps(corpo).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'User-Agent': 'voxy-pdf-service'},
+        method='POST',
+    )
+    with _ABRIDOR_WEBHOOK.open(requisicao, timeout=timeout) as resposta:
+        return resposta.status
+
+class JobManager:
+    """
+    Recebe jobs, executa no RenderEngine e guarda o resultado no JobStore.
+
+    - No máximo `concorrencia` jobs usam o motor ao mesmo tempo, para que as
+      requisições síncronas continuem encontrando vaga no pool
+    - No máximo `max_pendentes` jobs aguardam ou executam; acima disso a
+      submissão levanta RenderQueueFullError (HTTP 503)
+    - Se o motor estiver cheio, o job espera e tenta de novo até o seu prazo
+      (JOB_RENDER_TIMEOUT) em vez de falhar
+    - Ao terminar (sucesso ou erro), o callback_url recebe um POST com o estado
+    """
+
+    def __init__(self, render_engine, store=None, max_pendentes=JOB_MAX_PENDING,
+                 concorrencia=JOB_CONCURRENCY, timeout=JOB_RENDER_TIMEOUT):
+        self.render_engine = render_engine
+        self.store = store or JobStore()
+        self.max_pendentes = max(1, max_pendentes)
+        self.concorrencia = max(1, concorrencia)
+        self.timeout = timeout
+        self._semaforo = None
+        self._tarefas = set()
+        self._limpeza = None
+        self.jobs_concluidos = 0
+        self.jobs_com_erro = 0
+        self.webhooks_enviados = 0
+        self.webhooks_com_falha = 0
+        self._reservados = 0  # submissões aceitas cujo registro no store ainda está em andamento
+
+    @property
+    def pendentes(self):
+        """Jobs aceitos que ainda não terminaram."""
+        return len(self._tarefas) + self._reservados
+
+    def iniciar(self):
+        """Prepara o semáforo e a limpeza periódica. Deve ser chamado dentro do event loop (startup)."""
+        self._semaforo = asyncio.Semaphore(self.concorrencia)
+        self._limpeza = asyncio.get_running_loop().create_task(self._limpar_periodicamente())
+        logging.info(
+            f"Jobs assíncronos prontos: {self.concorrencia} simultâneos, até {self.max_pendentes} pendentes, "
+            f"armazenamento em {self.store.diretorio or 'memória'}"
+        )
+
+    def encerrar(self):
+        """Cancela a limpeza e os jobs em andamento (os workers são encerrados pelo RenderEngine)."""
+        if self._limpeza:
+            self._limpeza.cancel()
+        for tarefa in list(self._tarefas):
+            tarefa.cancel()
+
+    async def _limpar_periodicamente(self):
+        while True:
+            await asyncio.sleep(INTERVALO_LIMPEZA)
+            try:
+                removidos = await asyncio.to_thread(self.store.limpar_expirados)
+                if removidos:
+                    logging.info(f"Jobs expirados removidos: {removidos}")
+            except Exception as e:
+                logging.error(f"Erro na limpeza de jobs expirados: {e}")
+
+    async def submeter(self, tipo, nome_job, dados, filename, callback_url=None, anexos=None):
+        """
+        Registra o job e agenda a execução em segundo plano.
+
+        Args:
+            tipo (str): Tipo do relatório exposto na API ('dinamico', 'visita', 'adubacao')
+            nome_job (str): Função de renderização do worker ('dinamico' ou 'visita')
+            dados (dict): Dados já preparados para a função de renderização
+            filename (str): Nome do arquivo PDF
+            callback_url (str, optional): URL notificada ao final
+            anexos (RequisicaoRecebida, optional): Imagens recebidas em fluxo, descartadas
+                quando o job termina (ou na hora, se ele for recusado)
+
+        Returns:
+            dict: Estado inicial do job
+
+        Raises:
+            RenderQueueFullError: Se já houver max_pendentes jobs em andamento
+        """
+        if self.pendentes >= self.max_pendentes:
+            if anexos is not None:
+                anexos.descartar()
+            raise RenderQueueFullError(
+                f"Fila de jobs cheia ({self.pendentes} jobs em andamento). "
+                f"Tente novamente em {self.render_engine.retry_after} segundos.",
+                retry_after=self.render_engine.retry_after,
+            )
+        # Com JOB_STORE_DIR o registro grava o JSON no disco: fora do event loop. A vaga fica
+        # reservada enquanto isso, para o limite de pendentes valer entre submissões simultâneas
+        self._reservados += 1
+        try:
+            job = await asyncio.to_thread(self.store.criar, tipo, callback_url)
+        except BaseException:
+            if anexos is not None:
+                anexos.descartar()
+            raise
+        finally:
+            self._reservados -= 1
+        # O job termina depois da resposta 202: não entra no rastro da requisição
+        tarefa = asyncio.get_running_loop().create_task(
+            self._executar(job['id'], nome_job, dados, filename, callback_url), context=contexto_sem_rastro()
+        )
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+        if anexos is not None:
+            tarefa.add_done_callback(lambda _: anexos.descartar())
+        logging.info(f"Job {job['id']} ({tipo}) recebido")
+        return job
+
+    async def _atualizar(self, job_id, **campos):
+        """store.atualizar fora do event loop (com JOB_STORE_DIR, grava o JSON no disco)."""
+        return await asyncio.to_thread(self.store.atualizar, job_id, **campos)
+
+    async def _executar(self, job_id, nome_job, dados, filename, callback_url):
+        try:
+            async with self._semaforo:
+                await self._atualizar(job_id, status='executando', etapa='renderizando', progresso=0.2)
+                pdf_bytes = await self.render_engine.renderizar_com_espera(nome_job, dados, self.timeout)
+                # Os dados (com as imagens) não são mais necessários
+                dados = None
+                await self._atualizar(job_id, etapa='armazenando', progresso=0.9)
+                await asyncio.to_thread(self.store.guardar_pdf, job_id, pdf_bytes)
+            job = await self._atualizar(
+                job_id, status='concluido', etapa='concluido', progresso=1.0,
+                concluido_em=time.time(), filename=filename, tamanho_bytes=len(pdf_bytes),
+            )
+            self.jobs_concluidos += 1
+            logging.info(f"Job {job_id} concluído: {filename} ({len(pdf_bytes)} bytes)")
+        except asyncio.CancelledError:
+            # Encerramento do serviço: grava direto, o loop está parando
+            self.store.atualizar(job_id, status='erro', etapa='cancelado', erro="Serviço encerrado antes do fim do job",
+                                 codigo_erro=503, concluido_em=time.time())
+            raise
+        except Exception as e:
+            logging.error(f"Job {job_id} falhou: {e}", exc_info=not isinstance(e, (ImageSecurityError, RenderTimeoutError)))
+            job = await self._atualizar(job_id, status='erro', etapa='erro', erro=str(e),
+                                        codigo_erro=codigo_erro_http(e), concluido_em=time.time())
+            self.jobs_com_erro += 1
+
+        if callback_url and job is not None:
+            await self._notificar(job, callback_url)
+
+    async def _notificar(self, job, callback_url):
+        """Envia o estado final ao callback_url, com novas tentativas e espera crescente."""
+        corpo = {campo: job[campo] for campo in (
+            'id', 'tipo', 'status', 'filename', 'tamanho_bytes', 'erro', 'codigo_erro', 'concluido_em'
+        )}
+        corpo['status_url'] = f"/jobs/{job['id']}"
+        corpo['pdf_url'] = f"/jobs/{job['id']}/pdf" if job['status'] == 'concluido' else None
+
+        tentativas = max(1, JOB_WEBHOOK_RETRIES)
+        for tentativa in range(1, tentativas + 1):
+            try:
+                status = await asyncio.to_thread(_enviar_webhook, callback_url, corpo, JOB_WEBHOOK_TIMEOUT)
+                await self._atualizar(job['id'], webhook={'status': 'enviado', 'http_status': status,
+                                                         'tentativas': tentativa})
+                self.webhooks_enviados += 1
+                return
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                logging.warning(f"Webhook do job {job['id']} falhou (tentativa {tentativa}/{tentativas}): {e}")
+                erro = str(e)
+                if tentativa < tentativas:
+                    await asyncio.sleep(2 ** (tentativa - 1))
+
+        await self._atualizar(job['id'], webhook={'status': 'falhou', 'erro': erro, 'tentativas': tentativas})
+        self.webhooks_com_falha += 1
+
+    def estatisticas(self):
+        """
+        Retorna os contadores dos jobs deste processo.
+
+        Returns:
+            dict: Pendentes, concluídos, com erro, webhooks e ocupação do armazenamento
+        """
+        return {
+            'pendentes': self.pendentes,
+            'max_pendentes': self.max_pendentes,
+            'concorrencia': self.concorrencia,
+            'concluidos': self.jobs_concluidos,
+            'com_erro': self.jobs_com_erro,
+            'webhooks_enviados': self.webhooks_enviados,
+            'webhooks_com_falha': self.webhooks_com_falha,
+            'armazenamento': self.store.estatisticas(),
+        }
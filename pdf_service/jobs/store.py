@@ -0,0 +1,273 @@
+# Arquivo: jobs/store.py
+# Armazenamento dos jobs assíncronos e dos PDFs gerados, com expiração (memória ou diretório)
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+from ..core.config import JOB_STORE_DIR, JOB_TTL_SECONDS, JOB_STORE_MAX_MB
+from ..core.exceptions import JobStoreFullError
+
+# Ids são uuid4 em hexadecimal; qualquer outra coisa é rejeitada antes de virar caminho no disco
+_PADRAO_ID = re.compile(r'[0-9a-f]{32}\Z')
+
+class JobStore:
+    """
+    Guarda o estado de cada job e o PDF resultante.
+
+    - Sem `diretorio`, tudo fica na memória do processo
+    - Com `diretorio`, cada job é um `<id>.json` (estado) e um `<id>.pdf`
+      (resultado), gravados de forma atômica; qualquer processo da API que
+      aponte para o mesmo diretório responde status e PDF
+    - Um job expira `ttl` segundos depois da última atualização; expirados
+      são removidos na consulta e pela limpeza periódica (JobManager)
+    - Na memória, os PDFs somam no máximo `max_bytes`: para caber um novo,
+      os jobs com os PDFs mais antigos são removidos antes do TTL
+    """
+
+    def __init__(self, diretorio=JOB_STORE_DIR, ttl=JOB_TTL_SECONDS, max_bytes=int(JOB_STORE_MAX_MB * 1024 * 1024)):
+        self.diretorio = diretorio or None
+        self.ttl = max(1, int(ttl))
+        self.max_bytes = max(0, int(max_bytes))
+        self._jobs = {}
+        self._pdfs = {}  # em ordem de chegada: os primeiros são os descartados quando falta espaço
+        self._bytes_pdfs = 0
+        self._lock = threading.Lock()
+        self.expirados = 0
+        self.descartados_por_espaco = 0
+
+        if self.diretorio:
+            try:
+                os.makedirs(self.diretorio, exist_ok=True)
+            except OSError as e:
+                logging.warning(f"Armazenamento de jobs em disco desativado ({self.diretorio}): {e}")
+                self.diretorio = None
+
+    def _caminho(self, job_id, extensao):
+        return os.path.join(self.diretorio, job_id + extensao)
+
+    def _gravar_arquivo(self, caminho, dados):
+        """Grava de forma atômica (arquivo temporário + rename) para não expor arquivos parciais."""
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def _salvar(self, job):
+        """Registra o estado do job (memória ou disco). Chamado com o lock."""
+        job['atualizado_em'] = time.time()
+        job['expira_em'] = job['atualizado_em'] + self.ttl
+        if self.diretorio:
+            self._gravar_arquivo(self._caminho(job['id'], '.json'), json.dumps(job).encode('utf-8'))
+        else:
+            self._jobs[job['id']] = job
+
+    def _ler(self, job_id):
+        """Lê o estado do job (memória ou disco). Chamado com o lock (no disco, também seguro sem ele)."""
+        if not self.diretorio:
+            return self._jobs.get(job_id)
+        try:
+            with open(self._caminho(job_id, '.json'), 'rb') as arquivo:
+                return json.loads(arquivo.read())
+        except (OSError, ValueError):
+            return None
+
+    def _remover(self, job_id):
+        """Remove estado e PDF do job. Chamado com o lock."""
+        self._jobs.pop(job_id, None)
+        self._remover_pdf(job_id)
+        if self.diretorio:
+            for extensao in ('.json', '.pdf'):
+                try:
+                    os.unlink(self._caminho(job_id, extensao))
+                except OSError:
+                    pass
+
+    def _remover_pdf(self, job_id):
+        """Remove só o PDF do job da memória (ao regravar ou remover o job). Chamado com o lock."""
+        pdf = self._pdfs.pop(job_id, None)
+        if pdf is not None:
+            self._bytes_pdfs -= len(pdf)
+
+    def criar(self, tipo, callback_url=None):
+        """
+        Registra um novo job na fila.
+
+        Args:
+            tipo (str): Tipo do relatório ('dinamico', 'visita', 'adubacao')
+            callback_url (str, optional): URL notificada quando o job terminar
+
+        Returns:
+            dict: Estado inicial do job
+        """
+        agora = time.time()
+        job = {
+            'id': uuid.uuid4().hex,
+            'tipo': tipo,
+            'status': 'na_fila',
+            'etapa': 'na_fila',
+            'progresso': 0.0,
+            'criado_em': agora,
+            'concluido_em': None,
+            'filename': None,
+            'tamanho_bytes': None,
+            'erro': None,
+            'codigo_erro': None,
+            'callback_url': callback_url,
+            'webhook': None,
+        }
+        with self._lock:
+            self._salvar(job)
+        return dict(job)
+
+    def atualizar(self, job_id, **campos):
+        """
+        Atualiza campos do job e renova a expiração.
+
+        Args:
+            job_id (str): Id do job
+            **campos: Campos a alterar (status, etapa, progresso, erro...)
+
+        Returns:
+            dict: Estado atualizado ou None se o job não existir mais
+        """
+        with self._lock:
+            job = self._ler(job_id)
+            if job is None:
+                return None
+            job.update(campos)
+            self._salvar(job)
+            return dict(job)
+
+    def obter(self, job_id):
+        """
+        Retorna o estado de um job que ainda não expirou.
+
+        Args:
+            job_id (str): Id do job
+
+        Returns:
+            dict: Estado do job ou None se não existir ou tiver expirado
+        """
+        if not _PADRAO_ID.match(job_id or ''):
+            return None
+        with self._lock:
+            job = self._ler(job_id)
+            if job is None:
+                return None
+            if job['expira_em'] < time.time():
+                self._remover(job_id)
+                self.expirados += 1
+                return None
+            return dict(job)
+
+    def guardar_pdf(self, job_id, pdf_bytes):
+        """
+        Armazena o PDF de um job concluído.
+
+        Args:
+            job_id (str): Id do job
+            pdf_bytes (bytes): PDF gerado
+
+        Raises:
+            JobStoreFullError: Na memória, se o PDF sozinho passar de max_bytes
+        """
+        if self.diretorio:
+            # Fora do lock: gravar alguns MB não deve travar as consultas de status
+            self._gravar_arquivo(self._caminho(job_id, '.pdf'), pdf_bytes)
+            return
+
+        with self._lock:
+            self._remover_pdf(job_id)
+            if self.max_bytes:
+                if len(pdf_bytes) > self.max_bytes:
+                    raise JobStoreFullError(
+                        f"PDF de {len(pdf_bytes) / 1024 / 1024:.1f}MB não cabe no armazenamento de jobs "
+                        f"({self.max_bytes / 1024 / 1024:.0f}MB)"
+                    )
+                while self._bytes_pdfs + len(pdf_bytes) > self.max_bytes:
+                    mais_antigo = next(iter(self._pdfs))
+                    logging.warning(f"Job {mais_antigo} removido antes do TTL: armazenamento de jobs cheio")
+                    self._remover(mais_antigo)
+                    self.descartados_por_espaco += 1
+            self._pdfs[job_id] = pdf_bytes
+            self._bytes_pdfs += len(pdf_bytes)
+
+    def obter_pdf(self, job_id):
+        """
+        Retorna o PDF de um job concluído.
+
+        Args:
+            job_id (str): Id do job (já validado por obter())
+
+        Returns:
+            bytes: PDF ou None se não existir
+        """
+        if not self.diretorio:
+            with self._lock:
+                return self._pdfs.get(job_id)
+        try:
+            with open(self._caminho(job_id, '.pdf'), 'rb') as arquivo:
+                return arquivo.read()
+        except OSError:
+            return None
+
+    def limpar_expirados(self):
+        """
+        Remove os jobs expirados (e seus PDFs).
+
+        Returns:
+            int: Quantidade de jobs removidos
+        """
+        agora = time.time()
+        if self.diretorio:
+            # Listagem e leitura sem o lock (as gravações são atômicas): com muitos jobs no
+            # diretório, criar/atualizar/estatisticas não ficam esperando a varredura
+            candidatos = []
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith('.json'):
+                    job = self._ler(nome[:-5])
+                    if job is not None and job['expira_em'] < agora:
+                        candidatos.append(nome[:-5])
+        else:
+            with self._lock:
+                candidatos = [job_id for job_id, job in self._jobs.items() if job['expira_em'] < agora]
+
+        removidos = 0
+        with self._lock:
+            for job_id in candidatos:
+                # Relido com o lock: o job pode ter sido atualizado depois da varredura
+                job = self._ler(job_id)
+                if job is not None and job['expira_em'] < agora:
+                    self._remover(job_id)
+                    removidos += 1
+            self.expirados += removidos
+        return removidos
+
+    def estatisticas(self):
+        """
+        Retorna a ocupação do armazenamento.
+
+        Returns:
+            dict: Backend, quantidade de jobs/PDFs em memória e expirados removidos
+        """
+        with self._lock:
+            return {
+                'backend': 'diretorio' if self.diretorio else 'memoria',
+                'diretorio': self.diretorio,
+                'ttl_s': self.ttl,
+                'jobs_em_memoria': len(self._jobs),
+                'bytes_em_memoria': self._bytes_pdfs,
+                'max_bytes_em_memoria': self.max_bytes,
+                'expirados': self.expirados,
+                'descartados_por_espaco': self.descartados_por_espaco,
+            }
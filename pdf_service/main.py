@@ -1,20 +1,34 @@
 import base64
+import json
 import logging
 import os
 import time
 import asyncio
-from fastapi import FastAPI, HTTPException, Security, Request
+from typing import Optional
+from urllib.parse import quote
+from fastapi import FastAPI, HTTPException, Security, Request, Query, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from pydantic import ValidationError
 
-from .models import ReportData, PDFResponse, VisitReportData, AdubacaoReportData
-from .pdf_generator import create_pdf_from_data, preencher_pdf_template, ImageSecurityError
+from .models import ReportData, PDFResponse, VisitReportData, AdubacaoReportData, JobStatusResponse, LoteRequest
+from .core.exceptions import ImageSecurityError, RenderEngineError, RenderQueueFullError
+from .render.engine import RenderEngine
+from .jobs.manager import JobManager, validar_callback_url
+from .jobs.batch import ItemLote, ResultadoLote, renderizar_lote, codificar_ndjson, codificar_zip
+from .graphics.chart_cache import somar_estatisticas
+from .images.resample import somar_estatisticas_imagens
+from .render.profiling import somar_estatisticas_layout
+from .ingest.request import RequisicaoRecebida, receber_json, receber_json_simples
+from .core.config import PDF_STREAM_CHUNK_KB, LOTE_CONCURRENCY, LOTE_TIMEOUT, TRACING_ENABLED
+from .core.tracing import rastrear, span, ler_traceparent, exportar
+from .core.metrics import METRICAS, DURACAO_REQUISICOES, registrar_spans, linhas_metrica, linhas_histograma
+from .core.resources import AmostradorRecursos
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -46,6 +60,8 @@ A API de Geração de PDFs da Voxy é uma ferramenta para criar relatórios téc
 
 *   **Relatórios de Visita (Template Fixo):** Use o endpoint `/gerar-relatorio-visita` para preencher o template padrão da Arizona Nutrição Animal com os dados de uma visita técnica. O layout é fixo, garantindo consistência.
 *   **Relatórios Dinâmicos:** Use o endpoint `/gerar-pdf-dinamico` para criar relatórios completos do zero, com suporte para gráficos, tabelas e layouts customizados.
+*   **Lotes:** `/gerar-lote-dinamico` e `/gerar-lote-adubacao` recebem vários relatórios e devolvem um ZIP (ou NDJSON) à medida que ficam prontos; um item com erro não derruba o lote.
+*   **Jobs Assíncronos:** Para relatórios grandes, use `/jobs/dinamico`, `/jobs/visita` ou `/jobs/adubacao`: a resposta traz o id do job na hora; acompanhe em `/jobs/{id}` (ou informe `callback_url`) e baixe o PDF em `/jobs/{id}/pdf`.
 
 **Autenticação:**
 
@@ -59,6 +75,245 @@ app = FastAPI(
     version="1.2.0"  # Atualizada com proteções de recursos
 )
 
+# ===============================
+# MOTOR DE RENDERIZAÇÃO (POOL DE PROCESSOS)
+# ===============================
+# A geração de PDF (ReportLab + matplotlib) é CPU-bound: roda em processos
+# separados para não travar o event loop (healthcheck e demais requisições)
+render_engine = RenderEngine()
+
+# Jobs assíncronos (/jobs/...): mesmo motor, resultado guardado com TTL
+job_manager = JobManager(render_engine)
+
+# Uso de recursos amostrado em segundo plano (/health/resources e /metrics só leem a última amostra)
+amostrador_recursos = AmostradorRecursos(render_engine.pids_workers)
+
+@app.on_event("startup")
+async def iniciar_render_engine():
+    render_engine.iniciar()
+    job_manager.iniciar()
+    amostrador_recursos.iniciar()
+
+@app.on_event("shutdown")
+async def encerrar_render_engine():
+    amostrador_recursos.encerrar()
+    job_manager.encerrar()
+    render_engine.encerrar()
+
+def tempo_restante(request: Request) -> float:
+    """
+    Tempo (em segundos) que ainda resta do prazo definido pelo timeout_middleware.
+
+    Usado como timeout do render_engine para que o worker seja encerrado no
+    mesmo instante em que o middleware desiste da requisição.
+    """
+    prazo = getattr(request.state, "prazo", None)
+    if prazo is None:
+        return PDF_GENERATION_TIMEOUT
+    return max(0.0, min(PDF_GENERATION_TIMEOUT, prazo - time.monotonic()))
+
+def erro_http_render(e: RenderEngineError) -> HTTPException:
+    """
+    Converte erros do motor de renderização em respostas HTTP.
+
+    Fila cheia vira 503 com Retry-After; timeout vira 408 (mesmo código do middleware).
+    """
+    if isinstance(e, RenderQueueFullError):
+        logging.warning(f"Fila de renderização cheia: {e}")
+        return HTTPException(
+            status_code=503,
+            detail=f"Serviço ocupado gerando outros relatórios. {str(e)}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    logging.error(f"Falha no motor de renderização: {e}")
+    return HTTPException(
+        status_code=408,
+        detail=f"{str(e)}. Tente novamente com dados menores ou contate o suporte."
+    )
+
+def quer_pdf_binario(request: Request) -> bool:
+    """
+    Indica se o cliente pediu o PDF em binário em vez do JSON com base64.
+
+    Vale o header `Accept: application/pdf` ou o parâmetro `?formato=pdf`;
+    sem nenhum dos dois a resposta continua sendo o PDFResponse (fluxos n8n).
+    """
+    if request.query_params.get("formato", "").lower() == "pdf":
+        return True
+    tipos_aceitos = [parte.split(";")[0].strip().lower() for parte in request.headers.get("accept", "").split(",")]
+    return "application/pdf" in tipos_aceitos
+
+def quer_perfil_layout(request: Request) -> Optional[dict]:
+    """
+    Retorna um dict para receber o perfil de layout do job, se o cliente pediu.
+
+    Vale o header `X-Perfil-Layout: 1` ou o parâmetro `?perfil=layout`; o perfil
+    volta no header X-Perfil-Layout da resposta (ver render/profiling.py).
+    """
+    if request.query_params.get("perfil", "").lower() == "layout" or request.headers.get("x-perfil-layout") == "1":
+        return {}
+    return None
+
+def resposta_pdf(request: Request, pdf_bytes: bytes, filename: str, perfil: Optional[dict] = None):
+    """
+    Monta a resposta no modo pedido pelo cliente.
+
+    O modo binário envia os bytes do PDF em blocos de PDF_STREAM_CHUNK_KB, sem
+    cópia (memoryview), com Content-Disposition; o modo JSON codifica em base64
+    (+33% no tamanho e mais uma cópia do documento na serialização).
+
+    Args:
+        request: Requisição atual
+        pdf_bytes: PDF gerado
+        filename: Nome do arquivo sugerido ao cliente
+        perfil: Perfil de layout do job (de quer_perfil_layout), enviado no header X-Perfil-Layout
+
+    Returns:
+        StreamingResponse (application/pdf) ou PDFResponse
+    """
+    headers = {}
+    if perfil:
+        headers["X-Perfil-Layout"] = json.dumps(perfil, separators=(',', ':'))
+
+    if not quer_pdf_binario(request):
+        with span('base64', bytes=len(pdf_bytes)):
+            pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
+        resposta = PDFResponse(filename=filename, pdf_base64=pdf_base64)
+        if headers:
+            return JSONResponse(content=resposta.dict(), headers=headers)
+        return resposta
+
+    tamanho_bloco = int(PDF_STREAM_CHUNK_KB * 1024)
+    dados = memoryview(pdf_bytes)
+
+    def blocos():
+        for inicio in range(0, len(dados), tamanho_bloco):
+            yield dados[inicio:inicio + tamanho_bloco]
+
+    # filename* (RFC 5987) preserva acentos; filename simples fica para clientes antigos
+    nome_ascii = filename.encode('ascii', 'replace').decode('ascii').replace('?', '_').replace('"', '')
+    return StreamingResponse(
+        blocos(),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=\"{nome_ascii}\"; filename*=UTF-8''{quote(filename)}",
+            "Content-Length": str(len(pdf_bytes)),
+            **headers,
+        }
+    )
+
+def preparar_relatorio_dinamico(report_data: ReportData):
+    """Converte o ReportData nos dados do job 'dinamico'; retorna (dados, filename)."""
+    data_dict = report_data.dict()
+
+    for key, value in data_dict.items():
+        if value is None:
+            if key in ['cliente', 'propriedade', 'data_documento', 'recomendacoes', 'conclusoes']:
+                data_dict[key] = ''
+            elif key == 'imagens_anexadas':
+                data_dict[key] = []
+
+    propriedade = data_dict.get('propriedade', 'voxy')
+    filename = f"relatorio_{propriedade.replace(' ', '_').lower()}.pdf"
+    return data_dict, filename
+
+def preparar_relatorio_visita(report_data: VisitReportData):
+    """Extrai os dados do job 'visita' de function_args; retorna (dados, filename)."""
+    data_dict = report_data.function_args.dict()
+
+    propriedade = data_dict.get('nombre_de_la_hacienda', 'visita')
+    filename = f"relatorio_visita_{propriedade.replace(' ', '_').lower()}.pdf"
+    return data_dict, filename
+
+# Rotas com imagens leem o corpo em fluxo (ingest/): o base64 é decodificado em
+# blocos durante a leitura, em vez de o JSON inteiro ir para a memória e ser
+# copiado de novo pelo pydantic e pelo envio ao worker
+async def receber_relatorio_dinamico(request: Request):
+    recebido = await receber_json(request, ReportData, ('imagens_anexadas',))
+    try:
+        yield recebido
+    finally:
+        recebido.descartar()
+
+async def receber_relatorio_visita(request: Request):
+    recebido = await receber_json(request, VisitReportData, ('function_args', 'imagens_anexadas'))
+    try:
+        yield recebido
+    finally:
+        recebido.descartar()
+
+# Modelos dos corpos lidos em fluxo: não aparecem na assinatura das rotas, então o
+# FastAPI não os coloca em components/schemas; openapi_com_corpos acrescenta
+MODELOS_CORPO_OPENAPI = []
+
+def corpo_openapi(modelo) -> dict:
+    """Documenta no OpenAPI o corpo das rotas que leem a requisição em fluxo."""
+    if modelo not in MODELOS_CORPO_OPENAPI:
+        MODELOS_CORPO_OPENAPI.append(modelo)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{modelo.__name__}"}}},
+        }
+    }
+
+_openapi_padrao = app.openapi
+
+def openapi_com_corpos() -> dict:
+    """Esquema OpenAPI do FastAPI mais os modelos de MODELOS_CORPO_OPENAPI (e os que eles usam)."""
+    if app.openapi_schema is None:
+        esquemas = _openapi_padrao().setdefault('components', {}).setdefault('schemas', {})
+        for modelo in MODELOS_CORPO_OPENAPI:
+            esquema = modelo.model_json_schema(ref_template='#/components/schemas/{model}')
+            for nome, definicao in esquema.pop('$defs', {}).items():
+                esquemas.setdefault(nome, definicao)
+            esquemas.setdefault(modelo.__name__, esquema)
+    return app.openapi_schema
+
+app.openapi = openapi_com_corpos
+
+def preparar_relatorio_adubacao(report_data: AdubacaoReportData):
+    """Converte os dados do Doutor Pasto para o job 'dinamico'; retorna (dados, filename)."""
+    data_dict = report_data.function_args.dict()
+
+    # Processa observacoes_tecnicas: converte todo o texto para negrito
+    observacoes_original = data_dict.get('observacoes_tecnicas', '')
+    if observacoes_original and observacoes_original.strip():
+        # Adiciona ** no início e fim para deixar todo o texto em negrito
+        observacoes_formatadas = f"**{observacoes_original.strip()}**"
+    else:
+        observacoes_formatadas = ''
+
+    # Converte dados para formato compatível com create_pdf_from_data
+    pdf_data = {
+        'tipo_documento': 'Relatório de Adubação e Calagem',
+        'titulo_documento': f"RELATÓRIO TÉCNICO DE ADUBAÇÃO - {data_dict.get('nome_propriedade', 'PROPRIEDADE')}",
+        'cliente': data_dict.get('nome_cliente', ''),
+        'propriedade': data_dict.get('nome_propriedade', ''),
+        'data_documento': data_dict.get('data_analise', ''),
+        'tecnico_nome': data_dict.get('tecnico_responsavel', ''),
+        'paleta_cores': 'preto_e_branco',  # Padrão para relatórios de adubação
+        'conteudo_principal': data_dict.get('conteudo_principal', ''),
+        'recomendacoes': observacoes_formatadas,  # Campo formatado em negrito
+        'conclusoes': f"Área: {data_dict.get('area_hectares', 'N/A')} ha | Cultura: {data_dict.get('cultura_pastagem', 'N/A')} | Objetivo: {data_dict.get('objetivo_manejo', 'N/A')}",
+        'imagens_anexadas': [],  # Sem imagens para relatórios de adubação
+        'qualidade_graficos': data_dict.get('qualidade_graficos'),
+        'backend_graficos': data_dict.get('backend_graficos'),
+    }
+
+    propriedade = data_dict.get('nome_propriedade', 'adubacao')
+    filename = f"relatorio_adubacao_{propriedade.replace(' ', '_').lower()}.pdf"
+    return pdf_data, filename
+
+# Documentação OpenAPI do modo binário (o JSON continua sendo o response_model)
+RESPOSTA_PDF_BINARIO = {
+    200: {
+        "content": {"application/pdf": {}},
+        "description": "PDF em JSON (base64) ou, com `Accept: application/pdf` ou `?formato=pdf`, o arquivo binário.",
+    }
+}
+
 # Configurar rate limiting na aplicação
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -94,16 +349,22 @@ async def timeout_middleware(request: Request, call_next):
     
     try:
         # Timeout específico para endpoints de PDF (mais tempo)
-        if request.url.path in ["/gerar-pdf-dinamico", "/gerar-relatorio-visita"]:
+        if request.url.path in ["/gerar-pdf-dinamico", "/gerar-relatorio-visita", "/gerar-relatorio-adubacao",
+                                "/gerar-lote-dinamico", "/gerar-lote-adubacao"]:
             timeout = PDF_GENERATION_TIMEOUT
         else:
             timeout = REQUEST_TIMEOUT
         
+        # Prazo absoluto da requisição: os endpoints de PDF repassam o tempo
+        # restante ao render_engine, que mata o worker quando o prazo estoura
+        request.state.prazo = time.monotonic() + timeout
+        
         # Executa a requisição com timeout
         response = await asyncio.wait_for(call_next(request), timeout=timeout)
         
         # Log apenas de requisições importantes (não healthchecks)
         process_time = time.time() - start_time
+        registrar_requisicao(request, response.status_code, process_time)
         
         if request.url.path != "/":
             logging.info(f"Requisição {request.url.path} processada em {process_time:.2f}s")
@@ -112,19 +373,64 @@ async def timeout_middleware(request: Request, call_next):
         
     except asyncio.TimeoutError:
         process_time = time.time() - start_time
+        registrar_requisicao(request, 408, process_time)
         client_ip = get_remote_address(request)
         logging.error(f"TIMEOUT: Requisição de {client_ip} para {request.url.path} excedeu {timeout}s (processou por {process_time:.2f}s)")
         
-        raise HTTPException(
+        # O render_engine usa o mesmo prazo (request.state.prazo) e mata o
+        # processo worker do job: nada continua renderizando depois do 408.
+        # Exceções levantadas aqui não passam pelos exception handlers do
+        # FastAPI, por isso a resposta é montada diretamente.
+        return JSONResponse(
             status_code=408,
-            detail=f"Requisição excedeu o tempo limite de {timeout} segundos. "
-                   f"Tente novamente com dados menores ou contate o suporte."
+            content={
+                "detail": f"Requisição excedeu o tempo limite de {timeout} segundos. "
+                          f"Tente novamente com dados menores ou contate o suporte."
+            }
         )
     except Exception as e:
         process_time = time.time() - start_time
+        registrar_requisicao(request, 500, process_time)
         logging.error(f"Erro no middleware após {process_time:.2f}s: {e}")
         raise
 
+def registrar_requisicao(request: Request, status: int, duracao: float):
+    """Observa a duração da requisição em /metrics, pela rota declarada (ex: /jobs/{job_id}), não pelo caminho."""
+    rota = getattr(request.scope.get("route"), "path", "outras")
+    DURACAO_REQUISICOES.observar(duracao, rota, request.method, str(status))
+
+# ===============================
+# MIDDLEWARE DE RASTREAMENTO
+# ===============================
+
+# Registrado depois do timeout_middleware, fica por fora dele: o span raiz
+# inclui as respostas 408 montadas pelo timeout
+@app.middleware("http")
+async def rastreamento_middleware(request: Request, call_next):
+    """
+    Rastreia as etapas da requisição (ver core/tracing.py).
+
+    Abre o span raiz 'requisicao' (continuando o header traceparent do
+    cliente, se houver), devolve o resumo dos spans no header Server-Timing,
+    soma a duração de cada etapa em /metrics e exporta o rastro para
+    TRACING_EXPORT_FILE. Healthchecks não são rastreados.
+    """
+    if not TRACING_ENABLED or request.url.path == "/":
+        return await call_next(request)
+
+    with rastrear(*(ler_traceparent(request.headers.get("traceparent")) or ())) as rastro:
+        try:
+            with span('requisicao', **{'http.request.method': request.method, 'url.path': request.url.path}) as trecho:
+                response = await call_next(request)
+                trecho.atributos['http.response.status_code'] = response.status_code
+        finally:
+            rastro.encerrar()
+            registrar_spans(rastro.spans)
+            exportar(rastro)
+
+    response.headers["Server-Timing"] = rastro.server_timing()
+    return response
+
 auth_scheme = HTTPBearer()
 
 def verify_api_key(credentials: HTTPAuthorizationCredentials = Security(auth_scheme)):
@@ -156,54 +462,51 @@ def read_root():
     """Endpoint de verificação de saúde."""
     return {"status": "ok", "message": "PDF Generation Service is running."}
 
+def _mb(valor):
+    return round(valor / 1024 / 1024, 2)
+
 @app.get("/health/resources", 
          summary="Monitoramento de Recursos", 
-         description="Endpoint para verificar o uso de recursos do sistema.")
-def check_resources():
+         description="Endpoint para verificar o uso de recursos do sistema (última amostra do amostrador em segundo plano).")
+async def check_resources():
     """
     Endpoint de monitoramento de recursos.
-    Retorna informações sobre uso de memória, CPU e limites configurados.
+    Retorna a última amostra de memória e CPU (do processo principal, dos
+    workers e do sistema), os limites configurados e os contadores do motor,
+    caches e jobs. Não mede nada na hora: responde em microssegundos.
     """
-    import psutil
-    import sys
-    
     try:
-        # Informações do processo atual
-        process = psutil.Process()
-        
-        # Uso de memória
-        memory_info = process.memory_info()
-        memory_percent = process.memory_percent()
-        
-        # Uso de CPU
-        cpu_percent = process.cpu_percent(interval=1)
-        
-        # Informações do sistema
-        system_memory = psutil.virtual_memory()
-        system_cpu = psutil.cpu_percent(interval=1)
+        amostra = amostrador_recursos.ultima_amostra() or amostrador_recursos.amostrar()
+        processo = amostra['process']
+        sistema = amostra['system']
+        metricas_workers = render_engine.metricas_workers()
         
         return {
             "status": "healthy",
             "timestamp": time.time(),
+            "amostrado_em": amostra['timestamp'],
             "process": {
-                "pid": process.pid,
+                "pid": processo['pid'],
                 "memory": {
-                    "rss_mb": round(memory_info.rss / 1024 / 1024, 2),
-                    "vms_mb": round(memory_info.vms / 1024 / 1024, 2),
-                    "percent": round(memory_percent, 2)
+                    "rss_mb": _mb(processo['rss_bytes']),
+                    "vms_mb": _mb(processo['vms_bytes']),
+                    "percent": round(processo['memory_percent'], 2)
                 },
-                "cpu_percent": round(cpu_percent, 2),
-                "threads": process.num_threads(),
-                "connections": len(process.connections()),
-                "open_files": len(process.open_files())
+                "cpu_percent": round(processo['cpu_percent'], 2),
+                "threads": processo['threads'],
+                "open_fds": processo['open_fds']
             },
+            "render_workers": [
+                {"pid": worker['pid'], "rss_mb": _mb(worker['rss_bytes']), "cpu_percent": round(worker['cpu_percent'], 2)}
+                for worker in amostra['render_workers']
+            ],
             "system": {
                 "memory": {
-                    "total_gb": round(system_memory.total / 1024 / 1024 / 1024, 2),
-                    "available_gb": round(system_memory.available / 1024 / 1024 / 1024, 2),
-                    "percent_used": system_memory.percent
+                    "total_gb": round(sistema['memory_total_bytes'] / 1024 / 1024 / 1024, 2),
+                    "available_gb": round(sistema['memory_available_bytes'] / 1024 / 1024 / 1024, 2),
+                    "percent_used": sistema['memory_percent']
                 },
-                "cpu_percent": system_cpu
+                "cpu_percent": sistema['cpu_percent']
             },
             "limits": {
                 "docker_memory_limit": "1536MB",
@@ -213,6 +516,22 @@ def check_resources():
                 "request_timeout": REQUEST_TIMEOUT,
                 "pdf_generation_timeout": PDF_GENERATION_TIMEOUT
             },
+            "render_engine": {
+                "pool_size": render_engine.tamanho_pool,
+                "queue_depth": render_engine.profundidade_fila,
+                "jobs_pendentes": render_engine.pendentes,
+                **render_engine.estatisticas.como_dict()
+            },
+            "chart_cache": somar_estatisticas(
+                [metricas['chart_cache'] for metricas in metricas_workers]
+            ),
+            "imagens": somar_estatisticas_imagens(
+                [metricas['imagens'] for metricas in metricas_workers if 'imagens' in metricas]
+            ),
+            "layout": somar_estatisticas_layout(
+                [metricas['layout'] for metricas in metricas_workers if 'layout' in metricas]
+            ),
+            "jobs": job_manager.estatisticas(),
             "rate_limits": {
                 "pdf_dinamico": "20/minute per IP",
                 "relatorio_visita": "15/minute per IP",
@@ -228,36 +547,128 @@ def check_resources():
             "timestamp": time.time()
         }
 
+# ===============================
+# MÉTRICAS (/metrics)
+# ===============================
+# Os contadores do caminho das requisições ficam em core/metrics.py; os
+# coletores abaixo leem, na hora da coleta, o que já é mantido em outros
+# lugares. As métricas dos workers chegam com cada job (ver worker.coletar_metricas);
+# um worker reiniciado recomeça os seus contadores do zero.
+
+@METRICAS.coletor
+def _metricas_motor():
+    """Fila e resultados do motor de renderização e dos jobs assíncronos."""
+    estatisticas = render_engine.estatisticas.como_dict()
+    jobs = job_manager.estatisticas()
+    return (
+        linhas_metrica('pdf_service_render_pool_size', 'gauge', 'Processos worker do motor de renderização.',
+                       [({}, render_engine.tamanho_pool)])
+        + linhas_metrica('pdf_service_render_queue_jobs', 'gauge', 'Jobs aceitos pelo motor (executando ou aguardando worker).',
+                         [({}, render_engine.pendentes)])
+        + linhas_metrica('pdf_service_render_queue_capacity', 'gauge', 'Jobs aceitos pelo motor antes de responder 503.',
+                         [({}, render_engine.capacidade)])
+        + linhas_metrica('pdf_service_render_jobs_total', 'counter', 'Jobs do motor por resultado.',
+                         [({'resultado': 'concluido'}, estatisticas['jobs_concluidos']),
+                          ({'resultado': 'erro'}, estatisticas['jobs_com_erro'])]
+                         + [({'resultado': motivo}, total) for motivo, total in estatisticas['jobs_encerrados'].items()
+                            if motivo != 'total'])
+        + linhas_metrica('pdf_service_async_jobs_pending', 'gauge', 'Jobs assíncronos aguardando ou em execução.',
+                         [({}, jobs['pendentes'])])
+        + linhas_metrica('pdf_service_async_jobs_total', 'counter', 'Jobs assíncronos terminados por resultado.',
+                         [({'resultado': 'concluido'}, jobs['concluidos']), ({'resultado': 'erro'}, jobs['com_erro'])])
+    )
+
+@METRICAS.coletor
+def _metricas_workers():
+    """Cache de gráficos, preparação de imagens e histogramas de layout somados dos workers."""
+    metricas_workers = render_engine.metricas_workers()
+    cache = somar_estatisticas([metricas['chart_cache'] for metricas in metricas_workers])
+    imagens = somar_estatisticas_imagens([metricas['imagens'] for metricas in metricas_workers if 'imagens' in metricas])
+    layout = somar_estatisticas_layout([metricas['layout'] for metricas in metricas_workers if 'layout' in metricas])
+    documentos = layout['documentos'].items()
+    return (
+        linhas_metrica('pdf_service_chart_cache_requests_total', 'counter', 'Consultas ao cache de gráficos por resultado.',
+                       [({'resultado': 'hit'}, cache['hits']), ({'resultado': 'miss'}, cache['misses'])])
+        + linhas_metrica('pdf_service_chart_cache_hit_ratio', 'gauge', 'Taxa de acerto do cache de gráficos desde o início dos workers.',
+                         [({}, cache['hit_rate'])])
+        + linhas_metrica('pdf_service_chart_cache_bytes', 'gauge', 'Bytes ocupados pelo cache de gráficos em memória.',
+                         [({}, cache['bytes'])])
+        + linhas_metrica('pdf_service_images_prepared_total', 'counter', 'Imagens anexadas preparadas por resultado.',
+                         [({'resultado': 'reamostrada'}, imagens['reamostradas']), ({'resultado': 'mantida'}, imagens['mantidas'])])
+        + linhas_metrica('pdf_service_image_bytes_total', 'counter', 'Bytes das imagens anexadas antes e depois da preparação.',
+                         [({'fase': 'entrada'}, imagens['bytes_entrada']), ({'fase': 'saida'}, imagens['bytes_saida'])])
+        + linhas_histograma('pdf_service_layout_seconds', 'Tempo de layout por documento, componente e fase (requer LAYOUT_PROFILING).',
+                            layout['buckets'],
+                            [({'tipo': serie['tipo'], 'componente': serie['componente'], 'fase': serie['fase']},
+                              serie['contagens'], serie['soma']) for serie in layout['series']])
+        + linhas_metrica('pdf_service_layout_documents_total', 'counter', 'Documentos com perfil de layout por tipo.',
+                         [({'tipo': tipo}, contadores['documentos']) for tipo, contadores in documentos])
+        + linhas_metrica('pdf_service_layout_pages_total', 'counter', 'Páginas dos documentos com perfil de layout por tipo.',
+                         [({'tipo': tipo}, contadores['paginas']) for tipo, contadores in documentos])
+        + linhas_metrica('pdf_service_layout_passes_total', 'counter', 'Passes de doc.build dos documentos com perfil de layout por tipo.',
+                         [({'tipo': tipo}, contadores['passes']) for tipo, contadores in documentos])
+    )
+
+@METRICAS.coletor
+def _metricas_recursos():
+    """Última amostra do amostrador de recursos (ver core/resources.py)."""
+    amostra = amostrador_recursos.ultima_amostra()
+    if amostra is None:
+        return []
+    processo = amostra['process']
+    workers = amostra['render_workers']
+    linhas = (
+        linhas_metrica('pdf_service_resource_sample_timestamp_seconds', 'gauge', 'Momento da última amostra de recursos.',
+                       [({}, amostra['timestamp'])])
+        + linhas_metrica('pdf_service_resident_memory_bytes', 'gauge', 'Memória residente por processo (principal e soma dos workers).',
+                         [({'processo': 'principal'}, processo['rss_bytes']),
+                          ({'processo': 'workers'}, sum(worker['rss_bytes'] for worker in workers))])
+        + linhas_metrica('pdf_service_cpu_percent', 'gauge', 'Uso de CPU entre as duas últimas amostras (principal, soma dos workers e sistema).',
+                         [({'processo': 'principal'}, processo['cpu_percent']),
+                          ({'processo': 'workers'}, sum(worker['cpu_percent'] for worker in workers)),
+                          ({'processo': 'sistema'}, amostra['system']['cpu_percent'])])
+        + linhas_metrica('pdf_service_threads', 'gauge', 'Threads do processo principal.', [({}, processo['threads'])])
+        + linhas_metrica('pdf_service_system_memory_available_bytes', 'gauge', 'Memória disponível no sistema.',
+                         [({}, amostra['system']['memory_available_bytes'])])
+    )
+    if processo['open_fds'] is not None:
+        linhas += linhas_metrica('pdf_service_open_fds', 'gauge', 'Descritores abertos pelo processo principal.',
+                                 [({}, processo['open_fds'])])
+    return linhas
+
+@app.get("/metrics",
+         summary="Métricas (Prometheus)",
+         description="Latência por rota, duração das etapas, fila do motor, caches, tamanho dos PDFs e itens por documento no formato texto do Prometheus.",
+         response_class=Response)
+async def metrics():
+    """Endpoint de coleta do Prometheus: só lê contadores e a última amostra de recursos."""
+    return Response(METRICAS.texto(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.post("/gerar-pdf-dinamico", 
           response_model=PDFResponse, 
+          responses=RESPOSTA_PDF_BINARIO,
           summary="Gera um Relatório em PDF a partir de um HTML",
-          description="Recebe os dados do relatório em JSON e retorna o arquivo PDF codificado em base64.",
-          dependencies=[Security(verify_api_key)])
+          description="Recebe os dados do relatório em JSON e retorna o arquivo PDF codificado em base64 (ou binário, com `Accept: application/pdf` ou `?formato=pdf`).",
+          dependencies=[Security(verify_api_key)],
+          openapi_extra=corpo_openapi(ReportData))
 @limiter.limit("20/minute")  # PROTEÇÃO: Máximo 20 PDFs por minuto por IP
-async def generate_report(request: Request, report_data: ReportData):
+async def generate_report(request: Request, recebido: RequisicaoRecebida = Depends(receber_relatorio_dinamico)):
     try:
-        data_dict = report_data.dict()
-
-        for key, value in data_dict.items():
-            if value is None:
-                if key in ['cliente', 'propriedade', 'data_documento', 'recomendacoes', 'conclusoes']:
-                    data_dict[key] = ''
-                elif key == 'imagens_anexadas':
-                    data_dict[key] = []
+        data_dict, filename = preparar_relatorio_dinamico(recebido.modelo)
+        data_dict['imagens_anexadas'] = recebido.imagens
         
         logging.info(f"Iniciando geração de PDF para: {data_dict.get('titulo_documento')}")
         
-        pdf_bytes = create_pdf_from_data(data_dict)
-
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        propriedade = data_dict.get('propriedade', 'voxy')
-        filename = f"relatorio_{propriedade.replace(' ', '_').lower()}.pdf"
+        perfil = quer_perfil_layout(request)
+        pdf_bytes = await render_engine.renderizar('dinamico', data_dict, timeout=tempo_restante(request), perfil=perfil)
 
         logging.info(f"PDF gerado com sucesso: {filename}")
 
-        return PDFResponse(filename=filename, pdf_base64=pdf_base64)
+        return resposta_pdf(request, pdf_bytes, filename, perfil)
 
+    except RenderEngineError as e:
+        raise erro_http_render(e)
     except ImageSecurityError as e:
         logging.error(f"VIOLAÇÃO DE SEGURANÇA - Imagem rejeitada: {e}", exc_info=True)
         raise HTTPException(
@@ -305,29 +716,30 @@ async def generate_report(request: Request, report_data: ReportData):
 
 @app.post("/gerar-relatorio-visita", 
           response_model=PDFResponse, 
+          responses=RESPOSTA_PDF_BINARIO,
           summary="Cria um Relatório de Visita (Template Arizona)",
           description="Recebe os dados da visita em JSON, preenche o template visual da Arizona Nutrição Animal e retorna o PDF pronto. Ideal para relatórios de rotina.",
           dependencies=[Security(verify_api_key)],
-          tags=["Relatórios de Visita"])
+          tags=["Relatórios de Visita"],
+          openapi_extra=corpo_openapi(VisitReportData))
 @limiter.limit("15/minute")  # PROTEÇÃO: Máximo 15 relatórios de visita por minuto por IP
-async def generate_visit_report(request: Request, report_data: VisitReportData):
+async def generate_visit_report(request: Request, recebido: RequisicaoRecebida = Depends(receber_relatorio_visita)):
     try:
         # Extrai os dados de function_args
-        data_dict = report_data.function_args.dict()
+        data_dict, filename = preparar_relatorio_visita(recebido.modelo)
+        data_dict['imagens_anexadas'] = recebido.imagens
         
         logging.info(f"Iniciando preenchimento de PDF para: {data_dict.get('nombre_de_la_hacienda')}")
         
-        pdf_bytes = preencher_pdf_template(data_dict)
-
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        propriedade = data_dict.get('nombre_de_la_hacienda', 'visita')
-        filename = f"relatorio_visita_{propriedade.replace(' ', '_').lower()}.pdf"
+        perfil = quer_perfil_layout(request)
+        pdf_bytes = await render_engine.renderizar('visita', data_dict, timeout=tempo_restante(request), perfil=perfil)
 
         logging.info(f"PDF de visita gerado com sucesso: {filename}")
 
-        return PDFResponse(filename=filename, pdf_base64=pdf_base64)
+        return resposta_pdf(request, pdf_bytes, filename, perfil)
 
+    except RenderEngineError as e:
+        raise erro_http_render(e)
     except ImageSecurityError as e:
         logging.error(f"VIOLAÇÃO DE SEGURANÇA - Imagem rejeitada no template: {e}", exc_info=True)
         raise HTTPException(
@@ -343,6 +755,7 @@ async def generate_visit_report(request: Request, report_data: VisitReportData):
 
 @app.post("/gerar-relatorio-adubacao", 
           response_model=PDFResponse, 
+          responses=RESPOSTA_PDF_BINARIO,
           summary="Cria um Relatório de Adubação e Calagem (Doutor Pasto)",
           description="Recebe os dados de recomendação de adubação em JSON, processa as informações técnicas do Doutor Pasto e retorna o PDF profissional. Ideal para relatórios de fertilidade do solo e correção de pastagens.",
           dependencies=[Security(verify_api_key)],
@@ -350,48 +763,242 @@ async def generate_visit_report(request: Request, report_data: VisitReportData):
 @limiter.limit("60/minute")  # PROTEÇÃO: Máximo 60 relatórios de adubação por minuto por IP para o evento
 async def generate_adubacao_report(request: Request, report_data: AdubacaoReportData):
     try:
-        # Extrai os dados de function_args
-        data_dict = report_data.function_args.dict()
+        pdf_data, filename = preparar_relatorio_adubacao(report_data)
         
-        logging.info(f"Iniciando geração de relatório de adubação para: {data_dict.get('nome_propriedade')}")
-        
-        # Processa observacoes_tecnicas: converte todo o texto para negrito
-        observacoes_original = data_dict.get('observacoes_tecnicas', '')
-        if observacoes_original and observacoes_original.strip():
-            # Adiciona ** no início e fim para deixar todo o texto em negrito
-            observacoes_formatadas = f"**{observacoes_original.strip()}**"
-        else:
-            observacoes_formatadas = ''
-        
-        # Converte dados para formato compatível com create_pdf_from_data
-        pdf_data = {
-            'tipo_documento': 'Relatório de Adubação e Calagem',
-            'titulo_documento': f"RELATÓRIO TÉCNICO DE ADUBAÇÃO - {data_dict.get('nome_propriedade', 'PROPRIEDADE')}",
-            'cliente': data_dict.get('nome_cliente', ''),
-            'propriedade': data_dict.get('nome_propriedade', ''),
-            'data_documento': data_dict.get('data_analise', ''),
-            'tecnico_nome': data_dict.get('tecnico_responsavel', ''),
-            'paleta_cores': 'preto_e_branco',  # Padrão para relatórios de adubação
-            'conteudo_principal': data_dict.get('conteudo_principal', ''),
-            'recomendacoes': observacoes_formatadas,  # Campo formatado em negrito
-            'conclusoes': f"Área: {data_dict.get('area_hectares', 'N/A')} ha | Cultura: {data_dict.get('cultura_pastagem', 'N/A')} | Objetivo: {data_dict.get('objetivo_manejo', 'N/A')}",
-            'imagens_anexadas': []  # Sem imagens para relatórios de adubação
-        }
-
-        pdf_bytes = create_pdf_from_data(pdf_data)
+        logging.info(f"Iniciando geração de relatório de adubação para: {pdf_data.get('propriedade')}")
 
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        propriedade = data_dict.get('nome_propriedade', 'adubacao')
-        filename = f"relatorio_adubacao_{propriedade.replace(' ', '_').lower()}.pdf"
+        perfil = quer_perfil_layout(request)
+        pdf_bytes = await render_engine.renderizar('dinamico', pdf_data, timeout=tempo_restante(request), perfil=perfil)
 
         logging.info(f"PDF de adubação gerado com sucesso: {filename}")
 
-        return PDFResponse(filename=filename, pdf_base64=pdf_base64)
+        return resposta_pdf(request, pdf_bytes, filename, perfil)
 
+    except RenderEngineError as e:
+        raise erro_http_render(e)
     except Exception as e:
         logging.critical(f"Erro inesperado na geração do relatório de adubação: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Ocorreu um erro interno ao gerar o relatório de adubação: {str(e)}"
         )
+
+# ===============================
+# JOBS ASSÍNCRONOS
+# ===============================
+# Para relatórios grandes: a submissão responde na hora com o id do job, e o
+# cliente consulta o status (ou recebe o webhook) e baixa o PDF depois
+
+def resposta_job(job: dict) -> dict:
+    """Estado do job para a API (sem o callback_url) com os links de status e PDF."""
+    publico = {campo: valor for campo, valor in job.items() if campo != 'callback_url'}
+    publico['status_url'] = f"/jobs/{job['id']}"
+    publico['pdf_url'] = f"/jobs/{job['id']}/pdf"
+    return publico
+
+async def enfileirar_job(tipo: str, nome_job: str, dados: dict, filename: str, callback_url: Optional[str],
+                         recebido: Optional[RequisicaoRecebida] = None) -> dict:
+    """
+    Submete o job ao JobManager e converte os erros em respostas HTTP.
+
+    Args:
+        tipo: Tipo exposto na API ('dinamico', 'visita', 'adubacao')
+        nome_job: Função de renderização do worker ('dinamico' ou 'visita')
+        dados: Dados já preparados
+        filename: Nome do arquivo PDF
+        callback_url: URL notificada ao final (opcional)
+        recebido: Corpo lido em fluxo; os temporários das imagens passam a ser do job
+
+    Returns:
+        dict: Estado inicial do job
+    """
+    if callback_url:
+        try:
+            # Resolve o host (DNS) para recusar endereços internos: fora do event loop
+            await asyncio.to_thread(validar_callback_url, callback_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        # O job roda depois da resposta: a dependência da rota não apaga mais as imagens
+        anexos = recebido.transferir() if recebido is not None else None
+        job = await job_manager.submeter(tipo, nome_job, dados, filename, callback_url, anexos)
+    except RenderEngineError as e:
+        raise erro_http_render(e)
+    return resposta_job(job)
+
+DESCRICAO_CALLBACK = "URL que recebe um POST (JSON com o estado final do job) quando ele terminar."
+
+@app.post("/jobs/dinamico",
+          response_model=JobStatusResponse,
+          status_code=202,
+          summary="Agenda um Relatório Dinâmico",
+          description="Mesmos dados de `/gerar-pdf-dinamico`; responde na hora com o id do job.",
+          dependencies=[Security(verify_api_key)],
+          tags=["Jobs Assíncronos"],
+          openapi_extra=corpo_openapi(ReportData))
+@limiter.limit("20/minute")
+async def submit_report_job(request: Request, recebido: RequisicaoRecebida = Depends(receber_relatorio_dinamico),
+                            callback_url: Optional[str] = Query(None, description=DESCRICAO_CALLBACK)):
+    data_dict, filename = preparar_relatorio_dinamico(recebido.modelo)
+    data_dict['imagens_anexadas'] = recebido.imagens
+    return await enfileirar_job('dinamico', 'dinamico', data_dict, filename, callback_url, recebido)
+
+@app.post("/jobs/visita",
+          response_model=JobStatusResponse,
+          status_code=202,
+          summary="Agenda um Relatório de Visita",
+          description="Mesmos dados de `/gerar-relatorio-visita`; responde na hora com o id do job.",
+          dependencies=[Security(verify_api_key)],
+          tags=["Jobs Assíncronos"],
+          openapi_extra=corpo_openapi(VisitReportData))
+@limiter.limit("15/minute")
+async def submit_visit_job(request: Request, recebido: RequisicaoRecebida = Depends(receber_relatorio_visita),
+                           callback_url: Optional[str] = Query(None, description=DESCRICAO_CALLBACK)):
+    data_dict, filename = preparar_relatorio_visita(recebido.modelo)
+    data_dict['imagens_anexadas'] = recebido.imagens
+    return await enfileirar_job('visita', 'visita', data_dict, filename, callback_url, recebido)
+
+@app.post("/jobs/adubacao",
+          response_model=JobStatusResponse,
+          status_code=202,
+          summary="Agenda um Relatório de Adubação",
+          description="Mesmos dados de `/gerar-relatorio-adubacao`; responde na hora com o id do job.",
+          dependencies=[Security(verify_api_key)],
+          tags=["Jobs Assíncronos"])
+@limiter.limit("60/minute")
+async def submit_adubacao_job(request: Request, report_data: AdubacaoReportData,
+                              callback_url: Optional[str] = Query(None, description=DESCRICAO_CALLBACK)):
+    pdf_data, filename = preparar_relatorio_adubacao(report_data)
+    return await enfileirar_job('adubacao', 'dinamico', pdf_data, filename, callback_url)
+
+@app.get("/jobs/{job_id}",
+         response_model=JobStatusResponse,
+         summary="Consulta um Job",
+         description="Status e progresso do job. Jobs expiram JOB_TTL_SECONDS depois da última atualização.",
+         dependencies=[Security(verify_api_key)],
+         tags=["Jobs Assíncronos"])
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_manager.store.obter, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    return resposta_job(job)
+
+@app.get("/jobs/{job_id}/pdf",
+         response_model=PDFResponse,
+         responses=RESPOSTA_PDF_BINARIO,
+         summary="Baixa o PDF de um Job",
+         description="PDF do job concluído, no mesmo formato dos endpoints síncronos (JSON com base64 ou binário).",
+         dependencies=[Security(verify_api_key)],
+         tags=["Jobs Assíncronos"])
+async def get_job_pdf(request: Request, job_id: str):
+    job = await asyncio.to_thread(job_manager.store.obter, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+    if job['status'] == 'erro':
+        raise HTTPException(status_code=job['codigo_erro'] or 500, detail=f"O job falhou: {job['erro']}")
+    if job['status'] != 'concluido':
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job ainda não concluído (status: {job['status']}, progresso: {job['progresso']:.0%})"
+        )
+    pdf_bytes = await asyncio.to_thread(job_manager.store.obter_pdf, job_id)
+    if pdf_bytes is None:
+        raise HTTPException(status_code=404, detail="PDF do job não encontrado ou expirado")
+    return resposta_pdf(request, pdf_bytes, job['filename'])
+
+# ===============================
+# LOTES
+# ===============================
+# Vários relatórios em uma requisição (ex: dia de campo): validados item a
+# item, renderizados em paralelo (um por worker) e devolvidos à medida que
+# ficam prontos, em ZIP (padrão) ou NDJSON (?formato=ndjson ou Accept)
+
+def preparar_lote(itens: list, modelo, preparar, nome_job: str):
+    """
+    Valida e prepara cada item do lote separadamente.
+
+    Args:
+        itens: Dicts recebidos no lote
+        modelo: Modelo pydantic do endpoint equivalente
+        preparar: Função preparar_relatorio_* correspondente
+        nome_job: Função de renderização do worker
+
+    Returns:
+        tuple: (itens válidos como ItemLote, erros de validação como ResultadoLote)
+    """
+    validos = []
+    erros = []
+    for indice, item in enumerate(itens):
+        try:
+            dados, filename = preparar(modelo.parse_obj(item))
+        except ValidationError as e:
+            detalhes = "; ".join(
+                f"{'.'.join(str(parte) for parte in erro['loc'])}: {erro['msg']}" for erro in e.errors()
+            )
+            erros.append(ResultadoLote(indice, erro=f"Dados inválidos: {detalhes}", codigo_erro=422))
+            continue
+        validos.append(ItemLote(indice, nome_job, dados, filename))
+    return validos, erros
+
+async def receber_lote(request: Request) -> LoteRequest:
+    # Com o mesmo limite de corpo das rotas com imagens; cada item é validado depois, em preparar_lote
+    return await receber_json_simples(request, LoteRequest)
+
+def resposta_lote(request: Request, validos: list, erros: list, nome_arquivo: str):
+    """Inicia a renderização do lote e devolve o fluxo no formato pedido (ZIP ou NDJSON)."""
+    total = len(validos) + len(erros)
+    logging.info(f"Lote {nome_arquivo}: {total} itens ({len(erros)} inválidos)")
+    resultados = renderizar_lote(
+        render_engine, validos, erros,
+        concorrencia=LOTE_CONCURRENCY or max(1, render_engine.tamanho_pool),
+        timeout_item=PDF_GENERATION_TIMEOUT,
+        timeout_lote=LOTE_TIMEOUT,
+    )
+
+    formato = request.query_params.get("formato", "").lower()
+    if formato == "ndjson" or (not formato and "application/x-ndjson" in request.headers.get("accept", "")):
+        return StreamingResponse(codificar_ndjson(resultados, total), media_type="application/x-ndjson")
+    return StreamingResponse(
+        codificar_zip(resultados, total),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=\"{nome_arquivo}.zip\""}
+    )
+
+RESPOSTA_LOTE = {
+    200: {
+        "content": {"application/zip": {}, "application/x-ndjson": {}},
+        "description": "ZIP com um PDF por item e `resumo.json` (erros por item), ou NDJSON com uma linha por item e uma linha final de resumo.",
+    }
+}
+
+@app.post("/gerar-lote-dinamico",
+          response_class=StreamingResponse,
+          responses=RESPOSTA_LOTE,
+          summary="Gera Vários Relatórios Dinâmicos",
+          description="Cada item tem os mesmos campos de `/gerar-pdf-dinamico`.",
+          dependencies=[Security(verify_api_key)],
+          tags=["Lotes"],
+          openapi_extra=corpo_openapi(LoteRequest))
+@limiter.limit("10/minute")
+async def generate_report_batch(request: Request, lote: LoteRequest = Depends(receber_lote)):
+    # Validação de até LOTE_MAX_ITENS itens (com as imagens em base64): fora do event loop
+    validos, erros = await asyncio.to_thread(
+        preparar_lote, lote.itens, ReportData, preparar_relatorio_dinamico, 'dinamico'
+    )
+    return resposta_lote(request, validos, erros, f"lote_relatorios_{int(time.time())}")
+
+@app.post("/gerar-lote-adubacao",
+          response_class=StreamingResponse,
+          responses=RESPOSTA_LOTE,
+          summary="Gera Vários Relatórios de Adubação",
+          description="Cada item tem os campos de `function_args` de `/gerar-relatorio-adubacao` (com ou sem o envelope `function_args`).",
+          dependencies=[Security(verify_api_key)],
+          tags=["Lotes"],
+          openapi_extra=corpo_openapi(LoteRequest))
+@limiter.limit("10/minute")
+async def generate_adubacao_batch(request: Request, lote: LoteRequest = Depends(receber_lote)):
+    itens = [item if 'function_args' in item else {'function_args': item} for item in lote.itens]
+    validos, erros = await asyncio.to_thread(
+        preparar_lote, itens, AdubacaoReportData, preparar_relatorio_adubacao, 'dinamico'
+    )
+    return resposta_lote(request, validos, erros, f"lote_adubacao_{int(time.time())}")
@@ -4,6 +4,8 @@ from pydantic import BaseModel, Field, validator, constr
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
+from .core.config import LOTE_MAX_ITENS
+
 # ===============================
 # ENUMS DE VALIDAÇÃO CRÍTICOS
 # ===============================
@@ -44,21 +46,50 @@ MAX_PROPRIEDADE_LENGTH = 100
 MAX_CONTEUDO_LENGTH = 50000  # 50KB de texto
 MAX_LEGENDA_LENGTH = 500
 
+# Alfabeto base64; a checagem remove esses bytes e confere se sobrou algo
+# (uma passada em C, bem mais barata que um regex sobre vários MB)
+ALFABETO_BASE64 = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+BLOCO_BASE64 = 64 * 1024
+
+def _base64_valido(v: str) -> bool:
+    """Só caracteres base64 e até 2 '=' no final; em blocos, sem copiar a string inteira."""
+    fim = len(v) - (2 if v.endswith('==') else 1 if v.endswith('=') else 0)
+    if not v.isascii():
+        return False
+    for inicio in range(0, fim, BLOCO_BASE64):
+        if v[inicio:min(inicio + BLOCO_BASE64, fim)].encode('ascii').translate(None, ALFABETO_BASE64):
+            return False
+    return True
+
 # Modelo para os dados de uma imagem anexada
-class ImagemAnexada(BaseModel):
+class ImagemAnexadaMetadados(BaseModel):
+    """
+    Campos de uma imagem anexada além do conteúdo.
+    Usado sozinho pelas rotas com leitura em fluxo, em que o base64 é
+    decodificado direto da requisição (ingest/request.py).
+    """
+    id: Optional[int] = Field(None, ge=0, le=999, description="ID numérico da imagem (0-999)")
+    legenda: Optional[constr(max_length=MAX_LEGENDA_LENGTH)] = Field(
+        "", 
+        description=f"Legenda da imagem (máximo {MAX_LEGENDA_LENGTH} caracteres)"
+    )
+    
+    @validator('legenda')
+    def validar_legenda(cls, v):
+        """Validação de legenda"""
+        if v and len(v.strip()) == 0:
+            return ""  # Converte string vazia para string vazia limpa
+        return v.strip() if v else ""
+
+class ImagemAnexada(ImagemAnexadaMetadados):
     """
     Modelo validado para imagens anexadas.
     Inclui validações de segurança e integridade.
     """
-    id: Optional[int] = Field(None, ge=0, le=999, description="ID numérico da imagem (0-999)")
     base64: constr(min_length=100, max_length=10_000_000) = Field(
         ..., 
         description="Dados da imagem em base64 (100 chars a 10MB)"
     )
-    legenda: Optional[constr(max_length=MAX_LEGENDA_LENGTH)] = Field(
-        "", 
-        description=f"Legenda da imagem (máximo {MAX_LEGENDA_LENGTH} caracteres)"
-    )
     
     @validator('base64')
     def validar_base64(cls, v):
@@ -66,19 +97,12 @@ class ImagemAnexada(BaseModel):
         if not v:
             raise ValueError("Base64 não pode estar vazio")
         
-        # Verifica se contém apenas caracteres base64 válidos
-        import re
-        if not re.match(r'^[A-Za-z0-9+/]*={0,2}$', v):
+        # Verifica se contém apenas caracteres base64 válidos; a decodificação
+        # em si acontece uma única vez, no worker (images/pipeline.py)
+        if not _base64_valido(v):
             raise ValueError("Formato base64 inválido")
         
         return v
-    
-    @validator('legenda')
-    def validar_legenda(cls, v):
-        """Validação de legenda"""
-        if v and len(v.strip()) == 0:
-            return ""  # Converte string vazia para string vazia limpa
-        return v.strip() if v else ""
 
 # Modelo para detalhes do proprietário/assinatura
 class ProprietarioDetalhes(BaseModel):
@@ -137,6 +161,18 @@ class ReportData(BaseModel):
     condicoes_comerciais: Optional[str] = None
     observacoes_adicionais: Optional[str] = None
     proprietario_detalhes: Optional[ProprietarioDetalhes] = None
+    qualidade_graficos: Optional[str] = Field(
+        None,
+        description="Qualidade dos gráficos: 'vetor', 'alta', 'media' ou 'rascunho' (padrão do servidor se omitido)"
+    )
+    backend_graficos: Optional[str] = Field(
+        None,
+        description="Backend dos gráficos: 'matplotlib' ou 'reportlab' (nativo); padrão do servidor se omitido"
+    )
+    qualidade_imagens: Optional[str] = Field(
+        None,
+        description="Resolução das fotos no PDF: 'alta' (300 DPI), 'media' (200), 'rascunho' (150) ou 'original' (sem reamostrar); padrão do servidor se omitido"
+    )
     
     imagens_anexadas: Optional[List[ImagemAnexada]] = Field(
         default_factory=list,
@@ -160,6 +196,24 @@ class ReportData(BaseModel):
             return []
         return v
     
+    @validator('qualidade_graficos', pre=True)
+    def validar_qualidade_graficos(cls, v):
+        """Normaliza a qualidade dos gráficos (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_chart_quality
+        return validate_chart_quality(v) if v else None
+    
+    @validator('backend_graficos', pre=True)
+    def validar_backend_graficos(cls, v):
+        """Normaliza o backend dos gráficos (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_chart_backend
+        return validate_chart_backend(v) if v else None
+    
+    @validator('qualidade_imagens', pre=True)
+    def validar_qualidade_imagens(cls, v):
+        """Normaliza o perfil das imagens (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_image_quality
+        return validate_image_quality(v) if v else None
+    
     @validator('paleta_cores', pre=True)
     def validar_paleta_cores(cls, v):
         """Validação flexível de paleta - compatível com Gemini function calls"""
@@ -175,6 +229,39 @@ class PDFResponse(BaseModel):
     filename: str = Field(..., description="Nome do arquivo PDF gerado.")
     pdf_base64: str
 
+class LoteRequest(BaseModel):
+    """
+    Lote de relatórios renderizados em uma única requisição.
+
+    Cada item é validado separadamente (com o modelo do endpoint), para que um
+    item inválido vire um erro daquele item em vez de recusar o lote inteiro.
+    """
+    itens: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=LOTE_MAX_ITENS,
+        description=f"Relatórios do lote (máximo {LOTE_MAX_ITENS})"
+    )
+
+class JobStatusResponse(BaseModel):
+    """Estado de um job assíncrono (POST /jobs/... e GET /jobs/{id})."""
+    id: str = Field(..., description="Id do job")
+    tipo: str = Field(..., description="Tipo do relatório: 'dinamico', 'visita' ou 'adubacao'")
+    status: str = Field(..., description="'na_fila', 'executando', 'concluido' ou 'erro'")
+    etapa: str = Field(..., description="Etapa atual: 'na_fila', 'renderizando', 'armazenando', 'concluido', 'erro'")
+    progresso: float = Field(..., ge=0, le=1, description="Progresso aproximado (0 a 1)")
+    criado_em: float
+    atualizado_em: float
+    expira_em: float = Field(..., description="Quando o job e o PDF deixam de estar disponíveis (epoch)")
+    concluido_em: Optional[float] = None
+    filename: Optional[str] = None
+    tamanho_bytes: Optional[int] = None
+    erro: Optional[str] = None
+    codigo_erro: Optional[int] = Field(None, description="Código HTTP que o endpoint síncrono teria devolvido")
+    webhook: Optional[dict] = Field(None, description="Resultado da notificação do callback_url")
+    status_url: str
+    pdf_url: str
+
 # Modelo para function_args (dados internos)
 class FunctionArgs(BaseModel):
     """
@@ -219,6 +306,19 @@ class FunctionArgs(BaseModel):
         description="Lista de imagens anexadas ao relatório"
     )
     
+    qualidade_graficos: Optional[str] = Field(
+        None,
+        description="Qualidade dos gráficos: 'vetor', 'alta', 'media' ou 'rascunho' (padrão do servidor se omitido)"
+    )
+    backend_graficos: Optional[str] = Field(
+        None,
+        description="Backend dos gráficos: 'matplotlib' ou 'reportlab' (nativo); padrão do servidor se omitido"
+    )
+    qualidade_imagens: Optional[str] = Field(
+        None,
+        description="Resolução das fotos no PDF: 'alta' (300 DPI), 'media' (200), 'rascunho' (150) ou 'original' (sem reamostrar); padrão do servidor se omitido"
+    )
+    
     class Config:
         extra = "ignore"  # Compatibilidade: ignora campos extras do Gemini
         validate_assignment = True  # Validação rigorosa
@@ -230,6 +330,24 @@ class FunctionArgs(BaseModel):
             return []
         return v
     
+    @validator('qualidade_graficos', pre=True)
+    def validar_qualidade_graficos(cls, v):
+        """Normaliza a qualidade dos gráficos (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_chart_quality
+        return validate_chart_quality(v) if v else None
+    
+    @validator('backend_graficos', pre=True)
+    def validar_backend_graficos(cls, v):
+        """Normaliza o backend dos gráficos (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_chart_backend
+        return validate_chart_backend(v) if v else None
+    
+    @validator('qualidade_imagens', pre=True)
+    def validar_qualidade_imagens(cls, v):
+        """Normaliza o perfil das imagens (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_image_quality
+        return validate_image_quality(v) if v else None
+    
     @validator('contenido_principal')
     def validar_conteudo_principal(cls, v):
         """Validação do conteúdo principal"""
@@ -320,10 +438,31 @@ class AdubacaoFunctionArgs(BaseModel):
         description="Observações técnicas adicionais (máximo 2000 caracteres)"
     )
     
+    qualidade_graficos: Optional[str] = Field(
+        None,
+        description="Qualidade dos gráficos: 'vetor', 'alta', 'media' ou 'rascunho' (padrão do servidor se omitido)"
+    )
+    backend_graficos: Optional[str] = Field(
+        None,
+        description="Backend dos gráficos: 'matplotlib' ou 'reportlab' (nativo); padrão do servidor se omitido"
+    )
+    
     class Config:
         extra = "ignore"  # Compatibilidade: ignora campos extras do Gemini
         validate_assignment = True  # Validação rigorosa
     
+    @validator('qualidade_graficos', pre=True)
+    def validar_qualidade_graficos(cls, v):
+        """Normaliza a qualidade dos gráficos (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_chart_quality
+        return validate_chart_quality(v) if v else None
+    
+    @validator('backend_graficos', pre=True)
+    def validar_backend_graficos(cls, v):
+        """Normaliza o backend dos gráficos (valores desconhecidos usam o padrão do servidor)"""
+        from .core.config import validate_chart_backend
+        return validate_chart_backend(v) if v else None
+    
     @validator('conteudo_principal')
     def validar_conteudo_principal(cls, v):
         """Validação do conteúdo principal"""
@@ -0,0 +1 @@
+# Render module - Process pool that runs CPU-bound PDF rendering off the event loop
@@ -0,0 +1,402 @@
+# Arquivo: render/engine.py
+# Motor de renderização: envia jobs de PDF para um pool limitado de processos
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core.config import (
+    RENDER_POOL_SIZE, RENDER_QUEUE_DEPTH, RENDER_RETRY_AFTER, RENDER_START_METHOD
+)
+from ..core.exceptions import (
+    PDFGenerationError, RenderQueueFullError, RenderTimeoutError, RenderCancelledError
+)
+from ..core.metrics import registrar_documento
+from ..core.tracing import span
+from ..utils.fonts import FONT_REGISTRY
+from .worker import executar_worker, executar_job
+
+# Intervalo máximo entre verificações do pipe enquanto o job executa
+POLL_INTERVAL = 0.1
+
+class EstatisticasRender:
+    """
+    Contadores do motor de renderização, com foco nos jobs encerrados à força.
+
+    Atualizados pelas threads de I/O do pool, por isso protegidos por lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs_concluidos = 0
+        self.jobs_com_erro = 0
+        self.jobs_encerrados = {'timeout': 0, 'cancelado': 0}
+        self.segundos_encerrados = 0.0
+        self.maior_duracao_encerrado = 0.0
+        self.ultimos_encerrados = deque(maxlen=20)
+
+    def registrar_resultado(self, sucesso):
+        """Conta um job que terminou normalmente (com ou sem erro de geração)."""
+        with self._lock:
+            if sucesso:
+                self.jobs_concluidos += 1
+            else:
+                self.jobs_com_erro += 1
+
+    def registrar_encerramento(self, motivo, nome_job, duracao):
+        """
+        Conta um job cujo processo foi morto.
+
+        Args:
+            motivo (str): 'timeout' ou 'cancelado'
+            nome_job (str): Nome do job encerrado
+            duracao (float): Quanto tempo o job rodou antes de ser morto (segundos)
+        """
+        with self._lock:
+            self.jobs_encerrados[motivo] += 1
+            self.segundos_encerrados += duracao
+            self.maior_duracao_encerrado = max(self.maior_duracao_encerrado, duracao)
+            self.ultimos_encerrados.append({
+                'job': nome_job,
+                'motivo': motivo,
+                'duracao_s': round(duracao, 3),
+                'timestamp': time.time(),
+            })
+
+    def como_dict(self):
+        """Retorna uma cópia dos contadores para o endpoint de monitoramento."""
+        with self._lock:
+            total_encerrados = sum(self.jobs_encerrados.values())
+            return {
+                'jobs_concluidos': self.jobs_concluidos,
+                'jobs_com_erro': self.jobs_com_erro,
+                'jobs_encerrados': dict(self.jobs_encerrados, total=total_encerrados),
+                'segundos_gastos_em_jobs_encerrados': round(self.segundos_encerrados, 3),
+                'maior_duracao_encerrado_s': round(self.maior_duracao_encerrado, 3),
+                'ultimos_encerrados': list(self.ultimos_encerrados),
+            }
+
+class RenderWorker:
+    """
+    Um processo worker pré-criado e o pipe usado para conversar com ele.
+
+    Todas as chamadas bloqueantes (send/poll/recv) acontecem em threads do
+    executor do RenderEngine, nunca no event loop.
+    """
+
+    def __init__(self, contexto, indice, estatisticas):
+        self.contexto = contexto
+        self.indice = indice
+        self.estatisticas = estatisticas
+        self.processo = None
+        self.conn = None
+        self.metricas = {}
+        self.iniciar()
+
+    def iniciar(self):
+        """Cria o processo worker e o pipe de comunicação."""
+        conn_pai, conn_filho = self.contexto.Pipe()
+        self.processo = self.contexto.Process(
+            target=executar_worker,
+            args=(conn_filho,),
+            name=f"render-worker-{self.indice}",
+            daemon=True,
+        )
+        self.processo.start()
+        conn_filho.close()
+        self.conn = conn_pai
+        self.metricas = {}
+        logging.info(f"Worker de renderização {self.indice} iniciado (PID {self.processo.pid})")
+
+    def encerrar(self, forcar=False):
+        """
+        Encerra o processo worker.
+
+        Args:
+            forcar (bool): Se True mata o processo imediatamente (SIGKILL)
+        """
+        if forcar:
+            self.processo.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.processo.join(timeout=5)
+        if self.processo.is_alive():
+            self.processo.kill()
+            self.processo.join()
+        self.conn.close()
+
+    def reiniciar(self):
+        """Mata o processo atual (liberando CPU e memória) e cria um novo no lugar."""
+        self.encerrar(forcar=True)
+        self.iniciar()
+
+    def _encerrar_job(self, motivo, nome_job, inicio):
+        """Mata o processo que está executando o job e registra quanto tempo ele rodou."""
+        duracao = time.monotonic() - inicio
+        logging.error(
+            f"Job '{nome_job}' encerrado ({motivo}) no worker {self.indice} "
+            f"(PID {self.processo.pid}) após {duracao:.2f}s; processo será recriado"
+        )
+        self.reiniciar()
+        self.estatisticas.registrar_encerramento(motivo, nome_job, duracao)
+
+    def executar(self, nome_job, dados, timeout, cancelado, perfil=None, trecho=None):
+        """
+        Executa um job no processo worker e aguarda o resultado.
+
+        Args:
+            nome_job (str): Nome do job registrado em render/worker.py
+            dados (dict): Dados do relatório
+            timeout (float): Tempo máximo de execução em segundos
+            cancelado (threading.Event): Sinalizado quando ninguém mais aguarda o resultado
+            perfil (dict): Se informado, recebe o perfil de layout do job
+            trecho (Span): Span que aguarda o job; recebe os spans do worker como filhos
+
+        Returns:
+            bytes: Resultado do job
+
+        Raises:
+            RenderTimeoutError: Se o job exceder o timeout (o processo é morto)
+            RenderCancelledError: Se o job for cancelado (o processo é morto)
+            PDFGenerationError: Se o processo worker morrer durante o job
+        """
+        inicio = time.monotonic()
+        limite = inicio + timeout
+
+        try:
+            self.conn.send((nome_job, dados, trecho.contexto() if trecho else None))
+            while not self.conn.poll(POLL_INTERVAL):
+                if cancelado.is_set():
+                    self._encerrar_job('cancelado', nome_job, inicio)
+                    raise RenderCancelledError(f"Renderização '{nome_job}' cancelada")
+                if time.monotonic() >= limite:
+                    self._encerrar_job('timeout', nome_job, inicio)
+                    raise RenderTimeoutError(
+                        f"Renderização excedeu o tempo limite de {timeout:.1f} segundos"
+                    )
+            status, resultado, self.metricas = self.conn.recv()
+            extras = {chave: self.metricas.pop(chave, None) for chave in ('perfil_layout', 'spans')}
+        except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+            logging.error(f"Worker de renderização {self.indice} morreu durante o job '{nome_job}': {e}")
+            self.reiniciar()
+            self.estatisticas.registrar_resultado(sucesso=False)
+            raise PDFGenerationError(f"Processo de renderização encerrado inesperadamente: {e}")
+
+        self.estatisticas.registrar_resultado(sucesso=(status == 'ok'))
+        if status == 'erro':
+            raise resultado
+        _entregar_extras(nome_job, resultado, extras, perfil, trecho)
+        return resultado
+
+def _entregar_extras(nome_job, resultado, extras, perfil, trecho):
+    """Registra as métricas do documento e repassa o perfil de layout e os spans do job a quem pediu."""
+    perfil_job = extras.get('perfil_layout')
+    registrar_documento(nome_job, len(resultado), perfil_job['contagens'] if perfil_job else None)
+    if perfil is not None and perfil_job:
+        perfil.update(perfil_job)
+    if trecho is not None and extras.get('spans'):
+        trecho.rastro.adicionar(extras['spans'])
+
+def _executar_local(nome_job, funcao, dados, perfil, trecho):
+    """Executa o job na thread atual (RENDER_POOL_SIZE=0), preenchendo `perfil` e `trecho` como RenderWorker.executar."""
+    resultado, extras = executar_job(nome_job, funcao, dados, trecho.contexto() if trecho else None)
+    _entregar_extras(nome_job, resultado, extras, perfil, trecho)
+    return resultado
+
+class RenderEngine:
+    """
+    Pool limitado de processos para renderização de PDFs.
+
+    - Os workers são criados uma vez (startup) e reutilizados entre requisições
+    - No máximo `tamanho_pool` jobs executam ao mesmo tempo e no máximo
+      `profundidade_fila` aguardam; acima disso RenderQueueFullError (HTTP 503)
+    - Um job que estoura o timeout, ou cuja requisição foi cancelada (ex: timeout
+      do middleware), tem o processo worker morto e recriado
+    - A vaga de um job só é liberada quando ele termina de verdade, então jobs
+      abandonados não se acumulam por cima dos novos
+    - Com `tamanho_pool=0` os jobs rodam em thread no próprio processo (modo
+      desenvolvimento); nesse modo não há como interromper um job em andamento
+    """
+
+    def __init__(self, tamanho_pool=RENDER_POOL_SIZE, profundidade_fila=RENDER_QUEUE_DEPTH,
+                 retry_after=RENDER_RETRY_AFTER, metodo_inicio=RENDER_START_METHOD):
+        self.tamanho_pool = max(0, tamanho_pool)
+        self.profundidade_fila = max(0, profundidade_fila)
+        self.retry_after = retry_after
+        self.metodo_inicio = metodo_inicio
+        self.workers = []
+        self._livres = None
+        self._executor = None
+        self._loop = None
+        self._pendentes = 0
+        self.estatisticas = EstatisticasRender()
+
+    @property
+    def capacidade(self):
+        """Número máximo de jobs aceitos simultaneamente (executando + na fila)."""
+        return max(1, self.tamanho_pool) + self.profundidade_fila
+
+    @property
+    def pendentes(self):
+        """Jobs aceitos que ainda não terminaram (executando + na fila)."""
+        return self._pendentes
+
+    def iniciar(self):
+        """Cria os processos do pool. Deve ser chamado dentro do event loop (startup)."""
+        self._loop = asyncio.get_running_loop()
+        self._livres = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.tamanho_pool),
+            thread_name_prefix="render-io",
+        )
+
+        if self.tamanho_pool == 0:
+            logging.warning("RENDER_POOL_SIZE=0: renderização em thread local, sem isolamento por processo")
+            FONT_REGISTRY.carregar()
+            return
+
+        contexto = multiprocessing.get_context(self.metodo_inicio)
+        for indice in range(self.tamanho_pool):
+            worker = RenderWorker(contexto, indice, self.estatisticas)
+            self.workers.append(worker)
+            self._livres.put_nowait(worker)
+
+        logging.info(
+            f"Motor de renderização pronto: {self.tamanho_pool} processos, "
+            f"fila de {self.profundidade_fila} jobs ({self.metodo_inicio})"
+        )
+
+    def encerrar(self):
+        """Encerra todos os workers e o executor de I/O."""
+        for worker in self.workers:
+            worker.encerrar()
+        self.workers = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        logging.info("Motor de renderização encerrado")
+
+    def metricas_workers(self):
+        """
+        Retorna as métricas mais recentes de cada worker (ver worker.coletar_metricas).
+
+        Returns:
+            list: Um dict por processo (no modo thread, as métricas do próprio processo)
+        """
+        if self.tamanho_pool == 0:
+            from .worker import coletar_metricas
+            return [coletar_metricas()]
+        return [worker.metricas for worker in self.workers if worker.metricas]
+
+    def pids_workers(self):
+        """PIDs dos processos worker em execução (lidos pelo amostrador de recursos)."""
+        return [worker.processo.pid for worker in self.workers if worker.processo is not None and worker.processo.pid]
+
+    def _liberar_worker(self, worker):
+        """Devolve o worker ao conjunto de livres (chamado no event loop)."""
+        self._livres.put_nowait(worker)
+
+    def _liberar_vaga(self):
+        """Libera a vaga de um job que terminou (chamado no event loop)."""
+        self._pendentes -= 1
+
+    async def renderizar(self, nome_job, dados, timeout, perfil=None):
+        """
+        Executa um job de renderização sem bloquear o event loop.
+
+        Com um rastro ativo (ver core/tracing.py) o job vira o span 'render', com a
+        espera por worker em 'fila' e os spans do processo worker como filhos.
+
+        Args:
+            nome_job (str): Nome do job ('dinamico' ou 'visita')
+            dados (dict): Dados do relatório
+            timeout (float): Tempo máximo em segundos, contando a espera na fila
+            perfil (dict): Se informado, recebe o perfil de layout do job (ver render/profiling.py)
+
+        Returns:
+            bytes: PDF gerado
+
+        Raises:
+            RenderQueueFullError: Se o pool e a fila estiverem cheios
+            RenderTimeoutError: Se o job exceder o timeout
+        """
+        with span('render', job=nome_job) as trecho:
+            if self._pendentes >= self.capacidade:
+                raise RenderQueueFullError(
+                    f"Fila de renderização cheia ({self._pendentes} jobs em andamento). "
+                    f"Tente novamente em {self.retry_after} segundos.",
+                    retry_after=self.retry_after,
+                )
+            self._pendentes += 1
+            cancelado = threading.Event()
+
+            try:
+                if self.tamanho_pool == 0:
+                    from .worker import _carregar_jobs
+                    funcao = _carregar_jobs()[nome_job]
+                    futuro = self._executor.submit(_executar_local, nome_job, funcao, dados, perfil, trecho)
+                else:
+                    inicio_espera = time.monotonic()
+                    try:
+                        with span('fila'):
+                            worker = await asyncio.wait_for(self._livres.get(), timeout)
+                    except asyncio.TimeoutError:
+                        raise RenderTimeoutError(
+                            f"Nenhum worker livre em {timeout:.1f} segundos (job ainda na fila)"
+                        )
+                    # O tempo de espera na fila é descontado do orçamento do job
+                    restante = max(0.0, timeout - (time.monotonic() - inicio_espera))
+                    futuro = self._executor.submit(worker.executar, nome_job, dados, restante, cancelado, perfil, trecho)
+                    # O worker só volta ao pool quando a thread termina de verdade
+                    futuro.add_done_callback(
+                        lambda _: self._loop.call_soon_threadsafe(self._liberar_worker, worker)
+                    )
+            except BaseException:
+                # Cancelado (ou falhou) antes de começar: a vaga é liberada na hora
+                self._pendentes -= 1
+                raise
+
+            futuro.add_done_callback(lambda _: self._loop.call_soon_threadsafe(self._liberar_vaga))
+
+            try:
+                return await asyncio.wrap_future(futuro)
+            except asyncio.CancelledError:
+                # Quem aguardava desistiu (timeout do middleware, cliente desconectou):
+                # a thread de I/O mata o processo worker em até POLL_INTERVAL
+                cancelado.set()
+                raise
+
+    async def renderizar_com_espera(self, nome_job, dados, timeout):
+        """
+        Como renderizar(), mas espera por vaga quando o pool e a fila estão cheios.
+
+        Usado por quem não tem um cliente HTTP aguardando a resposta (jobs
+        assíncronos e lotes): em vez de falhar com RenderQueueFullError, tenta
+        de novo a cada `retry_after` segundos até esgotar o timeout.
+
+        Args:
+            nome_job (str): Nome do job ('dinamico' ou 'visita')
+            dados (dict): Dados do relatório
+            timeout (float): Tempo máximo em segundos, contando a espera por vaga
+
+        Returns:
+            bytes: PDF gerado
+
+        Raises:
+            RenderTimeoutError: Se não houver vaga ou o job exceder o timeout
+        """
+        prazo = time.monotonic() + timeout
+        while True:
+            restante = prazo - time.monotonic()
+            if restante <= 0:
+                raise RenderTimeoutError(f"Job não conseguiu vaga no motor em {timeout:.0f} segundos")
+            try:
+                return await self.renderizar(nome_job, dados, timeout=restante)
+            except RenderQueueFullError:
+                await asyncio.sleep(min(self.retry_after, max(0.0, prazo - time.monotonic())))
@@ -0,0 +1,299 @@
+# Arquivo: render/profiling.py
+# Perfil de layout dos documentos: tempo de wrap/split/draw por tipo de flowable, etapas de montagem, páginas e
+# passadas do doc.build, com histogramas por tipo de documento
+
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+from reportlab.platypus import SimpleDocTemplate
+from reportlab.platypus.flowables import Flowable
+from reportlab.platypus.frames import Frame
+
+from ..core.config import LAYOUT_HISTOGRAM_BUCKETS
+from ..core.tracing import span
+
+# Métodos medidos: (classe, método, fase). Frame chama wrap e split direto no flowable da story, e
+# Table/KeepTogether usam wrapOn/splitOn nos internos; o tempo próprio de Frame.add, descontado o
+# drawOn medido dentro dele, é o wrap do flowable (classes que sobrescrevem drawOn, como KeepInFrame,
+# não têm o draw medido)
+_METODOS_MEDIDOS = (
+    (Flowable, 'wrapOn', 'wrap'),
+    (Flowable, 'splitOn', 'split'),
+    (Flowable, 'drawOn', 'draw'),
+    (Frame, 'add', 'wrap'),
+    (Frame, 'split', 'split'),
+)
+
+# Perfil do documento em renderização nesta thread (None = sem medição)
+_PERFIL_ATIVO = contextvars.ContextVar('perfil_layout', default=None)
+
+_lock_instalacao = threading.Lock()
+_instalado = False
+
+class PerfilLayout:
+    """
+    Medições de layout de um job de renderização.
+
+    Os tempos por flowable são exclusivos: o wrap de um Table não inclui o
+    wrap dos Paragraphs das células, que aparece em Paragraph. Assim a soma
+    de todos os componentes não conta nada duas vezes.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.tipo = job  # Trocado pelo tipo do documento em DocumentoPerfilado.build
+        self.inicio = time.perf_counter()
+        self.total = 0.0
+        self.build = 0.0
+        self.paginas = 0
+        self.passes = 0
+        self.etapas = {}      # etapa de montagem da story -> segundos
+        self.contagens = {}   # itens inseridos na story (imagens, gráficos, tabelas) -> quantidade
+        self.componentes = {}  # (componente, fase) -> [chamadas, segundos]
+        self._aninhado = [0.0]  # Pilha: tempo das chamadas internas de cada chamada em andamento
+
+    def registrar(self, componente, fase, segundos):
+        """Soma uma chamada de `segundos` (tempo exclusivo) ao componente e fase."""
+        medida = self.componentes.get((componente, fase))
+        if medida is None:
+            self.componentes[(componente, fase)] = [1, segundos]
+        else:
+            medida[0] += 1
+            medida[1] += segundos
+
+    def medir(self, componente, fase, funcao, *args, **kwargs):
+        """Executa funcao(*args, **kwargs) registrando o tempo exclusivo dela."""
+        pilha = self._aninhado
+        pilha.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            decorrido = time.perf_counter() - inicio
+            interno = pilha.pop()
+            pilha[-1] += decorrido
+            self.registrar(componente, fase, decorrido - interno)
+
+    def como_dict(self):
+        """
+        Retorna o perfil em um dict serializável (tempos em milissegundos).
+
+        Returns:
+            dict: tipo, job, total_ms, montagem_ms (story antes do build), build_ms,
+            paginas, passes, etapas_ms, contagens e flowables (componente -> fase -> chamadas e ms)
+        """
+        flowables = {}
+        for (componente, fase), (chamadas, segundos) in sorted(self.componentes.items()):
+            flowables.setdefault(componente, {})[fase] = {'chamadas': chamadas, 'ms': round(segundos * 1000, 2)}
+        return {
+            'tipo': self.tipo,
+            'job': self.job,
+            'total_ms': round(self.total * 1000, 2),
+            'montagem_ms': round((self.total - self.build) * 1000, 2),
+            'build_ms': round(self.build * 1000, 2),
+            'paginas': self.paginas,
+            'passes': self.passes,
+            'etapas_ms': {etapa: round(segundos * 1000, 2) for etapa, segundos in self.etapas.items()},
+            'contagens': dict(self.contagens),
+            'flowables': flowables,
+        }
+
+def _medido(classe, fase, original):
+    """Versão de um método de Flowable (ou de Frame, que recebe o flowable) que mede a chamada quando há perfil ativo."""
+    def metodo(self, *args, **kwargs):
+        perfil = _PERFIL_ATIVO.get()
+        if perfil is None:
+            return original(self, *args, **kwargs)
+        flowable = self if classe is Flowable else args[0]
+        return perfil.medir(type(flowable).__name__, fase, original, self, *args, **kwargs)
+    metodo.__name__ = original.__name__
+    metodo.__doc__ = original.__doc__
+    return metodo
+
+def instalar():
+    """Troca os métodos de _METODOS_MEDIDOS pelas versões medidas (uma vez por processo)."""
+    global _instalado
+    with _lock_instalacao:
+        if _instalado:
+            return
+        for classe, nome, fase in _METODOS_MEDIDOS:
+            setattr(classe, nome, _medido(classe, fase, getattr(classe, nome)))
+        _instalado = True
+
+@contextlib.contextmanager
+def perfilar(job):
+    """
+    Ativa um perfil de layout para o código executado dentro do bloco (nesta thread).
+
+    Args:
+        job (str): Nome do job de renderização
+
+    Yields:
+        PerfilLayout: Perfil preenchido durante o bloco (total só no fim)
+    """
+    instalar()
+    perfil = PerfilLayout(job)
+    token = _PERFIL_ATIVO.set(perfil)
+    try:
+        yield perfil
+    finally:
+        _PERFIL_ATIVO.reset(token)
+        perfil.total = time.perf_counter() - perfil.inicio
+
+@contextlib.contextmanager
+def etapa(nome):
+    """Soma o tempo do bloco à etapa de montagem `nome` do perfil ativo (sem perfil, não faz nada)."""
+    perfil = _PERFIL_ATIVO.get()
+    if perfil is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        perfil.etapas[nome] = perfil.etapas.get(nome, 0.0) + time.perf_counter() - inicio
+
+def contar(item):
+    """Conta um item inserido na story do perfil ativo ('imagens', 'graficos', 'tabelas')."""
+    perfil = _PERFIL_ATIVO.get()
+    if perfil is not None:
+        perfil.contagens[item] = perfil.contagens.get(item, 0) + 1
+
+class DocumentoPerfilado(SimpleDocTemplate):
+    """
+    SimpleDocTemplate que informa ao perfil ativo o tipo do documento, o tempo
+    do build, as páginas, as passadas de layout e o tempo dos callbacks de
+    página (fundo, cabeçalho e rodapé, registrados como 'Pagina'). O build
+    também vira o span 'doc.build' do rastro ativo (ver core/tracing.py).
+    """
+
+    def __init__(self, filename, tipo, **kw):
+        super().__init__(filename, **kw)
+        self.tipo_documento = tipo
+
+    def handle_documentBegin(self):
+        perfil = _PERFIL_ATIVO.get()
+        if perfil is not None:
+            perfil.passes += 1
+        super().handle_documentBegin()
+
+    def handle_pageBegin(self):
+        perfil = _PERFIL_ATIVO.get()
+        if perfil is None:
+            return super().handle_pageBegin()
+        return perfil.medir('Pagina', 'draw', super().handle_pageBegin)
+
+    def build(self, flowables, **kw):
+        perfil = _PERFIL_ATIVO.get()
+        with span('doc.build', documento=self.tipo_documento) as trecho:
+            inicio = time.perf_counter()
+            try:
+                return super().build(flowables, **kw)
+            finally:
+                if trecho is not None:
+                    trecho.atributos['paginas'] = self.page
+                if perfil is not None:
+                    perfil.tipo = self.tipo_documento
+                    perfil.build += time.perf_counter() - inicio
+                    perfil.paginas += self.page
+
+class EstatisticasLayout:
+    """
+    Histogramas dos perfis de layout deste processo, por tipo de documento.
+
+    Cada série (tipo, componente, fase) recebe uma observação por documento:
+    o tempo total gasto naquele componente e fase. Componente 'documento'
+    guarda o total, a montagem da story e o build; as etapas de montagem
+    usam a fase 'montagem'.
+    """
+
+    def __init__(self, buckets=LAYOUT_HISTOGRAM_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self._series = {}      # (tipo, componente, fase) -> [contagens por bucket (+Inf no fim), soma]
+        self._documentos = {}  # tipo -> [documentos, páginas, passadas]
+
+    def _observar(self, chave, segundos):
+        serie = self._series.get(chave)
+        if serie is None:
+            serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect.bisect_left(self.buckets, segundos)] += 1
+        serie[1] += segundos
+
+    def registrar(self, perfil):
+        """Registra um documento renderizado."""
+        with self._lock:
+            tipo = perfil.tipo
+            self._observar((tipo, 'documento', 'total'), perfil.total)
+            self._observar((tipo, 'documento', 'montagem'), perfil.total - perfil.build)
+            self._observar((tipo, 'documento', 'build'), perfil.build)
+            for nome, segundos in perfil.etapas.items():
+                self._observar((tipo, nome, 'montagem'), segundos)
+            for (componente, fase), (_, segundos) in perfil.componentes.items():
+                self._observar((tipo, componente, fase), segundos)
+            contadores = self._documentos.setdefault(tipo, [0, 0, 0])
+            contadores[0] += 1
+            contadores[1] += perfil.paginas
+            contadores[2] += perfil.passes
+
+    def estatisticas(self):
+        """
+        Retorna os histogramas deste processo.
+
+        Returns:
+            dict: buckets (limites em segundos), series (uma por tipo, componente
+            e fase, com as contagens de cada bucket, a última acima do maior
+            limite, e a soma) e documentos (quantidade, páginas e passadas por tipo)
+        """
+        with self._lock:
+            return {
+                'buckets': list(self.buckets),
+                'series': [
+                    {'tipo': tipo, 'componente': componente, 'fase': fase,
+                     'contagens': list(contagens), 'soma': round(soma, 6)}
+                    for (tipo, componente, fase), (contagens, soma) in sorted(self._series.items())
+                ],
+                'documentos': {
+                    tipo: {'documentos': documentos, 'paginas': paginas, 'passes': passes}
+                    for tipo, (documentos, paginas, passes) in sorted(self._documentos.items())
+                },
+            }
+
+# Instância única por processo
+ESTATISTICAS_LAYOUT = EstatisticasLayout()
+
+def somar_estatisticas_layout(lista):
+    """
+    Soma os histogramas de layout de vários processos worker.
+
+    Args:
+        lista (list): Dicts retornados por EstatisticasLayout.estatisticas()
+
+    Returns:
+        dict: Mesmo formato, com as séries e contadores somados
+    """
+    series = {}
+    documentos = {}
+    buckets = list(LAYOUT_HISTOGRAM_BUCKETS)
+    for estatisticas in lista:
+        buckets = estatisticas.get('buckets', buckets)
+        for serie in estatisticas.get('series', []):
+            chave = (serie['tipo'], serie['componente'], serie['fase'])
+            total = series.get(chave)
+            if total is None:
+                series[chave] = dict(serie, contagens=list(serie['contagens']))
+            else:
+                total['contagens'] = [a + b for a, b in zip(total['contagens'], serie['contagens'])]
+                total['soma'] = round(total['soma'] + serie['soma'], 6)
+        for tipo, contadores in estatisticas.get('documentos', {}).items():
+            total = documentos.setdefault(tipo, {'documentos': 0, 'paginas': 0, 'passes': 0})
+            for campo in total:
+                total[campo] += contadores.get(campo, 0)
+    return {
+        'buckets': buckets,
+        'series': [series[chave] for chave in sorted(series)],
+        'documentos': dict(sorted(documentos.items())),
+    }
@@ -0,0 +1,147 @@
+# Arquivo: render/worker.py
+# Loop executado dentro de cada processo do pool de renderização
+
+import contextlib
+import logging
+import os
+import pickle
+import signal
+
+from ..core.config import LAYOUT_PROFILING
+from ..core.exceptions import PDFGenerationError
+from ..core.tracing import rastrear, span
+from ..graphics.chart_cache import CHART_CACHE
+from ..images.resample import ESTATISTICAS_IMAGENS
+from ..utils.fonts import FONT_REGISTRY
+from ..utils.assets import ASSET_REGISTRY
+from ..utils.styles import STYLE_CATALOG
+from .profiling import ESTATISTICAS_LAYOUT, perfilar
+
+def _carregar_jobs():
+    """
+    Importa as funções de renderização disponíveis para os workers.
+
+    O import acontece uma única vez na inicialização do processo, então
+    ReportLab e o backend de gráficos padrão (CHART_BACKEND) já estão
+    carregados quando o primeiro job chega. O outro backend só é importado
+    se alguma requisição pedir por ele.
+
+    Returns:
+        dict: Mapeamento nome do job -> função que recebe o dict de dados e retorna bytes
+    """
+    from ..pdf_generator import create_pdf_from_data, preencher_pdf_template
+    from ..graphics.chart_factory import ChartFactory
+    from ..core.config import CHART_BACKEND, validate_chart_backend
+
+    ChartFactory.carregar_backend(validate_chart_backend(CHART_BACKEND))
+
+    return {
+        'dinamico': create_pdf_from_data,
+        'visita': preencher_pdf_template,
+    }
+
+def _erro_serializavel(erro):
+    """
+    Garante que a exceção possa voltar ao processo principal pelo pipe.
+
+    Args:
+        erro (Exception): Exceção levantada pelo job
+
+    Returns:
+        Exception: A própria exceção ou um PDFGenerationError equivalente
+    """
+    try:
+        pickle.dumps(erro)
+        return erro
+    except Exception:
+        return PDFGenerationError(f"{type(erro).__name__}: {erro}")
+
+def coletar_metricas():
+    """
+    Coleta os contadores locais do processo worker.
+
+    Os caches e a preparação de imagens vivem dentro de cada worker, então os
+    contadores voltam ao processo principal junto com cada resposta.
+
+    Returns:
+        dict: Métricas do processo
+    """
+    return {
+        'chart_cache': CHART_CACHE.estatisticas(),
+        'imagens': ESTATISTICAS_IMAGENS.estatisticas(),
+        'layout': ESTATISTICAS_LAYOUT.estatisticas(),
+    }
+
+def executar_job(nome_job, funcao, dados, contexto=None):
+    """
+    Executa um job de renderização com o perfil de layout (ver render/profiling.py)
+    e, se a requisição for rastreada, os spans das etapas (ver core/tracing.py).
+
+    Args:
+        nome_job (str): Nome do job
+        funcao: Função do job (recebe o dict de dados e retorna bytes)
+        dados (dict): Dados do relatório
+        contexto (tuple): (trace_id, span_id) do span que aguarda o job, ou None sem rastreamento
+
+    Returns:
+        tuple: (resultado, extras) com extras['perfil_layout'] (dict, ou None se
+        LAYOUT_PROFILING estiver desativado) e extras['spans'] (lista de spans do job)
+    """
+    with rastrear(*contexto) if contexto else contextlib.nullcontext() as rastro:
+        with span('job', job=nome_job, **{'process.pid': os.getpid()}):
+            if LAYOUT_PROFILING:
+                with perfilar(nome_job) as perfil:
+                    resultado = funcao(dados)
+                ESTATISTICAS_LAYOUT.registrar(perfil)
+            else:
+                resultado, perfil = funcao(dados), None
+    return resultado, {
+        'perfil_layout': perfil.como_dict() if perfil else None,
+        'spans': rastro.spans if rastro else [],
+    }
+
+def executar_worker(conn):
+    """
+    Ponto de entrada do processo worker.
+
+    Recebe mensagens (nome_job, dados, contexto do rastro) pelo pipe, executa a
+    renderização e devolve ('ok', resultado, métricas) ou ('erro', exceção,
+    métricas). Em caso de sucesso as métricas trazem também o perfil de layout
+    ('perfil_layout') e os spans ('spans') do job. Uma mensagem None encerra o loop.
+
+    Args:
+        conn: Extremidade do multiprocessing.Pipe pertencente ao worker
+    """
+    # Ctrl+C é tratado pelo processo principal, que encerra os workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    jobs = _carregar_jobs()
+
+    # Registra as fontes TTF, prepara as imagens dos templates e monta os estilos antes do primeiro job (uma vez por processo)
+    FONT_REGISTRY.carregar()
+    ASSET_REGISTRY.carregar()
+    STYLE_CATALOG.carregar()
+
+    while True:
+        try:
+            mensagem = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if mensagem is None:
+            break
+
+        nome_job, dados, contexto = mensagem
+        try:
+            if nome_job not in jobs:
+                raise PDFGenerationError(f"Job de renderização desconhecido: {nome_job}")
+            resultado, extras = executar_job(nome_job, jobs[nome_job], dados, contexto)
+            resposta = ('ok', resultado, dict(coletar_metricas(), **extras))
+        except Exception as e:
+            resposta = ('erro', _erro_serializavel(e), coletar_metricas())
+
+        try:
+            conn.send(resposta)
+        except (BrokenPipeError, OSError):
+            break
@@ -0,0 +1 @@
+# Tables module - Content-aware column widths and page-sized table splitting
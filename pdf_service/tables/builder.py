@@ -0,0 +1,236 @@
+# Arquivo: tables/builder.py
+# Tabelas do corpo dos relatórios: larguras pelo conteúdo, células leves e paginação em blocos do tamanho da página
+
+import bisect
+import itertools
+import logging
+import re
+
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.platypus import Flowable, Paragraph, Table
+
+from ..core.config import TABLE_PAGINATION_ROWS
+from ..text.html_cleaner import limpar_html_malformado
+from ..text.unicode_handler import corrigir_caracteres_especiais
+from ..utils.styles import cor
+from .layout import texto_visivel, medir_texto, medir_colunas, distribuir_larguras
+
+# ===============================
+# PADRÕES COMPILADOS (UMA VEZ POR PROCESSO)
+# ===============================
+
+_PADRAO_BR = re.compile(r'<br\s*/?>')
+
+# Espaçamentos das células (os mesmos dos comandos de estilo, usados também no cálculo das alturas)
+PADDING_HORIZONTAL = 6   # Padrão do ReportLab, à esquerda e à direita
+PADDING_CABECALHO = 10   # Acima e abaixo, na linha de cabeçalho
+PADDING_CORPO = 8        # Acima e abaixo, nas linhas de dados
+
+_ALINHAMENTOS = {TA_CENTER: 'CENTER', TA_RIGHT: 'RIGHT'}
+
+def _ler_tabela(table_string):
+    """
+    Separa título e linhas de células do texto de um bloco [TABELA].
+
+    Returns:
+        tuple: (título, linhas de células) ou None se não houver dados
+    """
+    table_string_normalized = _PADRAO_BR.sub('\n', table_string.strip())
+    linhas = [linha.strip() for linha in table_string_normalized.split('\n') if linha.strip()]
+    if len(linhas) < 2:
+        logging.warning(f"Dados insuficientes para criar tabela a partir de: {table_string}")
+        return None
+
+    titulo_tabela, *dados_tabela_str = linhas
+
+    dados_tabela = []
+    for linha in dados_tabela_str:
+        # Dividir por | e limpar espaços, removendo células vazias no início/fim
+        celulas = [cell.strip() for cell in linha.split('|')]
+        # Remover células vazias no início e fim (comuns quando linha começa/termina com |)
+        while celulas and not celulas[0]:
+            celulas.pop(0)
+        while celulas and not celulas[-1]:
+            celulas.pop()
+        if celulas:
+            dados_tabela.append(celulas)
+
+    if not dados_tabela:
+        logging.warning(f"Nenhuma linha de dados válida encontrada para a tabela: {titulo_tabela}")
+        return None
+    return titulo_tabela, dados_tabela
+
+def _comandos_estilo(cores_paleta, estilo_celula):
+    """Comandos de TableStyle da tabela (sem as cores alternadas das linhas)."""
+    # Células de texto simples (strings) usam a mesma fonte, cor e alinhamento do estilo de célula
+    comandos = [
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('ALIGN', (0, 1), (-1, -1), _ALINHAMENTOS.get(estilo_celula.alignment, 'LEFT')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 1), (-1, -1), estilo_celula.fontName),
+        ('FONTSIZE', (0, 1), (-1, -1), estilo_celula.fontSize),
+        ('LEADING', (0, 1), (-1, -1), estilo_celula.leading),
+        ('TEXTCOLOR', (0, 1), (-1, -1), estilo_celula.textColor),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), PADDING_CABECALHO),
+        ('TOPPADDING', (0, 0), (-1, 0), PADDING_CABECALHO),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), PADDING_CORPO),
+        ('TOPPADDING', (0, 1), (-1, -1), PADDING_CORPO),
+    ]
+
+    # Estilo clean para Dr. Pasto / preto e branco
+    if cores_paleta.get('principal') in ['#000000', '#1A1A1A']:
+        comandos += [
+            ('BACKGROUND', (0, 0), (-1, 0), cor('#f5f5f5')),
+            ('LINEBELOW', (0, 0), (-1, 0), 1, cor('#cccccc')),
+            ('LINEBELOW', (0, 1), (-1, -2), 0.5, cor('#eeeeee')),
+        ]
+    else:
+        # Estilo moderno para relatórios coloridos
+        comandos += [
+            ('BACKGROUND', (0, 0), (-1, 0), cor(cores_paleta['principal'])),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, cor(cores_paleta['destaque'])),
+            ('LINEBELOW', (0, 1), (-1, -2), 0.5, cor('#E0E0E0')),
+        ]
+    return comandos
+
+class TabelaPaginada(Flowable):
+    """
+    Tabela longa entregue ao documento em blocos do tamanho do espaço livre.
+
+    As alturas das linhas são calculadas uma única vez; a cada quebra de
+    página o bloco que cabe é achado por busca binária nas alturas
+    acumuladas e só ele vira um Table (com o cabeçalho repetido). O Table
+    do ReportLab, ao contrário, recalcula e copia todas as linhas restantes
+    a cada página, o que é quadrático em tabelas de centenas de linhas.
+    """
+
+    def __init__(self, cabecalho, linhas, larguras, alturas, comandos, cores_linhas, inicio=0, acumuladas=None):
+        super().__init__()
+        self.cabecalho = cabecalho
+        self.linhas = linhas
+        self.larguras = larguras
+        self.alturas = alturas  # [cabeçalho, linha 1, linha 2, ...]
+        self.comandos = comandos
+        self.cores_linhas = cores_linhas
+        self.inicio = inicio
+        # acumuladas[k] = altura das k primeiras linhas de dados
+        self.acumuladas = acumuladas or list(itertools.accumulate(alturas[1:], initial=0))
+        self.hAlign = 'CENTER'
+
+    def _altura(self, fim):
+        return self.alturas[0] + self.acumuladas[fim] - self.acumuladas[self.inicio]
+
+    def _bloco(self, fim):
+        """Table com o cabeçalho e as linhas de dados [inicio, fim)."""
+        # As cores alternadas seguem a numeração da tabela inteira
+        cores = self.cores_linhas if self.inicio % 2 == 0 else self.cores_linhas[::-1]
+        return Table(
+            [self.cabecalho] + self.linhas[self.inicio:fim],
+            colWidths=self.larguras,
+            rowHeights=[self.alturas[0]] + self.alturas[self.inicio + 1:fim + 1],
+            style=self.comandos + [('ROWBACKGROUNDS', (0, 1), (-1, -1), cores)],
+            repeatRows=1,
+        )
+
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.larguras)
+        self.height = self._altura(len(self.linhas))
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        limite = self.acumuladas[self.inicio] + availHeight - self.alturas[0] + rl_config._FUZZ
+        fim = bisect.bisect_right(self.acumuladas, limite) - 1
+        if fim <= self.inicio:
+            return []
+        if fim >= len(self.linhas):
+            return [self._bloco(len(self.linhas))]
+        restante = TabelaPaginada(self.cabecalho, self.linhas, self.larguras, self.alturas,
+                                  self.comandos, self.cores_linhas, fim, self.acumuladas)
+        return [self._bloco(fim), restante]
+
+    def draw(self):
+        tabela = self._bloco(len(self.linhas))
+        tabela.wrapOn(self.canv, self.width, self.height)
+        tabela.drawOn(self.canv, 0, 0)
+
+def _altura_linha(celulas, larguras, padding_vertical, leading):
+    """Altura de uma linha como o Table calcularia: maior conteúdo mais o padding."""
+    altura = 0
+    for celula, largura in zip(celulas, larguras):
+        if isinstance(celula, Flowable):
+            conteudo = celula.wrap(largura - 2 * PADDING_HORIZONTAL, 72000)[1]
+        else:
+            conteudo = leading
+        if conteudo > altura:
+            altura = conteudo
+    return altura + 2 * padding_vertical
+
+def criar_tabela(table_string, cores_paleta, total_width, estilos):
+    """
+    Cria a tabela de um bloco [TABELA] (título na primeira linha, células separadas por '|').
+
+    As colunas são medidas uma vez (larguras de texto em cache) e recebem
+    larguras proporcionais ao conteúdo. Células sem marcação que cabem em uma
+    linha viram strings, desenhadas direto pelo Table, e só as demais viram
+    Paragraph. Tabelas com mais de TABLE_PAGINATION_ROWS linhas são
+    paginadas por TabelaPaginada.
+
+    Args:
+        table_string (str): Conteúdo do bloco de tabela
+        cores_paleta (dict): Paleta de cores do documento
+        total_width (float): Largura disponível em pontos
+        estilos (Mapping): Estilos do documento (ver utils/styles.py)
+
+    Returns:
+        list: [título, tabela], um parágrafo com o texto original se a tabela
+        for inválida, ou None se não houver dados
+    """
+    try:
+        lido = _ler_tabela(table_string)
+        if lido is None:
+            return None
+        titulo_tabela, dados_tabela = lido
+
+        cell_style = estilos['CelulaTabela']
+        header_style = estilos['CabecalhoTabela']
+
+        cabecalho = [corrigir_caracteres_especiais(cell) for cell in dados_tabela[0]]
+        corpo = [[corrigir_caracteres_especiais(cell.replace('\n', ' ')) for cell in row] for row in dados_tabela[1:]]
+
+        # Medição: uma vez por texto distinto, com a fonte de cada linha
+        visiveis = [[texto_visivel(cell) for cell in row] for row in [cabecalho] + corpo]
+        fontes = [(header_style.fontName, header_style.fontSize)] + [(cell_style.fontName, cell_style.fontSize)] * len(corpo)
+        naturais, minimas = medir_colunas(visiveis, fontes, 2 * PADDING_HORIZONTAL)
+        col_widths = distribuir_larguras(naturais, minimas, total_width)
+
+        header_row = [Paragraph(f'<b>{cell}</b>', header_style) for cell in cabecalho]
+        linhas = []
+        for row, visivel in zip(corpo, visiveis[1:]):
+            linha = []
+            for cell, texto, largura in zip(row, visivel, col_widths):
+                if ('<' in cell or '&' in cell
+                        or medir_texto(texto, cell_style.fontName, cell_style.fontSize)[0] + 2 * PADDING_HORIZONTAL > largura):
+                    linha.append(Paragraph(limpar_html_malformado(cell), cell_style))
+                else:
+                    linha.append(texto)
+            linhas.append(linha)
+
+        # Alturas calculadas uma vez: o Table não precisa medir as linhas de novo a cada quebra de página
+        alturas = [_altura_linha(header_row, col_widths, PADDING_CABECALHO, header_style.leading)]
+        alturas += [_altura_linha(linha, col_widths, PADDING_CORPO, cell_style.leading) for linha in linhas]
+
+        comandos = _comandos_estilo(cores_paleta, cell_style)
+        # Zebra striping com cor da paleta (ou fallback para cinza)
+        cores_linhas = [colors.white, cor(cores_paleta.get('zebra', '#F5F5F5'))]
+
+        tabela = TabelaPaginada(header_row, linhas, col_widths, alturas, comandos, cores_linhas)
+        if len(linhas) <= TABLE_PAGINATION_ROWS:
+            tabela = tabela._bloco(len(linhas))
+
+        logging.info(f"Tabela criada: {titulo_tabela} ({len(linhas)} linhas, {len(col_widths)} colunas)")
+        return [Paragraph(titulo_tabela, estilos['TituloTabela']), tabela]
+    except Exception as e:
+        logging.error(f"Erro ao criar tabela: {e}", exc_info=True)
+        return [Paragraph(limpar_html_malformado((table_string or '').replace('\n', '<br/>')), estilos['TabelaInvalida'])]
@@ -0,0 +1,97 @@
+# Arquivo: tables/layout.py
+# Medição do conteúdo das colunas (larguras de texto em cache) e distribuição proporcional da largura da tabela
+
+import functools
+import html
+import re
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# ===============================
+# PADRÕES COMPILADOS (UMA VEZ POR PROCESSO)
+# ===============================
+
+_PADRAO_TAG = re.compile(r'<[^<>]*>')
+
+def texto_visivel(celula):
+    """Texto que o Paragraph desenha: sem tags, com entidades resolvidas e espaços colapsados."""
+    if '<' in celula or '&' in celula:
+        celula = html.unescape(_PADRAO_TAG.sub('', celula))
+    return ' '.join(celula.split())
+
+@functools.lru_cache(maxsize=8192)
+def medir_texto(texto, fonte, tamanho):
+    """
+    Mede um texto de célula uma vez por processo (valores se repetem muito entre linhas e tabelas).
+
+    Args:
+        texto (str): Texto visível, em uma linha
+        fonte (str): Nome da fonte registrada
+        tamanho (float): Tamanho da fonte em pontos
+
+    Returns:
+        tuple: (largura natural em uma linha, largura da maior palavra)
+    """
+    natural = stringWidth(texto, fonte, tamanho)
+    if ' ' not in texto:
+        return natural, natural
+    return natural, max(stringWidth(palavra, fonte, tamanho) for palavra in texto.split(' '))
+
+def medir_colunas(linhas, fontes, padding):
+    """
+    Mede o conteúdo de cada coluna.
+
+    Args:
+        linhas (list): Linhas de textos visíveis (a primeira é o cabeçalho)
+        fontes (list): (fonte, tamanho) de cada linha; tipicamente o cabeçalho em bold e o corpo regular
+        padding (float): Espaço horizontal da célula (esquerda + direita)
+
+    Returns:
+        tuple: (larguras naturais, larguras mínimas) por coluna, já com o padding
+    """
+    num_colunas = max(len(linha) for linha in linhas)
+    naturais = [0.0] * num_colunas
+    minimas = [0.0] * num_colunas
+    for linha, (fonte, tamanho) in zip(linhas, fontes):
+        for j, texto in enumerate(linha):
+            if not texto:
+                continue
+            natural, minima = medir_texto(texto, fonte, tamanho)
+            if natural > naturais[j]:
+                naturais[j] = natural
+            if minima > minimas[j]:
+                minimas[j] = minima
+    return [n + padding for n in naturais], [m + padding for m in minimas]
+
+def distribuir_larguras(naturais, minimas, total):
+    """
+    Divide a largura da tabela entre as colunas, proporcionalmente ao conteúdo.
+
+    - Se todo o conteúdo cabe em uma linha, cada coluna recebe sua largura
+      natural e a sobra é repartida na proporção dessas larguras
+    - Senão, cada coluna recebe ao menos sua maior palavra e o restante vai
+      para as colunas na proporção do texto que ainda precisa quebrar
+
+    Se nem as maiores palavras cabem, elas só são garantidas até a largura
+    de uma divisão igual (como antes), para que uma palavra enorme não
+    esprema as demais colunas.
+
+    Args:
+        naturais (list): Larguras sem quebra de linha
+        minimas (list): Larguras da maior palavra (limite para não estourar a célula)
+        total (float): Largura disponível
+
+    Returns:
+        list: Largura de cada coluna, somando `total`
+    """
+    soma_naturais = sum(naturais)
+    if soma_naturais <= total:
+        return [total * n / soma_naturais for n in naturais]
+
+    if sum(minimas) > total:
+        teto = total / len(naturais)
+        minimas = [min(m, teto) for m in minimas]
+    sobra = total - sum(minimas)
+    faltas = [n - m for n, m in zip(naturais, minimas)]
+    soma_faltas = sum(faltas)
+    return [m + sobra * f / soma_faltas for m, f in zip(minimas, faltas)]
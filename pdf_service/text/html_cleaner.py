@@ -2,17 +2,50 @@
 # Limpeza e sanitização de HTML malformado
 
 import re
-import logging
+
+# ===============================
+# PADRÕES COMPILADOS (UMA VEZ POR PROCESSO)
+# ===============================
+
+# Tags de formatação balanceadas (aninhar a mesma tag não tem efeito; "<b>x<b>" fecha o negrito)
+TAGS_FORMATACAO = frozenset({'b', 'i', 'u', 'sup', 'sub', 'super', 'strike', 'strong', 'em'})
+# Demais tags do parser de parágrafos do ReportLab: as com par também são balanceadas, as vazias passam direto
+TAGS_PAREADAS = TAGS_FORMATACAO | {'font', 'span', 'a', 'link', 'greek', 'nobr', 'bullet'}
+TAGS_VAZIAS = frozenset({'br', 'img', 'seq', 'seqdefault', 'seqreset', 'seqchain', 'seqformat',
+                         'ondraw', 'index', 'unichar', 'pagenumber'})
+
+# Uma varredura: tag conhecida (<nome ...> ou </nome>), '<' solto (inclusive o de tags
+# desconhecidas, cujo resto segue como texto) ou '&' que não inicia uma entidade
+_PADRAO_HTML = re.compile(
+    r'(?=[<&])(?:<(/?)((?i:' + '|'.join(sorted(TAGS_PAREADAS | TAGS_VAZIAS | {'para'}, key=len, reverse=True)) + r'))'
+    r'(?![A-Za-z0-9])([^<>]*)>'
+    r'|(<)'
+    r'|&(?![A-Za-z][A-Za-z0-9]*;|#[0-9]+;|#[xX][0-9A-Fa-f]+;))'
+)
+
+# Caso comum já correto, que o balanceador devolveria sem mudanças: texto, <br/>, entidades e pares de
+# formatação sem atributos e não vazios, sem outras tags dentro. Quantificadores possessivos: sem
+# retrocesso, tempo linear mesmo quando a verificação falha.
+_TRECHO_CORRETO = r'(?:[^<&]++|<br/>|&(?:[A-Za-z][A-Za-z0-9]*+|#[0-9]++|#[xX][0-9A-Fa-f]++);)'
+_PADRAO_JA_BALANCEADO = re.compile(
+    r'(?:' + _TRECHO_CORRETO + r'|<(' + '|'.join(sorted(TAGS_FORMATACAO, key=len, reverse=True)) + r')>'
+    + _TRECHO_CORRETO + r'++</\1>)*+'
+)
 
 def limpar_html_malformado(texto):
     """
     Limpa e corrige HTML malformado para uso em PDFs.
     
-    Corrige problemas comuns como:
-    - Tags não fechadas
-    - Tags duplicadas
-    - Tags <para> desnecessárias
-    - Caracteres especiais não escapados
+    Balanceador de tags com pilha, em uma única passada (tempo linear):
+    - Tags não fechadas são fechadas no fim do texto (ou quando o texto
+      abre de novo a mesma tag de formatação: "<b>x<b>" vira "<b>x</b>")
+    - Fechamentos sem abertura são descartados; fechar uma tag com outras
+      abertas por cima fecha também essas (nada fica cruzado)
+    - Pares de formatação vazios e tags <para> são removidos
+    - '&' vira '&amp;', exceto quando já inicia uma entidade (&deg;, &#176;)
+    - '<' que não inicia uma tag conhecida pelo ReportLab vira '&lt;'
+    
+    O resultado é sempre aceito pelo parser de parágrafos do ReportLab.
     
     Args:
         texto (str): Texto HTML possivelmente malformado
@@ -22,61 +55,64 @@ def limpar_html_malformado(texto):
     """
     if not texto:
         return ""
-    
-    # Remove tags <para> desnecessárias
-    texto = re.sub(r'</?para>', '', texto)
-    
-    # Corrige tags <b> malformadas
-    texto = re.sub(r'<b>(?!.*</b>.*$)', '<b>', texto)
-    texto = re.sub(r'<b>([^<]*)<b>', r'<b>\1</b>', texto)
-    texto = re.sub(r'<b>([^<]*)$', r'<b>\1</b>', texto)
-    
-    # Corrige outras tags malformadas
-    texto = re.sub(r'<i>(?!.*</i>)', '<i>', texto)
-    texto = re.sub(r'<i>([^<]*)<i>', r'<i>\1</i>', texto)
-    texto = re.sub(r'<u>(?!.*</u>)', '<u>', texto)
-    texto = re.sub(r'<u>([^<]*)<u>', r'<u>\1</u>', texto)
-    
-    # Escapa caracteres especiais (&), mas preserva tags HTML válidas
-    texto = texto.replace('&', '&amp;')
-    # Não escapa < e > pois já temos HTML válido
-    
-    # Remove tags <b> não fechadas no final
-    if texto.endswith('<b>'):
-        texto = texto[:-3]
-    
-    return texto
+    if '<' not in texto and '&' not in texto:
+        return texto
+    if _PADRAO_JA_BALANCEADO.fullmatch(texto):
+        return texto
+    return _balancear_tags(texto)
 
-def limpeza_agressiva_html(texto):
-    """
-    Realiza limpeza agressiva de HTML quando a limpeza normal falha.
-    
-    Remove todas as tags HTML quando detecta problemas irrecuperáveis.
-    
-    Args:
-        texto (str): Texto HTML problemático
-        
-    Returns:
-        str: Texto limpo (possivelmente sem HTML)
-    """
-    if not texto:
-        return ""
-    
-    # Remove tags <para> desnecessárias
-    texto = re.sub(r'</?para>', '', texto)
-    
-    # Remove tags <b> malformadas no final
-    texto = re.sub(r'<b>([^<]*)$', r'\1', texto)
-    
-    # Remove tags vazias
-    texto = re.sub(r'<b>\s*</b>', '', texto)
-    
-    # Se ainda há tags <b> não fechadas, remove todas as tags
-    if '<b>' in texto and '</b>' not in texto:
-        logging.warning("HTML irrecuperável detectado, removendo todas as tags")
-        texto = re.sub(r'<[^>]+>', '', texto)
-    
-    return texto
+def _balancear_tags(texto):
+    """Passada com pilha de limpar_html_malformado (sem os atalhos para texto já correto)."""
+    saida = []
+    pilha = []  # (nome, posição da abertura em saida)
+    abertas = {}
+    posicao = 0
+
+    def fechar_topo():
+        nome, indice = pilha.pop()
+        abertas[nome] -= 1
+        if indice == len(saida) - 1 and nome in TAGS_FORMATACAO:
+            saida.pop()  # Par vazio
+        else:
+            saida.append(f'</{nome}>')
+
+    for match in _PADRAO_HTML.finditer(texto):
+        inicio = match.start()
+        if inicio > posicao:
+            saida.append(texto[posicao:inicio])
+        posicao = match.end()
+
+        fecha, nome, resto, menor = match.groups()
+        if nome is None:
+            saida.append('&lt;' if menor else '&amp;')
+            continue
+
+        nome = nome.lower()
+        if nome == 'para':
+            continue
+        if nome in TAGS_VAZIAS or resto.endswith('/'):
+            if not fecha:
+                saida.append(match.group())
+            continue
+
+        if fecha:
+            if abertas.get(nome):
+                while pilha[-1][0] != nome:
+                    fechar_topo()
+                fechar_topo()
+        elif pilha and pilha[-1][0] == nome and nome in TAGS_FORMATACAO:
+            fechar_topo()
+        else:
+            pilha.append((nome, len(saida)))
+            abertas[nome] = abertas.get(nome, 0) + 1
+            saida.append(match.group())
+
+    if posicao < len(texto):
+        saida.append(texto[posicao:])
+    while pilha:
+        fechar_topo()
+
+    return ''.join(saida)
 
 def sanitize_html_for_reportlab(texto):
     """
@@ -1,8 +1,36 @@
 # Arquivo: text/markdown_processor.py
-# Conversão de Markdown para HTML compatível com ReportLab
+# Conversão de Markdown para HTML compatível com ReportLab e para descritores de flowables
 
 import re
 from .unicode_handler import corrigir_caracteres_especiais
+from .tokenizer import TipoToken, Token
+
+# ===============================
+# PADRÕES COMPILADOS (UMA VEZ POR PROCESSO)
+# ===============================
+
+# Letras consideradas por _is_section_title
+_PADRAO_MINUSCULA = re.compile(r'[a-záéíóúàèìòùâêîôûãõäëïöüç]')
+_PADRAO_MAIUSCULAS = re.compile(r'[A-ZÁÉÍÓÚÀÈÌÒÙÂÊÎÔÛÃÕÄËÏÖÜÇ]')
+
+# Estrutura de uma linha (já sem espaços nas pontas), na ordem de prioridade de converter_markdown_para_html
+_PADRAO_LINHA = re.compile(
+    r'(?P<separador>-{3,}\Z)'
+    r'|(?P<numeracao>\d+(?:\.\d+)*)\)\s+(?P<titulo>.+)'
+    r'|(?P<numero>\d+)\.\s+(?P<item>.+)'
+    r'|(?P<cerquilhas>#{1,6})\s+(?P<cabecalho>.+)'
+)
+
+_PADRAO_NEGRITO = re.compile(r'\*\*(.*?)\*\*')
+_PADRAO_ITALICO = re.compile(r'(?<!\*)\*(?!\*)([^*]+)\*(?!\*)')
+_PADRAO_ASTERISCOS = re.compile(r'\*+')
+_PADRAO_MARCADOR_LISTA = re.compile(r'(<br/>\s*)+[-•]\s+')
+
+# Maior nível de título com estilo próprio (TituloNivel1..6)
+NIVEL_MAXIMO_TITULO = 6
+
+# Marcador de separador; também aceito quando escrito literalmente no conteúdo
+MARCADOR_SEPARADOR = '[SEPARADOR_HORIZONTAL]'
 
 
 def _is_section_title(linha):
@@ -28,7 +56,8 @@ def _is_section_title(linha):
     - "O lote está bem." (frase normal)
     - "- ITEM" (começa com bullet)
     """
-    if not linha or len(linha) < 3:
+    # Frases longas (a maioria das linhas) são descartadas antes de olhar as letras
+    if not linha or len(linha) < 3 or len(linha) > 60:
         return False
 
     # Não pode começar com bullets
@@ -39,23 +68,16 @@ def _is_section_title(linha):
     if linha[-1] in '.,;:!?':
         return False
 
-    # Extrai apenas letras para análise
-    letras = re.findall(r'[a-zA-ZáéíóúàèìòùâêîôûãõäëïöüçÁÉÍÓÚÀÈÌÒÙÂÊÎÔÛÃÕÄËÏÖÜÇ]', linha)
-
-    if len(letras) < 3:
-        return False
-
     # Todas as letras devem ser maiúsculas
-    texto_letras = ''.join(letras)
-    if texto_letras != texto_letras.upper():
+    if _PADRAO_MINUSCULA.search(linha):
         return False
 
-    # Evita siglas muito curtas (5 letras ou menos sem espaço)
-    if ' ' not in linha and len(letras) <= 5:
+    letras = len(_PADRAO_MAIUSCULAS.findall(linha))
+    if letras < 3:
         return False
 
-    # Não pode ter mais de 60 caracteres (provavelmente é um parágrafo)
-    if len(linha) > 60:
+    # Evita siglas muito curtas (5 letras ou menos sem espaço)
+    if ' ' not in linha and letras <= 5:
         return False
 
     return True
@@ -93,9 +115,9 @@ def converter_markdown_para_html(texto):
     for linha in linhas:
         linha_limpa = linha.strip()
 
-        # Separadores horizontais: ---
-        if re.match(r'^-{3,}$', linha_limpa):
-            linhas_processadas.append('[SEPARADOR_HORIZONTAL]')
+        # Separadores horizontais: --- (ou o próprio marcador escrito no texto, que não pode virar título)
+        if re.match(r'^-{3,}$', linha_limpa) or linha_limpa == MARCADOR_SEPARADOR:
+            linhas_processadas.append(MARCADOR_SEPARADOR)
             continue
 
         # Títulos hierárquicos: 1), 1.1), 1.1.1) etc
@@ -149,6 +171,150 @@ def converter_markdown_para_html(texto):
     
     return texto_processado
 
+def _classificar_linha(linha):
+    """
+    Classifica uma linha do bloco, com o negrito já convertido.
+
+    Returns:
+        tuple: (TipoToken, conteúdo, nível do título); TEXTO mantém a linha original
+    """
+    linha_limpa = linha.strip()
+    if linha_limpa and (linha_limpa[0] in '-#' or linha_limpa[0].isdigit()):
+        match = _PADRAO_LINHA.match(linha_limpa)
+        if match:
+            if match.group('separador'):
+                return TipoToken.SEPARADOR, '', None
+            if match.group('numeracao'):
+                numeracao = match.group('numeracao')
+                nivel = min(numeracao.count('.') + 1, NIVEL_MAXIMO_TITULO)
+                return TipoToken.TITULO, _negrito(f"{numeracao}) {match.group('titulo')}"), nivel
+            if match.group('numero'):
+                return TipoToken.ITEM_LISTA, _negrito(f"{match.group('numero')}. {match.group('item')}"), None
+            return TipoToken.TITULO, _negrito(match.group('cabecalho')), len(match.group('cerquilhas'))
+
+    # O marcador escrito no conteúdo é todo em maiúsculas: sem esta verificação viraria título
+    if linha_limpa == MARCADOR_SEPARADOR:
+        return TipoToken.SEPARADOR, '', None
+    if _is_section_title(linha_limpa):
+        return TipoToken.TITULO, _negrito(linha_limpa), 2
+    return TipoToken.TEXTO, _negrito(linha), None
+
+def _negrito(texto):
+    return _PADRAO_NEGRITO.sub(r'<b>\1</b>', texto) if '**' in texto else texto
+
+def _aplicar_italico(partes):
+    """
+    Converte *itálico* como o re.sub sobre o bloco inteiro, mas parte a parte.
+
+    Um par pode começar numa linha e terminar em outra (o conteúdo do itálico
+    atravessa quebras de linha). Só asteriscos isolados formam pares, e uma
+    sequência de dois ou mais entre eles impede o par, como no padrão original.
+    """
+    sequencias = []
+    for indice, parte in enumerate(partes):
+        if '*' in parte:
+            for match in _PADRAO_ASTERISCOS.finditer(parte):
+                sequencias.append((indice, match.start(), match.end() - match.start() == 1))
+    if len(sequencias) < 2:
+        return partes
+
+    trocas = {}
+    k = 0
+    while k < len(sequencias) - 1:
+        if sequencias[k][2] and sequencias[k + 1][2]:
+            trocas.setdefault(sequencias[k][0], []).append((sequencias[k][1], '<i>'))
+            trocas.setdefault(sequencias[k + 1][0], []).append((sequencias[k + 1][1], '</i>'))
+            k += 2
+        else:
+            k += 1
+
+    for indice, posicoes in trocas.items():
+        parte = partes[indice]
+        pedacos = []
+        anterior = 0
+        for posicao, tag in posicoes:
+            pedacos.append(parte[anterior:posicao])
+            pedacos.append(tag)
+            anterior = posicao + 1
+        pedacos.append(parte[anterior:])
+        partes[indice] = ''.join(pedacos)
+    return partes
+
+def _marcadores_lista(texto):
+    return _PADRAO_MARCADOR_LISTA.sub('<br/>• ', texto) if '<br/>' in texto else texto
+
+def converter_markdown_em_elementos(bloco):
+    """
+    Converte um bloco Markdown (parágrafo sem linhas em branco) direto em descritores de flowables.
+
+    Uma única passada pelas linhas, com os padrões compilados, no lugar de
+    converter_markdown_para_html seguido de tokenizar_bloco: não há
+    marcadores intermediários no texto. Títulos, itens e o texto saem iguais
+    aos do caminho anterior, na mesma ordem: separador, títulos (por nível),
+    itens de lista numerada e o texto restante (HTML com <br/> entre as
+    linhas, ainda sem limpar_html_malformado).
+
+    Args:
+        bloco (str): Bloco de texto Markdown
+
+    Returns:
+        list: Tokens SEPARADOR, TITULO (numero = nível 1-6), ITEM_LISTA e TEXTO
+    """
+    if not bloco:
+        return []
+
+    linhas = corrigir_caracteres_especiais(bloco).split('\n')
+    tipos = []
+    partes = []
+    niveis = []
+    tem_separador = False
+    for linha in linhas:
+        if MARCADOR_SEPARADOR in linha and linha.strip() != MARCADOR_SEPARADOR:
+            # Marcador no meio da linha: separador no bloco e a linha sem o marcador (como tokenizar_bloco)
+            tem_separador = True
+            linha = linha.replace(MARCADOR_SEPARADOR, '')
+        tipo, conteudo, nivel = _classificar_linha(linha)
+        tipos.append(tipo)
+        partes.append(conteudo)
+        niveis.append(nivel)
+
+    partes = _aplicar_italico(partes)
+
+    # Texto entre elementos estruturais: cada quebra de linha vira <br/>, mesmo ao lado de um título
+    trechos = [[]]
+    titulos = []
+    itens = []
+    for i, tipo in enumerate(tipos):
+        if i:
+            trechos[-1].append('<br/>')
+        if tipo is TipoToken.TEXTO:
+            trechos[-1].append(partes[i])
+            continue
+        trechos.append([])
+        if tipo is TipoToken.TITULO:
+            titulos.append((niveis[i], _marcadores_lista(partes[i]).strip()))
+        elif tipo is TipoToken.ITEM_LISTA:
+            itens.append(_marcadores_lista(partes[i]).strip())
+        else:
+            tem_separador = True
+
+    textos = [_marcadores_lista(''.join(trecho)) for trecho in trechos]
+
+    # Bloco que começa com marcador de lista (sem <br/> antes); o strip vale para o bloco inteiro
+    inicio = textos[0].lstrip() if len(textos) > 1 else textos[0].strip()
+    if inicio.startswith('- ') or inicio.startswith('• '):
+        textos[0] = '• ' + inicio[2:]
+        textos[-1] = textos[-1].rstrip()
+    texto = ''.join(textos)
+
+    elementos = [Token(TipoToken.SEPARADOR)] if tem_separador else []
+    titulos.sort(key=lambda titulo: titulo[0])
+    elementos.extend(Token(TipoToken.TITULO, texto=conteudo, numero=nivel) for nivel, conteudo in titulos)
+    elementos.extend(Token(TipoToken.ITEM_LISTA, texto=item) for item in itens)
+    if texto.strip() and texto.strip() != '<br/>':
+        elementos.append(Token(TipoToken.TEXTO, texto))
+    return elementos
+
 def extract_markdown_titles(texto):
     """
     Extrai todos os títulos de um texto Markdown.
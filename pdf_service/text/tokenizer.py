@@ -0,0 +1,167 @@
+# Arquivo: text/tokenizer.py
+# Tokenizador da linguagem de tags usada no conteúdo dos relatórios
+
+import re
+from enum import Enum
+from typing import NamedTuple, Optional
+
+class TipoToken(str, Enum):
+    """
+    Tipos de token reconhecidos no conteúdo.
+    """
+    # Nível do documento (tags inseridas pela IA)
+    TEXTO = "texto"
+    GRAFICO = "grafico"
+    TABELA = "tabela"
+    IMAGEM = "imagem"
+    # Nível do bloco (descritores de converter_markdown_em_elementos e marcadores de converter_markdown_para_html)
+    TITULO = "titulo"
+    ITEM_LISTA = "item_lista"
+    SEPARADOR = "separador"
+
+class Token(NamedTuple):
+    """
+    Token da linguagem de tags.
+
+    - TEXTO / TITULO / ITEM_LISTA: `texto` é o conteúdo; TITULO usa `numero` como nível (1-6)
+    - GRAFICO: `subtipo` ('barras', 'pizza', 'linha'), `titulo` e `texto` (dados)
+    - TABELA: `texto` é o conteúdo da tabela (título + linhas)
+    - IMAGEM: `numero` é o ID da imagem ou None para o modo sequencial
+    """
+    tipo: TipoToken
+    texto: str = ''
+    titulo: str = ''
+    subtipo: str = ''
+    numero: Optional[int] = None
+
+# ===============================
+# PADRÕES COMPILADOS (UMA VEZ POR PROCESSO)
+# ===============================
+
+# Tags de nível do documento em uma única alternação com grupos nomeados
+_PADRAO_TAGS = re.compile(
+    r'\[(?P<grafico>GR[ÁA]FICO(?:_BARRAS|_PIZZA|_LINHA| PIZZA| DE BARRAS| DE PIZZA| DE LINHA)):(?P<grafico_corpo>[^\]]+)\]'
+    r'|\[TABELA:(?P<tabela>[\s\S]*?)\]'
+    r'|\[IMAGEM(?::(?P<imagem_id>\d+))?\]'
+)
+
+# Corpo do gráfico: "Título: dados" (os dados não podem ter quebra de linha)
+_PADRAO_CORPO_GRAFICO = re.compile(r'\s*([^:]+):\s*(.*)\Z')
+
+# Marcadores gerados por converter_markdown_para_html dentro de um bloco ([SEPARADOR_HORIZONTAL] é
+# tratado antes, em tokenizar_bloco, porque pode aparecer dentro de outro marcador)
+_PADRAO_MARCADORES = re.compile(
+    r'\[TITULO_NIVEL_(?P<nivel>[1-6])\](?P<titulo>.*?)\[/TITULO_NIVEL_(?P=nivel)\]'
+    r'|\[ITEM_LISTA\](?P<item>.*?)\[/ITEM_LISTA\]'
+)
+
+_MARCADOR_SEPARADOR = '[SEPARADOR_HORIZONTAL]'
+
+# Tag de logo: [LOGO:n]
+_PADRAO_LOGO = re.compile(r'\[LOGO:(\d+)\]')
+
+# Separador de blocos (parágrafos) dentro de um trecho de texto
+_PADRAO_BLOCOS = re.compile(r'\n\s*\n')
+
+def _tipo_grafico(nome_tag):
+    """Resolve o tipo do gráfico a partir do nome da tag (ex: 'GRÁFICO DE PIZZA')."""
+    if 'BARRA' in nome_tag:
+        return 'barras'
+    if 'PIZZA' in nome_tag:
+        return 'pizza'
+    return 'linha'
+
+def tokenizar_conteudo(texto):
+    """
+    Divide o conteúdo em tokens de nível do documento em uma única passada.
+
+    Reconhece [GRÁFICO_*], [TABELA: ...], [IMAGEM] e [IMAGEM:n]; o restante vira
+    TEXTO. Gráficos cujo corpo não está no formato "Título: dados" são descartados,
+    como no parser anterior.
+
+    Args:
+        texto (str): Conteúdo completo do relatório
+
+    Yields:
+        Token: Tokens na ordem em que aparecem no texto
+    """
+    posicao = 0
+    for match in _PADRAO_TAGS.finditer(texto):
+        if match.start() > posicao:
+            yield Token(TipoToken.TEXTO, texto[posicao:match.start()])
+        posicao = match.end()
+
+        if match.group('grafico'):
+            corpo = _PADRAO_CORPO_GRAFICO.match(match.group('grafico_corpo'))
+            if corpo:
+                yield Token(
+                    TipoToken.GRAFICO,
+                    texto=corpo.group(2).strip(),
+                    titulo=corpo.group(1).strip(),
+                    subtipo=_tipo_grafico(match.group('grafico')),
+                )
+        elif match.group('tabela') is not None:
+            yield Token(TipoToken.TABELA, texto=match.group('tabela').strip())
+        else:
+            imagem_id = match.group('imagem_id')
+            yield Token(TipoToken.IMAGEM, numero=int(imagem_id) if imagem_id is not None else None)
+
+    if posicao < len(texto):
+        yield Token(TipoToken.TEXTO, texto[posicao:])
+
+def dividir_blocos(texto):
+    """
+    Divide um trecho de texto em blocos (parágrafos) separados por linha em branco.
+
+    Args:
+        texto (str): Trecho de texto (token TEXTO)
+
+    Returns:
+        list: Blocos não vazios
+    """
+    return [bloco for bloco in _PADRAO_BLOCOS.split(texto.strip()) if bloco and not bloco.isspace()]
+
+def tokenizar_bloco(bloco_html):
+    """
+    Tokeniza os marcadores de um bloco já convertido por converter_markdown_para_html.
+
+    Args:
+        bloco_html (str): Bloco HTML com marcadores [TITULO_NIVEL_n], [ITEM_LISTA] e [SEPARADOR_HORIZONTAL]
+
+    Yields:
+        Token: SEPARADOR (no máximo um, primeiro, se o bloco tiver o marcador em
+        qualquer posição, como no parser anterior), depois TITULO, ITEM_LISTA e
+        TEXTO (o HTML entre marcadores) na ordem do bloco
+    """
+    if _MARCADOR_SEPARADOR in bloco_html:
+        yield Token(TipoToken.SEPARADOR)
+        bloco_html = bloco_html.replace(_MARCADOR_SEPARADOR, '')
+
+    posicao = 0
+    for match in _PADRAO_MARCADORES.finditer(bloco_html):
+        if match.start() > posicao:
+            yield Token(TipoToken.TEXTO, bloco_html[posicao:match.start()])
+        posicao = match.end()
+
+        if match.group('nivel'):
+            yield Token(TipoToken.TITULO, texto=match.group('titulo').strip(), numero=int(match.group('nivel')))
+        else:
+            yield Token(TipoToken.ITEM_LISTA, texto=match.group('item').strip())
+
+    if posicao < len(bloco_html):
+        yield Token(TipoToken.TEXTO, bloco_html[posicao:])
+
+def extrair_tag_logo(texto):
+    """
+    Localiza a primeira tag [LOGO:n] e a remove do texto.
+
+    Args:
+        texto (str): Conteúdo do relatório
+
+    Returns:
+        tuple: (ID do logo como str ou None, texto sem a tag)
+    """
+    match = _PADRAO_LOGO.search(texto)
+    if not match:
+        return None, texto
+    return match.group(1), texto[:match.start()] + texto[match.end():]
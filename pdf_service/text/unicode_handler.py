@@ -1,12 +1,86 @@
 # Arquivo: text/unicode_handler.py
 # Processamento e correção de caracteres especiais Unicode
 
+import re
+
+# Mapeamento de caracteres problemáticos, aplicado numa única varredura
+SUBSTITUICOES = {
+    # Sobrescritos negativos
+    '⁻¹': '<sup>-1</sup>',
+    '⁻²': '<sup>-2</sup>',
+    '⁻³': '<sup>-3</sup>',
+    '⁻⁴': '<sup>-4</sup>',
+
+    # Sobrescritos positivos
+    '¹': '<sup>1</sup>',
+    '²': '<sup>2</sup>',
+    '³': '<sup>3</sup>',
+    '⁴': '<sup>4</sup>',
+
+    # Subscritos químicos (conversão para subscript HTML)
+    '₀': '<sub>0</sub>',
+    '₁': '<sub>1</sub>',
+    '₂': '<sub>2</sub>',
+    '₃': '<sub>3</sub>',
+    '₄': '<sub>4</sub>',
+    '₅': '<sub>5</sub>',
+    '₆': '<sub>6</sub>',
+    '₇': '<sub>7</sub>',
+    '₈': '<sub>8</sub>',
+    '₉': '<sub>9</sub>',
+
+    # Correção específica para fórmulas químicas corrompidas
+    # ('■¹', '■²' e '■³' não entram: o sobrescrito sempre era convertido antes e o ■ removido)
+    'P■O■': 'P<sub>2</sub>O<sub>5</sub>',
+    'K■O': 'K<sub>2</sub>O',
+    'N■O■': 'N<sub>2</sub>O<sub>5</sub>',
+    'Ca■': 'Ca<sub>2</sub>',
+    'Mg■': 'Mg<sub>2</sub>',
+    'SO■': 'SO<sub>4</sub>',
+
+    '■': '',  # Remove quadrados brancos restantes
+
+    # Símbolos matemáticos
+    '≈': '~',  # Aproximadamente
+    '≤': '<=', # Menor ou igual
+    '≥': '>=', # Maior ou igual
+    '±': '+/-', # Mais ou menos
+
+    # Símbolos de graus e unidades ('°C' e '°F' saem de '°' + letra)
+    '°': '&deg;',
+
+    # Frações comuns
+    '½': '1/2',
+    '¼': '1/4',
+    '¾': '3/4',
+
+    # Símbolos especiais de agricultura
+    'µ': 'u',  # Micro
+    'α': 'alfa',
+    'β': 'beta',
+    'γ': 'gama',
+}
+
+# Padrões compilados uma vez por processo. As sequências (todas com ⁻ ou ■) vêm antes, as maiores primeiro;
+# sem ⁻ nem ■ no texto basta a classe dos caracteres isolados, bem mais rápida de percorrer
+_CLASSE_CARACTERES = '[' + re.escape(''.join(chave for chave in SUBSTITUICOES if len(chave) == 1)) + ']'
+_PADRAO_CARACTERES = re.compile(_CLASSE_CARACTERES)
+_PADRAO_COMPLETO = re.compile('|'.join(
+    [re.escape(chave) for chave in sorted((chave for chave in SUBSTITUICOES if len(chave) > 1), key=len, reverse=True)]
+    + [_CLASSE_CARACTERES]
+))
+
+def _substituto(match):
+    return SUBSTITUICOES[match.group()]
+
 def corrigir_caracteres_especiais(texto):
     """
     Corrige caracteres especiais que podem não renderizar corretamente em PDFs.
     
     Converte caracteres Unicode problemáticos para equivalentes HTML/texto
-    que renderizam corretamente em ReportLab.
+    que renderizam corretamente em ReportLab. Todo o mapeamento é aplicado
+    numa única varredura (a sequência mais longa vence), com o mesmo
+    resultado das substituições feitas uma a uma, em ordem.
     
     Args:
         texto (str): Texto com possíveis caracteres especiais
@@ -14,77 +88,12 @@ def corrigir_caracteres_especiais(texto):
     Returns:
         str: Texto com caracteres corrigidos
     """
-    if not texto:
+    # Todas as chaves têm algum caractere fora do ASCII
+    if not texto or texto.isascii():
         return texto
-    
-    # Mapeamento de caracteres problemáticos
-    substituicoes = {
-        # Sobrescritos negativos
-        '⁻¹': '<sup>-1</sup>',
-        '⁻²': '<sup>-2</sup>', 
-        '⁻³': '<sup>-3</sup>',
-        '⁻⁴': '<sup>-4</sup>',
-        
-        # Sobrescritos positivos
-        '¹': '<sup>1</sup>',
-        '²': '<sup>2</sup>',
-        '³': '<sup>3</sup>',
-        '⁴': '<sup>4</sup>',
-        
-        # Subscritos químicos (conversão para subscript HTML)
-        '₀': '<sub>0</sub>',
-        '₁': '<sub>1</sub>',
-        '₂': '<sub>2</sub>',
-        '₃': '<sub>3</sub>',
-        '₄': '<sub>4</sub>',
-        '₅': '<sub>5</sub>',
-        '₆': '<sub>6</sub>',
-        '₇': '<sub>7</sub>',
-        '₈': '<sub>8</sub>',
-        '₉': '<sub>9</sub>',
-        
-        # Caracteres problemáticos comuns
-        '■¹': '<sup>-1</sup>',
-        '■²': '<sup>-2</sup>',
-        '■³': '<sup>-3</sup>',
-        
-        # Correção específica para fórmulas químicas corrompidas
-        'P■O■': 'P<sub>2</sub>O<sub>5</sub>',
-        'K■O': 'K<sub>2</sub>O',
-        'N■O■': 'N<sub>2</sub>O<sub>5</sub>',
-        'Ca■': 'Ca<sub>2</sub>',
-        'Mg■': 'Mg<sub>2</sub>',
-        'SO■': 'SO<sub>4</sub>',
-        
-        '■': '',  # Remove quadrados brancos restantes
-        
-        # Símbolos matemáticos
-        '≈': '~',  # Aproximadamente
-        '≤': '<=', # Menor ou igual
-        '≥': '>=', # Maior ou igual
-        '±': '+/-', # Mais ou menos
-        
-        # Símbolos de graus e unidades
-        '°C': '&deg;C',
-        '°F': '&deg;F',
-        '°': '&deg;',
-        
-        # Frações comuns
-        '½': '1/2',
-        '¼': '1/4',
-        '¾': '3/4',
-        
-        # Símbolos especiais de agricultura
-        'µ': 'u',  # Micro
-        'α': 'alfa',
-        'β': 'beta',
-        'γ': 'gama',
-    }
-    
-    for original, substituto in substituicoes.items():
-        texto = texto.replace(original, substituto)
-    
-    return texto
+
+    padrao = _PADRAO_COMPLETO if '■' in texto or '⁻' in texto else _PADRAO_CARACTERES
+    return padrao.sub(_substituto, texto)
 
 def sanitize_text_for_pdf(texto):
     """
@@ -106,8 +115,6 @@ def sanitize_text_for_pdf(texto):
     texto = corrigir_caracteres_especiais(texto)
     
     # Remove caracteres de controle problemáticos
-    import re
-    
     # Remove caracteres de controle (exceto \n, \r, \t)
     texto = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', texto)
     
@@ -0,0 +1,223 @@
+# Arquivo: utils/assets.py
+# Imagens como XObjects prontos: registro das imagens fixas dos templates (itens_png_voxy), preparadas uma vez
+# por processo, e o logo do usuário, preparado uma vez por documento
+
+import copy
+import logging
+import math
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from PIL import Image as PILImage
+from reportlab.lib.units import inch, cm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfdoc import PDFImageXObject, PDFObjectReference
+from reportlab.pdfgen.canvas import aspectRatioFix
+from reportlab.platypus import Flowable
+
+from ..core.config import TEMPLATE_ASSET_DPI
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ITENS_PNG_DIR = os.path.join(BASE_DIR, 'itens_png_voxy')
+
+# Imagens dos templates: chave -> (arquivo em itens_png_voxy, maior caixa em que é
+# desenhada (largura, altura em pontos), mantém a proporção, máscara do drawImage)
+ASSETS_TEMPLATE = {
+    'arco_final': ('imagens_arizona/arcofinal.png', (16 * cm, 10 * cm), True, 'auto'),
+    'legenda': ('imagens_arizona/legenda.png', (12 * cm, 2 * cm), True, 'auto'),
+    'logo_principal': ('imagens_arizona/logoprincipal.png', (4 * cm, 2 * cm), True, 'auto'),
+    'linha_vermelha': ('imagens_arizona/linhavermelha.png', (13 * cm, 1.5), False, None),
+    'logo_dr_pasto': ('imagens_dr_pasto/logo_drPasto.png', (2 * inch, 2 * inch), True, 'auto'),
+}
+
+_MODOS_COM_ALFA = ('RGBA', 'LA', 'PA', 'RGBa', 'La')
+
+class AssetPreparado(NamedTuple):
+    """XObject de imagem pronto (stream já comprimido) e a máscara suave, se houver."""
+    nome: str
+    molde: PDFImageXObject
+    mascara: Optional[PDFImageXObject]
+    largura: int
+    altura: int
+
+def preparar_xobject(nome, fonte, mascara='auto'):
+    """
+    Monta o XObject de uma imagem uma única vez, para ser registrado em vários documentos ou páginas.
+
+    Args:
+        nome (str): Nome do XObject no PDF (único dentro do documento)
+        fonte: Imagem PIL ou arquivo (BytesIO) aceito pelo ImageReader; JPEG é embutido sem recodificar
+        mascara: Máscara do drawImage ('auto' usa a transparência da imagem)
+
+    Returns:
+        AssetPreparado: XObject e máscara suave prontos
+    """
+    molde = PDFImageXObject(nome, ImageReader(fonte), mask=mascara)
+    suave = molde.__dict__.pop('_smask', None)
+    return AssetPreparado(nome, molde, suave, molde.width, molde.height)
+
+def _registrar(canvas, asset):
+    """Registra o XObject no documento do canvas (uma vez por documento) e retorna o nome interno."""
+    documento = canvas._doc
+    nome_interno = documento.getXObjectName(asset.nome)
+    if nome_interno in documento.idToObject:
+        return nome_interno
+
+    # Mesmos passos do canvas.drawImage, com cópias do XObject já comprimido
+    xobjeto = copy.copy(asset.molde)
+    canvas._setXObjects(xobjeto)
+    documento.Reference(xobjeto, nome_interno)
+    documento.addForm(asset.nome, xobjeto)
+    if asset.mascara is not None:
+        nome_mascara = documento.getXObjectName(asset.mascara.name)
+        if nome_mascara in documento.idToObject:
+            xobjeto.smask = PDFObjectReference(nome_mascara)
+        else:
+            mascara = copy.copy(asset.mascara)
+            canvas._setXObjects(mascara)
+            xobjeto.smask = documento.Reference(mascara, nome_mascara)
+    return nome_interno
+
+def desenhar_xobject(canvas, asset, x, y, largura, altura, preserveAspectRatio=False, anchor='c'):
+    """
+    Desenha um XObject preparado, como canvas.drawImage(...).
+
+    Args:
+        canvas: Canvas do ReportLab
+        asset (AssetPreparado): Imagem de preparar_xobject ou do registro
+        x, y (float): Canto inferior esquerdo da caixa
+        largura, altura (float): Caixa de desenho em pontos
+        preserveAspectRatio (bool): Encaixa a imagem na caixa mantendo a proporção
+        anchor (str): Ponto de ancoragem quando a proporção é mantida
+    """
+    nome_interno = _registrar(canvas, asset)
+    x, y, largura, altura, _ = aspectRatioFix(
+        preserveAspectRatio, anchor, x, y, largura, altura, asset.largura, asset.altura
+    )
+    canvas.saveState()
+    canvas.translate(x, y)
+    canvas.scale(largura, altura)
+    canvas._code.append(f"/{nome_interno} Do")
+    canvas.restoreState()
+    canvas._formsinuse.append(asset.nome)
+    canvas._currentPageHasImages = 1
+
+def _tamanho_alvo(largura, altura, caixa, proporcional, dpi):
+    """Pixels suficientes para imprimir a imagem na caixa no DPI pedido (nunca amplia)."""
+    alvo_largura = math.ceil(caixa[0] / 72 * dpi)
+    alvo_altura = math.ceil(caixa[1] / 72 * dpi)
+    if proporcional:
+        fator = min(1.0, alvo_largura / largura, alvo_altura / altura)
+        return max(1, round(largura * fator)), max(1, round(altura * fator))
+    return min(largura, alvo_largura), min(altura, alvo_altura)
+
+class AssetRegistry:
+    """
+    Registro das imagens fixas dos templates.
+
+    Cada PNG é aberto, reduzido para TEMPLATE_ASSET_DPI na caixa em que é
+    desenhado e comprimido como XObject uma única vez por processo. Em cada
+    documento o XObject é registrado uma vez e as páginas seguintes apenas
+    o referenciam, em vez de o ReportLab reabrir e recomprimir o arquivo em
+    todo documento.
+    """
+
+    def __init__(self, assets=ASSETS_TEMPLATE, diretorio=ITENS_PNG_DIR, dpi=TEMPLATE_ASSET_DPI):
+        self.assets = assets
+        self.diretorio = diretorio
+        self.dpi = dpi
+        self._preparados = {}
+        self._lock = threading.Lock()
+        self.tempo_carregamento = 0.0
+
+    def obter(self, chave):
+        """
+        Retorna o asset preparado, carregando-o na primeira chamada.
+
+        Args:
+            chave (str): Chave de ASSETS_TEMPLATE
+
+        Returns:
+            AssetPreparado: XObject pronto para ser registrado nos documentos
+
+        Raises:
+            OSError: Se o arquivo não puder ser lido
+        """
+        asset = self._preparados.get(chave)
+        if asset is not None:
+            return asset
+
+        with self._lock:
+            if chave not in self._preparados:
+                self._preparados[chave] = self._preparar(chave)
+            return self._preparados[chave]
+
+    def _preparar(self, chave):
+        arquivo, caixa, proporcional, mascara = self.assets[chave]
+        caminho = os.path.join(self.diretorio, arquivo)
+        inicio = time.perf_counter()
+
+        with PILImage.open(caminho) as pil_img:
+            original = pil_img.size
+            tem_alfa = pil_img.mode in _MODOS_COM_ALFA or 'transparency' in pil_img.info
+            imagem = pil_img.convert('RGBA' if tem_alfa else 'RGB')
+
+        if self.dpi:
+            alvo = _tamanho_alvo(imagem.width, imagem.height, caixa, proporcional, self.dpi)
+            if alvo != imagem.size:
+                imagem = imagem.resize(alvo, PILImage.LANCZOS)
+
+        asset = preparar_xobject(f'asset_{chave}', imagem, mascara)
+
+        duracao = time.perf_counter() - inicio
+        self.tempo_carregamento += duracao
+        logging.info(
+            f"Asset '{chave}' preparado: {original[0]}x{original[1]} -> {asset.largura}x{asset.altura}px, "
+            f"{len(asset.molde.streamContent) / 1024:.0f}KB em {duracao * 1000:.0f}ms"
+        )
+        return asset
+
+    def carregar(self):
+        """Prepara todos os assets (chamado na inicialização dos workers); falhas ficam para o primeiro uso."""
+        for chave in self.assets:
+            try:
+                self.obter(chave)
+            except Exception as e:
+                logging.warning(f"Não foi possível preparar o asset '{chave}': {e}")
+
+    def desenhar(self, canvas, chave, x, y, largura, altura, preserveAspectRatio=False, anchor='c'):
+        """
+        Desenha o asset no canvas, como canvas.drawImage(caminho, ...).
+
+        Args:
+            canvas: Canvas do ReportLab
+            chave (str): Chave de ASSETS_TEMPLATE
+            x, y (float): Canto inferior esquerdo da caixa
+            largura, altura (float): Caixa de desenho em pontos
+            preserveAspectRatio (bool): Encaixa a imagem na caixa mantendo a proporção
+            anchor (str): Ponto de ancoragem quando a proporção é mantida
+        """
+        desenhar_xobject(canvas, self.obter(chave), x, y, largura, altura, preserveAspectRatio, anchor)
+
+# Instância única por processo
+ASSET_REGISTRY = AssetRegistry()
+
+class ImagemAsset(Flowable):
+    """Flowable de um asset do registro, encaixado proporcionalmente na caixa (como Image(kind='proportional'))."""
+
+    def __init__(self, chave, largura, altura, registro=ASSET_REGISTRY):
+        super().__init__()
+        self.chave = chave
+        self.registro = registro
+        asset = registro.obter(chave)
+        fator = min(largura / asset.largura, altura / asset.altura)
+        self.drawWidth = asset.largura * fator
+        self.drawHeight = asset.altura * fator
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        self.registro.desenhar(self.canv, self.chave, 0, 0, self.drawWidth, self.drawHeight)
@@ -2,54 +2,111 @@
 # Gerenciamento de fontes Unicode para PDFs
 
 import logging
+import threading
+import time
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+# Famílias tentadas em ordem de preferência: (nome, arquivo regular, arquivo bold)
+FAMILIAS_UNICODE = [
+    ('DejaVuSans', 'DejaVuSans.ttf', 'DejaVuSans-Bold.ttf'),        # Melhor suporte Unicode
+    ('LiberationSans', 'LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf'),  # Fallback
+]
+
+class FontRegistry:
+    """
+    Registro de fontes do processo.
+
+    Os arquivos TrueType são lidos e registrados no ReportLab uma única vez por
+    processo; as chamadas seguintes apenas devolvem os nomes já resolvidos.
+    """
+
+    def __init__(self, familias=FAMILIAS_UNICODE):
+        self.familias = familias
+        self.fonte_regular = None
+        self.fonte_bold = None
+        self.tempo_carregamento = None
+        self._lock = threading.Lock()
+
+    @property
+    def carregado(self):
+        return self.fonte_regular is not None
+
+    def carregar(self):
+        """
+        Registra a primeira família disponível (ou Helvetica como fallback padrão).
+
+        Returns:
+            tuple: (nome da fonte regular, nome da fonte bold)
+        """
+        if self.carregado:
+            return self.fonte_regular, self.fonte_bold
+
+        with self._lock:
+            if self.carregado:
+                return self.fonte_regular, self.fonte_bold
+
+            inicio = time.perf_counter()
+            regular, bold = 'Helvetica', 'Helvetica-Bold'
+
+            try:
+                from reportlab.pdfbase.pdfmetrics import registerFontFamily
+
+                for nome, arquivo_regular, arquivo_bold in self.familias:
+                    try:
+                        pdfmetrics.registerFont(TTFont(nome, arquivo_regular))
+                        pdfmetrics.registerFont(TTFont(f'{nome}-Bold', arquivo_bold))
+                        registerFontFamily(nome, normal=nome, bold=f'{nome}-Bold')
+                        regular, bold = nome, f'{nome}-Bold'
+                        break
+                    except Exception:
+                        continue
+
+            except Exception as e:
+                logging.warning(f"Não foi possível registrar fontes Unicode: {e}")
+
+            self.tempo_carregamento = time.perf_counter() - inicio
+            self.fonte_bold = bold
+            self.fonte_regular = regular  # Por último: marca o registro como carregado
+
+            logging.info(f"Fontes registradas: {regular}/{bold} em {self.tempo_carregamento * 1000:.1f}ms")
+            return self.fonte_regular, self.fonte_bold
+
+# Instância única por processo
+FONT_REGISTRY = FontRegistry()
+
+def obter_fontes():
+    """
+    Retorna as fontes Unicode do processo, registrando-as na primeira chamada.
+
+    Returns:
+        tuple: (nome da fonte regular, nome da fonte bold)
+    """
+    return FONT_REGISTRY.carregar()
+
 def registrar_fontes_unicode():
     """
     Registra fontes com suporte Unicode completo.
-    
+
     Tenta registrar fontes na seguinte ordem de preferência:
     1. DejaVu Sans (melhor suporte Unicode)
     2. Liberation Sans (fallback)
     3. Helvetica (fallback padrão)
-    
+
+    O registro acontece apenas uma vez por processo (ver FontRegistry).
+
     Returns:
         str: Nome da fonte registrada com sucesso
     """
-    try:
-        from reportlab.pdfbase.pdfmetrics import registerFontFamily
-        
-        # Tenta registrar DejaVu Sans (melhor suporte Unicode)
-        try:
-            pdfmetrics.registerFont(TTFont('DejaVuSans', 'DejaVuSans.ttf'))
-            pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', 'DejaVuSans-Bold.ttf'))
-            registerFontFamily('DejaVuSans', normal='DejaVuSans', bold='DejaVuSans-Bold')
-            return 'DejaVuSans'
-        except:
-            pass
-            
-        # Fallback para Liberation Sans
-        try:
-            pdfmetrics.registerFont(TTFont('LiberationSans', 'LiberationSans-Regular.ttf'))
-            pdfmetrics.registerFont(TTFont('LiberationSans-Bold', 'LiberationSans-Bold.ttf'))
-            registerFontFamily('LiberationSans', normal='LiberationSans', bold='LiberationSans-Bold')
-            return 'LiberationSans'
-        except:
-            pass
-            
-    except Exception as e:
-        logging.warning(f"Não foi possível registrar fontes Unicode: {e}")
-    
-    return 'Helvetica'  # Fallback padrão
+    return obter_fontes()[0]
 
 def get_font_bold_variant(font_name: str) -> str:
     """
     Retorna o nome da variante bold de uma fonte.
-    
+
     Args:
         font_name: Nome da fonte base
-        
+
     Returns:
         str: Nome da fonte bold correspondente
     """
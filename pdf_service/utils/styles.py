@@ -0,0 +1,235 @@
+# Arquivo: utils/styles.py
+# Catálogo de estilos de parágrafo dos relatórios, montado uma vez por (tipo de documento, paleta, fontes)
+
+import functools
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+
+from ..core.config import COLOR_PALETTES, DEFAULT_COLOR_PALETTE
+from .fonts import obter_fontes
+
+# Tipos de documento com conjuntos de estilos próprios
+TIPO_VOXY = 'voxy'            # create_pdf_from_data, design minimalista
+TIPO_DR_PASTO = 'dr_pasto'    # create_pdf_from_data, relatório de adubação
+TIPO_ARIZONA = 'arizona'      # preencher_pdf_template
+TIPOS_DOCUMENTO = (TIPO_VOXY, TIPO_DR_PASTO, TIPO_ARIZONA)
+
+@functools.lru_cache(maxsize=256)
+def cor(valor):
+    """
+    Cor do ReportLab para um hexadecimal da paleta, convertida uma vez por processo.
+
+    Args:
+        valor (str): Cor no formato '#RRGGBB'
+
+    Returns:
+        Color: Cor compartilhada (não deve ser alterada)
+    """
+    return colors.HexColor(valor)
+
+def _estilos_conteudo(cores, fonte_unicode, fonte_bold):
+    """Estilos usados por parse_conteudo em todos os tipos: títulos Markdown, listas, legendas e tabelas."""
+    normal = getSampleStyleSheet()['Normal']
+    return {
+        # Título principal - grande e destacado
+        'TituloNivel1': ParagraphStyle(
+            'TituloNivel1',
+            fontName=fonte_bold,
+            fontSize=18,
+            textColor=cor(cores['principal']),
+            spaceAfter=16,
+            spaceBefore=28,
+            leading=22,
+            leftIndent=0,
+            borderPadding=0,
+        ),
+        # Título de seção - destaque forte com borda lateral
+        'TituloNivel2': ParagraphStyle(
+            'TituloNivel2',
+            fontName=fonte_bold,
+            fontSize=14,
+            textColor=cor(cores['principal']),
+            spaceAfter=12,
+            spaceBefore=22,
+            leading=18,
+            leftIndent=0,
+            borderLeftWidth=3,
+            borderLeftColor=cor(cores['destaque']),
+            borderPadding=(8, 0, 8, 12),  # top, right, bottom, left
+            backColor=cor('#F8F9FA'),  # Fundo sutil
+        ),
+        # Subtítulo - menor mas ainda destacado
+        'TituloNivel3': ParagraphStyle(
+            'TituloNivel3',
+            fontName=fonte_bold,
+            fontSize=12,
+            textColor=cor(cores['principal']),
+            spaceAfter=10,
+            spaceBefore=16,
+            leading=16,
+            leftIndent=8,
+        ),
+        # Níveis menores (4 a 6)
+        **{
+            f'TituloNivel{nivel}': ParagraphStyle(
+                f'TituloNivel{nivel}',
+                fontName=fonte_bold,
+                fontSize=11,
+                textColor=cor(cores['secundaria']),
+                spaceAfter=8,
+                spaceBefore=12,
+                leading=14,
+                leftIndent=16,
+            )
+            for nivel in range(4, 7)
+        },
+        'ItemLista': ParagraphStyle(
+            'ItemLista',
+            fontName=fonte_unicode,
+            fontSize=11,
+            textColor=colors.black,
+            spaceAfter=6,
+            spaceBefore=2,
+            leading=14,
+            leftIndent=20,
+            bulletIndent=10
+        ),
+        'Legenda': ParagraphStyle('Legenda', fontSize=9, alignment=TA_CENTER, textColor=colors.gray, spaceAfter=12),
+        # Tabelas: células em Helvetica, como sempre foram
+        'CelulaTabela': ParagraphStyle('CelulaTabela', parent=normal, alignment=TA_LEFT),
+        'CabecalhoTabela': ParagraphStyle('CabecalhoTabela', parent=normal, alignment=TA_CENTER, fontName='Helvetica-Bold'),
+        'TituloTabela': ParagraphStyle('TituloTabela', fontName='Helvetica-Bold', fontSize=12, spaceBefore=15, spaceAfter=10, textColor=cor(cores['principal'])),
+        'TabelaInvalida': ParagraphStyle('TabelaInvalida'),
+    }
+
+def _estilos_voxy(cores, fonte_unicode, fonte_bold, dr_pasto):
+    """Estilos de create_pdf_from_data (minimalista v2.0 ou Dr. Pasto)."""
+    if dr_pasto:
+        titulo_principal = ParagraphStyle('TituloPrincipal', fontName=fonte_bold, fontSize=18, textColor=cor(cores['principal']), alignment=TA_CENTER, leading=22, spaceAfter=20, spaceBefore=30)
+    else:
+        # Estilo minimalista v2.0 - tipografia forte, sem fundo colorido
+        titulo_principal = ParagraphStyle('TituloPrincipal', fontName=fonte_bold, fontSize=24, textColor=cor(cores['principal']), alignment=TA_LEFT, leading=30, spaceAfter=8)
+
+    return {
+        'TituloPrincipal': titulo_principal,
+        'TituloSecao': ParagraphStyle('TituloSecao', fontName=fonte_bold, fontSize=16, textColor=cor(cores['principal']), spaceAfter=18, spaceBefore=24, borderBottomWidth=2, borderBottomColor=cor(cores['destaque']), paddingBottom=8),
+        'TextoNormal': ParagraphStyle('TextoNormal', fontName=fonte_unicode, fontSize=11, alignment=TA_JUSTIFY, spaceAfter=14, spaceBefore=6, leading=16),
+        'TituloSubsecao': ParagraphStyle('TituloSubsecao', fontName=fonte_bold, fontSize=14, textColor=cor(cores['principal']), spaceAfter=12, spaceBefore=18, leading=18),
+        'SubtituloMetodologia': ParagraphStyle('SubtituloMetodologia', fontName=fonte_unicode, fontSize=12, textColor=cor(cores['secundaria']), alignment=TA_CENTER, leading=14, spaceAfter=20, spaceBefore=8),
+        # Informações do cabeçalho: texto cinza, sem borda, sem fundo
+        'InfoMinimalista': ParagraphStyle('InfoMinimalista', fontName=fonte_unicode, fontSize=10, textColor=cor(cores['secundaria']), leading=16, spaceAfter=20),
+        # Assinatura do técnico
+        'NomeTecnico': ParagraphStyle('NomeTecnico', fontName=fonte_bold, fontSize=14, textColor=cor(cores['principal']), alignment=TA_CENTER, spaceAfter=4, leading=18),
+        'ContatoTecnico': ParagraphStyle('ContatoTecnico', fontName=fonte_unicode, fontSize=10, textColor=cor(cores['secundaria']), alignment=TA_CENTER, spaceAfter=2, leading=14),
+    }
+
+def _estilos_arizona(fonte_unicode, fonte_bold):
+    """Estilos de preencher_pdf_template (relatório de visita sobre o fundo Arizona)."""
+    body_text = ParagraphStyle('BodyText', parent=getSampleStyleSheet()['BodyText'],
+                               fontName=fonte_unicode, fontSize=9, leading=12, alignment=TA_JUSTIFY)
+    section_title = ParagraphStyle('SectionTitle', fontName=fonte_bold, fontSize=9, leading=12, alignment=TA_LEFT,
+                                   spaceBefore=0.6*cm, spaceAfter=0.2*cm)
+    assinatura = ParagraphStyle('AssinaturaStyle', fontName=fonte_unicode, fontSize=11, alignment=TA_CENTER,
+                                spaceAfter=8, leading=16)
+    return {
+        'BodyText': body_text,
+        'SectionTitle': section_title,
+        'HeaderInfo': ParagraphStyle('HeaderInfo', fontName=fonte_unicode, fontSize=9, leading=12, spaceAfter=2, alignment=TA_LEFT),
+        'TextoNormal': ParagraphStyle('TextoNormal', parent=body_text),
+        'TituloSubsecao': ParagraphStyle('TituloSubsecao', parent=section_title),
+        'AssinaturaStyle': assinatura,
+        'NomeStyle': ParagraphStyle('NomeStyle', parent=assinatura, fontName=fonte_bold, fontSize=12),
+    }
+
+class StyleCatalog:
+    """
+    Catálogo de estilos de parágrafo do processo.
+
+    Cada conjunto (tipo de documento, paleta, fontes) é montado uma única vez e
+    devolvido como mapeamento somente leitura, compartilhado por todas as
+    requisições: os estilos não devem ser alterados; variações pontuais usam
+    estilo.clone(...).
+    """
+
+    def __init__(self, paletas=COLOR_PALETTES):
+        self.paletas = paletas
+        self._catalogos = {}
+        self._lock = threading.Lock()
+        self.tempo_carregamento = 0.0
+
+    def _paleta(self, paleta):
+        """Nome efetivo da paleta (o mesmo fallback de get_color_palette)."""
+        return paleta if paleta in self.paletas else DEFAULT_COLOR_PALETTE
+
+    def obter(self, tipo, paleta, fontes=None):
+        """
+        Retorna os estilos do documento, montando-os na primeira chamada.
+
+        Args:
+            tipo (str): Um de TIPOS_DOCUMENTO
+            paleta (str): Nome da paleta (desconhecida cai na padrão)
+            fontes (tuple): (fonte regular, fonte bold); padrão: obter_fontes()
+
+        Returns:
+            MappingProxyType: Nome do estilo -> ParagraphStyle
+
+        Raises:
+            ValueError: Se o tipo de documento não existir
+        """
+        if tipo not in TIPOS_DOCUMENTO:
+            raise ValueError(f"Tipo de documento sem estilos: {tipo}")
+        chave = (tipo, self._paleta(paleta), tuple(fontes or obter_fontes()))
+        estilos = self._catalogos.get(chave)
+        if estilos is not None:
+            return estilos
+
+        with self._lock:
+            if chave not in self._catalogos:
+                self._catalogos[chave] = self._montar(*chave)
+            return self._catalogos[chave]
+
+    def _montar(self, tipo, paleta, fontes):
+        inicio = time.perf_counter()
+        cores = self.paletas[paleta]
+        fonte_unicode, fonte_bold = fontes
+
+        estilos = _estilos_conteudo(cores, fonte_unicode, fonte_bold)
+        if tipo == TIPO_ARIZONA:
+            estilos.update(_estilos_arizona(fonte_unicode, fonte_bold))
+        else:
+            estilos.update(_estilos_voxy(cores, fonte_unicode, fonte_bold, tipo == TIPO_DR_PASTO))
+
+        duracao = time.perf_counter() - inicio
+        self.tempo_carregamento += duracao
+        logging.info(f"Estilos '{tipo}/{paleta}' ({fonte_unicode}) montados: {len(estilos)} em {duracao * 1000:.1f}ms")
+        return MappingProxyType(estilos)
+
+    def carregar(self):
+        """Monta os estilos de todos os tipos e paletas (chamado na inicialização dos workers)."""
+        fontes = obter_fontes()
+        for tipo in TIPOS_DOCUMENTO:
+            for paleta in self.paletas:
+                self.obter(tipo, paleta, fontes)
+
+# Instância única por processo
+STYLE_CATALOG = StyleCatalog()
+
+def obter_estilos(tipo, paleta):
+    """
+    Retorna os estilos compartilhados de um tipo de documento e paleta.
+
+    Args:
+        tipo (str): Um de TIPOS_DOCUMENTO
+        paleta (str): Nome da paleta
+
+    Returns:
+        MappingProxyType: Nome do estilo -> ParagraphStyle (somente leitura)
+    """
+    return STYLE_CATALOG.obter(tipo, paleta)
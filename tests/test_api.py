@@ -0,0 +1,116 @@
+# Arquivo: tests/test_api.py
+# Rotas da API (main.py)
+
+import io
+import json
+import os
+import re
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+# main.py recusa iniciar sem API_KEY
+os.environ.setdefault('API_KEY', 'chave-de-teste')
+
+from pdf_service import main  # noqa: E402
+from pdf_service.core.exceptions import RenderQueueFullError  # noqa: E402
+from pdf_service.ingest import request as modulo_request  # noqa: E402
+from pdf_service.jobs.manager import JobManager  # noqa: E402
+from pdf_service.render.engine import RenderEngine  # noqa: E402
+
+CABECALHOS = {'Authorization': f"Bearer {main.API_KEY}"}
+
+ITEM_DINAMICO = {
+    'tipo_documento': 'relatorio',
+    'titulo_documento': 'Relatório de teste',
+    'tecnico_nome': 'Teste',
+    'propriedade': 'Fazenda Teste',
+    'conteudo_principal': '## Solo\n\nSolo argiloso com boa estrutura.',
+}
+
+@pytest.fixture
+def cliente(monkeypatch):
+    """API com o motor em thread no próprio processo (sem pool de workers)."""
+    motor = RenderEngine(tamanho_pool=0)
+    monkeypatch.setattr(main, 'render_engine', motor)
+    monkeypatch.setattr(main, 'job_manager', JobManager(motor))
+    with TestClient(main.app) as cliente:
+        yield cliente
+
+def test_openapi_sem_referencias_quebradas():
+    esquema = main.app.openapi()
+    referencias = set(re.findall(r'#/components/schemas/(\w+)', json.dumps(esquema)))
+
+    assert {'ReportData', 'VisitReportData'} <= referencias
+    assert referencias <= set(esquema['components']['schemas'])
+
+def test_fila_cheia_responde_503_com_retry_after(cliente, monkeypatch):
+    async def fila_cheia(*args, **kwargs):
+        raise RenderQueueFullError("Fila de renderização cheia", retry_after=7)
+
+    monkeypatch.setattr(main.render_engine, 'renderizar', fila_cheia)
+
+    resposta = cliente.post('/gerar-pdf-dinamico', json=ITEM_DINAMICO, headers=CABECALHOS)
+
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After'] == '7'
+
+def _lote_com_item_invalido():
+    # O item 1 não tem titulo_documento
+    invalido = {chave: valor for chave, valor in ITEM_DINAMICO.items() if chave != 'titulo_documento'}
+    return {'itens': [ITEM_DINAMICO, invalido, dict(ITEM_DINAMICO, propriedade='Sítio')]}
+
+def test_lote_zip_reporta_item_invalido_e_renderiza_os_demais(cliente):
+    resposta = cliente.post('/gerar-lote-dinamico', json=_lote_com_item_invalido(), headers=CABECALHOS)
+
+    assert resposta.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(resposta.content)) as arquivo_zip:
+        nomes = sorted(arquivo_zip.namelist())
+        resumo = json.loads(arquivo_zip.read('resumo.json'))
+        pdfs = [arquivo_zip.read(nome) for nome in nomes if nome.endswith('.pdf')]
+    assert nomes == ['001_relatorio_fazenda_teste.pdf', '003_relatorio_sítio.pdf', 'resumo.json']
+    assert all(pdf.startswith(b'%PDF') for pdf in pdfs)
+    assert (resumo['total'], resumo['sucesso'], resumo['erro']) == (3, 2, 1)
+    assert resumo['erros'][0]['indice'] == 1
+    assert resumo['erros'][0]['codigo_erro'] == 422
+    assert 'titulo_documento' in resumo['erros'][0]['erro']
+
+def test_lote_ndjson_reporta_item_invalido_e_renderiza_os_demais(cliente):
+    resposta = cliente.post('/gerar-lote-dinamico', json=_lote_com_item_invalido(), headers=CABECALHOS,
+                            params={'formato': 'ndjson'})
+
+    assert resposta.status_code == 200
+    linhas = [json.loads(linha) for linha in resposta.text.splitlines()]
+    itens = sorted(linhas[:-1], key=lambda linha: linha['indice'])
+    assert [item['status'] for item in itens] == ['sucesso', 'erro', 'sucesso']
+    assert itens[1]['codigo_erro'] == 422
+    assert linhas[-1]['resumo']['sucesso'] == 2
+
+def test_lote_maior_que_o_limite_recusado_pelo_content_length(cliente, monkeypatch):
+    monkeypatch.setattr(modulo_request, 'INGEST_MAX_BODY_MB', 0.0002)
+
+    resposta = cliente.post('/gerar-lote-dinamico', json=_lote_com_item_invalido(), headers=CABECALHOS)
+
+    assert resposta.status_code == 413
+
+def test_lote_maior_que_o_limite_recusado_durante_a_leitura(cliente, monkeypatch):
+    monkeypatch.setattr(modulo_request, 'INGEST_MAX_BODY_MB', 0.0002)
+    corpo = json.dumps(_lote_com_item_invalido()).encode()
+
+    # Sem Content-Length (chunked): o limite vale para os bytes recebidos
+    resposta = cliente.post('/gerar-lote-dinamico', content=iter([corpo[:150], corpo[150:]]),
+                            headers=dict(CABECALHOS, **{'Content-Type': 'application/json'}))
+
+    assert resposta.status_code == 413
+
+@pytest.mark.parametrize('corpo, local', [
+    (b'{"itens": [', ['body', 11]),
+    (b'{"itens": []}', ['body', 'itens']),
+])
+def test_lote_invalido_recusado_com_422(cliente, corpo, local):
+    resposta = cliente.post('/gerar-lote-adubacao', content=corpo,
+                            headers=dict(CABECALHOS, **{'Content-Type': 'application/json'}))
+
+    assert resposta.status_code == 422
+    assert resposta.json()['detail'][0]['loc'] == local
@@ -0,0 +1,74 @@
+# Arquivo: tests/test_chart_backends.py
+# Os dois backends de gráfico (matplotlib e ReportLab nativo) desenham os mesmos títulos, rótulos e valores
+
+import io
+
+import pytest
+from PyPDF2 import PdfReader
+
+from pdf_service.core.config import get_color_palette
+from pdf_service.graphics.chart_cache import CHART_CACHE
+from pdf_service.graphics.chart_data import (
+    detectar_unidade, extrair_pares, extrair_serie_linha, formatar_valor, rotulo_eixo_y
+)
+from pdf_service.graphics.chart_factory import ChartFactory
+
+GRAFICOS = {
+    'barras': ('barras', 'Produção por talhão', 'Talhão 1: 120, Talhão 2: 95, Talhão 3: 143, Talhão 4: 80', None),
+    'barras_monetario': ('barras', 'Receita', 'Milho: 1200, Soja: 2350.5, Trigo: 800', 'R$'),
+    'barras_percentual': ('barras', 'Cobertura', 'A: 45%, B: 30%, C: 25%', None),
+    'pizza': ('pizza', 'Uso do solo', 'Pastagem: 55, Lavoura: 30, Reserva: 15', None),
+    'linha': ('linha', 'Evolução do pH', 'pH=4.8,5.1,5.4,5.9,6.2; labels=Jan,Mar,Mai,Jul,Set', None),
+}
+BACKENDS = ('matplotlib', 'reportlab')
+
+@pytest.fixture(autouse=True)
+def sem_cache():
+    CHART_CACHE.limpar()
+    yield
+    CHART_CACHE.limpar()
+
+def _textos_esperados(tipo, titulo, dados, unidade):
+    """Título, rótulos e valores formatados pelo parsing compartilhado (graphics/chart_data.py)."""
+    if tipo == 'linha':
+        titulo, _, labels, valores = extrair_serie_linha(titulo, dados)
+    else:
+        labels, valores = extrair_pares(titulo, dados, tipo)
+    esperados = [titulo] + labels
+    if tipo == 'pizza':
+        total = sum(valores)
+        esperados += [f'{100.0 * valor / total:.1f}%' for valor in valores]
+    else:
+        unidade = detectar_unidade(dados, unidade)
+        esperados += [formatar_valor(valor, unidade) for valor in valores]
+        esperados.append(rotulo_eixo_y(unidade))
+    return esperados
+
+def _texto_do_pdf(buffer):
+    # Sem espaços: o matplotlib (fontes Type 3) pode separar os glifos
+    return ''.join(PdfReader(io.BytesIO(buffer.getvalue())).pages[0].extract_text().split())
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('nome', GRAFICOS)
+def test_backend_desenha_titulo_rotulos_e_valores(nome, backend):
+    tipo, titulo, dados, unidade = GRAFICOS[nome]
+
+    buffer = ChartFactory.create_chart(tipo, titulo, dados, get_color_palette('azul_escuro'), unidade=unidade,
+                                       qualidade='vetor', backend=backend)
+
+    assert buffer.getvalue().startswith(b'%PDF')
+    texto = _texto_do_pdf(buffer)
+    ausentes = [esperado for esperado in _textos_esperados(tipo, titulo, dados, unidade)
+                if ''.join(esperado.split()) not in texto]
+    assert ausentes == []
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('tipo', ['barras', 'pizza', 'linha'])
+def test_backend_gera_imagem_rasterizada(tipo, backend):
+    _, titulo, dados, unidade = GRAFICOS[tipo]
+
+    buffer = ChartFactory.create_chart(tipo, titulo, dados, get_color_palette('preto_e_branco'), unidade=unidade,
+                                       qualidade='alta', backend=backend)
+
+    # Sem o renderPM o backend nativo cai para o PDF vetorial (ver renderizar_desenho)
+    assert buffer.getvalue()[:4] in (b'\x89PNG', b'%PDF')
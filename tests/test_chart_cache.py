@@ -0,0 +1,79 @@
+# Arquivo: tests/test_chart_cache.py
+# Cache de gráficos em disco: total de bytes mantido a cada gravação, diretório percorrido só ao passar do limite
+
+import os
+
+import pytest
+
+from pdf_service.graphics.chart_cache import ChartCache
+
+@pytest.fixture
+def percursos(monkeypatch):
+    """Conta as vezes em que um diretório é percorrido com os.walk."""
+    chamadas = []
+    original = os.walk
+
+    def walk(diretorio, *args, **kwargs):
+        chamadas.append(diretorio)
+        return original(diretorio, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'walk', walk)
+    return chamadas
+
+def _chave(i):
+    return ChartCache.chave('barras', f'Gráfico {i}', 'A: 1', None, {})
+
+def _envelhecer(cache, chaves):
+    # mtimes distintos e em ordem, para a remoção dos menos usados ser determinística
+    for idade, chave in enumerate(reversed(chaves), start=1):
+        os.utime(cache._caminho(chave), (1_000_000 - idade, 1_000_000 - idade))
+
+def test_gravacoes_abaixo_do_limite_nao_percorrem_o_diretorio(tmp_path, percursos):
+    cache = ChartCache(diretorio=str(tmp_path), max_bytes_disco=10_000)
+    assert percursos == [str(tmp_path)]
+
+    for i in range(9):
+        cache.guardar(_chave(i), b'x' * 1_000)
+    # Regravar a mesma chave troca o tamanho em vez de somar de novo
+    cache.guardar(_chave(0), b'x' * 500)
+
+    assert len(percursos) == 1
+    assert cache._bytes_disco == 8_500
+
+def test_total_inicial_lido_do_disco_e_limpeza_ao_passar_do_limite(tmp_path, percursos):
+    anterior = ChartCache(diretorio=str(tmp_path), max_bytes_disco=0)
+    chaves = [_chave(i) for i in range(8)]
+    for chave in chaves:
+        anterior.guardar(chave, b'x' * 1_000)
+    _envelhecer(anterior, chaves)
+
+    cache = ChartCache(diretorio=str(tmp_path), max_bytes_disco=9_500)
+    assert cache._bytes_disco == 8_000
+    cache.guardar(_chave(8), b'x' * 1_000)
+    assert len(percursos) == 1
+
+    # Passa do limite: uma contagem do diretório e remoção dos arquivos mais antigos
+    cache.guardar(_chave(9), b'x' * 1_000)
+
+    assert len(percursos) == 2
+    assert cache._bytes_disco == 9_000
+    assert cache.disk_evictions == 1
+    assert not os.path.exists(cache._caminho(chaves[0]))
+    assert os.path.exists(cache._caminho(chaves[1]))
+
+def test_limpeza_corrige_o_total_com_gravacoes_de_outros_processos(tmp_path):
+    cache = ChartCache(diretorio=str(tmp_path), max_bytes_disco=5_000)
+    outro_worker = ChartCache(diretorio=str(tmp_path), max_bytes_disco=0)
+    chaves = [_chave(i) for i in range(5)]
+    for chave in chaves:
+        outro_worker.guardar(chave, b'x' * 1_000)
+    _envelhecer(outro_worker, chaves)
+    assert cache._bytes_disco == 0
+
+    for i in range(5, 11):
+        cache.guardar(_chave(i), b'x' * 1_000)
+
+    # Ao passar do limite pelas próprias gravações (6KB), conta o diretório real (11KB)
+    assert cache.disk_evictions == 6
+    assert cache._bytes_disco == 5_000
+    assert not any(os.path.exists(cache._caminho(chave)) for chave in chaves)
@@ -0,0 +1,100 @@
+# Arquivo: tests/test_html_cleaner.py
+# limpar_html_malformado: equivalência com a versão anterior em HTML bem formado e robustez em sopa de tags
+
+import html
+import random
+import re
+
+import pytest
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph
+
+from pdf_service.text.html_cleaner import _balancear_tags, limpar_html_malformado
+
+def limpar_anterior(texto):
+    """limpar_html_malformado anterior (regex com lookahead), congelado aqui."""
+    if not texto:
+        return ""
+    texto = re.sub(r'</?para>', '', texto)
+    texto = re.sub(r'<b>(?!.*</b>.*$)', '<b>', texto)
+    texto = re.sub(r'<b>([^<]*)<b>', r'<b>\1</b>', texto)
+    texto = re.sub(r'<b>([^<]*)$', r'<b>\1</b>', texto)
+    texto = re.sub(r'<i>(?!.*</i>)', '<i>', texto)
+    texto = re.sub(r'<i>([^<]*)<i>', r'<i>\1</i>', texto)
+    texto = re.sub(r'<u>(?!.*</u>)', '<u>', texto)
+    texto = re.sub(r'<u>([^<]*)<u>', r'<u>\1</u>', texto)
+    texto = texto.replace('&', '&amp;')
+    if texto.endswith('<b>'):
+        texto = texto[:-3]
+    return texto
+
+PALAVRAS = ['solo', 'pH 5,2', 'calagem', 'P', 'K', 'dose', '90 kg/ha', 'Ca', ' ', ' ', '.', ',']
+TAGS = ('b', 'i', 'u', 'sup', 'sub')
+SOPA = [f'<{tag}>' for tag in TAGS] + [f'</{tag}>' for tag in TAGS] + [
+    '<br/>', '<para>', '</para>', '&', '&deg;', '&#176;', '&amp;', '&x', '<', 'x<y', 'a < b', '<=', '>',
+] + PALAVRAS
+
+_TAG_CONHECIDA = re.compile(r'</?(?:b|i|u|sup|sub|para)>|<br/>')
+
+def _bem_formado(aleatorio, abertas=()):
+    """HTML bem formado sem '&', '<' solto, par vazio nem tag dentro dela mesma (onde a versão anterior acertava)."""
+    partes = []
+    for _ in range(aleatorio.randint(1, 4)):
+        sorteio = aleatorio.random()
+        livres = [tag for tag in TAGS if tag not in abertas]
+        if sorteio < 0.3 and len(abertas) < 3:
+            tag = aleatorio.choice(livres)
+            partes.append(f'<{tag}>{_bem_formado(aleatorio, abertas + (tag,))}</{tag}>')
+        elif sorteio < 0.4:
+            partes.append('<br/>')
+        else:
+            partes.append(aleatorio.choice(PALAVRAS[:-4]))
+    return ''.join(partes)
+
+def _sopas(quantidade, semente):
+    aleatorio = random.Random(semente)
+    for _ in range(quantidade):
+        yield ''.join(aleatorio.choice(SOPA) for _ in range(aleatorio.randint(1, 15)))
+
+def _texto_visivel(marcado):
+    return html.unescape(_TAG_CONHECIDA.sub('', marcado))
+
+def test_igual_a_versao_anterior_em_html_bem_formado():
+    aleatorio = random.Random(21)
+    for _ in range(10_000):
+        texto = _bem_formado(aleatorio)
+        assert limpar_html_malformado(texto) == limpar_anterior(texto), texto
+
+def test_sopa_de_tags_sempre_aceita_pelo_reportlab():
+    estilo = ParagraphStyle('Teste')
+    for texto in _sopas(5_000, 22):
+        limpo = limpar_html_malformado(texto)
+        Paragraph(limpo, estilo)
+        assert _texto_visivel(limpo) == _texto_visivel(texto), texto
+
+def test_atalhos_iguais_a_passada_com_pilha():
+    aleatorio = random.Random(23)
+    textos = list(_sopas(5_000, 24)) + [_bem_formado(aleatorio) for _ in range(5_000)]
+    for texto in textos:
+        assert limpar_html_malformado(texto) == _balancear_tags(texto), texto
+
+@pytest.mark.parametrize('texto', [
+    '90 kg/ha',
+    'A amostragem do <b>talhão</b> foi feita a 0-20 cm,<br/>com <i>15</i> subamostras a 25 &deg;C.',
+    '<sup>-1</sup> e <sub>2</sub><br/><br/>',
+])
+def test_texto_ja_correto_volta_inalterado(texto):
+    assert limpar_html_malformado(texto) == texto
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('<b>dose', '<b>dose</b>'),
+    ('<b>x<b>y', '<b>x</b>y'),
+    ('x</b>', 'x'),
+    ('<b><i>x</b></i>', '<b><i>x</i></b>'),
+    ('<b></b>texto', 'texto'),
+    ('<para>a</para>', 'a'),
+    ('P & K &deg; &#176;', 'P &amp; K &deg; &#176;'),
+    ('a < b <=', 'a &lt; b &lt;='),
+])
+def test_correcoes(texto, esperado):
+    assert limpar_html_malformado(texto) == esperado
@@ -0,0 +1,48 @@
+# Arquivo: tests/test_images.py
+# Preparo das imagens anexadas na caixa em que são impressas (images/pipeline.py), incluindo o logo do rodapé
+
+import io
+import math
+
+from PIL import Image as PILImage
+from reportlab.lib.units import inch
+
+from pdf_service import pdf_generator
+from pdf_service.images.pipeline import validar_imagens
+
+def _png(largura, altura):
+    saida = io.BytesIO()
+    # Ruído para o PNG não ficar menor que a versão reamostrada
+    PILImage.effect_noise((largura, altura), 64).convert('RGB').save(saida, 'PNG')
+    return saida.getvalue()
+
+def test_caixa_por_posicao_prepara_o_logo_no_tamanho_do_rodape():
+    imagens = [{'id': 1, 'dados': _png(1200, 1200)}, {'id': 2, 'dados': _png(1200, 1200)}]
+
+    logo, foto = validar_imagens(imagens, 'rascunho', caixas={0: pdf_generator.LOGO_RODAPE})
+
+    assert (logo.largura, logo.altura) == (math.ceil(0.6 * 150), math.ceil(0.6 * 150))
+    # Retrato/quadrada no corpo: 3.5 polegadas de largura
+    assert (foto.largura, foto.altura) == (math.ceil(3.5 * 150), math.ceil(3.5 * 150))
+
+def test_logo_preparado_uma_vez_a_partir_do_original(monkeypatch):
+    chamadas = []
+    original = pdf_generator.validar_imagens
+
+    def validar(imagens, qualidade=None, caixas=None):
+        chamadas.append(caixas)
+        return original(imagens, qualidade, caixas)
+
+    monkeypatch.setattr(pdf_generator, 'validar_imagens', validar)
+    dados = {
+        'tipo_documento': 'relatorio',
+        'titulo_documento': 'Teste',
+        'tecnico_nome': 'Teste',
+        'conteudo_principal': '[LOGO:7] Texto do relatório.\n\n[IMAGEM:1]',
+        'imagens_anexadas': [{'id': 1, 'dados': _png(800, 600)}, {'id': 7, 'dados': _png(1200, 1200)}],
+    }
+
+    pdf = pdf_generator.create_pdf_from_data(dados)
+
+    assert pdf.startswith(b'%PDF')
+    assert chamadas == [{1: (0.6 * inch, 0.6 * inch)}]
@@ -0,0 +1,183 @@
+# Arquivo: tests/test_ingest.py
+# Leitura do corpo em fluxo (ingest/): LeitorJSON em blocos cortados em qualquer ponto, base64 decodificado em fluxo, limites e erros
+
+import base64
+import json
+import random
+from typing import List
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from pdf_service.ingest import request as modulo_request
+from pdf_service.ingest.json_stream import ErroJSON, LeitorJSON
+from pdf_service.ingest.request import receber_json
+from pdf_service.ingest.spool import ArquivoSpool, DecodificadorBase64, OrcamentoDecodificado
+
+DOCUMENTO = {
+    'titulo': 'Análise de solo — talhão "A"\\norte',
+    'escapes': 'aspas \" barra \\ /, \b\f\n\r\t, ção, \U0001F331 e \u2028',
+    'numeros': [0, -0, 7, -12, 3.25, -0.5, 1e10, 2.5E-3, -1e+2, 12345678901234567890, 0.1],
+    'literais': [True, False, None, [], {}, ''],
+    'aninhado': {'a': [{'b': [1, {'c': None}]}], 'vazio': {'x': []}},
+}
+
+def _json(objeto, **opcoes):
+    return json.dumps(objeto, **opcoes).encode()
+
+def _ler(blocos, abrir_destino=None):
+    leitor = LeitorJSON(abrir_destino)
+    for bloco in blocos:
+        leitor.alimentar(bloco)
+    return leitor.finalizar()
+
+def _cortes_aleatorios(dados, aleatorio, maximo=7):
+    blocos, inicio = [], 0
+    while inicio < len(dados):
+        fim = inicio + aleatorio.randint(0, maximo)
+        blocos.append(dados[inicio:fim])
+        inicio = fim
+    return blocos
+
+@pytest.mark.parametrize('opcoes', [{}, {'ensure_ascii': False}, {'indent': 2}])
+def test_qualquer_corte_em_dois_blocos_igual_ao_json_loads(opcoes):
+    dados = _json(DOCUMENTO, **opcoes)
+    esperado = json.loads(dados)
+    # Corta em todo byte: dentro de números, literais, escapes \uXXXX e caracteres UTF-8
+    for corte in range(len(dados) + 1):
+        assert _ler([dados[:corte], dados[corte:]]) == esperado, corte
+
+def test_blocos_aleatorios_iguais_ao_json_loads():
+    aleatorio = random.Random(14)
+    dados = _json(DOCUMENTO, ensure_ascii=False)
+    esperado = json.loads(dados)
+    for _ in range(500):
+        assert _ler(_cortes_aleatorios(dados, aleatorio)) == esperado
+
+@pytest.mark.parametrize('texto', [b'123', b'-0.5e3', b'true', b'null', b'"\\u00e7"', b'  []  '])
+def test_valor_na_raiz_byte_a_byte(texto):
+    assert _ler([texto[i:i + 1] for i in range(len(texto))]) == json.loads(texto)
+
+@pytest.mark.parametrize('corte', range(5))
+def test_bom_utf8_no_inicio_ignorado(corte):
+    dados = b'\xef\xbb\xbf' + _json({'a': 1})
+
+    assert _ler([dados[:corte], dados[corte:]]) == {'a': 1}
+
+@pytest.mark.parametrize('texto', [
+    b'{"a": 1,}', b'{"a" 1}', b'[1 2]', b'[01]', b'[1.]', b'[-]', b'[tru]', b'[nul', b'{"a": "\\x"}',
+    b'{"a": 1} {}', b'[1, "sem fim', b'\xef\xbb', b'\xef\xbb\xbf\xef\xbb\xbf{}',
+])
+def test_json_invalido_recusado_em_qualquer_corte(texto):
+    for corte in range(len(texto) + 1):
+        with pytest.raises(ErroJSON):
+            _ler([texto[:corte], texto[corte:]])
+
+class _Destinos:
+    """abrir_destino que decodifica os campos imagens[*].base64 para spools em memória."""
+
+    def __init__(self):
+        self.spools = []
+        self.orcamento = OrcamentoDecodificado(10)
+
+    def __call__(self, caminho):
+        if caminho != ('imagens', '*', 'base64'):
+            return None
+        spool = ArquivoSpool(limite_memoria=1024 * 1024)
+        self.spools.append(spool)
+        return DecodificadorBase64(spool, len(self.spools) - 1, 10, self.orcamento)
+
+def test_base64_com_barra_escapada_decodificado_em_qualquer_corte():
+    aleatorio = random.Random(15)
+    # Bytes 0xff/0xfe geram muitas '/' no base64, que alguns encoders escrevem como '\/'
+    conteudos = [bytes(aleatorio.choice([0xff, 0xfe, aleatorio.randrange(256)]) for _ in range(tamanho))
+                 for tamanho in (300, 301, 302)]
+    dados = _json({'imagens': [{'id': i, 'base64': base64.b64encode(conteudo).decode()}
+                               for i, conteudo in enumerate(conteudos)]}).replace(b'/', b'\\/')
+    assert b'\\/' in dados
+
+    for _ in range(200):
+        destinos = _Destinos()
+        objeto = _ler(_cortes_aleatorios(dados, aleatorio, maximo=40), destinos)
+        assert [spool.como_anexo()['dados'] for spool in destinos.spools] == conteudos
+        assert [imagem['base64'] for imagem in objeto['imagens']] == destinos.spools
+
+class Corpo(BaseModel):
+    titulo: str
+    imagens_anexadas: List[dict] = []
+
+app = FastAPI()
+
+@app.post('/corpo')
+async def ler_corpo(request: Request):
+    recebido = await receber_json(request, Corpo, ('imagens_anexadas',))
+    try:
+        return {'titulo': recebido.modelo.titulo,
+                'imagens': [base64.b64encode(imagem['dados']).decode() for imagem in recebido.imagens]}
+    finally:
+        recebido.descartar()
+
+@pytest.fixture
+def cliente():
+    with TestClient(app) as cliente:
+        yield cliente
+
+def _imagem(tamanho, semente=0):
+    return base64.b64encode(random.Random(semente).randbytes(tamanho)).decode()
+
+def _corpo(*imagens):
+    return {'titulo': 'Teste', 'imagens_anexadas': [{'id': i, 'base64': b64} for i, b64 in enumerate(imagens)]}
+
+def _em_blocos(dados, tamanho=64):
+    # Sem Content-Length: só a contagem dos bytes recebidos vale
+    return iter([dados[i:i + tamanho] for i in range(0, len(dados), tamanho)])
+
+def test_corpo_com_bom_aceito(cliente):
+    imagem = _imagem(200)
+
+    resposta = cliente.post('/corpo', content=b'\xef\xbb\xbf' + _json(_corpo(imagem)))
+
+    assert resposta.status_code == 200
+    assert resposta.json() == {'titulo': 'Teste', 'imagens': [imagem]}
+
+@pytest.mark.parametrize('em_blocos', [False, True])
+def test_corpo_acima_do_limite_recusado_com_413(cliente, monkeypatch, em_blocos):
+    monkeypatch.setattr(modulo_request, 'INGEST_MAX_BODY_MB', 0.001)
+    dados = _json(_corpo(_imagem(1000)))
+
+    resposta = cliente.post('/corpo', content=_em_blocos(dados) if em_blocos else dados)
+
+    assert resposta.status_code == 413
+    assert 'Requisição muito grande' in resposta.json()['detail']
+
+def test_imagem_acima_do_limite_recusada_com_413(cliente, monkeypatch):
+    monkeypatch.setattr(modulo_request, 'MAX_IMAGE_SIZE_MB', 0.001)
+
+    resposta = cliente.post('/corpo', content=_em_blocos(_json(_corpo(_imagem(300), _imagem(1000)))))
+
+    assert resposta.status_code == 413
+    assert 'Imagem 1 muito grande' in resposta.json()['detail']
+
+def test_total_decodificado_acima_do_limite_recusado_com_413(cliente, monkeypatch):
+    monkeypatch.setattr(modulo_request, 'MAX_DECODE_SIZE_MB', 0.002)
+
+    # Cada imagem cabe sozinha; a terceira passa do total de ~2KB decodificados
+    resposta = cliente.post('/corpo', content=_em_blocos(_json(_corpo(*[_imagem(900, i) for i in range(3)]))))
+
+    assert resposta.status_code == 413
+    assert 'Tamanho total das imagens' in resposta.json()['detail']
+
+@pytest.mark.parametrize('dados, local', [
+    (b'{"titulo": "Teste",, "imagens_anexadas": []}', ['body', 19]),
+    (b'{"titulo": "Teste"', ['body', 18]),
+    (_json(_corpo(_imagem(300), _imagem(300)[:-8] + '!!!!' + 'AAAA')), ['body', 'imagens_anexadas', 1, 'base64']),
+    (_json(_corpo(_imagem(300) + 'A')), ['body', 'imagens_anexadas', 0, 'base64']),
+    (_json({'imagens_anexadas': []}), ['body', 'titulo']),
+])
+def test_corpo_invalido_recusado_com_422_no_local_do_erro(cliente, dados, local):
+    resposta = cliente.post('/corpo', content=_em_blocos(dados, 16))
+
+    assert resposta.status_code == 422
+    assert resposta.json()['detail'][0]['loc'] == local
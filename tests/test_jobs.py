@@ -0,0 +1,242 @@
+# Arquivo: tests/test_jobs.py
+# Jobs assíncronos: webhook (callback_url) contra um servidor HTTP local, proteção contra SSRF e limite do JobStore
+
+import asyncio
+import json
+import os
+import time
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pdf_service.core.exceptions import JobStoreFullError, RenderQueueFullError
+from pdf_service.ingest.request import RequisicaoRecebida
+from pdf_service.ingest.spool import ArquivoSpool
+from pdf_service.jobs import manager as modulo_manager
+from pdf_service.jobs import store as modulo_store
+from pdf_service.jobs.manager import JobManager, _enviar_webhook, validar_callback_url
+from pdf_service.jobs.store import JobStore
+from pdf_service.render.engine import RenderEngine
+
+DADOS_DINAMICO = {
+    'tipo_documento': 'relatorio',
+    'titulo_documento': 'Relatório de teste',
+    'tecnico_nome': 'Teste',
+    'propriedade': 'Fazenda Teste',
+    'conteudo_principal': '## Solo\n\nSolo argiloso com boa estrutura.',
+    'imagens_anexadas': [],
+}
+
+class _Webhook(BaseHTTPRequestHandler):
+    """Responde cada POST com o próximo status de `respostas` e guarda o caminho e o corpo recebidos."""
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.recebidos.append((self.path, json.loads(corpo or b'null')))
+        status = self.server.respostas.pop(0) if self.server.respostas else 200
+        self.send_response(status)
+        if 300 <= status < 400:
+            self.send_header('Location', '/redirecionado')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def webhook():
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Webhook)
+    servidor.recebidos = []
+    servidor.respostas = []
+    servidor.url = f"http://127.0.0.1:{servidor.server_address[1]}/webhook"
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+@pytest.fixture
+def loopback_permitido(monkeypatch):
+    monkeypatch.setattr(modulo_manager, 'JOB_WEBHOOK_ALLOWED_HOSTS', ['127.0.0.1'])
+
+def _executar_job(callback_url, anexos=None):
+    """Roda um job 'dinamico' de ponta a ponta (motor em thread) e retorna o estado final no store."""
+    async def executar():
+        motor = RenderEngine(tamanho_pool=0)
+        motor.iniciar()
+        jobs = JobManager(motor, store=JobStore(diretorio=''))
+        jobs.iniciar()
+        try:
+            job = await jobs.submeter('dinamico', 'dinamico', dict(DADOS_DINAMICO), 'teste.pdf', callback_url, anexos)
+            while jobs.pendentes:
+                await asyncio.sleep(0.05)
+            return jobs.store.obter(job['id'])
+        finally:
+            jobs.encerrar()
+            motor.encerrar()
+    return asyncio.run(executar())
+
+def test_webhook_recebe_estado_final_apos_nova_tentativa(webhook, loopback_permitido):
+    webhook.respostas = [500, 200]
+
+    job = _executar_job(webhook.url)
+
+    assert job['status'] == 'concluido'
+    assert job['webhook'] == {'status': 'enviado', 'http_status': 200, 'tentativas': 2}
+    assert [caminho for caminho, _ in webhook.recebidos] == ['/webhook', '/webhook']
+    corpo = webhook.recebidos[-1][1]
+    assert corpo['id'] == job['id']
+    assert (corpo['tipo'], corpo['status'], corpo['filename']) == ('dinamico', 'concluido', 'teste.pdf')
+    assert corpo['tamanho_bytes'] == job['tamanho_bytes'] > 0
+    assert corpo['status_url'] == f"/jobs/{job['id']}"
+    assert corpo['pdf_url'] == f"/jobs/{job['id']}/pdf"
+    assert corpo['erro'] is None
+
+def test_webhook_desiste_depois_das_tentativas(webhook, loopback_permitido, monkeypatch):
+    monkeypatch.setattr(modulo_manager, 'JOB_WEBHOOK_RETRIES', 2)
+    webhook.respostas = [503, 503]
+
+    job = _executar_job(webhook.url)
+
+    assert job['webhook']['status'] == 'falhou'
+    assert job['webhook']['tentativas'] == 2
+    assert len(webhook.recebidos) == 2
+
+def test_webhook_nao_segue_redirecionamento(webhook, loopback_permitido):
+    webhook.respostas = [302]
+
+    with pytest.raises(urllib.error.HTTPError):
+        _enviar_webhook(webhook.url, {'id': 'x'}, timeout=5)
+    assert [caminho for caminho, _ in webhook.recebidos] == ['/webhook']
+
+def test_webhook_recusa_conexao_com_endereco_interno(webhook):
+    # Sem o host na lista, o IP conectado (loopback) é recusado antes de enviar o corpo
+    with pytest.raises(ValueError):
+        _enviar_webhook(webhook.url, {'id': 'x'}, timeout=5)
+    assert webhook.recebidos == []
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1:8000/webhook',
+    'http://localhost/webhook',
+    'http://169.254.169.254/latest/meta-data/',
+    'http://10.0.0.5/webhook',
+    'http://192.168.1.10/webhook',
+    'http://[::1]/webhook',
+    'http://[::ffff:10.0.0.1]/webhook',
+    'ftp://93.184.216.34/webhook',
+])
+def test_callback_url_interna_recusada(url):
+    with pytest.raises(ValueError):
+        validar_callback_url(url)
+
+def test_callback_url_publica_aceita():
+    assert validar_callback_url('https://93.184.216.34/webhook') == 'https://93.184.216.34/webhook'
+
+def test_lista_de_hosts_libera_host_interno_e_restringe_os_demais(monkeypatch):
+    monkeypatch.setattr(modulo_manager, 'JOB_WEBHOOK_ALLOWED_HOSTS', ['127.0.0.1'])
+
+    assert validar_callback_url('http://127.0.0.1:8000/webhook')
+    with pytest.raises(ValueError):
+        validar_callback_url('https://93.184.216.34/webhook')
+
+def _recebido_em_disco(tmp_path):
+    spool = ArquivoSpool(limite_memoria=0, diretorio=str(tmp_path))
+    spool.escrever(b'x' * 10)
+    return RequisicaoRecebida(None, [spool.como_anexo()], [spool]), spool
+
+def test_transferir_passa_os_temporarios_para_o_job(tmp_path):
+    recebido, spool = _recebido_em_disco(tmp_path)
+
+    anexos = recebido.transferir()
+    recebido.descartar()  # o que a dependência da rota faz depois da resposta 202
+    assert os.path.exists(spool.caminho)
+
+    anexos.descartar()
+    assert os.listdir(tmp_path) == []
+
+def test_job_descarta_os_anexos_ao_terminar(tmp_path):
+    recebido, _ = _recebido_em_disco(tmp_path)
+
+    job = _executar_job(None, recebido.transferir())
+
+    assert job['status'] == 'concluido'
+    assert os.listdir(tmp_path) == []
+
+def test_job_recusado_descarta_os_anexos(tmp_path):
+    recebido, _ = _recebido_em_disco(tmp_path)
+    jobs = JobManager(RenderEngine(tamanho_pool=0), store=JobStore(diretorio=''), max_pendentes=1)
+    jobs._tarefas.add(object())  # fila cheia
+
+    with pytest.raises(RenderQueueFullError):
+        asyncio.run(jobs.submeter('dinamico', 'dinamico', dict(DADOS_DINAMICO), 'teste.pdf', None,
+                                  recebido.transferir()))
+    assert os.listdir(tmp_path) == []
+
+def test_store_em_memoria_descarta_os_pdfs_mais_antigos():
+    store = JobStore(diretorio='', max_bytes=100)
+    jobs = [store.criar('dinamico') for _ in range(3)]
+    for job in jobs:
+        store.guardar_pdf(job['id'], b'x' * 40)
+
+    assert store.obter(jobs[0]['id']) is None
+    assert store.obter_pdf(jobs[2]['id']) == b'x' * 40
+    estatisticas = store.estatisticas()
+    assert (estatisticas['bytes_em_memoria'], estatisticas['descartados_por_espaco']) == (80, 1)
+
+def test_store_em_memoria_recusa_pdf_maior_que_o_limite():
+    store = JobStore(diretorio='', max_bytes=100)
+    job = store.criar('dinamico')
+
+    with pytest.raises(JobStoreFullError):
+        store.guardar_pdf(job['id'], b'x' * 101)
+    assert store.estatisticas()['bytes_em_memoria'] == 0
+
+def test_submissoes_simultaneas_respeitam_o_limite_de_pendentes(tmp_path):
+    async def submeter_duas():
+        motor = RenderEngine(tamanho_pool=0)
+        motor.iniciar()
+        jobs = JobManager(motor, store=JobStore(diretorio=str(tmp_path)), max_pendentes=1)
+        jobs.iniciar()
+        try:
+            # O registro no disco roda em thread: a segunda submissão chega enquanto a primeira grava
+            resultados = await asyncio.gather(
+                *(jobs.submeter('dinamico', 'dinamico', dict(DADOS_DINAMICO), 'teste.pdf') for _ in range(2)),
+                return_exceptions=True,
+            )
+            while jobs.pendentes:
+                await asyncio.sleep(0.05)
+            return resultados
+        finally:
+            jobs.encerrar()
+            motor.encerrar()
+
+    primeiro, segundo = asyncio.run(submeter_duas())
+
+    assert primeiro['status'] == 'na_fila'
+    assert isinstance(segundo, RenderQueueFullError)
+
+def test_limpeza_em_disco_le_os_jobs_sem_o_lock(tmp_path, monkeypatch):
+    inicio = time.time()
+    relogio = [inicio]
+    monkeypatch.setattr(modulo_store.time, 'time', lambda: relogio[0])
+    store = JobStore(diretorio=str(tmp_path), ttl=60)
+    expirado, valido = store.criar('dinamico'), store.criar('dinamico')
+    relogio[0] = inicio + 50
+    store.atualizar(valido['id'], progresso=0.5)
+    leituras = []
+    ler = store._ler
+
+    def ler_registrando(job_id):
+        leituras.append((job_id, store._lock.locked()))
+        return ler(job_id)
+
+    monkeypatch.setattr(store, '_ler', ler_registrando)
+    relogio[0] = inicio + 100
+
+    assert store.limpar_expirados() == 1
+    # Varredura (uma leitura por arquivo) sem o lock; só o expirado é relido com ele
+    assert sorted(com_lock for _, com_lock in leituras) == [False, False, True]
+    assert (expirado['id'], True) in leituras
+    assert os.listdir(tmp_path) == [valido['id'] + '.json']
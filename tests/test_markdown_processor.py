@@ -0,0 +1,64 @@
+# Arquivo: tests/test_markdown_processor.py
+# Conversão dos blocos Markdown em descritores de flowables (text/markdown_processor.py)
+
+import pytest
+from reportlab.platypus import HRFlowable, Paragraph
+
+from pdf_service.core.config import get_color_palette
+from pdf_service.pdf_generator import parse_conteudo
+from pdf_service.text.markdown_processor import converter_markdown_em_elementos, converter_markdown_para_html
+from pdf_service.text.tokenizer import TipoToken, tokenizar_bloco
+from pdf_service.utils.styles import TIPO_VOXY, obter_estilos
+
+BLOCOS = [
+    'Texto antes\n[SEPARADOR_HORIZONTAL]\nTexto depois',
+    'Fim da seção [SEPARADOR_HORIZONTAL]',
+    '## Título [SEPARADOR_HORIZONTAL]\ntexto',
+    'INTRODUÇÃO\nO lote está **bem** manejado.\n---\n1) Solo\n1.1) Fertilidade\n2. Calagem\n- item *um*\n- item dois',
+    '- começa com marcador\ncontinua *itálico\natravessando* linhas',
+]
+
+def _legado(bloco):
+    """Caminho com marcadores no HTML (converter_markdown_para_html + tokenizar_bloco), agrupado como em _processar_bloco."""
+    titulos, itens, partes, separador = [], [], [], False
+    for token in tokenizar_bloco(converter_markdown_para_html(bloco)):
+        if token.tipo is TipoToken.TEXTO:
+            partes.append(token.texto)
+        elif token.tipo is TipoToken.TITULO:
+            titulos.append((token.numero, token.texto))
+        elif token.tipo is TipoToken.ITEM_LISTA:
+            itens.append(token.texto)
+        else:
+            separador = True
+    texto = ''.join(partes)
+    saida = [('separador',)] if separador else []
+    saida += [('titulo', nivel, titulo) for nivel, titulo in sorted(titulos, key=lambda titulo: titulo[0])]
+    saida += [('item', item) for item in itens]
+    if texto.strip() and texto.strip() != '<br/>':
+        saida.append(('texto', texto))
+    return saida
+
+def _compilado(bloco):
+    saida = []
+    for elemento in converter_markdown_em_elementos(bloco):
+        if elemento.tipo is TipoToken.SEPARADOR:
+            saida.append(('separador',))
+        elif elemento.tipo is TipoToken.TITULO:
+            saida.append(('titulo', elemento.numero, elemento.texto))
+        elif elemento.tipo is TipoToken.ITEM_LISTA:
+            saida.append(('item', elemento.texto))
+        else:
+            saida.append(('texto', elemento.texto))
+    return saida
+
+@pytest.mark.parametrize('bloco', BLOCOS)
+def test_passada_unica_igual_ao_caminho_com_marcadores(bloco):
+    assert _compilado(bloco) == _legado(bloco)
+
+def test_linha_separador_literal_vira_regua():
+    elementos = parse_conteudo('Texto antes\n[SEPARADOR_HORIZONTAL]\nTexto depois', obter_estilos(TIPO_VOXY, 'preto_e_branco'),
+                               get_color_palette('preto_e_branco'), 450, [])
+
+    assert isinstance(elementos[0], HRFlowable)
+    paragrafos = [elemento.text for elemento in elementos if isinstance(elemento, Paragraph)]
+    assert paragrafos == ['Texto antes<br/><br/>Texto depois']
@@ -0,0 +1,75 @@
+# Arquivo: tests/test_pdf_xobjects.py
+# Imagens embutidas uma vez por documento: assets do fundo Arizona dentro do form, logo do rodapé, referência por página
+
+import io
+
+from PIL import Image as PILImage
+from PyPDF2 import PdfReader
+
+from pdf_service.pdf_generator import FUNDO_ARIZONA, create_pdf_from_data, preencher_pdf_template
+from pdf_service.utils.assets import ASSETS_TEMPLATE
+
+def _objetos(leitor):
+    return {numero: leitor.get_object(numero) for numero in range(1, leitor.trailer['/Size'])}
+
+def _imagens(leitor):
+    """Números dos XObjects de imagem do PDF, sem as máscaras suaves (SMask)."""
+    objetos = _objetos(leitor)
+    imagens = {numero for numero, objeto in objetos.items()
+               if hasattr(objeto, 'get') and objeto.get('/Subtype') == '/Image'}
+    mascaras = {objetos[numero].raw_get('/SMask').idnum for numero in imagens if '/SMask' in objetos[numero]}
+    return imagens - mascaras
+
+def _chamadas_do(conteudo):
+    return [linha.split()[0] for linha in conteudo.get_data().splitlines() if linha.endswith(b' Do')]
+
+def test_relatorio_de_visita_embute_cada_asset_uma_vez_dentro_do_form():
+    conteudo = '\n\n'.join(f'## Seção {i}\n\n' + 'Pastagem com boa cobertura e manejo rotacionado. ' * 30
+                           for i in range(12))
+    pdf = preencher_pdf_template({'nombre_de_la_hacienda': 'Fazenda Teste', 'contenido_principal': conteudo})
+
+    leitor = PdfReader(io.BytesIO(pdf))
+    assert len(leitor.pages) > 1
+    nome_form = f'/FormXob.{FUNDO_ARIZONA}'
+
+    # Cada página só referencia o form, uma vez
+    for pagina in leitor.pages:
+        assert list(pagina['/Resources']['/XObject']) == [nome_form]
+        assert _chamadas_do(pagina.get_contents()) == [nome_form.encode()]
+
+    form = leitor.pages[0]['/Resources']['/XObject'].raw_get(nome_form)
+    assert all(pagina['/Resources']['/XObject'].raw_get(nome_form).idnum == form.idnum for pagina in leitor.pages)
+
+    # Dentro do form: um XObject de imagem por asset do template, e são as únicas imagens do PDF
+    imagens_form = form.get_object()['/Resources']['/XObject']
+    assets_arizona = [chave for chave, (arquivo, *_) in ASSETS_TEMPLATE.items() if 'arizona' in arquivo]
+    assert sorted(imagens_form) == sorted(f'/FormXob.asset_{chave}' for chave in assets_arizona)
+    assert sorted(_chamadas_do(form.get_object())) == sorted(nome.encode() for nome in imagens_form)
+    assert {imagens_form.raw_get(nome).idnum for nome in imagens_form} == _imagens(leitor)
+
+def _png(largura, altura):
+    saida = io.BytesIO()
+    PILImage.effect_noise((largura, altura), 64).convert('RGB').save(saida, 'PNG')
+    return saida.getvalue()
+
+def test_logo_do_rodape_embutido_uma_vez_em_documento_de_varias_paginas():
+    conteudo = '[LOGO:7] ' + '\n\n'.join(f'## Seção {i}\n\n' + 'Solo argiloso com boa estrutura e drenagem. ' * 30
+                                          for i in range(12)) + '\n\n[IMAGEM:1]'
+    pdf = create_pdf_from_data({
+        'tipo_documento': 'relatorio',
+        'titulo_documento': 'Teste',
+        'tecnico_nome': 'Teste',
+        'conteudo_principal': conteudo,
+        'imagens_anexadas': [{'id': 1, 'dados': _png(800, 600)}, {'id': 7, 'dados': _png(400, 400)}],
+    })
+
+    leitor = PdfReader(io.BytesIO(pdf))
+    assert len(leitor.pages) > 1
+    nome_logo = '/FormXob.logo_usuario'
+
+    referencias = {pagina['/Resources']['/XObject'].raw_get(nome_logo).idnum for pagina in leitor.pages}
+    assert all(_chamadas_do(pagina.get_contents()).count(nome_logo.encode()) == 1 for pagina in leitor.pages)
+    # Todas as páginas apontam para o mesmo objeto; além dele só a foto do corpo é imagem
+    assert len(referencias) == 1
+    assert referencias < _imagens(leitor)
+    assert len(_imagens(leitor)) == 2
@@ -0,0 +1,126 @@
+# Arquivo: tests/test_render_engine.py
+# Motor de renderização: worker morto e recriado no timeout e no cancelamento, fila cheia e espera descontada do prazo
+
+import asyncio
+import time
+
+import pytest
+
+from pdf_service.core.exceptions import RenderQueueFullError, RenderTimeoutError
+from pdf_service.render import worker as modulo_worker
+from pdf_service.render.engine import RenderEngine
+
+def _dormir(dados):
+    time.sleep(dados['segundos'])
+    return b'%PDF-dormiu'
+
+@pytest.fixture(autouse=True)
+def job_que_dorme(monkeypatch):
+    # Com 'fork' o processo worker herda o _carregar_jobs trocado (não precisa importar o pdf_generator)
+    monkeypatch.setattr(modulo_worker, '_carregar_jobs', lambda: {'dormir': _dormir})
+
+def _com_motor(teste, tamanho_pool=1, profundidade_fila=1):
+    """Roda `teste(motor)` num event loop novo, com um pool de processos criados por fork."""
+    async def executar():
+        motor = RenderEngine(tamanho_pool=tamanho_pool, profundidade_fila=profundidade_fila,
+                             retry_after=7, metodo_inicio='fork')
+        motor.iniciar()
+        try:
+            return await teste(motor)
+        finally:
+            motor.encerrar()
+    return asyncio.run(executar())
+
+async def _esperar_novo_pid(motor, pid_antigo, limite=5.0):
+    prazo = time.monotonic() + limite
+    while motor.pids_workers() == [pid_antigo] and time.monotonic() < prazo:
+        await asyncio.sleep(0.05)
+    return motor.pids_workers()
+
+async def _esperar_vagas(motor):
+    # Cancelar a tarefa não espera a thread do job; a vaga volta quando ela termina de verdade
+    while motor.pendentes:
+        await asyncio.sleep(0.05)
+
+def test_timeout_mata_e_recria_o_worker():
+    async def teste(motor):
+        pid = motor.pids_workers()[0]
+        inicio = time.monotonic()
+        with pytest.raises(RenderTimeoutError):
+            await motor.renderizar('dormir', {'segundos': 30}, timeout=0.5)
+        duracao = time.monotonic() - inicio
+        novo_pid = motor.pids_workers()
+        # O worker novo atende o próximo job
+        resultado = await motor.renderizar('dormir', {'segundos': 0}, timeout=10)
+        return pid, novo_pid, duracao, resultado, motor.estatisticas.como_dict()
+
+    pid, novo_pid, duracao, resultado, estatisticas = _com_motor(teste)
+
+    assert duracao < 5
+    assert len(novo_pid) == 1 and novo_pid[0] != pid
+    assert resultado == b'%PDF-dormiu'
+    assert estatisticas['jobs_encerrados'] == {'timeout': 1, 'cancelado': 0, 'total': 1}
+    assert estatisticas['jobs_concluidos'] == 1
+    assert 0.5 <= estatisticas['segundos_gastos_em_jobs_encerrados'] < 5
+    assert [(job['job'], job['motivo']) for job in estatisticas['ultimos_encerrados']] == [('dormir', 'timeout')]
+
+def test_cancelamento_mata_e_recria_o_worker():
+    async def teste(motor):
+        pid = motor.pids_workers()[0]
+        tarefa = asyncio.create_task(motor.renderizar('dormir', {'segundos': 30}, timeout=60))
+        await asyncio.sleep(0.3)
+        tarefa.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+        novo_pid = await _esperar_novo_pid(motor, pid)
+        await _esperar_vagas(motor)
+        resultado = await motor.renderizar('dormir', {'segundos': 0}, timeout=10)
+        return pid, novo_pid, resultado, motor.estatisticas.como_dict()
+
+    pid, novo_pid, resultado, estatisticas = _com_motor(teste)
+
+    assert len(novo_pid) == 1 and novo_pid[0] != pid
+    assert resultado == b'%PDF-dormiu'
+    assert estatisticas['jobs_encerrados'] == {'timeout': 0, 'cancelado': 1, 'total': 1}
+    assert estatisticas['jobs_concluidos'] == 1
+    assert 0.3 <= estatisticas['segundos_gastos_em_jobs_encerrados'] < 5
+    assert [(job['job'], job['motivo']) for job in estatisticas['ultimos_encerrados']] == [('dormir', 'cancelado')]
+
+def test_fila_cheia_recusa_com_retry_after():
+    async def teste(motor):
+        ocupando = [asyncio.create_task(motor.renderizar('dormir', {'segundos': 30}, timeout=60)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        try:
+            with pytest.raises(RenderQueueFullError) as erro:
+                await motor.renderizar('dormir', {'segundos': 0}, timeout=10)
+            return motor.pendentes, erro.value
+        finally:
+            for tarefa in ocupando:
+                tarefa.cancel()
+            await asyncio.gather(*ocupando, return_exceptions=True)
+            await _esperar_vagas(motor)
+
+    pendentes, erro = _com_motor(teste)
+
+    # Um executando e um na fila (pool 1, fila 1)
+    assert pendentes == 2
+    assert erro.retry_after == 7
+
+def test_espera_na_fila_e_descontada_do_prazo():
+    async def teste(motor):
+        # Worker já carregado (fontes e assets), para o primeiro job levar só o 1s dele
+        await motor.renderizar('dormir', {'segundos': 0}, timeout=10)
+        primeiro = asyncio.create_task(motor.renderizar('dormir', {'segundos': 1.0}, timeout=10))
+        await asyncio.sleep(0.1)
+        inicio = time.monotonic()
+        # Sozinho caberia no prazo (1s de 1.6s), mas ~0.9s são gastos esperando o primeiro
+        with pytest.raises(RenderTimeoutError) as erro:
+            await motor.renderizar('dormir', {'segundos': 1.0}, timeout=1.6)
+        duracao = time.monotonic() - inicio
+        await primeiro
+        return duracao, str(erro.value)
+
+    duracao, mensagem = _com_motor(teste)
+
+    assert duracao < 2.5
+    assert 'tempo limite de 0.' in mensagem
@@ -0,0 +1,96 @@
+# Arquivo: tests/test_tables.py
+# Tabelas (tables/): paginação em blocos da TabelaPaginada e distribuição das larguras das colunas
+
+import random
+
+import pytest
+from reportlab.lib import colors
+
+from pdf_service.tables.builder import TabelaPaginada
+from pdf_service.tables.layout import distribuir_larguras
+
+CORES = [colors.white, colors.lightgrey]
+
+def _tabela(num_linhas, alturas=None):
+    cabecalho = ['Talhão', 'pH']
+    linhas = [[f'T{i}', str(i)] for i in range(num_linhas)]
+    alturas = [20] + (alturas or [10] * num_linhas)
+    return TabelaPaginada(cabecalho, linhas, [100, 60], alturas, [], CORES)
+
+def _blocos(tabela, altura_disponivel):
+    """Parte a tabela como o documento faria, página a página."""
+    blocos = []
+    restante = tabela
+    while True:
+        partes = restante.split(160, altura_disponivel)
+        blocos.append(partes[0])
+        if len(partes) == 1:
+            return blocos
+        restante = partes[1]
+
+def _cores_das_linhas(bloco):
+    _, _, _, cores = next(comando for comando in bloco._bkgrndcmds if comando[0] == 'ROWBACKGROUNDS')
+    return [cores[k % len(cores)] for k in range(len(bloco._cellvalues) - 1)]
+
+@pytest.mark.parametrize('altura_disponivel', [20 + 10 * 5, 20 + 10 * 4 + 5, 20 + 10 * 7])
+def test_cada_bloco_repete_o_cabecalho_e_mantem_as_cores_alternadas(altura_disponivel):
+    tabela = _tabela(23)
+
+    blocos = _blocos(tabela, altura_disponivel)
+
+    assert len(blocos) > 2
+    linhas, cores = [], []
+    for bloco in blocos:
+        assert bloco._cellvalues[0] == ['Talhão', 'pH']
+        assert bloco.wrap(160, altura_disponivel)[1] <= altura_disponivel
+        linhas += bloco._cellvalues[1:]
+        cores += _cores_das_linhas(bloco)
+    # Sem linhas perdidas ou repetidas, e a alternância segue a tabela inteira (blocos começando em linha ímpar)
+    assert linhas == tabela.linhas
+    assert cores == [CORES[i % 2] for i in range(len(tabela.linhas))]
+
+def test_alturas_diferentes_por_linha():
+    alturas = [10, 30, 10, 25, 10, 10, 40, 10, 10, 15, 10]
+    tabela = _tabela(len(alturas), alturas)
+
+    blocos = _blocos(tabela, 20 + 45)
+
+    assert [len(bloco._cellvalues) - 1 for bloco in blocos] == [2, 3, 1, 1, 4]
+    assert [linha for bloco in blocos for linha in bloco._cellvalues[1:]] == tabela.linhas
+
+def test_sem_espaco_para_uma_linha_nao_divide():
+    assert _tabela(5).split(160, 20 + 9) == []
+
+def test_larguras_naturais_quando_tudo_cabe():
+    larguras = distribuir_larguras([100, 50, 50], [40, 20, 20], 400)
+
+    assert larguras == pytest.approx([200, 100, 100])
+
+def test_larguras_garantem_a_maior_palavra_quando_o_texto_quebra():
+    naturais, minimas = [300, 100, 500], [80, 60, 40]
+
+    larguras = distribuir_larguras(naturais, minimas, 400)
+
+    assert sum(larguras) == pytest.approx(400)
+    assert all(largura >= minima for largura, minima in zip(larguras, minimas))
+
+def test_palavras_que_nao_cabem_limitadas_a_divisao_igual():
+    # Nem as maiores palavras cabem (180 + 200 + 30 > 300): cada uma é garantida só até 100
+    larguras = distribuir_larguras([400, 250, 60], [180, 200, 30], 300)
+
+    assert sum(larguras) == pytest.approx(300)
+    assert larguras[0] >= 100 and larguras[1] >= 100 and larguras[2] >= 30
+
+def test_larguras_sempre_somam_o_total():
+    aleatorio = random.Random(22)
+    for _ in range(2_000):
+        num_colunas = aleatorio.randint(1, 8)
+        minimas = [aleatorio.uniform(10, 150) for _ in range(num_colunas)]
+        naturais = [minima + aleatorio.choice([0, aleatorio.uniform(0, 400)]) for minima in minimas]
+        total = aleatorio.uniform(50, 600)
+
+        larguras = distribuir_larguras(naturais, minimas, total)
+
+        assert sum(larguras) == pytest.approx(total)
+        teto = total / num_colunas
+        assert all(largura >= min(minima, teto) - 1e-6 for largura, minima in zip(larguras, minimas))
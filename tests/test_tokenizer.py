@@ -0,0 +1,40 @@
+# Arquivo: tests/test_tokenizer.py
+# Tokenização das tags do conteúdo (text/tokenizer.py)
+
+from pdf_service.text.markdown_processor import converter_markdown_para_html
+from pdf_service.text.tokenizer import TipoToken, tokenizar_bloco, tokenizar_conteudo
+
+def _tokens_bloco(bloco):
+    return list(tokenizar_bloco(converter_markdown_para_html(bloco)))
+
+def test_conteudo_separa_tags_e_texto():
+    texto = 'Intro\n[GRÁFICO DE PIZZA: Uso do solo: Pasto=60, Mata=40]\n[TABELA: T\nA | B\n1 | 2\n]\n[IMAGEM:2]fim'
+    tokens = list(tokenizar_conteudo(texto))
+
+    assert [token.tipo for token in tokens] == [
+        TipoToken.TEXTO, TipoToken.GRAFICO, TipoToken.TEXTO, TipoToken.TABELA, TipoToken.TEXTO,
+        TipoToken.IMAGEM, TipoToken.TEXTO,
+    ]
+    assert (tokens[1].subtipo, tokens[1].titulo, tokens[1].texto) == ('pizza', 'Uso do solo', 'Pasto=60, Mata=40')
+    assert tokens[5].numero == 2
+
+def test_marcador_separador_literal_vira_separador():
+    # Linha com o marcador escrito no conteúdo: separador, nunca título em negrito
+    tokens = _tokens_bloco('Texto antes\n[SEPARADOR_HORIZONTAL]\nTexto depois')
+
+    assert tokens[0].tipo is TipoToken.SEPARADOR
+    assert TipoToken.TITULO not in [token.tipo for token in tokens]
+    texto = ''.join(token.texto for token in tokens if token.tipo is TipoToken.TEXTO)
+    assert texto == 'Texto antes<br/><br/>Texto depois'
+
+def test_marcador_separador_no_meio_da_linha():
+    tokens = _tokens_bloco('Fim da seção [SEPARADOR_HORIZONTAL]')
+
+    assert [token.tipo for token in tokens] == [TipoToken.SEPARADOR, TipoToken.TEXTO]
+    assert tokens[1].texto == 'Fim da seção '
+
+def test_tracos_viram_um_separador():
+    tokens = _tokens_bloco('## Título\n---\n---')
+
+    assert [token.tipo for token in tokens] == [TipoToken.SEPARADOR, TipoToken.TITULO, TipoToken.TEXTO]
+    assert (tokens[1].numero, tokens[1].texto) == (2, 'Título')
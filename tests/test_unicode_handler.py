@@ -0,0 +1,58 @@
+# Arquivo: tests/test_unicode_handler.py
+# corrigir_caracteres_especiais (varredura única) contra a cadeia de str.replace anterior, congelada aqui
+
+import random
+
+import pytest
+
+from pdf_service.text.unicode_handler import corrigir_caracteres_especiais
+
+# Tabela da versão anterior, na ordem em que os str.replace eram aplicados (inclui '■¹', '■²', '■³', '°C'
+# e '°F', que não estão mais em SUBSTITUICOES por nunca terem efeito nessa ordem)
+SUBSTITUICOES_ANTERIORES = [
+    ('⁻¹', '<sup>-1</sup>'), ('⁻²', '<sup>-2</sup>'), ('⁻³', '<sup>-3</sup>'), ('⁻⁴', '<sup>-4</sup>'),
+    ('¹', '<sup>1</sup>'), ('²', '<sup>2</sup>'), ('³', '<sup>3</sup>'), ('⁴', '<sup>4</sup>'),
+    ('₀', '<sub>0</sub>'), ('₁', '<sub>1</sub>'), ('₂', '<sub>2</sub>'), ('₃', '<sub>3</sub>'), ('₄', '<sub>4</sub>'),
+    ('₅', '<sub>5</sub>'), ('₆', '<sub>6</sub>'), ('₇', '<sub>7</sub>'), ('₈', '<sub>8</sub>'), ('₉', '<sub>9</sub>'),
+    ('■¹', '<sup>-1</sup>'), ('■²', '<sup>-2</sup>'), ('■³', '<sup>-3</sup>'),
+    ('P■O■', 'P<sub>2</sub>O<sub>5</sub>'), ('K■O', 'K<sub>2</sub>O'), ('N■O■', 'N<sub>2</sub>O<sub>5</sub>'),
+    ('Ca■', 'Ca<sub>2</sub>'), ('Mg■', 'Mg<sub>2</sub>'), ('SO■', 'SO<sub>4</sub>'),
+    ('■', ''),
+    ('≈', '~'), ('≤', '<='), ('≥', '>='), ('±', '+/-'),
+    ('°C', '&deg;C'), ('°F', '&deg;F'), ('°', '&deg;'),
+    ('½', '1/2'), ('¼', '1/4'), ('¾', '3/4'),
+    ('µ', 'u'), ('α', 'alfa'), ('β', 'beta'), ('γ', 'gama'),
+]
+
+def corrigir_anterior(texto):
+    if not texto:
+        return texto
+    for original, substituto in SUBSTITUICOES_ANTERIORES:
+        texto = texto.replace(original, substituto)
+    return texto
+
+@pytest.mark.parametrize('texto', [
+    '', 'texto só em ASCII', 'Adubação com calcário',
+    # Chaves de mais de um caractere e suas sobreposições
+    'P■O■', 'K■O', 'N■O■', 'Ca■', 'Mg■', 'SO■', 'P■O■■', 'KP■O■', 'N■O■O■', 'Ca■■', 'SO■O■',
+    '⁻¹', '⁻²', '⁻³', '⁻⁴', 'kg ha⁻¹', 'mg dm⁻³ e cmolc dm⁻³', '⁻', '⁻⁻¹', '⁻5', 'Ca²⁺',
+    # Entradas que saíram da tabela
+    '■¹', '■²', '■³', 'P■¹', '°C', '°F', '25 °C', '77°F', '°Ca■', '°F■', '■°C',
+    # Caracteres isolados
+    '¹²³⁴', '₀₁₂₃₄₅₆₇₈₉', 'H₂SO₄', '≈ ≤ ≥ ±', '½ ¼ ¾', 'µg', 'α β γ', '■ quadrado ■',
+    'Aplicar 90 kg/ha de P■O■ e 60 kg/ha de K₂O a 25 °C (≈ 1½ t, pH ≥ 5,5)',
+])
+def test_igual_a_cadeia_anterior(texto):
+    assert corrigir_caracteres_especiais(texto) == corrigir_anterior(texto)
+
+def test_igual_a_cadeia_anterior_em_textos_aleatorios():
+    # Chaves inteiras, pedaços e vizinhos, onde a ordem das substituições poderia fazer diferença
+    pedacos = ([chave for chave, _ in SUBSTITUICOES_ANTERIORES]
+               + list('POKNCaMgSF■⁻°¹²³⁴₂₅ ac-<>&') + ['ção', 'mg/dm', '\n'])
+    aleatorio = random.Random(20)
+    for _ in range(20_000):
+        texto = ''.join(aleatorio.choice(pedacos) for _ in range(aleatorio.randint(0, 12)))
+        assert corrigir_caracteres_especiais(texto) == corrigir_anterior(texto), texto
+
+def test_none_volta_inalterado():
+    assert corrigir_caracteres_especiais(None) is None